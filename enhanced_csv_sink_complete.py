@@ -15,6 +15,7 @@ Author: AI Assistant (Atomic file operations with comprehensive error handling)
 - Automatic cleanup and archival
 - Data quality scoring and validation
 - CSV format standardization
+- Streaming appends into segment files tracked by a manifest
 """
 
 import csv
@@ -29,6 +30,7 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional, Union, Tuple
 import tempfile
 import os
+import io
 import hashlib
 
 logger = logging.getLogger(__name__)
@@ -45,14 +47,20 @@ class EnhancedCSVSink:
     - Performance optimization
     - Thread-safe operations
     - Backup and archival capabilities
+    - Streaming appends into manifest-tracked segment files
     """
     
+    # Format version of the per-day segment manifest
+    MANIFEST_VERSION = 1
+    
     def __init__(self, 
                  base_dir: str = "data/g6_data",
                  enable_compression: bool = False,
                  enable_backup: bool = True,
                  max_file_size_mb: int = 100,
-                 archive_after_days: int = 30):
+                 archive_after_days: int = 30,
+                 streaming_append: bool = True,
+                 fsync_appends: bool = True):
         """
         🆕 Initialize Enhanced CSV Sink.
         
@@ -62,12 +70,16 @@ class EnhancedCSVSink:
             enable_backup: Enable automatic backup creation
             max_file_size_mb: Maximum file size before rotation
             archive_after_days: Days after which to archive files
+            streaming_append: Append to segment files instead of rewriting the whole file
+            fsync_appends: fsync each streaming append before committing it to the manifest
         """
         self.base_dir = Path(base_dir)
         self.enable_compression = enable_compression
         self.enable_backup = enable_backup
         self.max_file_size_mb = max_file_size_mb
         self.archive_after_days = archive_after_days
+        self.streaming_append = streaming_append
+        self.fsync_appends = fsync_appends
         
         # 🔒 AI Assistant: Thread safety
         self.lock = threading.RLock()
@@ -83,6 +95,11 @@ class EnhancedCSVSink:
         self.open_files = {}  # Cache of open file handles
         self.file_locks = {}  # Per-file locks for concurrent access
         
+        # 🧩 AI Assistant: Streaming append state (manifest per day file)
+        self.segment_states: Dict[Path, Dict[str, Any]] = {}
+        self.segment_appends = 0
+        self.segments_opened = 0
+        
         self.logger = logging.getLogger(f"{__name__}.EnhancedCSVSink")
         
         # 🏗️ AI Assistant: Ensure base directory exists
@@ -157,7 +174,9 @@ class EnhancedCSVSink:
                     self.logger.warning(f"⚠️ Low data quality ({data_quality:.2f}) for {index_name} {expiry_tag} {offset}")
                 
                 # 💾 AI Assistant: Check file size and rotate if necessary
-                if csv_file.exists() and self._should_rotate_file(csv_file):
+                # (streaming appends roll over to a new segment instead)
+                streaming = append_mode and self.streaming_append
+                if not streaming and csv_file.exists() and self._should_rotate_file(csv_file):
                     rotated_file = self._rotate_file(csv_file)
                     self.logger.info(f"🔄 File rotated: {csv_file} -> {rotated_file}")
                 
@@ -184,7 +203,8 @@ class EnhancedCSVSink:
                     )
                     
                     # 💾 AI Assistant: Create backup if enabled
-                    if self.enable_backup and len(sanitized_data) > 100:  # Only backup substantial files
+                    # (streamed segments are fsynced in place; copying them every cycle is O(file size))
+                    if self.enable_backup and not streaming and len(sanitized_data) > 100:  # Only backup substantial files
                         self._create_backup(csv_file)
                 
                 return success
@@ -449,6 +469,7 @@ class EnhancedCSVSink:
         
         try:
             csv_file.rename(rotated_path)
+            self._discard_manifest(csv_file)
             
             # 🗜️ Compress rotated file if enabled
             if self.enable_compression:
@@ -507,6 +528,30 @@ class EnhancedCSVSink:
         except Exception as e:
             self.logger.warning(f"⚠️ Failed to create backup for {csv_file}: {e}")
     
+    def _order_fieldnames(self, fieldnames: set) -> List[str]:
+        """
+        🎯 Order CSV columns: priority fields first, the rest alphabetically.
+        
+        Args:
+            fieldnames: Set of column names
+        
+        Returns:
+            List[str]: Ordered column names
+        """
+        fieldnames = set(fieldnames)
+        priority_fields = ['timestamp', 'tradingsymbol', 'strike', 'expiry', 'option_type', 'last_price']
+        ordered_fields = []
+        
+        # Add priority fields first
+        for field in priority_fields:
+            if field in fieldnames:
+                ordered_fields.append(field)
+                fieldnames.discard(field)
+        
+        # Add remaining fields alphabetically
+        ordered_fields.extend(sorted(fieldnames))
+        return ordered_fields
+    
     def _write_csv_atomic(self, 
                          csv_file: Path, 
                          data: List[Dict[str, Any]], 
@@ -516,6 +561,10 @@ class EnhancedCSVSink:
         """
         📝 AI Assistant: Write CSV file atomically to prevent corruption with enhanced features.
         
+        With streaming_append enabled, appends go to _append_streaming and
+        cost O(batch size). Otherwise the whole file (including any streamed
+        segments) is rewritten through a temporary file.
+        
         Args:
             csv_file: Path to CSV file
             data: Data to write
@@ -529,11 +578,14 @@ class EnhancedCSVSink:
         if not data:
             return True
         
+        if append_mode and self.streaming_append:
+            return self._append_streaming(csv_file, data, timestamp, metadata)
+        
         try:
             # 📊 AI Assistant: Determine if file exists and get existing data for append
             existing_data = []
             if append_mode and csv_file.exists():
-                existing_data = self._read_existing_csv(csv_file)
+                existing_data = self.read_segments(csv_file)
             
             # 🔄 AI Assistant: Combine existing and new data
             combined_data = existing_data + data if append_mode else data
@@ -542,19 +594,7 @@ class EnhancedCSVSink:
             fieldnames = set()
             for row in combined_data:
                 fieldnames.update(row.keys())
-            
-            # 🎯 AI Assistant: Order fields logically
-            priority_fields = ['timestamp', 'tradingsymbol', 'strike', 'expiry', 'option_type', 'last_price']
-            ordered_fields = []
-            
-            # Add priority fields first
-            for field in priority_fields:
-                if field in fieldnames:
-                    ordered_fields.append(field)
-                    fieldnames.discard(field)
-            
-            # Add remaining fields alphabetically
-            ordered_fields.extend(sorted(fieldnames))
+            ordered_fields = self._order_fieldnames(fieldnames)
             
             # 📝 AI Assistant: Write to temporary file first (atomic operation)
             temp_file = csv_file.with_suffix('.tmp')
@@ -579,6 +619,9 @@ class EnhancedCSVSink:
             else:  # Unix-like
                 temp_file.rename(csv_file)
             
+            # 🧩 AI Assistant: The rewritten file now holds the whole day
+            self._reset_segments(csv_file)
+            
             # 📊 AI Assistant: Log success with file info
             file_size = csv_file.stat().st_size
             self.logger.debug(
@@ -600,6 +643,281 @@ class EnhancedCSVSink:
             
             return False
     
+    def _append_streaming(self,
+                          csv_file: Path,
+                          data: List[Dict[str, Any]],
+                          timestamp: datetime,
+                          metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        🧩 AI Assistant: Append rows to the active segment without rewriting history.
+        
+        Rows are rendered once and written with a single append. The manifest
+        records each segment's committed byte length, and it is only updated
+        after the append is flushed (and fsynced), so a torn write is cut off
+        on the next load. A new segment (with its own header) is opened when
+        the batch brings new columns or the active segment is too large.
+        
+        Args:
+            csv_file: Path to the day's CSV file (first segment)
+            data: Rows to append
+            timestamp: Timestamp for the data
+            metadata: Optional metadata written as comments in new segments
+        
+        Returns:
+            bool: True if the append was committed
+        """
+        try:
+            state = self._load_segment_state(csv_file)
+            segments = state['segments']
+            
+            keys = set()
+            for row in data:
+                keys.update(row.keys())
+            
+            active = segments[-1] if segments else None
+            if active is not None and keys <= set(active['fieldnames']) and \
+                    active['bytes'] <= self.max_file_size_mb * 1024 * 1024:
+                # ➕ Same schema: append rows to the active segment
+                payload = self._render_csv(data, active['fieldnames'])
+                segment_path = csv_file.parent / active['file']
+                mode = 'ab'
+            else:
+                # 🆕 Schema change, oversized or first write: open a new segment
+                fieldnames = self._order_fieldnames(keys | set(active['fieldnames'] if active else ()))
+                segment_path = self._segment_path(csv_file, len(segments))
+                active = {'file': segment_path.name, 'fieldnames': fieldnames, 'rows': 0, 'bytes': 0}
+                
+                header = ''
+                if metadata:
+                    header += f"# Generated at: {timestamp.isoformat()}\n"
+                    for key, value in metadata.items():
+                        header += f"# {key}: {value}\n"
+                header_rows = self._render_csv(data, fieldnames, write_header=True)
+                payload = header.encode('utf-8') + header_rows
+                mode = 'wb'
+            
+            with open(segment_path, mode) as f:
+                f.write(payload)
+                f.flush()
+                if self.fsync_appends:
+                    os.fsync(f.fileno())
+                committed_bytes = f.tell()
+            
+            # 📜 Commit: the manifest only ever points at fully written bytes
+            if mode == 'wb':
+                segments.append(active)
+                self.segments_opened += 1
+                if len(segments) > 1:
+                    self.logger.info(f"🧩 Opened segment {segment_path.name} ({len(active['fieldnames'])} columns)")
+            active['rows'] += len(data)
+            active['bytes'] = committed_bytes
+            self._save_manifest(csv_file, state)
+            
+            self.segment_appends += 1
+            self.logger.debug(
+                f"✅ Streamed {len(data)} rows to {segment_path.name} "
+                f"({active['rows']} rows, {committed_bytes:,} bytes)"
+            )
+            return True
+        
+        except Exception as e:
+            self.logger.error(f"🔴 Failed to append CSV segment for {csv_file}: {e}")
+            # 🔄 Reload from the manifest (and cut any torn write) on the next append
+            self.segment_states.pop(csv_file, None)
+            return False
+    
+    def _render_csv(self, data: List[Dict[str, Any]], fieldnames: List[str], write_header: bool = False) -> bytes:
+        """
+        📝 Render rows to UTF-8 CSV bytes.
+        
+        Args:
+            data: Rows to render
+            fieldnames: Column order (extra keys are ignored, missing ones left empty)
+            write_header: Include the header row
+        
+        Returns:
+            bytes: Encoded CSV text
+        """
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction='ignore')
+        if write_header:
+            writer.writeheader()
+        writer.writerows(data)
+        return buffer.getvalue().encode('utf-8')
+    
+    def _segment_path(self, csv_file: Path, segment_number: int) -> Path:
+        """
+        🧩 Get the path of a segment (segment 0 is the day file itself).
+        
+        Args:
+            csv_file: Path to the day's CSV file
+            segment_number: Segment number
+        
+        Returns:
+            Path: Segment file path
+        """
+        if segment_number == 0:
+            return csv_file
+        return csv_file.parent / f"{csv_file.stem}.seg{segment_number:03d}{csv_file.suffix}"
+    
+    def _manifest_path(self, csv_file: Path) -> Path:
+        """📜 Get the manifest path for a day's CSV file."""
+        return csv_file.with_suffix('.manifest.json')
+    
+    def _save_manifest(self, csv_file: Path, state: Dict[str, Any]):
+        """
+        📜 Write the segment manifest atomically (temp file + rename).
+        
+        Args:
+            csv_file: Path to the day's CSV file
+            state: Segment state to persist
+        """
+        manifest_path = self._manifest_path(csv_file)
+        temp_path = csv_file.with_suffix('.manifest.tmp')
+        
+        state['updated_at'] = datetime.now().isoformat()
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, separators=(',', ':'))
+        os.replace(temp_path, manifest_path)
+    
+    def _load_segment_state(self, csv_file: Path) -> Dict[str, Any]:
+        """
+        📜 Get the segment state for a day's CSV file, recovering it from disk.
+        
+        Loads the manifest if there is one and truncates any bytes appended
+        after the last commit. A plain CSV written without a manifest is
+        adopted as segment 0 (scanned once).
+        
+        Args:
+            csv_file: Path to the day's CSV file
+        
+        Returns:
+            Dict[str, Any]: Segment state (version, segments)
+        """
+        state = self.segment_states.get(csv_file)
+        if state is not None:
+            return state
+        
+        manifest_path = self._manifest_path(csv_file)
+        state = {'version': self.MANIFEST_VERSION, 'segments': []}
+        
+        if manifest_path.exists():
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            
+            # ✂️ Cut uncommitted bytes from a torn append
+            for segment in state['segments']:
+                segment_path = csv_file.parent / segment['file']
+                actual_size = segment_path.stat().st_size if segment_path.exists() else 0
+                if actual_size > segment['bytes']:
+                    with open(segment_path, 'r+b') as f:
+                        f.truncate(segment['bytes'])
+                    self.logger.warning(
+                        f"⚠️ Truncated {actual_size - segment['bytes']:,} uncommitted bytes from {segment_path.name}"
+                    )
+                elif actual_size < segment['bytes']:
+                    self.logger.warning(f"⚠️ Segment {segment_path.name} is shorter than its manifest entry")
+                    segment['bytes'] = actual_size
+        
+        elif csv_file.exists():
+            # 📥 Adopt a file written by an atomic rewrite
+            rows = self._read_existing_csv(csv_file)
+            fieldnames = self._read_csv_header(csv_file)
+            if fieldnames:
+                state['segments'].append({
+                    'file': csv_file.name,
+                    'fieldnames': fieldnames,
+                    'rows': len(rows),
+                    'bytes': csv_file.stat().st_size
+                })
+        
+        self.segment_states[csv_file] = state
+        return state
+    
+    def _read_csv_header(self, csv_file: Path) -> List[str]:
+        """
+        📋 Read the header row of a CSV file (skipping comment lines).
+        
+        Args:
+            csv_file: Path to CSV file
+        
+        Returns:
+            List[str]: Column names (empty if the file has no header)
+        """
+        with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+            for line in f:
+                if line.strip() and not line.startswith('#'):
+                    return next(csv.reader([line]))
+        return []
+    
+    def _discard_manifest(self, csv_file: Path):
+        """
+        📜 Forget the manifest of a day's CSV file, keeping segment files.
+        
+        Every segment carries its own header, so they remain readable as
+        standalone CSV files.
+        
+        Args:
+            csv_file: Path to the day's CSV file
+        """
+        self.segment_states.pop(csv_file, None)
+        manifest_path = self._manifest_path(csv_file)
+        if manifest_path.exists():
+            manifest_path.unlink()
+    
+    def _reset_segments(self, csv_file: Path):
+        """
+        🧹 Remove extra segments and the manifest after a full rewrite.
+        
+        Args:
+            csv_file: Path to the day's CSV file (kept)
+        """
+        manifest_path = self._manifest_path(csv_file)
+        if manifest_path.exists():
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    segments = json.load(f).get('segments', [])
+                for segment in segments:
+                    if segment['file'] != csv_file.name:
+                        (csv_file.parent / segment['file']).unlink(missing_ok=True)
+            except Exception as e:
+                self.logger.warning(f"⚠️ Could not remove segments of {csv_file}: {e}")
+        self._discard_manifest(csv_file)
+    
+    def read_segments(self, csv_file: Path) -> List[Dict[str, Any]]:
+        """
+        📖 AI Assistant: Read a day's rows across all committed segments.
+        
+        Only bytes recorded in the manifest are read, so an append in
+        progress is never visible. Files without a manifest are read whole.
+        
+        Args:
+            csv_file: Path to the day's CSV file
+        
+        Returns:
+            List[Dict[str, Any]]: Rows in write order
+        """
+        csv_file = Path(csv_file)
+        manifest_path = self._manifest_path(csv_file)
+        if csv_file not in self.segment_states and not manifest_path.exists():
+            return self._read_existing_csv(csv_file) if csv_file.exists() else []
+        
+        try:
+            with self.lock:
+                segments = [dict(segment) for segment in self._load_segment_state(csv_file)['segments']]
+            
+            rows = []
+            for segment in segments:
+                with open(csv_file.parent / segment['file'], 'rb') as f:
+                    text = f.read(segment['bytes']).decode('utf-8')
+                lines = [line for line in text.splitlines(keepends=True) if not line.startswith('#')]
+                rows.extend(csv.DictReader(io.StringIO(''.join(lines))))
+            return rows
+        
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not read CSV segments for {csv_file}: {e}")
+            return []
+    
     def _read_existing_csv(self, csv_file: Path) -> List[Dict[str, Any]]:
         """
         📖 AI Assistant: Read existing CSV data safely.
@@ -622,7 +940,6 @@ class EnhancedCSVSink:
                     return []
                 
                 # 📊 Read CSV from filtered lines
-                import io
                 csv_content = ''.join(lines)
                 reader = csv.DictReader(io.StringIO(csv_content))
                 return list(reader)
@@ -663,7 +980,11 @@ class EnhancedCSVSink:
                 'compression_enabled': self.enable_compression,
                 'backup_enabled': self.enable_backup,
                 'max_file_size_mb': self.max_file_size_mb,
-                'open_files_count': len(self.open_files)
+                'open_files_count': len(self.open_files),
+                'streaming_append': self.streaming_append,
+                'segment_appends': self.segment_appends,
+                'segments_opened': self.segments_opened,
+                'tracked_day_files': len(self.segment_states)
             }
     
     def get_file_summary(self) -> Dict[str, Any]:
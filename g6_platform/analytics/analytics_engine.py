@@ -25,9 +25,16 @@ import statistics
 import numpy as np
 from scipy import stats, optimize
 from scipy.stats import norm
+from scipy.special import ndtr
 
 logger = logging.getLogger(__name__)
 
+SQRT_2PI = math.sqrt(2 * math.pi)
+
+def _norm_pdf(x: np.ndarray) -> np.ndarray:
+    """📊 Vectorized standard normal PDF."""
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
 @dataclass
 class GreekValues:
     """🧮 Complete Greeks data structure."""
@@ -150,6 +157,110 @@ class IVCalculator:
             self.convergence_failures += 1
             return None
     
+    def calculate_implied_volatility_batch(self,
+                                         prices: Any,
+                                         spots: Any,
+                                         strikes: Any,
+                                         time_to_expiry: Any,
+                                         option_types: Any,
+                                         max_iterations: int = 100,
+                                         tolerance: float = 1e-6) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        🧮 Calculate implied volatility for a whole chain at once.
+        
+        Runs safeguarded Newton-Raphson on NumPy arrays: every lane keeps a
+        [low, high] volatility bracket, and lanes whose Newton step leaves the
+        bracket (or whose vega vanishes) take a bisection step instead, so
+        deep ITM/OTM legs still converge.
+        
+        Args:
+            prices: Option prices
+            spots: Underlying prices (scalar or per leg)
+            strikes: Strike prices
+            time_to_expiry: Time to expiry in years (scalar or per leg)
+            option_types: 'CE' or 'PE' per leg
+            max_iterations: Maximum solver iterations
+            tolerance: Volatility convergence tolerance
+            
+        Returns:
+            Tuple of (IV as percentage with NaN for failures, failure mask)
+        """
+        prices, spots, strikes, time_to_expiry = np.broadcast_arrays(
+            np.asarray(prices, dtype=float),
+            np.asarray(spots, dtype=float),
+            np.asarray(strikes, dtype=float),
+            np.asarray(time_to_expiry, dtype=float)
+        )
+        is_call = np.broadcast_to(np.asarray(option_types) == 'CE', prices.shape)
+        
+        count = prices.size
+        self.calculations_performed += count
+        iv = np.full(prices.shape, np.nan)
+        if count == 0:
+            return iv, np.zeros(prices.shape, dtype=bool)
+        
+        with np.errstate(all='ignore'):
+            # 🧪 Input validation and no-arbitrage bounds
+            valid = (np.isfinite(prices) & np.isfinite(spots) & np.isfinite(strikes) & np.isfinite(time_to_expiry) &
+                     (prices > 0) & (spots > 0) & (strikes > 0) & (time_to_expiry > 0))
+            
+            discounted_spot = spots * np.exp(-self.dividend_yield * time_to_expiry)
+            discounted_strike = strikes * np.exp(-self.risk_free_rate * time_to_expiry)
+            lower = np.where(is_call, discounted_spot - discounted_strike, discounted_strike - discounted_spot)
+            upper = np.where(is_call, discounted_spot, discounted_strike)
+            valid &= (prices > np.maximum(lower, 0.0)) & (prices < upper)
+            
+            idx = np.flatnonzero(valid)
+            target = prices.ravel()[idx]
+            S = discounted_spot.ravel()[idx]
+            K = discounted_strike.ravel()[idx]
+            T = time_to_expiry.ravel()[idx]
+            call = is_call.ravel()[idx]
+            sqrt_t = np.sqrt(T)
+            log_moneyness = np.log(S / K)
+            
+            # 🎯 Brenner-Subrahmanyam initial guess and solver bracket
+            sigma = np.clip(target / spots.ravel()[idx] * SQRT_2PI / sqrt_t, 0.05, 3.0)
+            low = np.full(idx.size, 0.001)
+            high = np.full(idx.size, 5.0)
+            converged = np.zeros(idx.size, dtype=bool)
+            
+            for _ in range(max_iterations):
+                active = np.flatnonzero(~converged)
+                if active.size == 0:
+                    break
+                
+                sig = sigma[active]
+                vol_t = sig * sqrt_t[active]
+                d1 = (log_moneyness[active] + 0.5 * vol_t * vol_t) / vol_t
+                d2 = d1 - vol_t
+                
+                call_price = S[active] * ndtr(d1) - K[active] * ndtr(d2)
+                price = np.where(call[active], call_price, call_price - S[active] + K[active])
+                vega = S[active] * _norm_pdf(d1) * sqrt_t[active]
+                diff = price - target[active]
+                
+                # 📊 Price is increasing in volatility: tighten the bracket
+                too_high = diff > 0
+                high[active] = np.where(too_high, sig, high[active])
+                low[active] = np.where(too_high, low[active], sig)
+                
+                # 📈 Newton step, falling back to bisection outside the bracket
+                newton = sig - diff / vega
+                use_bisection = ~np.isfinite(newton) | (newton <= low[active]) | (newton >= high[active])
+                sig_new = np.where(use_bisection, 0.5 * (low[active] + high[active]), newton)
+                
+                converged[active] = np.abs(sig_new - sig) < tolerance
+                sigma[active] = sig_new
+            
+            result = np.where(converged & (sigma >= 0.01) & (sigma <= 5.0), sigma * 100, np.nan)
+            iv.ravel()[idx] = result
+        
+        failed = np.isnan(iv)
+        self.convergence_failures += int(failed.sum())
+        
+        return iv, failed
+    
     def _calculate_iv_black_scholes(self,
                                    option_price: float,
                                    spot_price: float,
@@ -386,6 +497,81 @@ class GreeksCalculator:
             self.logger.debug(f"⚠️ Greeks calculation error: {e}")
             return GreekValues(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
     
+    def calculate_greeks_batch(self,
+                               spots: Any,
+                               strikes: Any,
+                               time_to_expiry: Any,
+                               volatilities: Any,
+                               option_types: Any) -> Dict[str, np.ndarray]:
+        """
+        🧮 Calculate all Greeks for a whole chain at once.
+        
+        d1, d2, the normal PDF/CDF terms and discount factors are computed
+        once per leg and shared by every Greek. Units match
+        calculate_all_greeks (daily theta, vega and rho per 1%).
+        
+        Args:
+            spots: Underlying prices (scalar or per leg)
+            strikes: Strike prices
+            time_to_expiry: Time to expiry in years (scalar or per leg)
+            volatilities: Volatilities as decimals (NaN for unknown)
+            option_types: 'CE' or 'PE' per leg
+            
+        Returns:
+            Dictionary of arrays: delta, gamma, theta, vega, rho,
+            implied_volatility (percentage) and theoretical_price; legs with
+            invalid inputs are NaN
+        """
+        spots, strikes, time_to_expiry, volatilities = np.broadcast_arrays(
+            np.asarray(spots, dtype=float),
+            np.asarray(strikes, dtype=float),
+            np.asarray(time_to_expiry, dtype=float),
+            np.asarray(volatilities, dtype=float)
+        )
+        is_call = np.broadcast_to(np.asarray(option_types) == 'CE', spots.shape)
+        
+        with np.errstate(all='ignore'):
+            valid = (spots > 0) & (strikes > 0) & (time_to_expiry > 0) & (volatilities > 0)
+            
+            # 🧮 Shared terms
+            sqrt_t = np.sqrt(time_to_expiry)
+            vol_t = volatilities * sqrt_t
+            d1 = (np.log(spots / strikes) +
+                  (self.risk_free_rate - self.dividend_yield + 0.5 * volatilities ** 2) * time_to_expiry) / vol_t
+            d2 = d1 - vol_t
+            
+            pdf_d1 = _norm_pdf(d1)
+            cdf_d1 = ndtr(d1)
+            cdf_d2 = ndtr(d2)
+            dividend_discount = np.exp(-self.dividend_yield * time_to_expiry)
+            rate_discount = np.exp(-self.risk_free_rate * time_to_expiry)
+            discounted_spot = spots * dividend_discount
+            discounted_strike = strikes * rate_discount
+            
+            # Put terms via N(-x) = 1 - N(x)
+            cdf_d1_signed = np.where(is_call, cdf_d1, cdf_d1 - 1.0)
+            cdf_d2_signed = np.where(is_call, cdf_d2, cdf_d2 - 1.0)
+            
+            delta = dividend_discount * cdf_d1_signed
+            gamma = dividend_discount * pdf_d1 / (spots * vol_t)
+            vega = discounted_spot * pdf_d1 * sqrt_t / 100
+            theta = (-(discounted_spot * pdf_d1 * volatilities) / (2 * sqrt_t)
+                     - self.risk_free_rate * discounted_strike * cdf_d2_signed
+                     + self.dividend_yield * discounted_spot * cdf_d1_signed) / 365
+            rho = discounted_strike * time_to_expiry * cdf_d2_signed / 100
+            theoretical_price = np.maximum(0.0, discounted_spot * cdf_d1_signed - discounted_strike * cdf_d2_signed)
+        
+        greeks = {
+            'delta': delta,
+            'gamma': gamma,
+            'theta': theta,
+            'vega': vega,
+            'rho': rho,
+            'implied_volatility': volatilities * 100,
+            'theoretical_price': theoretical_price
+        }
+        return {name: np.where(valid, values, np.nan) for name, values in greeks.items()}
+    
     def _calculate_delta(self, d1: float, option_type: str, time_to_expiry: float) -> float:
         """📈 Calculate Delta."""
         try:
@@ -485,6 +671,102 @@ class GreeksCalculator:
         except Exception:
             return 0.0
 
+class ChainGreeksEngine:
+    """
+    🧮 Chain-level IV and Greeks engine.
+    
+    Solves implied volatility for every leg of a chain with the vectorized
+    IV solver, then computes all Greeks from the same column arrays, so
+    per-cycle cost scales with NumPy rather than Python call overhead.
+    """
+    
+    GREEK_FIELDS = ('delta', 'gamma', 'theta', 'vega', 'rho', 'implied_volatility', 'theoretical_price')
+    
+    # Indian index options expire at market close (15:30 IST)
+    EXPIRY_TIME = datetime.time(15, 30)
+    SECONDS_PER_YEAR = 365 * 24 * 3600
+    
+    def __init__(self, risk_free_rate: float = 0.06, dividend_yield: float = 0.0):
+        """🆕 Initialize chain Greeks engine."""
+        self.iv_calculator = IVCalculator(risk_free_rate, dividend_yield)
+        self.greeks_calculator = GreeksCalculator(risk_free_rate, dividend_yield)
+    
+    def compute(self,
+                prices: Any,
+                spots: Any,
+                strikes: Any,
+                time_to_expiry: Any,
+                option_types: Any) -> Dict[str, np.ndarray]:
+        """
+        🧮 Calculate IV and Greeks from column arrays.
+        
+        Returns:
+            Dictionary of Greek arrays plus an 'iv_failed' mask
+        """
+        iv, failed = self.iv_calculator.calculate_implied_volatility_batch(
+            prices, spots, strikes, time_to_expiry, option_types
+        )
+        greeks = self.greeks_calculator.calculate_greeks_batch(
+            spots, strikes, time_to_expiry, iv / 100, option_types
+        )
+        greeks['iv_failed'] = failed
+        return greeks
+    
+    def time_to_expiry(self, expiry: Optional[str], now: Optional[datetime.datetime] = None) -> float:
+        """⏰ Time to expiry in years for a YYYY-MM-DD expiry (NaN if unknown or past)."""
+        if not expiry:
+            return math.nan
+        try:
+            expiry_date = datetime.datetime.strptime(str(expiry)[:10], '%Y-%m-%d').date()
+        except ValueError:
+            return math.nan
+        
+        now = now or datetime.datetime.now()
+        seconds = (datetime.datetime.combine(expiry_date, self.EXPIRY_TIME) - now).total_seconds()
+        return seconds / self.SECONDS_PER_YEAR if seconds > 0 else math.nan
+    
+    def compute_chain(self,
+                      options: List[Dict[str, Any]],
+                      spot_price: float,
+                      now: Optional[datetime.datetime] = None) -> List[Dict[str, Optional[float]]]:
+        """
+        🧮 Calculate IV and Greeks for collected option records.
+        
+        Args:
+            options: Records with last_price, strike, option_type and expiry
+            spot_price: Current underlying price
+            now: Valuation time (defaults to now)
+            
+        Returns:
+            Per-record Greek dictionaries (None for legs that failed)
+        """
+        if not options:
+            return []
+        
+        now = now or datetime.datetime.now()
+        
+        # One time-to-expiry per distinct expiry rather than per leg
+        expiry_years = {expiry: self.time_to_expiry(expiry, now)
+                        for expiry in {o.get('expiry') for o in options}}
+        
+        prices = np.array([o.get('last_price') or 0.0 for o in options], dtype=float)
+        strikes = np.array([o.get('strike') or 0.0 for o in options], dtype=float)
+        option_types = np.array([o.get('option_type') for o in options])
+        time_to_expiry = np.array([expiry_years[o.get('expiry')] for o in options])
+        
+        greeks = self.compute(prices, spot_price, strikes, time_to_expiry, option_types)
+        
+        rows: List[Dict[str, Optional[float]]] = []
+        failed = greeks['iv_failed']
+        columns = [(name, greeks[name]) for name in self.GREEK_FIELDS]
+        for i in range(len(options)):
+            if failed[i]:
+                rows.append({name: None for name in self.GREEK_FIELDS})
+            else:
+                rows.append({name: round(float(values[i]), 4) for name, values in columns})
+        
+        return rows
+
 class PCRAnalyzer:
     """
     📊 AI Assistant: Comprehensive Put-Call Ratio Analyzer.
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📈 Chain Aggregates - G6 Platform v3.0
+Running per-index option chain totals updated from snapshot deltas.
+
+Consecutive snapshots of a chain usually keep the same contracts and only
+some legs change OI, volume or IV. ChainAggregates keeps per-leg values,
+per-strike OI/volume, side totals and IV sums, and folds in only the rows
+that differ from the previous snapshot, so overview metrics no longer
+rescan the whole chain every cycle.
+
+Features:
+- Side totals, PCR inputs and per-strike OI/volume maintained from deltas
+- Average IV from a running sum/count of legs with IV
+- Top-K OI strikes recomputed only when a changed strike can affect them
+- Strike maps rebuilt per changed strike (published maps are never mutated)
+- Optional changed-row hints from streaming sources skip the diff entirely
+"""
+
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Union
+
+import numpy as np
+
+from ..core.chain_snapshot import ChainSnapshot
+from .max_pain import MaxPainResult, max_pain_from_strikes
+
+logger = logging.getLogger(__name__)
+
+class ChainAggregates:
+    """
+    📈 Aggregate state of one index's option chain.
+    
+    Call update() with every new snapshot; the read accessors then reflect
+    the latest snapshot. Hold `lock` around an update and the reads that
+    belong to it when several threads share the instance.
+    """
+    
+    def __init__(self, top_k: int = 5):
+        """
+        Initialize empty aggregates.
+        
+        Args:
+            top_k: Number of highest-OI strikes tracked
+        """
+        self.top_k = top_k
+        self.lock = threading.RLock()
+        
+        # Layout of the last snapshot
+        self._symbols: Optional[np.ndarray] = None
+        self._leg_strikes: Optional[np.ndarray] = None
+        self._leg_strike = np.zeros(0, dtype=np.int64)
+        self._is_call = np.zeros(0, dtype=bool)
+        self.strikes = np.zeros(0)
+        
+        # Per-leg values of the last snapshot (missing OI/volume as 0)
+        self._oi = np.zeros(0)
+        self._volume = np.zeros(0)
+        self._iv = np.zeros(0)
+        
+        # Per-strike sums
+        self.ce_oi = np.zeros(0)
+        self.pe_oi = np.zeros(0)
+        self.ce_volume = np.zeros(0)
+        self.pe_volume = np.zeros(0)
+        
+        # Totals
+        self.total_ce_oi = 0.0
+        self.total_pe_oi = 0.0
+        self.total_ce_volume = 0.0
+        self.total_pe_volume = 0.0
+        self._iv_sum = 0.0
+        self._iv_count = 0
+        
+        self._oi_map: Dict[Union[int, float], Dict[str, int]] = {}
+        self._volume_map: Dict[Union[int, float], Dict[str, int]] = {}
+        self._top: Optional[np.ndarray] = None
+        
+        # Statistics
+        self.updates = 0
+        self.rebuilds = 0
+        self.rows_changed = 0
+    
+    def update(self, snapshot: ChainSnapshot, changed_rows: Optional[np.ndarray] = None) -> int:
+        """
+        Fold a new snapshot of the chain into the aggregates.
+        
+        Args:
+            snapshot: Latest chain snapshot
+            changed_rows: Rows known to have changed (diffed against the previous
+                snapshot if None); ignored when the chain layout changed
+        
+        Returns:
+            Number of legs that were re-aggregated
+        """
+        columns = snapshot.columns
+        oi = np.nan_to_num(columns['oi'])
+        volume = np.nan_to_num(columns['volume'])
+        iv = columns['iv']
+        self.updates += 1
+        
+        if not self._same_layout(snapshot):
+            self._rebuild(snapshot, oi, volume, iv)
+            self.rows_changed = len(snapshot)
+            return self.rows_changed
+        
+        if changed_rows is None:
+            same_iv = (iv == self._iv) | (np.isnan(iv) & np.isnan(self._iv))
+            changed = np.flatnonzero((oi != self._oi) | (volume != self._volume) | ~same_iv)
+        else:
+            changed = np.asarray(changed_rows, dtype=np.int64)
+        
+        if len(changed):
+            self._apply(changed, oi[changed], volume[changed], iv[changed])
+        self.rows_changed = len(changed)
+        return self.rows_changed
+    
+    def _same_layout(self, snapshot: ChainSnapshot) -> bool:
+        """Check whether a snapshot has the previous snapshot's contracts in the same order."""
+        symbols = snapshot.symbol
+        if self._symbols is None or len(symbols) != len(self._symbols):
+            return False
+        if symbols is not self._symbols and not bool((symbols == self._symbols).all()):
+            return False
+        return bool(np.array_equal(snapshot.columns['strike'], self._leg_strikes, equal_nan=True))
+    
+    def _rebuild(self, snapshot: ChainSnapshot, oi: np.ndarray, volume: np.ndarray, iv: np.ndarray):
+        """Recompute everything for a new chain layout."""
+        leg_strikes = snapshot.columns['strike']
+        valid = ~np.isnan(leg_strikes)
+        
+        strikes, leg_strike = np.unique(leg_strikes[valid], return_inverse=True)
+        self.strikes = strikes
+        # Legs without a strike are kept out of the per-strike sums via a dummy slot
+        self._leg_strike = np.full(len(snapshot), len(strikes), dtype=np.int64)
+        self._leg_strike[valid] = leg_strike
+        self._is_call = snapshot.is_call.copy()
+        self._symbols = snapshot.symbol
+        self._leg_strikes = leg_strikes.copy()
+        
+        self._oi, self._volume, self._iv = oi.copy(), volume.copy(), iv.copy()
+        
+        size = len(strikes) + 1
+        calls = self._is_call
+        self.ce_oi = np.bincount(self._leg_strike, weights=np.where(calls, oi, 0.0), minlength=size)
+        self.pe_oi = np.bincount(self._leg_strike, weights=np.where(calls, 0.0, oi), minlength=size)
+        self.ce_volume = np.bincount(self._leg_strike, weights=np.where(calls, volume, 0.0), minlength=size)
+        self.pe_volume = np.bincount(self._leg_strike, weights=np.where(calls, 0.0, volume), minlength=size)
+        
+        self.total_ce_oi = float(oi[calls].sum())
+        self.total_pe_oi = float(oi[~calls].sum())
+        self.total_ce_volume = float(volume[calls].sum())
+        self.total_pe_volume = float(volume[~calls].sum())
+        
+        has_iv = iv > 0
+        self._iv_sum = float(iv[has_iv].sum())
+        self._iv_count = int(has_iv.sum())
+        
+        self._oi_map = {}
+        self._volume_map = {}
+        self._refresh_maps(np.arange(len(strikes)))
+        self._top = None
+        self.rebuilds += 1
+    
+    def _apply(self, rows: np.ndarray, oi: np.ndarray, volume: np.ndarray, iv: np.ndarray):
+        """Fold changed legs into the sums."""
+        calls = self._is_call[rows]
+        strike_rows = self._leg_strike[rows]
+        oi_delta = oi - self._oi[rows]
+        volume_delta = volume - self._volume[rows]
+        
+        np.add.at(self.ce_oi, strike_rows[calls], oi_delta[calls])
+        np.add.at(self.pe_oi, strike_rows[~calls], oi_delta[~calls])
+        np.add.at(self.ce_volume, strike_rows[calls], volume_delta[calls])
+        np.add.at(self.pe_volume, strike_rows[~calls], volume_delta[~calls])
+        
+        self.total_ce_oi += float(oi_delta[calls].sum())
+        self.total_pe_oi += float(oi_delta[~calls].sum())
+        self.total_ce_volume += float(volume_delta[calls].sum())
+        self.total_pe_volume += float(volume_delta[~calls].sum())
+        
+        old_iv = self._iv[rows]
+        self._iv_sum += float(iv[iv > 0].sum() - old_iv[old_iv > 0].sum())
+        self._iv_count += int((iv > 0).sum() - (old_iv > 0).sum())
+        
+        self._oi[rows] = oi
+        self._volume[rows] = volume
+        self._iv[rows] = iv
+        
+        touched = np.unique(strike_rows)
+        touched = touched[touched < len(self.strikes)]
+        self._refresh_maps(touched)
+        self._refresh_top(touched)
+    
+    def _refresh_maps(self, strike_rows: np.ndarray):
+        """Replace the strike map entries of changed strikes."""
+        strikes = self.strikes.tolist()
+        for i in strike_rows.tolist():
+            key = _strike_key(strikes[i])
+            self._oi_map[key] = {'CE': int(self.ce_oi[i]), 'PE': int(self.pe_oi[i])}
+            self._volume_map[key] = {'CE': int(self.ce_volume[i]), 'PE': int(self.pe_volume[i])}
+    
+    def _refresh_top(self, strike_rows: np.ndarray):
+        """Drop the cached top-K strikes if changed strikes can alter them."""
+        top = self._top
+        if top is None or not len(strike_rows):
+            return
+        totals = self.ce_oi[strike_rows] + self.pe_oi[strike_rows]
+        if len(top) < self.top_k:
+            enters = totals > 0
+        else:
+            enters = totals >= self.ce_oi[top[-1]] + self.pe_oi[top[-1]]
+        if enters.any() or np.isin(strike_rows, top).any():
+            self._top = None
+    
+    @property
+    def pcr_oi(self) -> float:
+        """Put-call ratio by open interest."""
+        return self.total_pe_oi / max(1.0, self.total_ce_oi)
+    
+    @property
+    def pcr_volume(self) -> float:
+        """Put-call ratio by volume."""
+        return self.total_pe_volume / max(1.0, self.total_ce_volume)
+    
+    @property
+    def average_iv(self) -> float:
+        """Mean IV over legs with a positive IV (0 if none)."""
+        return self._iv_sum / self._iv_count if self._iv_count else 0.0
+    
+    def strike_iv(self, strike: float) -> float:
+        """
+        Get the mean positive IV of the legs at the listed strike nearest a price.
+        
+        Args:
+            strike: Strike or price (e.g. the ATM strike)
+        
+        Returns:
+            Mean IV of that strike's legs, NaN if none has IV
+        """
+        if not len(self.strikes) or not strike:
+            return np.nan
+        i = int(np.abs(self.strikes - strike).argmin())
+        iv = self._iv[self._leg_strike == i]
+        iv = iv[iv > 0]
+        return float(iv.mean()) if len(iv) else np.nan
+    
+    def top_oi_strikes(self) -> List[Union[int, float]]:
+        """
+        Get the strikes with the highest combined OI.
+        
+        Returns:
+            Up to top_k positive strikes, highest OI first (lower strike first on ties)
+        """
+        if self._top is None:
+            size = len(self.strikes)
+            totals = self.ce_oi[:size] + self.pe_oi[:size]
+            order = np.argsort(-totals, kind='stable')
+            order = order[(totals[order] > 0) & (self.strikes[order] > 0)]
+            self._top = order[:self.top_k]
+        return [_strike_key(strike) for strike in self.strikes[self._top].tolist()]
+    
+    def strike_maps(self) -> Dict[str, Dict[Union[int, float], Dict[str, int]]]:
+        """
+        Get per-strike OI and volume by side.
+        
+        Returns:
+            {'strike_oi_map': {...}, 'strike_volume_map': {...}} (safe to keep)
+        """
+        return {
+            'strike_oi_map': dict(self._oi_map),
+            'strike_volume_map': dict(self._volume_map)
+        }
+    
+    def max_pain(self) -> Optional[MaxPainResult]:
+        """Compute max pain from the per-strike OI."""
+        size = len(self.strikes)
+        listed = self.strikes > 0
+        return max_pain_from_strikes(self.strikes[listed], self.ce_oi[:size][listed], self.pe_oi[:size][listed])
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get aggregate statistics."""
+        return {
+            'legs': len(self._oi),
+            'strikes': len(self.strikes),
+            'updates': self.updates,
+            'rebuilds': self.rebuilds,
+            'last_rows_changed': self.rows_changed
+        }
+
+def _strike_key(strike: float) -> Union[int, float]:
+    """Use integer strike keys where possible (as in option records)."""
+    return int(strike) if float(strike).is_integer() else strike
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🕒 History Buffer - G6 Platform v3.0
+Fixed-capacity NumPy ring buffer for per-index metric history.
+
+Each index keeps one row per overview cycle (spot, spot return, PCR, ATM IV,
+max pain) in a preallocated 2D array. Running sums over the most recent
+`stats_window` rows give rolling mean and variance in O(1) per append, and
+window queries return contiguous arrays for vectorized trend calculations.
+
+Features:
+- Preallocated storage, no per-cycle allocation or list copies
+- O(1) rolling mean/variance over the stats window (NaN-aware)
+- Running sums resynchronized once per window to bound float drift
+- Vectorized window slices, time-based lookbacks and least-squares slopes
+"""
+
+import logging
+from typing import Dict, Tuple, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Per-cycle overview metrics kept for each index
+HISTORY_FIELDS = ('spot', 'spot_return', 'pcr_oi', 'pcr_volume', 'atm_iv', 'max_pain')
+
+class RingHistory:
+    """
+    🕒 Ring buffer of timestamped metric rows.
+    
+    Rows are appended oldest to newest; once `capacity` rows are stored the
+    oldest row is overwritten. Missing values are stored as NaN and are left
+    out of the running statistics.
+    """
+    
+    def __init__(self,
+                 capacity: int = 375,
+                 stats_window: Optional[int] = None,
+                 fields: Sequence[str] = HISTORY_FIELDS):
+        """
+        Initialize ring buffer.
+        
+        Args:
+            capacity: Rows kept (375 = one trading day of 1-minute cycles)
+            stats_window: Rows covered by the running mean/variance (capacity if None)
+            fields: Metric names, one column each
+        """
+        self.capacity = capacity
+        self.stats_window = min(stats_window or capacity, capacity)
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self._columns: Dict[str, int] = {name: i for i, name in enumerate(self.fields)}
+        
+        self._values = np.full((capacity, len(self.fields)), np.nan)
+        self._timestamps = np.zeros(capacity)
+        self._count = 0  # Rows ever appended; next row goes to _count % capacity
+        
+        # Running sums over the stats window, on values shifted by the first
+        # value seen so large levels (e.g. spot) do not swamp the variance
+        self._shift = np.full(len(self.fields), np.nan)
+        self._sum = np.zeros(len(self.fields))
+        self._sumsq = np.zeros(len(self.fields))
+        self._valid = np.zeros(len(self.fields), dtype=np.int64)
+    
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+    
+    def append(self, timestamp: float, **values: float):
+        """
+        Append one row.
+        
+        Args:
+            timestamp: Row time (epoch seconds, non-decreasing)
+            **values: Field values; omitted fields are stored as NaN
+        """
+        row = np.full(len(self.fields), np.nan)
+        for name, value in values.items():
+            if value is not None:
+                row[self._columns[name]] = value
+        
+        # The first value seen per field becomes its shift
+        unset = np.isnan(self._shift) & ~np.isnan(row)
+        self._shift[unset] = row[unset]
+        
+        # Drop the row leaving the stats window before it can be overwritten
+        if self._count >= self.stats_window:
+            self._accumulate(self._values[(self._count - self.stats_window) % self.capacity], -1)
+        
+        slot = self._count % self.capacity
+        self._values[slot] = row
+        self._timestamps[slot] = timestamp
+        self._count += 1
+        self._accumulate(row, 1)
+        
+        if self._count % self.stats_window == 0:
+            self._resync()
+    
+    def _accumulate(self, row: np.ndarray, sign: int):
+        """Add (sign=1) or remove (sign=-1) a row from the running sums."""
+        valid = ~np.isnan(row)
+        shifted = np.where(valid, row - self._shift, 0.0)
+        self._sum += sign * shifted
+        self._sumsq += sign * shifted * shifted
+        self._valid += sign * valid
+    
+    def _resync(self):
+        """Recompute the running sums exactly from the stats window."""
+        window = self._window_rows(self.stats_window)
+        valid = ~np.isnan(window)
+        shifted = np.where(valid, window - self._shift, 0.0)
+        self._sum = shifted.sum(axis=0)
+        self._sumsq = (shifted * shifted).sum(axis=0)
+        self._valid = valid.sum(axis=0)
+    
+    def _window_rows(self, n: int, array: Optional[np.ndarray] = None) -> np.ndarray:
+        """Get the last n entries (oldest first) of the rows or another per-slot array."""
+        array = self._values if array is None else array
+        n = min(n, len(self))
+        start = (self._count - n) % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            return array[start:end]
+        return np.concatenate((array[start:], array[:end - self.capacity]))
+    
+    def window(self, field: str, n: Optional[int] = None) -> np.ndarray:
+        """
+        Get the most recent values of a field.
+        
+        Args:
+            field: Field name
+            n: Number of rows (all stored rows if None)
+        
+        Returns:
+            Values, oldest first (a copy)
+        """
+        rows = self._window_rows(len(self) if n is None else n)
+        return rows[:, self._columns[field]].copy()
+    
+    def timestamps(self, n: Optional[int] = None) -> np.ndarray:
+        """Get the most recent row timestamps, oldest first (a copy)."""
+        return self._window_rows(len(self) if n is None else n, self._timestamps).copy()
+    
+    def count_since(self, timestamp: float) -> int:
+        """Count stored rows at or after a timestamp."""
+        times = self.timestamps()
+        return len(times) - int(np.searchsorted(times, timestamp, side='left'))
+    
+    def last(self, field: str) -> float:
+        """Get the latest value of a field (NaN if empty)."""
+        if not self._count:
+            return np.nan
+        return float(self._values[(self._count - 1) % self.capacity, self._columns[field]])
+    
+    def mean(self, field: str) -> float:
+        """Rolling mean of a field over the stats window (NaN if no values)."""
+        i = self._columns[field]
+        if not self._valid[i]:
+            return np.nan
+        return float(self._shift[i] + self._sum[i] / self._valid[i])
+    
+    def variance(self, field: str) -> float:
+        """Rolling sample variance of a field over the stats window (NaN if < 2 values)."""
+        i = self._columns[field]
+        n = self._valid[i]
+        if n < 2:
+            return np.nan
+        return float(max((self._sumsq[i] - self._sum[i] ** 2 / n) / (n - 1), 0.0))
+    
+    def std(self, field: str) -> float:
+        """Rolling sample standard deviation over the stats window."""
+        return float(np.sqrt(self.variance(field)))
+    
+    def slope(self, field: str, n: Optional[int] = None) -> Tuple[float, float, int]:
+        """
+        Fit a least-squares line through the latest values of a field.
+        
+        Args:
+            field: Field name
+            n: Number of rows (all stored rows if None)
+        
+        Returns:
+            (fitted first value, fitted last value, values used); NaNs if < 2 values
+        """
+        values = self.window(field, n)
+        times = self.timestamps(len(values))
+        valid = ~np.isnan(values)
+        if valid.sum() < 2:
+            return np.nan, np.nan, int(valid.sum())
+        
+        x = times[valid] - times[valid][0]
+        y = values[valid]
+        if x[-1] <= 0:
+            # All rows share one timestamp; fall back to row order
+            x = np.arange(len(y), dtype=np.float64)
+        slope, intercept = np.polyfit(x, y, 1)
+        return float(intercept), float(intercept + slope * x[-1]), len(y)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🎯 Max Pain Engine - G6 Platform v3.0
+Vectorized max-pain computation shared by the overview paths.
+
+The writers' payout at a settlement price S is
+    sum over calls of OI * max(S - K, 0) + sum over puts of OI * max(K - S, 0)
+which is piecewise linear in S with kinks only at listed strikes, so its
+minimum always lies on a listed strike. Evaluating every listed strike with
+prefix/suffix sums of OI and OI * strike is O(n) after one sort and needs no
+fixed price grid, whatever the index's strike interval.
+
+Features:
+- Pain for every listed strike from cumulative OI sums (no per-leg loops)
+- Strike layout cached per chain, so steady cycles skip the sort
+- Works on ChainSnapshot columns or plain arrays
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Hashable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class MaxPainResult:
+    """Max pain strike and the payout curve it was picked from."""
+    strike: float
+    total_pain: float
+    strikes: np.ndarray
+    pain: np.ndarray
+
+def pain_curve(strikes: np.ndarray, call_oi: np.ndarray, put_oi: np.ndarray) -> np.ndarray:
+    """
+    Compute the writers' payout at every strike.
+    
+    Args:
+        strikes: Unique strikes in ascending order
+        call_oi: Call OI per strike
+        put_oi: Put OI per strike
+    
+    Returns:
+        Payout if the underlying settles at each strike
+    """
+    # Calls struck below S pay S - K: S * sum(OI) - sum(OI * K) over strikes <= S
+    call_pain = strikes * np.cumsum(call_oi) - np.cumsum(call_oi * strikes)
+    
+    # Puts struck above S pay K - S: sum(OI * K) - S * sum(OI) over strikes >= S
+    put_pain = np.cumsum((put_oi * strikes)[::-1])[::-1] - strikes * np.cumsum(put_oi[::-1])[::-1]
+    
+    return call_pain + put_pain
+
+def max_pain_from_strikes(strikes: np.ndarray, call_oi: np.ndarray, put_oi: np.ndarray) -> Optional[MaxPainResult]:
+    """
+    Pick the max pain strike from per-strike OI.
+    
+    Args:
+        strikes: Unique strikes in ascending order
+        call_oi: Call OI per strike
+        put_oi: Put OI per strike
+    
+    Returns:
+        MaxPainResult, or None when there is no open interest
+    """
+    if not len(strikes) or (not call_oi.any() and not put_oi.any()):
+        return None
+    
+    pain = pain_curve(strikes, call_oi, put_oi)
+    best = int(np.argmin(pain))
+    return MaxPainResult(strike=float(strikes[best]), total_pain=float(pain[best]), strikes=strikes, pain=pain)
+
+def calculate_max_pain(strikes: np.ndarray, oi: np.ndarray, is_call: np.ndarray) -> Optional[MaxPainResult]:
+    """
+    Compute max pain from per-leg columns.
+    
+    Args:
+        strikes: Strike per leg
+        oi: Open interest per leg (NaN counts as 0)
+        is_call: True for CE legs
+    
+    Returns:
+        MaxPainResult, or None when the chain carries no open interest
+    """
+    return MaxPainEngine().compute(strikes, oi, is_call)
+
+class MaxPainEngine:
+    """
+    🎯 Max pain calculator keeping each chain's strike layout between cycles.
+    
+    The unique strikes and leg-to-strike mapping only change when contracts
+    are added or removed, so a cycle with an unchanged layout costs two
+    bincounts and a few cumulative sums.
+    """
+    
+    def __init__(self, max_layouts: int = 256):
+        """
+        Initialize engine.
+        
+        Args:
+            max_layouts: Cached chain layouts before the cache is reset
+        """
+        self.max_layouts = max_layouts
+        self._layouts: Dict[Hashable, tuple] = {}
+    
+    def compute(self,
+                strikes: np.ndarray,
+                oi: np.ndarray,
+                is_call: np.ndarray,
+                key: Optional[Hashable] = None) -> Optional[MaxPainResult]:
+        """
+        Compute max pain for one chain.
+        
+        Args:
+            strikes: Strike per leg
+            oi: Open interest per leg (NaN counts as 0)
+            is_call: True for CE legs
+            key: Chain identity (e.g. (index, expiry)) for layout caching
+        
+        Returns:
+            MaxPainResult, or None when the chain carries no open interest
+        """
+        unique_strikes, leg_strike, valid = self._layout(np.asarray(strikes, dtype=np.float64), key)
+        
+        oi = np.nan_to_num(np.asarray(oi, dtype=np.float64))[valid]
+        is_call = np.asarray(is_call, dtype=bool)[valid]
+        size = len(unique_strikes)
+        call_oi = np.bincount(leg_strike, weights=np.where(is_call, oi, 0.0), minlength=size)
+        put_oi = np.bincount(leg_strike, weights=np.where(is_call, 0.0, oi), minlength=size)
+        return max_pain_from_strikes(unique_strikes, call_oi, put_oi)
+    
+    def compute_snapshot(self, snapshot, key: Optional[Hashable] = None) -> Optional[MaxPainResult]:
+        """
+        Compute max pain for a ChainSnapshot.
+        
+        Args:
+            snapshot: Chain snapshot
+            key: Layout cache key (defaults to (index_name, expiry))
+        
+        Returns:
+            MaxPainResult, or None when the chain carries no open interest
+        """
+        if key is None:
+            key = (snapshot.index_name, snapshot.expiry)
+        return self.compute(snapshot.columns['strike'], snapshot.columns['oi'], snapshot.is_call, key)
+    
+    def _layout(self, strikes: np.ndarray, key: Optional[Hashable]) -> tuple:
+        """Get (unique strikes, strike row per valid leg, valid leg mask), reusing a cached layout."""
+        cached = self._layouts.get(key) if key is not None else None
+        if cached is not None and np.array_equal(cached[0], strikes):
+            return cached[1:]
+        
+        valid = strikes > 0  # NaN and placeholder strikes compare False
+        unique_strikes, leg_strike = np.unique(strikes[valid], return_inverse=True)
+        layout = (unique_strikes, leg_strike, valid)
+        
+        if key is not None:
+            if len(self._layouts) >= self.max_layouts:
+                self._layouts.clear()
+            self._layouts[key] = (strikes.copy(),) + layout
+        return layout
@@ -131,13 +131,15 @@ class BlackScholesModel:
 class VolatilityAnalyzer:
     """Main volatility analyzer class."""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], history_source=None):
         """Initialize volatility analyzer.
         
         Args:
             config: Configuration dictionary
+            history_source: Optional RollupSink providing daily spot and ATM IV history
         """
         self.config = config
+        self.history_source = history_source
         self.risk_free_rate = config.get('risk_free_rate', 0.06)  # 6% default
         self.historical_data = {}
         self.iv_surfaces = {}
@@ -168,7 +170,7 @@ class VolatilityAnalyzer:
         iv_surface = self._build_iv_surface(underlying_price, options_data)
         
         # Calculate IV rank and percentile
-        iv_rank, iv_percentile = self._calculate_iv_statistics(options_data)
+        iv_rank, iv_percentile = self._calculate_iv_statistics(options_data, market_data.get('symbol'))
         
         # Calculate volatility skew metrics
         skew_metrics = self._calculate_skew_metrics(iv_surface, underlying_price)
@@ -235,6 +237,10 @@ class VolatilityAnalyzer:
         Returns:
             List of historical prices
         """
+        history = self._get_daily_history(market_data.get('symbol'), 'spot_close', days=150)
+        if len(history) >= 10:
+            return history
+        
         # Mock historical price generation
         current_price = market_data.get('price', 25000)
         
@@ -250,6 +256,34 @@ class VolatilityAnalyzer:
         
         return list(reversed(prices))  # Chronological order
     
+    def _get_daily_history(self, index_name: Optional[str], column: str, days: int) -> List[float]:
+        """Get daily closing values of a rollup chain column.
+        
+        Reads the coarsest rollup tier covering the lookback; on each day the
+        nearest expiry's last bar is used.
+        
+        Args:
+            index_name: Index name
+            column: Chain bar column (spot_close, atm_iv_close, ...)
+            days: Lookback in days
+            
+        Returns:
+            Daily values in chronological order (empty without a history source)
+        """
+        if self.history_source is None or not index_name:
+            return []
+        
+        try:
+            bars = self.history_source.query(index_name, datetime.now() - timedelta(days=days),
+                                             resolution=timedelta(days=1))
+            bars = bars.dropna(subset=[column]).sort_values(['bucket_start', 'expiry'])
+            bars = bars.drop_duplicates('bucket_start', keep='first')
+            daily = bars.groupby(bars['bucket_start'].dt.date)[column].last()
+            return daily.astype(float).tolist()
+        except Exception:
+            # Fall back to the synthetic history
+            return []
+    
     def _build_iv_surface(self, underlying_price: float, options_data: List[Dict]) -> VolatilitySurface:
         """Build implied volatility surface from options data.
         
@@ -503,11 +537,12 @@ class VolatilityAnalyzer:
         
         return quality_metrics
     
-    def _calculate_iv_statistics(self, options_data: List[Dict]) -> Tuple[float, float]:
+    def _calculate_iv_statistics(self, options_data: List[Dict], index_name: Optional[str] = None) -> Tuple[float, float]:
         """Calculate IV rank and percentile.
         
         Args:
             options_data: List of options data
+            index_name: Index whose IV history is used (when a history source is set)
             
         Returns:
             Tuple of (iv_rank, iv_percentile)
@@ -525,9 +560,7 @@ class VolatilityAnalyzer:
         
         current_avg_iv = np.mean(current_ivs)
         
-        # Mock historical IV data for ranking
-        # In real implementation, this would use historical IV database
-        historical_ivs = self._get_historical_iv_data()
+        historical_ivs = self._get_historical_iv_data(index_name)
         
         if not historical_ivs:
             return 50, 50  # Default middle values
@@ -540,14 +573,20 @@ class VolatilityAnalyzer:
         
         return iv_rank, iv_percentile
     
-    def _get_historical_iv_data(self) -> List[float]:
+    def _get_historical_iv_data(self, index_name: Optional[str] = None) -> List[float]:
         """Get historical IV data for ranking calculations.
         
+        Args:
+            index_name: Index whose daily ATM IV history is read from the history source
+            
         Returns:
             List of historical IV values
         """
-        # Mock historical IV data generation
-        # In real implementation, this would query historical database
+        history = self._get_daily_history(index_name, 'atm_iv_close', days=365)
+        if len(history) >= 20:
+            return history
+        
+        # Mock historical IV data generation (no history source or too little history)
         
         # Generate 252 days of historical IV (1 year)
         historical_ivs = []
@@ -0,0 +1,716 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⚡ Async Kite Data Provider - G6 Platform v3.0
+asyncio-native Kite Connect access over a pooled keep-alive HTTP session.
+
+KiteDataProvider wraps the synchronous kiteconnect client and fans work out
+to a thread pool. AsyncKiteDataProvider talks to the Kite REST API directly
+through one aiohttp session, so hundreds of quote batches across indices can
+be in flight on a single event loop. It keeps the same public surface
+(get_quote, get_options_data, get_atm_strike, get_instruments) and shares
+the cache, metrics, instrument index and symbol building of the sync provider.
+
+Features:
+- Pooled keep-alive connections (one aiohttp session, bounded connector)
+- Async token bucket with priority-ordered waiters
+- Per-request deadlines; cancelled requests release their queue slot
+- Retries with exponential backoff on network errors, 429 and 5xx
+- Concurrent quote chunks via asyncio.gather
+"""
+
+import csv
+import io
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, List, Any, Union, Optional, Tuple
+
+from .instruments import InstrumentIndex, STRIKE_INTERVALS
+from .kite_provider import (
+    KiteDataProvider, RequestPriority, PRIORITY_TOKENS, IntelligentCache, ConnectionMetrics,
+    KiteException, TokenException, build_option_symbol_map, option_records_from_quotes
+)
+
+# aiohttp integration
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+    TRANSIENT_ERRORS = (aiohttp.ClientError, OSError, asyncio.TimeoutError)
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    aiohttp = None
+    TRANSIENT_ERRORS = (OSError, asyncio.TimeoutError)
+
+logger = logging.getLogger(__name__)
+
+class AsyncTokenBucket:
+    """
+    Token bucket rate limiter for coroutines.
+    
+    Waiters queue per RequestPriority and are served strictly in priority
+    order (FIFO within a priority), as in TokenBucketRateLimiter. A waiter
+    that times out or is cancelled leaves the queue immediately.
+    """
+    
+    def __init__(self, requests_per_minute: int = 200, burst_capacity: int = 50):
+        """
+        Initialize rate limiter.
+        
+        Args:
+            requests_per_minute: Base rate limit
+            burst_capacity: Burst allowance
+        """
+        self.capacity = requests_per_minute
+        self.refill_rate = requests_per_minute / 60.0  # tokens per second
+        self.burst_capacity = burst_capacity
+        
+        self.tokens = float(requests_per_minute)
+        self.last_refill = time.monotonic()
+        self.request_count = 0
+        self.rate_limit_hits = 0
+        
+        self._condition: Optional[asyncio.Condition] = None
+        self._waiters: Dict[RequestPriority, deque] = {p: deque() for p in RequestPriority}
+        self._timeouts: Dict[RequestPriority, int] = {p: 0 for p in RequestPriority}
+    
+    def _refill(self, now: float):
+        """Refill tokens based on elapsed time."""
+        self.tokens = min(self.capacity + self.burst_capacity,
+                          self.tokens + (now - self.last_refill) * self.refill_rate)
+        self.last_refill = now
+    
+    def _has_precedence(self, priority: RequestPriority, ticket: Optional[object]) -> bool:
+        """Check whether a caller may take tokens now (see TokenBucketRateLimiter)."""
+        for other in RequestPriority:
+            if other.value > priority.value and self._waiters[other]:
+                return False
+        
+        own_queue = self._waiters[priority]
+        if ticket is None:
+            return not own_queue
+        return bool(own_queue) and own_queue[0] is ticket
+    
+    async def acquire(self,
+                      priority: RequestPriority = RequestPriority.NORMAL,
+                      timeout: Optional[float] = 0.0) -> bool:
+        """
+        Acquire a rate limit token.
+        
+        Args:
+            priority: Request priority level
+            timeout: Maximum time to wait for a token; 0 returns immediately,
+                None waits indefinitely
+        
+        Returns:
+            True if token acquired, False if rate limited
+        """
+        if self._condition is None:
+            # Created lazily so the bucket binds to the running loop
+            self._condition = asyncio.Condition()
+        required_tokens = PRIORITY_TOKENS.get(priority, 1.0)
+        
+        async with self._condition:
+            start = time.monotonic()
+            self._refill(start)
+            
+            if self._has_precedence(priority, None) and self.tokens >= required_tokens:
+                self._take(required_tokens)
+                return True
+            
+            if timeout is not None and timeout <= 0:
+                self.rate_limit_hits += 1
+                return False
+            
+            deadline = None if timeout is None else start + timeout
+            ticket = object()
+            waiters = self._waiters[priority]
+            waiters.append(ticket)
+            
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    
+                    if self._has_precedence(priority, ticket) and self.tokens >= required_tokens:
+                        self._take(required_tokens)
+                        return True
+                    
+                    if deadline is not None and now >= deadline:
+                        self.rate_limit_hits += 1
+                        self._timeouts[priority] += 1
+                        return False
+                    
+                    # Sleep until enough tokens have refilled, or until woken
+                    # because the queue head changed
+                    wait_time = max(0.001, (required_tokens - self.tokens) / self.refill_rate)
+                    if deadline is not None:
+                        wait_time = min(wait_time, deadline - now)
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), wait_time)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                # Also runs on cancellation, so a cancelled waiter never blocks the queue
+                waiters.remove(ticket)
+                self._condition.notify_all()
+    
+    def _take(self, required_tokens: float):
+        """Consume tokens for a granted request."""
+        self.tokens -= required_tokens
+        self.request_count += 1
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get rate limiter status."""
+        return {
+            'tokens': self.tokens,
+            'capacity': self.capacity,
+            'requests': self.request_count,
+            'rate_limit_hits': self.rate_limit_hits,
+            'queue_depth': {p.name: len(self._waiters[p]) for p in RequestPriority},
+            'timeouts': {p.name: self._timeouts[p] for p in RequestPriority}
+        }
+
+class AsyncKiteDataProvider:
+    """
+    ⚡ asyncio-native Kite Connect data provider.
+    
+    Use as an async context manager (or call close()) so the pooled session
+    is released. request_deadline bounds every request, and the quote
+    methods take a per-call deadline in seconds; when a deadline expires the
+    request is cancelled and asyncio.TimeoutError is raised (get_options_data
+    included, while its other failures return an empty list).
+    """
+    
+    INSTRUMENT_MAPPING = KiteDataProvider.INSTRUMENT_MAPPING
+    OPTIONS_EXCHANGE = KiteDataProvider.OPTIONS_EXCHANGE
+    MAX_QUOTE_INSTRUMENTS = KiteDataProvider.MAX_QUOTE_INSTRUMENTS
+    
+    def __init__(self,
+                 api_key: str,
+                 access_token: str,
+                 requests_per_minute: int = 200,
+                 burst_capacity: int = 50,
+                 rate_limit_timeout: float = 30.0,
+                 cache_ttl: int = 60,
+                 cache_size: int = 1000,
+                 instrument_snapshot_dir: str = "data/instruments",
+                 max_retries: int = 3,
+                 connection_timeout: int = 30,
+                 read_timeout: int = 60,
+                 request_deadline: Optional[float] = None,
+                 pool_size: int = 20,
+                 root: str = "https://api.kite.trade",
+                 session=None):
+        """
+        Initialize async Kite data provider.
+        
+        Args:
+            api_key: Kite Connect API key
+            access_token: Kite Connect access token
+            requests_per_minute: Rate limit for requests
+            burst_capacity: Burst allowance for rate limiting
+            rate_limit_timeout: Maximum time a request waits for a rate limit token
+            cache_ttl: Cache TTL in seconds
+            cache_size: Maximum cache size
+            instrument_snapshot_dir: Directory for daily instrument index snapshots
+            max_retries: Maximum retry attempts
+            connection_timeout: Connection timeout
+            read_timeout: Read timeout
+            request_deadline: Default deadline per request including retries (None for no limit)
+            pool_size: Maximum pooled connections
+            root: Kite REST API root URL
+            session: aiohttp-compatible session to use instead of creating one
+        """
+        if session is None and not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp library not available. Install with: pip install aiohttp")
+        
+        self.api_key = api_key
+        self.access_token = access_token
+        self.max_retries = max_retries
+        self.connection_timeout = connection_timeout
+        self.read_timeout = read_timeout
+        self.request_deadline = request_deadline
+        self.pool_size = pool_size
+        self.root = root.rstrip('/')
+        
+        # Pooled session (created on first request inside the event loop)
+        self._session = session
+        self._owns_session = session is None
+        
+        # Rate limiting
+        self.rate_limiter = AsyncTokenBucket(
+            requests_per_minute=requests_per_minute,
+            burst_capacity=burst_capacity
+        )
+        self.rate_limit_timeout = rate_limit_timeout
+        
+        # Caching
+        self.cache = IntelligentCache(max_size=cache_size, default_ttl=cache_ttl)
+        
+        # Instrument master index (rebuilt once per trading day)
+        self.instrument_index = InstrumentIndex(
+            snapshot_dir=instrument_snapshot_dir,
+            underlyings=self.INSTRUMENT_MAPPING.keys()
+        )
+        self._instrument_lock: Optional[asyncio.Lock] = None
+        self._instrument_retry_at = 0.0
+        
+        # Metrics tracking
+        self.metrics = ConnectionMetrics()
+        
+        logger.info(f"⚡ Async Kite data provider initialized (pool size: {pool_size})")
+    
+    def _get_session(self):
+        """Get the pooled HTTP session, creating it on first use."""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(sock_connect=self.connection_timeout,
+                                              sock_read=self.read_timeout),
+                headers={
+                    'X-Kite-Version': '3',
+                    'Authorization': f"token {self.api_key}:{self.access_token}"
+                }
+            )
+        return self._session
+    
+    async def _request(self,
+                       path: str,
+                       params: Optional[List[Tuple[str, str]]] = None,
+                       cache_key: Optional[str] = None,
+                       cache_ttl: Optional[float] = None,
+                       priority: RequestPriority = RequestPriority.NORMAL,
+                       deadline: Optional[float] = None,
+                       raw: bool = False) -> Any:
+        """
+        Make API request with caching, rate limiting, retries and a deadline.
+        
+        Args:
+            path: API path (e.g. /quote)
+            params: Query parameters (repeated keys allowed)
+            cache_key: Cache key (if caching enabled)
+            cache_ttl: Cache TTL override
+            priority: Request priority
+            deadline: Seconds allowed including rate limit wait and retries
+                (request_deadline if None)
+            raw: Return the response body text instead of the JSON 'data' field
+        
+        Returns:
+            API response data
+        """
+        # Check cache first
+        if cache_key:
+            cached_data = self.cache.get(cache_key)
+            if cached_data is not None:
+                self.metrics.cache_hits += 1
+                return cached_data
+            self.metrics.cache_misses += 1
+        
+        deadline = self.request_deadline if deadline is None else deadline
+        try:
+            response = await asyncio.wait_for(self._request_with_retries(path, params, priority, raw), deadline)
+        except asyncio.TimeoutError:
+            self.metrics.timeout_errors += 1
+            logger.warning(f"⏱️ Request {path} exceeded its {deadline}s deadline")
+            raise
+        
+        if cache_key and response is not None:
+            self.cache.put(cache_key, response, cache_ttl)
+        
+        return response
+    
+    async def _request_with_retries(self,
+                                    path: str,
+                                    params: Optional[List[Tuple[str, str]]],
+                                    priority: RequestPriority,
+                                    raw: bool) -> Any:
+        """Rate limit and execute a request, retrying transient failures."""
+        error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                backoff_time = 2 ** (attempt - 1)
+                logger.info(f"🔄 Retrying in {backoff_time}s (attempt {attempt}/{self.max_retries})")
+                await asyncio.sleep(backoff_time)
+            
+            # Every attempt (retries included) spends a rate limit token
+            if not await self.rate_limiter.acquire(priority, timeout=self.rate_limit_timeout):
+                self.metrics.rate_limited_requests += 1
+                logger.warning(f"⏱️ Rate limited, no token within {self.rate_limit_timeout:.1f}s")
+                raise Exception(f"Rate limit wait exceeded {self.rate_limit_timeout:.1f}s")
+            
+            start_time = time.time()
+            self.metrics.total_requests += 1
+            try:
+                async with self._get_session().get(f"{self.root}{path}", params=params) as response:
+                    status = response.status
+                    body = await response.text()
+            except TRANSIENT_ERRORS as e:
+                logger.warning(f"🌐 Network error: {e}")
+                self.metrics.connection_errors += 1
+                error = e
+                continue
+            
+            if status == 200:
+                data = body if raw else json.loads(body).get('data')
+                self.metrics.total_latency += time.time() - start_time
+                self.metrics.successful_requests += 1
+                return data
+            
+            error_type, message = _error_details(status, body)
+            if status == 403 or error_type == 'TokenException':
+                logger.error(f"🔴 Kite token error: {message}")
+                self.metrics.failed_requests += 1
+                raise TokenException(message)
+            
+            if status != 429 and status < 500:
+                logger.error(f"🔴 Kite API error: {message}")
+                self.metrics.failed_requests += 1
+                raise KiteException(message)
+            
+            logger.warning(f"🌐 Kite API unavailable ({status}): {message}")
+            error = KiteException(message)
+        
+        self.metrics.failed_requests += 1
+        raise error
+    
+    async def get_quote(self,
+                        instruments: Union[str, List[str]],
+                        priority: RequestPriority = RequestPriority.NORMAL,
+                        deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get quote data for instruments.
+        
+        Args:
+            instruments: Instrument symbol(s)
+            priority: Request priority
+            deadline: Seconds allowed for the request (request_deadline if None)
+        
+        Returns:
+            Quote data dictionary
+        """
+        if isinstance(instruments, str):
+            instruments = [instruments]
+        
+        return await self._request(
+            '/quote',
+            params=[('i', instrument) for instrument in instruments],
+            cache_key=f"quote:{':'.join(sorted(instruments))}",
+            cache_ttl=30,  # Short TTL for quotes
+            priority=priority,
+            deadline=deadline
+        )
+    
+    async def get_quotes_batched(self,
+                                 instruments: List[str],
+                                 priority: RequestPriority = RequestPriority.NORMAL,
+                                 chunk_size: Optional[int] = None,
+                                 deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get quote data for many instruments, fetching all chunks concurrently.
+        
+        Args:
+            instruments: Exchange-prefixed instrument symbols
+            priority: Request priority
+            chunk_size: Instruments per request (defaults to MAX_QUOTE_INSTRUMENTS)
+            deadline: Seconds allowed for the whole batch (unfinished chunks are cancelled)
+        
+        Returns:
+            Merged quote data dictionary
+        """
+        chunk_size = max(1, min(chunk_size or self.MAX_QUOTE_INSTRUMENTS, self.MAX_QUOTE_INSTRUMENTS))
+        
+        chunks = [instruments[i:i + chunk_size] for i in range(0, len(instruments), chunk_size)]
+        responses = await asyncio.wait_for(
+            asyncio.gather(*(self.get_quote(chunk, priority) for chunk in chunks)),
+            deadline
+        )
+        
+        quotes: Dict[str, Any] = {}
+        for response in responses:
+            quotes.update(response or {})
+        
+        return quotes
+    
+    async def get_instruments(self,
+                              exchange: str = None,
+                              priority: RequestPriority = RequestPriority.LOW) -> List[Dict[str, Any]]:
+        """
+        Get instruments list.
+        
+        Args:
+            exchange: Exchange filter
+            priority: Request priority
+        
+        Returns:
+            List of instruments
+        """
+        cache_key = f"instruments:{exchange or 'all'}"
+        cached_data = self.cache.get(cache_key)
+        if cached_data is not None:
+            self.metrics.cache_hits += 1
+            return cached_data
+        self.metrics.cache_misses += 1
+        
+        body = await self._request(
+            f"/instruments/{exchange}" if exchange else '/instruments',
+            priority=priority,
+            raw=True
+        )
+        
+        # The dump is tens of thousands of CSV rows; parse off the event loop
+        loop = asyncio.get_running_loop()
+        instruments = await loop.run_in_executor(None, _parse_instruments_csv, body)
+        self.cache.put(cache_key, instruments, 3600)  # Long TTL for instruments
+        return instruments
+    
+    async def get_spot_price(self, index_name: str, deadline: Optional[float] = None) -> float:
+        """
+        Get the current index (spot) price.
+        
+        Args:
+            index_name: Index name (NIFTY, BANKNIFTY, etc.)
+            deadline: Seconds allowed for the request (request_deadline if None)
+        
+        Returns:
+            Last traded index price
+        """
+        instrument = self.INSTRUMENT_MAPPING.get(index_name)
+        if not instrument:
+            raise ValueError(f"Unknown index: {index_name}")
+        
+        quote_data = await self.get_quote(instrument, RequestPriority.HIGH, deadline)
+        
+        if instrument not in quote_data:
+            raise ValueError(f"No quote data for {instrument}")
+        
+        return quote_data[instrument]['last_price']
+    
+    async def get_atm_strike(self, index_name: str, deadline: Optional[float] = None) -> float:
+        """
+        Get ATM strike for an index.
+        
+        Args:
+            index_name: Index name (NIFTY, BANKNIFTY, etc.)
+            deadline: Seconds allowed for the spot quote (request_deadline if None)
+        
+        Returns:
+            ATM strike price
+        """
+        current_price = await self.get_spot_price(index_name, deadline)
+        
+        interval = STRIKE_INTERVALS.get(index_name, 50)
+        atm_strike = round(current_price / interval) * interval
+        
+        logger.debug(f"📍 {index_name} ATM strike: {atm_strike} (current: {current_price})")
+        
+        return atm_strike
+    
+    async def ensure_instrument_index(self) -> Optional[InstrumentIndex]:
+        """
+        Make sure the instrument index is built for today.
+        
+        Loads today's on-disk snapshot if present, otherwise fetches the
+        instrument dump from every options exchange concurrently and saves a
+        snapshot. Concurrent callers wait for the one rebuild in progress.
+        
+        Returns:
+            Fresh instrument index, or None if it is unavailable
+        """
+        index = self.instrument_index
+        if index is None:
+            return None
+        if index.is_fresh():
+            return index
+        
+        if self._instrument_lock is None:
+            self._instrument_lock = asyncio.Lock()
+        
+        async with self._instrument_lock:
+            if index.is_fresh():
+                return index
+            if time.time() < self._instrument_retry_at:
+                return None
+            
+            # Snapshot I/O and index building run on the default executor
+            loop = asyncio.get_running_loop()
+            if await loop.run_in_executor(None, index.load_snapshot):
+                logger.info("✅ Instrument index loaded from snapshot")
+                return index
+            
+            try:
+                exchanges = sorted({'NFO'} | set(self.OPTIONS_EXCHANGE.values()))
+                dumps = await asyncio.gather(*(self.get_instruments(exchange) for exchange in exchanges))
+                instruments = [row for dump in dumps for row in dump or []]
+                
+                await loop.run_in_executor(None, index.build, instruments)
+                await loop.run_in_executor(None, index.save_snapshot)
+                return index
+            
+            except Exception as e:
+                # Fall back to formatted symbols and retry in a few minutes
+                self._instrument_retry_at = time.time() + 300
+                logger.warning(f"⚠️ Instrument index unavailable: {e}")
+                return None
+    
+    async def resolve_expiry(self, index_name: str, expiry: str = None) -> Optional[str]:
+        """
+        Resolve an expiry (None for nearest) through the instrument index.
+        
+        Args:
+            index_name: Index name
+            expiry: Expiry date (YYYY-MM-DD) or None
+        
+        Returns:
+            Listed expiry, or the requested value if it cannot be resolved
+        """
+        index = await self.ensure_instrument_index()
+        if index is None or not index.has_underlying(index_name):
+            return expiry
+        return index.resolve_expiry(index_name, expiry)
+    
+    async def build_option_symbols(self,
+                                   index_name: str,
+                                   strikes: List[float],
+                                   expiry: str = None,
+                                   option_types: List[str] = None) -> Dict[str, Tuple[float, str]]:
+        """
+        Build exchange-prefixed option symbols for a strike window.
+        
+        Args:
+            index_name: Index name
+            strikes: List of strike prices
+            expiry: Expiry date (YYYY-MM-DD), None for nearest
+            option_types: Option types (CE, PE)
+        
+        Returns:
+            Mapping of quote symbol -> (strike, option_type)
+        """
+        return build_option_symbol_map(
+            await self.ensure_instrument_index(),
+            index_name,
+            strikes,
+            expiry,
+            option_types,
+            self.OPTIONS_EXCHANGE.get(index_name, 'NFO')
+        )
+    
+    async def get_options_data(self,
+                               index_name: str,
+                               strikes: List[float],
+                               expiry: str = None,
+                               option_types: List[str] = None,
+                               deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Get options data for specified strikes.
+        
+        Args:
+            index_name: Index name
+            strikes: List of strike prices
+            expiry: Expiry date (YYYY-MM-DD)
+            option_types: Option types (CE, PE)
+            deadline: Seconds allowed for the chain quotes
+        
+        Returns:
+            List of options data (empty on failure)
+        
+        Raises:
+            asyncio.TimeoutError: If the deadline expires
+        """
+        expiry = await self.resolve_expiry(index_name, expiry)
+        symbols = await self.build_option_symbols(index_name, strikes, expiry, option_types)
+        
+        if not symbols:
+            return []
+        
+        try:
+            quote_data = await self.get_quotes_batched(list(symbols), RequestPriority.HIGH, deadline=deadline)
+            return option_records_from_quotes(symbols, quote_data, expiry)
+        
+        except asyncio.TimeoutError:
+            raise
+        except Exception as e:
+            logger.error(f"🔴 Failed to get options data: {e}")
+            return []
+    
+    async def health_check(self) -> Dict[str, Any]:
+        """
+        Perform health check.
+        
+        Returns:
+            Health status dictionary
+        """
+        health = {
+            'api_functional': False,
+            'rate_limiter_status': self.rate_limiter.get_status(),
+            'cache_stats': self.cache.get_stats(),
+            'metrics': {
+                'success_rate': self.metrics.success_rate,
+                'average_latency': self.metrics.average_latency,
+                'cache_hit_rate': self.metrics.cache_hit_rate,
+                'total_requests': self.metrics.total_requests
+            },
+            'errors': []
+        }
+        
+        try:
+            profile = await self._request('/user/profile', priority=RequestPriority.LOW) or {}
+            health['api_functional'] = bool(profile.get('user_id'))
+            health['user_id'] = profile.get('user_id')
+        
+        except Exception as e:
+            health['errors'].append(str(e))
+            logger.error(f"🔴 Health check failed: {e}")
+        
+        return health
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get comprehensive metrics."""
+        return {
+            'connection': {
+                'total_requests': self.metrics.total_requests,
+                'successful_requests': self.metrics.successful_requests,
+                'failed_requests': self.metrics.failed_requests,
+                'success_rate': self.metrics.success_rate,
+                'average_latency': self.metrics.average_latency,
+                'connection_errors': self.metrics.connection_errors,
+                'timeout_errors': self.metrics.timeout_errors
+            },
+            'rate_limiting': self.rate_limiter.get_status(),
+            'cache': self.cache.get_stats(),
+            'instrument_index': self.instrument_index.get_stats() if self.instrument_index else None
+        }
+    
+    async def close(self):
+        """Close the pooled session (if created by the provider)."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+            logger.info("✅ Async Kite data provider closed")
+    
+    async def __aenter__(self) -> 'AsyncKiteDataProvider':
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+def _error_details(status: int, body: str) -> Tuple[Optional[str], str]:
+    """Extract (error_type, message) from a Kite error response."""
+    try:
+        payload = json.loads(body)
+        return payload.get('error_type'), payload.get('message') or f"HTTP {status}"
+    except (ValueError, AttributeError):
+        return None, f"HTTP {status}: {body[:200]}"
+
+def _parse_instruments_csv(body: str) -> List[Dict[str, Any]]:
+    """Parse the instrument dump CSV into rows typed like kiteconnect's."""
+    instruments = []
+    for row in csv.DictReader(io.StringIO(body)):
+        for key in ('instrument_token', 'exchange_token', 'lot_size'):
+            row[key] = int(row.get(key) or 0)
+        for key in ('last_price', 'strike', 'tick_size'):
+            row[key] = float(row.get(key) or 0.0)
+        instruments.append(row)
+    return instruments
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📇 Instrument Index - G6 Platform v3.0
+In-memory index over the daily Kite instrument master.
+
+Built once per trading day from kite.instruments() so that per-cycle
+option symbol building and expiry resolution are dictionary lookups
+instead of string formatting or extra API calls.
+
+Features:
+- Contracts keyed by (underlying, expiry, strike, option type)
+- Sorted expiry and strike lists per underlying
+- Token -> contract reverse map
+- Compact gzip snapshot on disk for fast warm starts
+"""
+
+import gzip
+import json
+import bisect
+import logging
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Tuple, Union
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# Option instrument types in the Kite instrument dump
+OPTION_TYPES = ('CE', 'PE')
+
+# Index-specific strike intervals (shared by the REST, async and streaming providers and the collectors)
+STRIKE_INTERVALS = {
+    'NIFTY': 50,
+    'BANKNIFTY': 100,
+    'FINNIFTY': 50,
+    'MIDCPNIFTY': 25,
+    'SENSEX': 100,
+    'BANKEX': 100
+}
+
+@dataclass(frozen=True)
+class OptionContract:
+    """Single option contract from the instrument master."""
+    instrument_token: int
+    tradingsymbol: str
+    exchange: str
+    underlying: str
+    expiry: str  # YYYY-MM-DD
+    strike: float
+    option_type: str
+    lot_size: int = 0
+    tick_size: float = 0.05
+    
+    @property
+    def quote_symbol(self) -> str:
+        """Exchange-prefixed symbol accepted by kite.quote()."""
+        return f"{self.exchange}:{self.tradingsymbol}"
+
+class InstrumentIndex:
+    """
+    📇 Lookup tables over option contracts of the instrument master.
+    """
+    
+    # Column order of the on-disk snapshot (one list per contract)
+    SNAPSHOT_FIELDS = ('instrument_token', 'tradingsymbol', 'exchange', 'underlying',
+                       'expiry', 'strike', 'option_type', 'lot_size', 'tick_size')
+    SNAPSHOT_VERSION = 1
+    
+    def __init__(self,
+                 snapshot_dir: Union[str, Path] = "data/instruments",
+                 underlyings: Optional[Iterable[str]] = None):
+        """
+        Initialize instrument index.
+        
+        Args:
+            snapshot_dir: Directory for daily snapshots
+            underlyings: Underlyings to index (None indexes every option)
+        """
+        self.snapshot_dir = Path(snapshot_dir)
+        self.underlyings = set(underlyings) if underlyings else None
+        
+        self.trade_date: Optional[date] = None
+        
+        self._contracts: Dict[Tuple[str, str, float, str], OptionContract] = {}
+        self._by_token: Dict[int, OptionContract] = {}
+        self._expiries: Dict[str, List[str]] = {}
+        self._strikes: Dict[Tuple[str, str], List[float]] = {}
+        
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        return len(self._contracts)
+    
+    def is_fresh(self, trade_date: Optional[date] = None) -> bool:
+        """Check whether the index was built for the given trading day."""
+        return bool(self._contracts) and self.trade_date == (trade_date or date.today())
+    
+    def build(self, instruments: Iterable[Dict[str, Any]], trade_date: Optional[date] = None) -> int:
+        """
+        Build the index from raw kite.instruments() rows.
+        
+        Args:
+            instruments: Instrument dump rows (may span several exchanges)
+            trade_date: Trading day the dump belongs to
+        
+        Returns:
+            Number of option contracts indexed
+        """
+        contracts = []
+        for row in instruments:
+            option_type = row.get('instrument_type')
+            underlying = row.get('name')
+            if option_type not in OPTION_TYPES or not underlying:
+                continue
+            if self.underlyings and underlying not in self.underlyings:
+                continue
+            
+            expiry = row.get('expiry')
+            if isinstance(expiry, (date, datetime)):
+                expiry = expiry.strftime('%Y-%m-%d')
+            if not expiry:
+                continue
+            
+            contracts.append(OptionContract(
+                instrument_token=int(row['instrument_token']),
+                tradingsymbol=row['tradingsymbol'],
+                exchange=row.get('exchange') or row.get('segment', 'NFO').split('-')[0],
+                underlying=underlying,
+                expiry=str(expiry),
+                strike=float(row.get('strike', 0.0)),
+                option_type=option_type,
+                lot_size=int(row.get('lot_size') or 0),
+                tick_size=float(row.get('tick_size') or 0.05)
+            ))
+        
+        self._load_contracts(contracts, trade_date or date.today())
+        return len(contracts)
+    
+    def _load_contracts(self, contracts: List[OptionContract], trade_date: date):
+        """Swap in new lookup tables built from a contract list."""
+        by_key: Dict[Tuple[str, str, float, str], OptionContract] = {}
+        by_token: Dict[int, OptionContract] = {}
+        expiries: Dict[str, set] = {}
+        strikes: Dict[Tuple[str, str], set] = {}
+        
+        for contract in contracts:
+            by_key[(contract.underlying, contract.expiry, contract.strike, contract.option_type)] = contract
+            by_token[contract.instrument_token] = contract
+            expiries.setdefault(contract.underlying, set()).add(contract.expiry)
+            strikes.setdefault((contract.underlying, contract.expiry), set()).add(contract.strike)
+        
+        with self._lock:
+            self._contracts = by_key
+            self._by_token = by_token
+            self._expiries = {name: sorted(values) for name, values in expiries.items()}
+            self._strikes = {key: sorted(values) for key, values in strikes.items()}
+            self.trade_date = trade_date
+        
+        logger.info(f"📇 Instrument index built: {len(by_key)} contracts, "
+                    f"{len(self._expiries)} underlyings ({trade_date})")
+    
+    def lookup(self, underlying: str, expiry: str, strike: float, option_type: str) -> Optional[OptionContract]:
+        """Get the contract for (underlying, expiry, strike, option type)."""
+        return self._contracts.get((underlying, expiry, float(strike), option_type))
+    
+    def by_token(self, instrument_token: int) -> Optional[OptionContract]:
+        """Get the contract for an instrument token."""
+        return self._by_token.get(instrument_token)
+    
+    def has_underlying(self, underlying: str) -> bool:
+        """Check whether any contracts are indexed for an underlying."""
+        return underlying in self._expiries
+    
+    def expiries(self, underlying: str) -> List[str]:
+        """Get sorted expiries (YYYY-MM-DD) for an underlying."""
+        return list(self._expiries.get(underlying, []))
+    
+    def strikes(self, underlying: str, expiry: str) -> List[float]:
+        """Get sorted listed strikes for an underlying and expiry."""
+        return list(self._strikes.get((underlying, expiry), []))
+    
+    def nearest_expiry(self, underlying: str, on_date: Optional[date] = None) -> Optional[str]:
+        """
+        Get the nearest expiry on or after a date.
+        
+        Args:
+            underlying: Underlying name (NIFTY, BANKNIFTY, ...)
+            on_date: Reference date (today if None)
+        
+        Returns:
+            Expiry date (YYYY-MM-DD) or None if nothing is listed
+        """
+        expiries = self._expiries.get(underlying)
+        if not expiries:
+            return None
+        
+        reference = (on_date or date.today()).strftime('%Y-%m-%d')
+        position = bisect.bisect_left(expiries, reference)
+        return expiries[position] if position < len(expiries) else None
+    
+    def resolve_expiry(self, underlying: str, expiry: Optional[str] = None) -> Optional[str]:
+        """
+        Resolve a requested expiry to a listed one.
+        
+        Args:
+            underlying: Underlying name
+            expiry: Explicit expiry (YYYY-MM-DD) or None for the nearest
+        
+        Returns:
+            Listed expiry, or the requested value if it cannot be resolved
+        """
+        if expiry:
+            return expiry
+        return self.nearest_expiry(underlying)
+    
+    def _snapshot_path(self, trade_date: date) -> Path:
+        """Get the snapshot file for a trading day."""
+        return self.snapshot_dir / f"instruments_{trade_date.strftime('%Y%m%d')}.json.gz"
+    
+    def save_snapshot(self) -> Optional[Path]:
+        """
+        Write the index to a compact gzip snapshot.
+        
+        Returns:
+            Snapshot path, or None on failure
+        """
+        with self._lock:
+            if not self._contracts or not self.trade_date:
+                return None
+            contracts = list(self._contracts.values())
+            trade_date = self.trade_date
+        
+        path = self._snapshot_path(trade_date)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            payload = {
+                'version': self.SNAPSHOT_VERSION,
+                'trade_date': trade_date.isoformat(),
+                'fields': list(self.SNAPSHOT_FIELDS),
+                'rows': [[getattr(c, name) for name in self.SNAPSHOT_FIELDS] for c in contracts]
+            }
+            
+            temp_path = path.with_suffix('.tmp')
+            with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+                json.dump(payload, f, separators=(',', ':'))
+            temp_path.replace(path)
+            
+            logger.debug(f"💾 Instrument snapshot saved: {path}")
+            return path
+        
+        except Exception as e:
+            logger.error(f"🔴 Failed to save instrument snapshot: {e}")
+            return None
+    
+    def load_snapshot(self, trade_date: Optional[date] = None) -> bool:
+        """
+        Load the snapshot for a trading day, if one exists.
+        
+        Returns:
+            True if the index was loaded from disk
+        """
+        trade_date = trade_date or date.today()
+        path = self._snapshot_path(trade_date)
+        if not path.exists():
+            return False
+        
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                payload = json.load(f)
+            
+            if payload.get('version') != self.SNAPSHOT_VERSION:
+                logger.warning(f"⚠️ Ignoring instrument snapshot with version {payload.get('version')}")
+                return False
+            
+            fields = payload['fields']
+            contracts = [OptionContract(**dict(zip(fields, row))) for row in payload['rows']]
+            if self.underlyings:
+                contracts = [c for c in contracts if c.underlying in self.underlyings]
+            
+            self._load_contracts(contracts, trade_date)
+            return True
+        
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load instrument snapshot {path}: {e}")
+            return False
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        with self._lock:
+            return {
+                'trade_date': self.trade_date.isoformat() if self.trade_date else None,
+                'contracts': len(self._contracts),
+                'underlyings': {name: len(expiries) for name, expiries in self._expiries.items()}
+            }
@@ -22,13 +22,15 @@ import asyncio
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Union, Optional, Tuple, Callable
-from collections import defaultdict, deque
+from collections import defaultdict, deque, OrderedDict
 from dataclasses import dataclass, field
 from enum import Enum
 import json
 import hashlib
 import weakref
 
+from .instruments import InstrumentIndex, STRIKE_INTERVALS
+
 # Kite Connect integration
 try:
     from kiteconnect import KiteConnect
@@ -50,6 +52,14 @@ class RequestPriority(Enum):
     HIGH = 3
     CRITICAL = 4
 
+# Rate limit tokens consumed per request by priority
+PRIORITY_TOKENS = {
+    RequestPriority.LOW: 1.0,
+    RequestPriority.NORMAL: 1.0,
+    RequestPriority.HIGH: 0.8,
+    RequestPriority.CRITICAL: 0.5
+}
+
 @dataclass
 class CacheEntry:
     """Cache entry with TTL and metadata."""
@@ -111,8 +121,15 @@ class ConnectionMetrics:
 class TokenBucketRateLimiter:
     """
     Advanced token bucket rate limiter with exponential backoff.
+    
+    Blocking acquires queue per RequestPriority and are woken strictly in
+    priority order (FIFO within a priority) as tokens refill, so a CRITICAL
+    spot request never loses a token to a queued LOW instrument dump.
     """
     
+    # Upper bounds (seconds) of the wait-time histogram buckets
+    WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float('inf'))
+    
     def __init__(self, 
                  requests_per_minute: int = 200,
                  burst_capacity: int = 50,
@@ -139,58 +156,128 @@ class TokenBucketRateLimiter:
         )
         
         self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        
+        # Waiters per priority (FIFO), plus queueing statistics
+        self._waiters: Dict[RequestPriority, deque] = {p: deque() for p in RequestPriority}
+        self._max_queue_depth: Dict[RequestPriority, int] = {p: 0 for p in RequestPriority}
+        self._wait_histogram: Dict[RequestPriority, List[int]] = {
+            p: [0] * len(self.WAIT_BUCKETS) for p in RequestPriority
+        }
+        self._total_wait: Dict[RequestPriority, float] = {p: 0.0 for p in RequestPriority}
+        self._timeouts: Dict[RequestPriority, int] = {p: 0 for p in RequestPriority}
+    
+    def _refill(self, now: float):
+        """Refill tokens based on elapsed time (caller holds the lock)."""
+        elapsed = now - self.state.last_refill
+        tokens_to_add = elapsed * self.refill_rate
+        self.state.tokens = min(self.capacity + self.burst_capacity, 
+                              self.state.tokens + tokens_to_add)
+        self.state.last_refill = now
+    
+    def _has_precedence(self, priority: RequestPriority, ticket: Optional[object]) -> bool:
+        """
+        Check whether a caller may take tokens now (caller holds the lock).
+        
+        Queued callers must be at the head of their priority queue with no
+        higher-priority waiters; unqueued callers must not overtake any
+        waiter of equal or higher priority.
+        """
+        for other in RequestPriority:
+            if other.value > priority.value and self._waiters[other]:
+                return False
+        
+        own_queue = self._waiters[priority]
+        if ticket is None:
+            return not own_queue
+        return bool(own_queue) and own_queue[0] is ticket
+    
+    def _take(self, required_tokens: float, now: float):
+        """Consume tokens for a granted request (caller holds the lock)."""
+        self.state.tokens -= required_tokens
+        self.state.request_count += 1
+        self.state.last_request = now
+        
+        # Reset backoff on successful acquisition
+        self.state.backoff_factor = 1.0
+    
+    def _record_wait(self, priority: RequestPriority, waited: float):
+        """Add a wait time to the histogram (caller holds the lock)."""
+        self._total_wait[priority] += waited
+        for i, bound in enumerate(self.WAIT_BUCKETS):
+            if waited <= bound:
+                self._wait_histogram[priority][i] += 1
+                break
     
-    def acquire(self, priority: RequestPriority = RequestPriority.NORMAL) -> bool:
+    def acquire(self, 
+                priority: RequestPriority = RequestPriority.NORMAL,
+                timeout: Optional[float] = 0.0) -> bool:
         """
         Acquire a rate limit token.
         
         Args:
             priority: Request priority level
+            timeout: Maximum time to wait for a token; 0 returns immediately,
+                None waits indefinitely
             
         Returns:
             True if token acquired, False if rate limited
         """
-        with self._lock:
-            now = time.time()
-            
-            # Refill tokens based on elapsed time
-            elapsed = now - self.state.last_refill
-            tokens_to_add = elapsed * self.refill_rate
-            self.state.tokens = min(self.capacity + self.burst_capacity, 
-                                  self.state.tokens + tokens_to_add)
-            self.state.last_refill = now
-            
-            # Priority-based token allocation
-            required_tokens = self._get_required_tokens(priority)
+        required_tokens = self._get_required_tokens(priority)
+        
+        with self._condition:
+            start = time.time()
+            self._refill(start)
             
-            if self.state.tokens >= required_tokens:
-                self.state.tokens -= required_tokens
-                self.state.request_count += 1
-                self.state.last_request = now
-                
-                # Reset backoff on successful acquisition
-                self.state.backoff_factor = 1.0
-                
+            if self._has_precedence(priority, None) and self.state.tokens >= required_tokens:
+                self._take(required_tokens, start)
+                self._record_wait(priority, 0.0)
                 return True
-            else:
+            
+            if timeout is not None and timeout <= 0:
                 # Rate limited - apply exponential backoff
                 self.state.rate_limit_hits += 1
                 self.state.backoff_factor = min(
                     self.max_backoff,
                     self.state.backoff_factor * self.backoff_factor
                 )
-                
                 return False
+            
+            # Queue behind earlier waiters of this priority
+            deadline = None if timeout is None else start + timeout
+            ticket = object()
+            waiters = self._waiters[priority]
+            waiters.append(ticket)
+            self._max_queue_depth[priority] = max(self._max_queue_depth[priority], len(waiters))
+            
+            try:
+                while True:
+                    now = time.time()
+                    self._refill(now)
+                    
+                    if self._has_precedence(priority, ticket) and self.state.tokens >= required_tokens:
+                        self._take(required_tokens, now)
+                        self._record_wait(priority, now - start)
+                        return True
+                    
+                    if deadline is not None and now >= deadline:
+                        self.state.rate_limit_hits += 1
+                        self._timeouts[priority] += 1
+                        return False
+                    
+                    # Sleep until enough tokens have refilled, or until woken
+                    # because the queue head changed
+                    wait_time = max(0.001, (required_tokens - self.state.tokens) / self.refill_rate)
+                    if deadline is not None:
+                        wait_time = min(wait_time, deadline - now)
+                    self._condition.wait(wait_time)
+            finally:
+                waiters.remove(ticket)
+                self._condition.notify_all()
     
     def _get_required_tokens(self, priority: RequestPriority) -> float:
         """Get required tokens based on priority."""
-        token_map = {
-            RequestPriority.LOW: 1.0,
-            RequestPriority.NORMAL: 1.0,
-            RequestPriority.HIGH: 0.8,
-            RequestPriority.CRITICAL: 0.5
-        }
-        return token_map.get(priority, 1.0)
+        return PRIORITY_TOKENS.get(priority, 1.0)
     
     def get_wait_time(self) -> float:
         """Get recommended wait time before next request."""
@@ -216,140 +303,183 @@ class TokenBucketRateLimiter:
                 'requests': self.state.request_count,
                 'rate_limit_hits': self.state.rate_limit_hits,
                 'backoff_factor': self.state.backoff_factor,
-                'time_since_last_request': time.time() - self.state.last_request
+                'time_since_last_request': time.time() - self.state.last_request,
+                'queue_depth': {p.name: len(self._waiters[p]) for p in RequestPriority},
+                'max_queue_depth': {p.name: self._max_queue_depth[p] for p in RequestPriority},
+                'timeouts': {p.name: self._timeouts[p] for p in RequestPriority},
+                'average_wait_ms': {
+                    p.name: self._total_wait[p] / max(1, sum(self._wait_histogram[p])) * 1000
+                    for p in RequestPriority
+                },
+                'wait_histogram': {
+                    p.name: {
+                        ('+Inf' if bound == float('inf') else f"{bound * 1000:g}ms"): count
+                        for bound, count in zip(self.WAIT_BUCKETS, self._wait_histogram[p])
+                    }
+                    for p in RequestPriority
+                }
             }
 
+class CacheStripe:
+    """Independently locked LRU segment of the cache."""
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.lock = threading.Lock()
+        
+        # Counters (per stripe, summed in get_stats)
+        self.prefix_hits: Dict[str, int] = defaultdict(int)
+        self.prefix_misses: Dict[str, int] = defaultdict(int)
+        self.expirations = 0
+        self.evictions = 0
+
 class IntelligentCache:
     """
-    Intelligent caching system with TTL, LRU eviction, and automatic cleanup.
+    Intelligent caching system with TTL and LRU eviction.
+    
+    Entries live in OrderedDicts, so get, put and eviction are all O(1).
+    Expired entries are dropped lazily when they are looked up or reach the
+    LRU end, instead of by a periodic full sweep. Keys can optionally be
+    spread over several independently locked stripes so concurrent collector
+    threads don't serialize on a single lock (LRU order is then per stripe).
     """
     
+    # Key prefixes tracked separately in hit/miss statistics
+    TRACKED_PREFIXES = ('quote:', 'instruments:', 'historical:')
+    
     def __init__(self, 
                  max_size: int = 1000,
                  default_ttl: float = 60.0,
-                 cleanup_interval: float = 300.0):
+                 lock_stripes: int = 1):
         """
         Initialize cache system.
         
         Args:
             max_size: Maximum cache size
             default_ttl: Default TTL in seconds
-            cleanup_interval: Cleanup interval in seconds
+            lock_stripes: Number of independently locked cache segments
         """
         self.max_size = max_size
         self.default_ttl = default_ttl
-        self.cleanup_interval = cleanup_interval
+        self.lock_stripes = max(1, lock_stripes)
         
-        self._cache: Dict[str, CacheEntry] = {}
-        self._access_order = deque()  # For LRU tracking
-        self._lock = threading.RLock()
-        
-        # Start cleanup thread
-        self._cleanup_thread = threading.Thread(
-            target=self._cleanup_worker,
-            daemon=True,
-            name="CacheCleanup"
-        )
-        self._cleanup_thread.start()
+        stripe_size = max(1, -(-max_size // self.lock_stripes))  # ceil division
+        self._stripes = [CacheStripe(stripe_size) for _ in range(self.lock_stripes)]
+    
+    def _stripe_for(self, key: str) -> CacheStripe:
+        """Get the stripe owning a key."""
+        if self.lock_stripes == 1:
+            return self._stripes[0]
+        return self._stripes[hash(key) % self.lock_stripes]
+    
+    def _prefix_of(self, key: str) -> str:
+        """Get the statistics bucket for a key."""
+        for prefix in self.TRACKED_PREFIXES:
+            if key.startswith(prefix):
+                return prefix
+        return 'other'
     
     def get(self, key: str) -> Optional[Any]:
         """Get item from cache."""
-        with self._lock:
-            entry = self._cache.get(key)
-            if not entry:
+        stripe = self._stripe_for(key)
+        prefix = self._prefix_of(key)
+        
+        with stripe.lock:
+            entry = stripe.entries.get(key)
+            if entry is None:
+                stripe.prefix_misses[prefix] += 1
                 return None
             
             if entry.is_expired():
-                self._remove_entry(key)
+                del stripe.entries[key]
+                stripe.expirations += 1
+                stripe.prefix_misses[prefix] += 1
                 return None
             
-            # Update access statistics
-            data = entry.access()
-            
-            # Move to end of access order (most recently used)
-            try:
-                self._access_order.remove(key)
-            except ValueError:
-                pass  # Key not in order, that's ok
-            self._access_order.append(key)
-            
-            return data
+            # Mark as most recently used
+            stripe.entries.move_to_end(key)
+            stripe.prefix_hits[prefix] += 1
+            return entry.access()
     
     def put(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
         """Put item in cache."""
-        with self._lock:
-            ttl = ttl or self.default_ttl
-            
-            # Create cache entry
-            entry = CacheEntry(
-                data=value,
-                timestamp=time.time(),
-                ttl=ttl
-            )
-            
-            # Check if we need to evict entries
-            if len(self._cache) >= self.max_size and key not in self._cache:
-                self._evict_lru()
+        stripe = self._stripe_for(key)
+        
+        entry = CacheEntry(
+            data=value,
+            timestamp=time.time(),
+            ttl=ttl or self.default_ttl
+        )
+        
+        with stripe.lock:
+            if key in stripe.entries:
+                stripe.entries[key] = entry
+                stripe.entries.move_to_end(key)
+                return
             
-            # Store entry
-            self._cache[key] = entry
+            # Evict least recently used entry if the stripe is full
+            if len(stripe.entries) >= stripe.max_size:
+                _, lru_entry = stripe.entries.popitem(last=False)
+                if lru_entry.is_expired():
+                    stripe.expirations += 1
+                else:
+                    stripe.evictions += 1
             
-            # Update access order
-            try:
-                self._access_order.remove(key)
-            except ValueError:
-                pass
-            self._access_order.append(key)
-    
-    def _remove_entry(self, key: str) -> None:
-        """Remove entry from cache."""
-        self._cache.pop(key, None)
-        try:
-            self._access_order.remove(key)
-        except ValueError:
-            pass
-    
-    def _evict_lru(self) -> None:
-        """Evict least recently used entry."""
-        if self._access_order:
-            lru_key = self._access_order.popleft()
-            self._cache.pop(lru_key, None)
-    
-    def _cleanup_worker(self) -> None:
-        """Background cleanup worker."""
-        while True:
-            try:
-                time.sleep(self.cleanup_interval)
-                self._cleanup_expired()
-            except Exception as e:
-                logger.error(f"Cache cleanup error: {e}")
+            stripe.entries[key] = entry
     
-    def _cleanup_expired(self) -> None:
-        """Clean up expired entries."""
-        with self._lock:
-            expired_keys = [
-                key for key, entry in self._cache.items()
-                if entry.is_expired()
-            ]
-            
-            for key in expired_keys:
-                self._remove_entry(key)
-            
-            if expired_keys:
-                logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
+    def invalidate(self, key: str) -> bool:
+        """Remove a single entry from the cache."""
+        stripe = self._stripe_for(key)
+        with stripe.lock:
+            return stripe.entries.pop(key, None) is not None
+    
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.entries.clear()
+    
+    def __len__(self) -> int:
+        return sum(len(stripe.entries) for stripe in self._stripes)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        with self._lock:
-            total_accesses = sum(entry.access_count for entry in self._cache.values())
-            
-            return {
-                'size': len(self._cache),
-                'max_size': self.max_size,
-                'utilization': (len(self._cache) / self.max_size) * 100,
-                'total_accesses': total_accesses,
-                'average_accesses': total_accesses / max(1, len(self._cache))
-            }
+        size = 0
+        expirations = 0
+        evictions = 0
+        by_prefix: Dict[str, Dict[str, Any]] = {}
+        
+        for stripe in self._stripes:
+            with stripe.lock:
+                size += len(stripe.entries)
+                expirations += stripe.expirations
+                evictions += stripe.evictions
+                for prefix in set(stripe.prefix_hits) | set(stripe.prefix_misses):
+                    counts = by_prefix.setdefault(prefix, {'hits': 0, 'misses': 0})
+                    counts['hits'] += stripe.prefix_hits[prefix]
+                    counts['misses'] += stripe.prefix_misses[prefix]
+        
+        for counts in by_prefix.values():
+            counts['hit_rate'] = (counts['hits'] / max(1, counts['hits'] + counts['misses'])) * 100
+        
+        total_hits = sum(counts['hits'] for counts in by_prefix.values())
+        total_misses = sum(counts['misses'] for counts in by_prefix.values())
+        
+        return {
+            'size': size,
+            'max_size': self.max_size,
+            'utilization': (size / self.max_size) * 100,
+            'total_accesses': total_hits,
+            'average_accesses': total_hits / max(1, size),
+            'hits': total_hits,
+            'misses': total_misses,
+            'hit_rate': (total_hits / max(1, total_hits + total_misses)) * 100,
+            'expirations': expirations,
+            'evictions': evictions,
+            'lock_stripes': self.lock_stripes,
+            'by_prefix': by_prefix
+        }
 
 class KiteDataProvider:
     """
@@ -373,13 +503,25 @@ class KiteDataProvider:
         'BANKEX': 'BSE:BANKEX'
     }
     
+    # Derivatives exchange per underlying (options segment)
+    OPTIONS_EXCHANGE = {
+        'SENSEX': 'BFO',
+        'BANKEX': 'BFO'
+    }
+    
+    # Kite Connect accepts at most 500 instruments per quote request
+    MAX_QUOTE_INSTRUMENTS = 500
+    
     def __init__(self,
                  api_key: str,
                  access_token: str,
                  requests_per_minute: int = 200,
                  burst_capacity: int = 50,
+                 rate_limit_timeout: float = 30.0,
                  cache_ttl: int = 60,
                  cache_size: int = 1000,
+                 cache_lock_stripes: int = 1,
+                 instrument_snapshot_dir: str = "data/instruments",
                  max_retries: int = 3,
                  connection_timeout: int = 30,
                  read_timeout: int = 60):
@@ -391,8 +533,11 @@ class KiteDataProvider:
             access_token: Kite Connect access token
             requests_per_minute: Rate limit for requests
             burst_capacity: Burst allowance for rate limiting
+            rate_limit_timeout: Maximum time a request waits for a rate limit token
             cache_ttl: Cache TTL in seconds
             cache_size: Maximum cache size
+            cache_lock_stripes: Number of independently locked cache segments
+            instrument_snapshot_dir: Directory for daily instrument index snapshots
             max_retries: Maximum retry attempts
             connection_timeout: Connection timeout
             read_timeout: Read timeout
@@ -415,12 +560,22 @@ class KiteDataProvider:
             requests_per_minute=requests_per_minute,
             burst_capacity=burst_capacity
         )
+        self.rate_limit_timeout = rate_limit_timeout
         
         # Caching
         self.cache = IntelligentCache(
             max_size=cache_size,
-            default_ttl=cache_ttl
+            default_ttl=cache_ttl,
+            lock_stripes=cache_lock_stripes
+        )
+        
+        # Instrument master index (rebuilt once per trading day)
+        self.instrument_index = InstrumentIndex(
+            snapshot_dir=instrument_snapshot_dir,
+            underlyings=self.INSTRUMENT_MAPPING.keys()
         )
+        self._instrument_lock = threading.Lock()
+        self._instrument_retry_at = 0.0
         
         # Metrics tracking
         self.metrics = ConnectionMetrics()
@@ -496,16 +651,11 @@ class KiteDataProvider:
             else:
                 self.metrics.cache_misses += 1
         
-        # Check rate limiting
-        if not self.rate_limiter.acquire(priority):
-            wait_time = self.rate_limiter.get_wait_time()
-            logger.warning(f"⏱️ Rate limited, waiting {wait_time:.2f}s")
-            time.sleep(wait_time)
-            
-            # Retry after waiting
-            if not self.rate_limiter.acquire(priority):
-                self.metrics.rate_limited_requests += 1
-                raise Exception("Rate limit exceeded after wait")
+        # Check rate limiting (queues in priority order until a token frees up)
+        if not self.rate_limiter.acquire(priority, timeout=self.rate_limit_timeout):
+            self.metrics.rate_limited_requests += 1
+            logger.warning(f"⏱️ Rate limited, no token within {self.rate_limit_timeout:.1f}s")
+            raise Exception(f"Rate limit wait exceeded {self.rate_limit_timeout:.1f}s")
         
         # Execute request
         start_time = time.time()
@@ -581,6 +731,33 @@ class KiteDataProvider:
             priority=priority
         )
     
+    def get_quotes_batched(self,
+                           instruments: List[str],
+                           priority: RequestPriority = RequestPriority.NORMAL,
+                           chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get quote data for many instruments in as few requests as possible.
+        
+        Instruments are split into chunks no larger than the per-request
+        instrument limit and the responses are merged.
+        
+        Args:
+            instruments: Exchange-prefixed instrument symbols
+            priority: Request priority
+            chunk_size: Instruments per request (defaults to MAX_QUOTE_INSTRUMENTS)
+            
+        Returns:
+            Merged quote data dictionary
+        """
+        chunk_size = max(1, min(chunk_size or self.MAX_QUOTE_INSTRUMENTS, self.MAX_QUOTE_INSTRUMENTS))
+        
+        quotes: Dict[str, Any] = {}
+        for i in range(0, len(instruments), chunk_size):
+            chunk = instruments[i:i + chunk_size]
+            quotes.update(self.get_quote(chunk, priority) or {})
+        
+        return quotes
+    
     def get_instruments(self, exchange: str = None, priority: RequestPriority = RequestPriority.LOW) -> List[Dict[str, Any]]:
         """
         Get instruments list.
@@ -638,45 +815,134 @@ class KiteDataProvider:
             priority=priority
         )
     
-    def get_atm_strike(self, index_name: str) -> float:
+    def get_spot_price(self, index_name: str) -> float:
         """
-        Get ATM strike for an index.
+        Get the current index (spot) price.
         
         Args:
             index_name: Index name (NIFTY, BANKNIFTY, etc.)
             
         Returns:
-            ATM strike price
+            Last traded index price
         """
         instrument = self.INSTRUMENT_MAPPING.get(index_name)
         if not instrument:
             raise ValueError(f"Unknown index: {index_name}")
         
-        # Get current market price
         quote_data = self.get_quote(instrument, RequestPriority.HIGH)
         
         if instrument not in quote_data:
             raise ValueError(f"No quote data for {instrument}")
         
-        current_price = quote_data[instrument]['last_price']
+        return quote_data[instrument]['last_price']
+    
+    def get_atm_strike(self, index_name: str) -> float:
+        """
+        Get ATM strike for an index.
         
-        # Calculate ATM strike based on index-specific intervals
-        strike_intervals = {
-            'NIFTY': 50,
-            'BANKNIFTY': 100,
-            'FINNIFTY': 50,
-            'MIDCPNIFTY': 25,
-            'SENSEX': 100,
-            'BANKEX': 100
-        }
+        Args:
+            index_name: Index name (NIFTY, BANKNIFTY, etc.)
+            
+        Returns:
+            ATM strike price
+        """
+        # Get current market price
+        current_price = self.get_spot_price(index_name)
         
-        interval = strike_intervals.get(index_name, 50)
+        # Calculate ATM strike based on index-specific intervals
+        interval = STRIKE_INTERVALS.get(index_name, 50)
         atm_strike = round(current_price / interval) * interval
         
         logger.debug(f"📍 {index_name} ATM strike: {atm_strike} (current: {current_price})")
         
         return atm_strike
     
+    def ensure_instrument_index(self) -> Optional[InstrumentIndex]:
+        """
+        Make sure the instrument index is built for today.
+        
+        Loads today's on-disk snapshot if present, otherwise fetches the
+        instrument dump once from every options exchange and saves a snapshot.
+        
+        Returns:
+            Fresh instrument index, or None if it is unavailable
+        """
+        index = self.instrument_index
+        if index is None:
+            return None
+        if index.is_fresh():
+            return index
+        
+        with self._instrument_lock:
+            if index.is_fresh():
+                return index
+            if time.time() < self._instrument_retry_at:
+                return None
+            
+            if index.load_snapshot():
+                logger.info("✅ Instrument index loaded from snapshot")
+                return index
+            
+            try:
+                instruments: List[Dict[str, Any]] = []
+                for exchange in sorted({'NFO'} | set(self.OPTIONS_EXCHANGE.values())):
+                    instruments.extend(self.get_instruments(exchange) or [])
+                
+                index.build(instruments)
+                index.save_snapshot()
+                return index
+            
+            except Exception as e:
+                # Fall back to formatted symbols and retry in a few minutes
+                self._instrument_retry_at = time.time() + 300
+                logger.warning(f"⚠️ Instrument index unavailable: {e}")
+                return None
+    
+    def resolve_expiry(self, index_name: str, expiry: str = None) -> Optional[str]:
+        """
+        Resolve an expiry (None for nearest) through the instrument index.
+        
+        Args:
+            index_name: Index name
+            expiry: Expiry date (YYYY-MM-DD) or None
+            
+        Returns:
+            Listed expiry, or the requested value if it cannot be resolved
+        """
+        index = self.ensure_instrument_index()
+        if index is None or not index.has_underlying(index_name):
+            return expiry
+        return index.resolve_expiry(index_name, expiry)
+    
+    def build_option_symbols(self,
+                             index_name: str,
+                             strikes: List[float],
+                             expiry: str = None,
+                             option_types: List[str] = None) -> Dict[str, Tuple[float, str]]:
+        """
+        Build exchange-prefixed option symbols for a strike window.
+        
+        Symbols come from the instrument index when it is available (strikes
+        that are not listed are skipped); otherwise they are formatted.
+        
+        Args:
+            index_name: Index name
+            strikes: List of strike prices
+            expiry: Expiry date (YYYY-MM-DD), None for nearest
+            option_types: Option types (CE, PE)
+            
+        Returns:
+            Mapping of quote symbol -> (strike, option_type)
+        """
+        return build_option_symbol_map(
+            self.ensure_instrument_index(),
+            index_name,
+            strikes,
+            expiry,
+            option_types,
+            self.OPTIONS_EXCHANGE.get(index_name, 'NFO')
+        )
+    
     def get_options_data(self, 
                         index_name: str,
                         strikes: List[float],
@@ -685,6 +951,9 @@ class KiteDataProvider:
         """
         Get options data for specified strikes.
         
+        All legs of the strike window are fetched together through
+        get_quotes_batched and fanned back out into per-leg records.
+        
         Args:
             index_name: Index name
             strikes: List of strike prices
@@ -694,51 +963,25 @@ class KiteDataProvider:
         Returns:
             List of options data
         """
-        option_types = option_types or ['CE', 'PE']
-        
         # Build instrument symbols
-        instruments = []
-        for strike in strikes:
-            for option_type in option_types:
-                # Format: NIFTY24950CE, BANKNIFTY45000PE, etc.
-                if expiry:
-                    # Extract year and date from expiry for symbol
-                    year = expiry[2:4]  # Last 2 digits of year
-                    month_day = expiry[5:].replace('-', '')
-                    symbol = f"{index_name}{year}{month_day}{int(strike)}{option_type}"
-                else:
-                    # Use nearest expiry
-                    symbol = f"{index_name}{int(strike)}{option_type}"
-                
-                instruments.append(symbol)
+        expiry = self.resolve_expiry(index_name, expiry)
+        symbols = self.build_option_symbols(index_name, strikes, expiry, option_types)
         
-        # Get quote data for all instruments
-        if instruments:
-            try:
-                quote_data = self.get_quote(instruments, RequestPriority.HIGH)
-                
-                # Process and structure the data
-                options_data = []
-                for symbol, data in quote_data.items():
-                    if data:  # Valid data received
-                        options_data.append({
-                            'symbol': symbol,
-                            'strike': data.get('instrument_token'),
-                            'option_type': symbol[-2:],  # CE or PE
-                            'last_price': data.get('last_price'),
-                            'volume': data.get('volume'),
-                            'oi': data.get('oi'),
-                            'change': data.get('net_change'),
-                            'timestamp': datetime.now().isoformat()
-                        })
-                
-                return options_data
-                
-            except Exception as e:
-                logger.error(f"🔴 Failed to get options data: {e}")
-                return []
+        if not symbols:
+            return []
         
-        return []
+        # Get quote data for all instruments
+        try:
+            quote_data = self.get_quotes_batched(list(symbols), RequestPriority.HIGH)
+            
+            # Fan the response back out into per-leg records
+            options_data = option_records_from_quotes(symbols, quote_data, expiry)
+            
+            return options_data
+            
+        except Exception as e:
+            logger.error(f"🔴 Failed to get options data: {e}")
+            return []
     
     def health_check(self) -> Dict[str, Any]:
         """
@@ -791,6 +1034,7 @@ class KiteDataProvider:
             },
             'rate_limiting': self.rate_limiter.get_status(),
             'cache': self.cache.get_stats(),
+            'instrument_index': self.instrument_index.get_stats() if self.instrument_index else None,
             'health': {
                 'connected': self._connected,
                 'last_health_check': self._last_health_check
@@ -811,4 +1055,72 @@ class KiteDataProvider:
         try:
             self.cleanup()
         except Exception:
-            pass  # Ignore cleanup errors in destructor
\ No newline at end of file
+            pass  # Ignore cleanup errors in destructor
+
+def build_option_symbol_map(index: Optional[InstrumentIndex],
+                            index_name: str,
+                            strikes: List[float],
+                            expiry: Optional[str],
+                            option_types: Optional[List[str]],
+                            exchange: str) -> Dict[str, Tuple[float, str]]:
+    """
+    Map exchange-prefixed option symbols to (strike, option type).
+    
+    Uses the instrument index when it lists the underlying (unlisted strikes
+    are skipped), otherwise formats trading symbols.
+    """
+    option_types = option_types or ['CE', 'PE']
+    
+    if index is not None and index.has_underlying(index_name):
+        expiry = index.resolve_expiry(index_name, expiry)
+        
+        symbols: Dict[str, Tuple[float, str]] = {}
+        for strike in strikes:
+            for option_type in option_types:
+                contract = index.lookup(index_name, expiry, strike, option_type)
+                if contract:
+                    symbols[contract.quote_symbol] = (strike, option_type)
+        return symbols
+    
+    symbols: Dict[str, Tuple[float, str]] = {}
+    for strike in strikes:
+        for option_type in option_types:
+            # Format: NIFTY24950CE, BANKNIFTY45000PE, etc.
+            if expiry:
+                # Extract year and date from expiry for symbol
+                year = expiry[2:4]  # Last 2 digits of year
+                month_day = expiry[5:].replace('-', '')
+                tradingsymbol = f"{index_name}{year}{month_day}{int(strike)}{option_type}"
+            else:
+                # Use nearest expiry
+                tradingsymbol = f"{index_name}{int(strike)}{option_type}"
+            
+            symbols[f"{exchange}:{tradingsymbol}"] = (strike, option_type)
+    
+    return symbols
+
+def option_records_from_quotes(symbols: Dict[str, Tuple[float, str]],
+                               quote_data: Dict[str, Any],
+                               expiry: Optional[str]) -> List[Dict[str, Any]]:
+    """Fan a chain quote response back out into per-leg option records."""
+    options_data = []
+    timestamp = datetime.now().isoformat()
+    for quote_symbol, (strike, option_type) in symbols.items():
+        data = quote_data.get(quote_symbol)
+        if not data:
+            continue
+        
+        options_data.append({
+            'symbol': quote_symbol.split(':', 1)[1],
+            'strike': strike,
+            'expiry': expiry,
+            'option_type': option_type,
+            'instrument_token': data.get('instrument_token'),
+            'last_price': data.get('last_price'),
+            'volume': data.get('volume'),
+            'oi': data.get('oi'),
+            'change': data.get('net_change'),
+            'timestamp': timestamp
+        })
+    
+    return options_data
@@ -0,0 +1,606 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📡 Kite Stream Engine - G6 Platform v3.0
+WebSocket ingestion through KiteTicker with a local per-index chain book.
+
+Instead of quoting the strike window over REST every cycle, the engine
+subscribes to each index spot and its ATM-window option tokens over the
+Kite ticker WebSocket and keeps the latest state of every leg in memory.
+When spot moves far enough to re-center the ATM strike, the window is
+re-subscribed (new tokens added, stale ones dropped). The collection cycle
+then reads the book through the same get_options_data() call it uses on the
+REST provider, so freshness is sub-second and REST quota use is near zero.
+
+Features:
+- Index spot and option window subscriptions in full mode (LTP, volume, OI)
+- Per-index chain book updated tick by tick under a lock
+- ATM re-centering with the shared hysteresis rule and automatic re-subscription
+- Window margin beyond the collected strikes so re-centered legs already have data
+- Staleness guard: consumers fall back to REST when the spot or option feed stops ticking
+- Instrument index built before connecting and refreshed off the ticker thread
+- Daily expiry roll to the nearest listed series (unless an expiry is pinned)
+- Injectable ticker factory (any KiteTicker-compatible object, e.g. a local fake)
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime, date
+from typing import Dict, List, Any, Optional, Callable, Set
+from dataclasses import dataclass
+
+from .instruments import OptionContract, STRIKE_INTERVALS
+from ..collectors.market_context import IndexContext, MarketContext, recenter_atm
+
+# KiteTicker integration
+try:
+    from kiteconnect import KiteTicker
+    KITETICKER_AVAILABLE = True
+except ImportError:
+    KITETICKER_AVAILABLE = False
+    KiteTicker = None
+
+logger = logging.getLogger(__name__)
+
+# Instrument tokens of the index spots on the Kite ticker
+INDEX_TOKENS = {
+    'NIFTY': 256265,
+    'BANKNIFTY': 260105,
+    'FINNIFTY': 257801,
+    'MIDCPNIFTY': 288009,
+    'SENSEX': 265,
+    'BANKEX': 274441
+}
+
+class _RefreshPending(Exception):
+    """The instrument index is being rebuilt; the refresh worker re-arms the window."""
+
+@dataclass
+class StreamStats:
+    """Streaming ingestion statistics."""
+    ticks_received: int = 0
+    option_ticks: int = 0
+    spot_ticks: int = 0
+    unknown_ticks: int = 0
+    connects: int = 0
+    reconnect_attempts: int = 0
+    errors: int = 0
+    resubscriptions: int = 0
+    book_reads: int = 0
+    stale_reads: int = 0
+    last_tick_time: float = 0.0
+
+class ChainBook:
+    """
+    📒 Latest state of one index's subscribed option window.
+    
+    Not thread-safe on its own; KiteStreamEngine serializes access.
+    """
+    
+    def __init__(self, index_name: str, spot_token: int, strike_interval: int):
+        """
+        Initialize chain book.
+        
+        Args:
+            index_name: Index name
+            spot_token: Instrument token of the index spot
+            strike_interval: Strike interval of the index
+        """
+        self.index_name = index_name
+        self.spot_token = spot_token
+        self.strike_interval = strike_interval
+        
+        self.expiry: Optional[str] = None
+        self.atm_strike: Optional[float] = None
+        self.spot_price: Optional[float] = None
+        self.spot_change = 0.0
+        self.spot_change_percent = 0.0
+        self.last_tick_time = 0.0
+        self.last_option_tick_time = 0.0
+        
+        # Day the window was last resolved and earliest retry after a failed re-centre
+        self.window_date: Optional[date] = None
+        self.retry_at = 0.0
+        
+        self.contracts: Dict[int, OptionContract] = {}
+        self.legs: Dict[int, Dict[str, Any]] = {}  # token -> latest leg record
+    
+    @property
+    def tokens(self) -> Set[int]:
+        """Option tokens of the current window."""
+        return set(self.contracts)
+    
+    def set_window(self, contracts: List[OptionContract]):
+        """
+        Replace the option window, keeping the state of legs that stay subscribed.
+        
+        Args:
+            contracts: Contracts of the new window
+        """
+        self.contracts = {contract.instrument_token: contract for contract in contracts}
+        self.legs = {token: leg for token, leg in self.legs.items() if token in self.contracts}
+    
+    def apply_spot_tick(self, tick: Dict[str, Any]):
+        """Update the spot from an index tick."""
+        self.spot_price = float(tick['last_price'])
+        close = (tick.get('ohlc') or {}).get('close')
+        if close:
+            self.spot_change = self.spot_price - close
+        self.spot_change_percent = tick.get('change', self.spot_change_percent) or 0.0
+        self.last_tick_time = time.time()
+    
+    def apply_option_tick(self, tick: Dict[str, Any]) -> bool:
+        """
+        Update one leg from an option tick.
+        
+        Returns:
+            True if the tick belongs to the current window
+        """
+        contract = self.contracts.get(tick['instrument_token'])
+        if contract is None:
+            return False
+        
+        last_price = tick.get('last_price')
+        close = (tick.get('ohlc') or {}).get('close')
+        timestamp = tick.get('exchange_timestamp') or tick.get('last_trade_time') or datetime.now()
+        
+        self.legs[contract.instrument_token] = {
+            'symbol': contract.tradingsymbol,
+            'strike': contract.strike,
+            'expiry': contract.expiry,
+            'option_type': contract.option_type,
+            'instrument_token': contract.instrument_token,
+            'last_price': last_price,
+            'volume': tick.get('volume_traded', tick.get('volume')),
+            'oi': tick.get('oi'),
+            'change': last_price - close if close and last_price is not None else None,
+            'timestamp': timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp
+        }
+        self.last_tick_time = self.last_option_tick_time = time.time()
+        return True
+    
+    def records(self, strikes: List[float], option_types: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get leg records for a strike window.
+        
+        Args:
+            strikes: Strikes wanted
+            option_types: Option types wanted
+        
+        Returns:
+            Copies of the leg records, or None if a listed leg has not ticked yet
+        """
+        if not self.contracts:
+            return None
+        
+        # Strikes outside the subscribed range are not served from the book
+        listed_strikes = [contract.strike for contract in self.contracts.values()]
+        low, high = min(listed_strikes), max(listed_strikes)
+        if any(not low <= strike <= high for strike in strikes):
+            return None
+        
+        wanted = {(float(strike), option_type) for strike in strikes for option_type in option_types}
+        
+        records = []
+        for token, contract in self.contracts.items():
+            if (float(contract.strike), contract.option_type) not in wanted:
+                continue
+            leg = self.legs.get(token)
+            if leg is None:
+                return None
+            records.append(dict(leg))
+        
+        return records or None
+
+class KiteStreamEngine:
+    """
+    📡 Streaming ingestion engine over the Kite ticker WebSocket.
+    
+    Ticker callbacks run on the ticker's own thread; the chain books are
+    read by collection threads through get_options_data() and
+    market_context(), all under one lock.
+    """
+    
+    def __init__(self,
+                 provider,
+                 api_key: Optional[str] = None,
+                 access_token: Optional[str] = None,
+                 offsets: int = 5,
+                 window_margin: int = 2,
+                 hysteresis: float = 0.3,
+                 max_staleness: float = 5.0,
+                 recenter_backoff: float = 30.0,
+                 expiry: Optional[str] = None,
+                 mode: str = 'full',
+                 root: Optional[str] = None,
+                 strike_intervals: Optional[Dict[str, int]] = None,
+                 index_tokens: Optional[Dict[str, int]] = None,
+                 ticker_factory: Optional[Callable[..., Any]] = None):
+        """
+        Initialize Kite Stream Engine.
+        
+        Args:
+            provider: KiteDataProvider (instrument index and credentials)
+            api_key: Kite Connect API key (provider's if None)
+            access_token: Kite Connect access token (provider's if None)
+            offsets: Strikes collected on each side of ATM
+            window_margin: Extra strikes subscribed on each side beyond offsets
+            hysteresis: ATM re-centering hysteresis (fraction of a strike interval)
+            max_staleness: Seconds without spot (context) or option (chain) ticks
+                before the book is not served
+            recenter_backoff: Seconds before retrying a failed window re-centre
+            expiry: Expiry to stream (YYYY-MM-DD); None follows the nearest listed expiry
+            mode: Ticker subscription mode (full carries volume and OI)
+            root: WebSocket root URI (e.g. a local fake tick server)
+            strike_intervals: Strike interval per index (STRIKE_INTERVALS if None)
+            index_tokens: Spot instrument token per index (INDEX_TOKENS if None)
+            ticker_factory: Callable(api_key, access_token, root) returning a
+                KiteTicker-compatible object (KiteTicker if None)
+        """
+        if ticker_factory is None and not KITETICKER_AVAILABLE:
+            raise ImportError("KiteTicker not available. Install with: pip install kiteconnect")
+        
+        self.provider = provider
+        self.api_key = api_key or getattr(provider, 'api_key', None)
+        self.access_token = access_token or getattr(provider, 'access_token', None)
+        self.offsets = offsets
+        self.window_margin = window_margin
+        self.hysteresis = hysteresis
+        self.max_staleness = max_staleness
+        self.recenter_backoff = recenter_backoff
+        self.expiry = expiry
+        self.mode = mode
+        self.root = root
+        self.strike_intervals = strike_intervals or STRIKE_INTERVALS
+        self.index_tokens = index_tokens or INDEX_TOKENS
+        self.ticker_factory = ticker_factory or self._create_ticker
+        
+        self.stats = StreamStats()
+        self.ticker = None
+        
+        self._books: Dict[str, ChainBook] = {}
+        self._spot_books: Dict[int, ChainBook] = {}  # spot token -> book
+        self._option_books: Dict[int, ChainBook] = {}  # option token -> book
+        self._lock = threading.RLock()
+        self._running = False
+        
+        # Instrument index used by ticker callbacks (never downloaded on the ticker thread)
+        self._instruments = None
+        self._refresh_thread: Optional[threading.Thread] = None
+        
+        logger.info(f"📡 Kite stream engine initialized (mode: {mode}, ±{offsets}+{window_margin} strikes)")
+    
+    def _create_ticker(self, api_key: str, access_token: str, root: Optional[str] = None):
+        """Create a KiteTicker connection."""
+        if root:
+            return KiteTicker(api_key, access_token, root=root)
+        return KiteTicker(api_key, access_token)
+    
+    @property
+    def is_running(self) -> bool:
+        """Whether the ticker has been started."""
+        return self._running
+    
+    def start(self, indices: List[str]) -> bool:
+        """
+        Connect the ticker and subscribe the index spots.
+        
+        The instrument index is built first, on the caller's thread; option
+        windows are subscribed once each index's first spot tick arrives.
+        
+        Args:
+            indices: Index names (NIFTY, BANKNIFTY, etc.)
+        
+        Returns:
+            True if the ticker was started
+        """
+        with self._lock:
+            for index_name in indices:
+                spot_token = self.index_tokens.get(index_name)
+                if spot_token is None:
+                    logger.warning(f"⚠️ No spot token for {index_name}; it will be collected over REST")
+                    continue
+                book = ChainBook(index_name, spot_token, self.strike_intervals.get(index_name, 50))
+                self._books[index_name] = book
+                self._spot_books[spot_token] = book
+            
+            if not self._books:
+                return False
+            
+            self._instruments = self.provider.ensure_instrument_index()
+            if self._instruments is None:
+                logger.warning("⚠️ Instrument index unavailable; option windows wait for a background refresh")
+            
+            try:
+                self.ticker = self.ticker_factory(self.api_key, self.access_token, self.root)
+                self.ticker.on_connect = self._on_connect
+                self.ticker.on_ticks = self._on_ticks
+                self.ticker.on_close = self._on_close
+                self.ticker.on_error = self._on_error
+                self.ticker.on_reconnect = self._on_reconnect
+                self.ticker.connect(threaded=True)
+            except Exception as e:
+                logger.error(f"🔴 Failed to start Kite ticker: {e}")
+                self.ticker = None
+                return False
+            
+            self._running = True
+        
+        logger.info(f"📡 Streaming {len(self._books)} indices: {', '.join(self._books)}")
+        return True
+    
+    def stop(self):
+        """Close the ticker connection."""
+        with self._lock:
+            self._running = False
+            ticker, self.ticker = self.ticker, None
+        
+        if ticker is not None:
+            try:
+                ticker.close()
+            except Exception as e:
+                logger.debug(f"Ticker close failed: {e}")
+        logger.info("📡 Kite stream engine stopped")
+    
+    def _on_connect(self, ws, response=None):
+        """(Re)subscribe every spot and option token after a connect."""
+        with self._lock:
+            self.stats.connects += 1
+            tokens = list(self._spot_books) + list(self._option_books)
+        
+        if tokens:
+            ws.subscribe(tokens)
+            ws.set_mode(self.mode, tokens)
+        logger.info(f"📡 Ticker connected, subscribed {len(tokens)} tokens")
+    
+    def _on_ticks(self, ws, ticks: List[Dict[str, Any]]):
+        """Apply a batch of ticks to the books, re-centering windows as spot moves."""
+        recentered: List[ChainBook] = []
+        
+        with self._lock:
+            for tick in ticks:
+                self.stats.ticks_received += 1
+                token = tick.get('instrument_token')
+                
+                book = self._option_books.get(token)
+                if book is not None:
+                    book.apply_option_tick(tick)
+                    self.stats.option_ticks += 1
+                    continue
+                
+                book = self._spot_books.get(token)
+                if book is not None and tick.get('last_price'):
+                    book.apply_spot_tick(tick)
+                    self.stats.spot_ticks += 1
+                    atm_strike = recenter_atm(book.spot_price, book.atm_strike, book.strike_interval, self.hysteresis)
+                    # A new day may roll the window to the next expiry
+                    due = atm_strike != book.atm_strike or book.window_date != date.today()
+                    if due and time.time() >= book.retry_at and book not in recentered:
+                        recentered.append(book)
+                    continue
+                
+                self.stats.unknown_ticks += 1
+            
+            self.stats.last_tick_time = time.time()
+        
+        for book in recentered:
+            self._resubscribe(ws, book)
+    
+    def _resubscribe(self, ws, book: ChainBook):
+        """Move an index's option window to the current ATM and update subscriptions."""
+        try:
+            contracts, expiry = self._window_contracts(book)
+        except _RefreshPending:
+            # retry_at is owned by the refresh until it finishes
+            logger.debug(f"📡 {book.index_name} window waits for the instrument index refresh")
+            return
+        except Exception as e:
+            with self._lock:
+                book.retry_at = time.time() + self.recenter_backoff
+            logger.warning(f"⚠️ Option window unavailable for {book.index_name} "
+                           f"(retry in {self.recenter_backoff:.0f}s): {e}")
+            return
+        
+        with self._lock:
+            atm_strike = recenter_atm(book.spot_price, book.atm_strike, book.strike_interval, self.hysteresis)
+            previous = book.atm_strike
+            previous_expiry = book.expiry
+            old_tokens = book.tokens
+            book.atm_strike = atm_strike
+            book.expiry = expiry
+            book.window_date = date.today()
+            book.retry_at = 0.0
+            book.set_window(contracts)
+            
+            new_tokens = book.tokens
+            for token in old_tokens - new_tokens:
+                self._option_books.pop(token, None)
+            for token in new_tokens:
+                self._option_books[token] = book
+            self.stats.resubscriptions += 1
+        
+        added = list(new_tokens - old_tokens)
+        removed = list(old_tokens - new_tokens)
+        if removed:
+            ws.unsubscribe(removed)
+        if added:
+            ws.subscribe(added)
+            ws.set_mode(self.mode, added)
+        
+        if previous_expiry is not None and expiry != previous_expiry:
+            logger.info(f"📡 {book.index_name} window rolled to expiry {expiry} (was {previous_expiry})")
+        logger.info(f"📡 {book.index_name} window re-centered {previous} -> {atm_strike} "
+                    f"(+{len(added)}/-{len(removed)} tokens)")
+    
+    def _window_contracts(self, book: ChainBook) -> tuple:
+        """Look up the listed contracts of the window around the book's next ATM strike."""
+        index = self._instruments
+        if index is None or not index.is_fresh():
+            self._refresh_instruments()
+            raise _RefreshPending()
+        if not index.has_underlying(book.index_name):
+            raise ValueError("instrument index unavailable")
+        
+        # Nearest listed expiry unless one is pinned, so the window follows the weekly roll
+        expiry = index.resolve_expiry(book.index_name, self.expiry)
+        if expiry is None:
+            raise ValueError("no listed expiry")
+        atm_strike = recenter_atm(book.spot_price, book.atm_strike, book.strike_interval, self.hysteresis)
+        reach = self.offsets + self.window_margin
+        
+        contracts = []
+        for offset in range(-reach, reach + 1):
+            strike = atm_strike + offset * book.strike_interval
+            for option_type in ('CE', 'PE'):
+                contract = index.lookup(book.index_name, expiry, strike, option_type)
+                if contract:
+                    contracts.append(contract)
+        return contracts, expiry
+    
+    def _refresh_instruments(self):
+        """Rebuild the instrument index on a worker thread (the download may take seconds)."""
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            # Hold re-centres back before the worker starts; it clears this on success
+            for book in self._books.values():
+                book.retry_at = time.time() + self.recenter_backoff
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_instruments_worker,
+                daemon=True,
+                name="KiteStreamInstruments"
+            )
+            self._refresh_thread.start()
+    
+    def _refresh_instruments_worker(self):
+        """Fetch the instrument index and let waiting windows re-centre on the next spot tick."""
+        try:
+            index = self.provider.ensure_instrument_index()
+        except Exception as e:
+            logger.warning(f"⚠️ Instrument index refresh failed: {e}")
+            return
+        if index is None or not index.is_fresh():
+            return
+        
+        with self._lock:
+            self._instruments = index
+            for book in self._books.values():
+                book.retry_at = 0.0
+        logger.info("📡 Instrument index refreshed for streaming")
+    
+    def _on_close(self, ws, code=None, reason=None):
+        """Log a closed connection (KiteTicker reconnects on its own)."""
+        logger.warning(f"⚠️ Ticker connection closed: {code} {reason}")
+    
+    def _on_error(self, ws, code=None, reason=None):
+        """Count ticker errors."""
+        with self._lock:
+            self.stats.errors += 1
+        logger.error(f"🔴 Ticker error: {code} {reason}")
+    
+    def _on_reconnect(self, ws, attempts_count=None):
+        """Count reconnect attempts."""
+        with self._lock:
+            self.stats.reconnect_attempts += 1
+        logger.info(f"📡 Ticker reconnecting (attempt {attempts_count})")
+    
+    def _fresh_book(self, index_name: str) -> Optional[ChainBook]:
+        """Get an index's book if its spot is ticking."""
+        book = self._books.get(index_name)
+        if book is None or book.spot_price is None:
+            return None
+        if time.time() - book.last_tick_time > self.max_staleness:
+            self.stats.stale_reads += 1
+            return None
+        return book
+    
+    def get_options_data(self,
+                         index_name: str,
+                         strikes: List[float],
+                         expiry: str = None,
+                         option_types: List[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get options data for specified strikes from the chain book.
+        
+        Same record layout as KiteDataProvider.get_options_data.
+        
+        Args:
+            index_name: Index name
+            strikes: List of strike prices
+            expiry: Expiry date (YYYY-MM-DD); None for the streamed expiry
+            option_types: Option types (CE, PE)
+        
+        Returns:
+            Leg records, or None when the book cannot serve the window
+            (stale, other expiry, outside the window or legs not yet ticked)
+        """
+        with self._lock:
+            self.stats.book_reads += 1
+            book = self._fresh_book(index_name)
+            if book is None or (expiry is not None and expiry != book.expiry):
+                return None
+            # Spot ticks alone do not keep silent or expired option legs fresh
+            if time.time() - book.last_option_tick_time > self.max_staleness:
+                self.stats.stale_reads += 1
+                return None
+            return book.records(strikes, option_types or ['CE', 'PE'])
+    
+    def market_context(self, indices: List[str]) -> MarketContext:
+        """
+        Build a cycle context from streamed spots.
+        
+        Args:
+            indices: Index names
+        
+        Returns:
+            MarketContext with every index whose book is ticking
+        """
+        context = MarketContext(timestamp=datetime.now())
+        
+        with self._lock:
+            for index_name in indices:
+                book = self._fresh_book(index_name)
+                if book is None or book.atm_strike is None:
+                    continue
+                context.indices[index_name] = IndexContext(
+                    index_name=index_name,
+                    spot_price=book.spot_price,
+                    atm_strike=book.atm_strike,
+                    strike_interval=book.strike_interval,
+                    change=book.spot_change,
+                    change_percent=book.spot_change_percent
+                )
+        
+        return context
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get streaming statistics."""
+        with self._lock:
+            now = time.time()
+            return {
+                'running': self._running,
+                'ticks_received': self.stats.ticks_received,
+                'option_ticks': self.stats.option_ticks,
+                'spot_ticks': self.stats.spot_ticks,
+                'unknown_ticks': self.stats.unknown_ticks,
+                'connects': self.stats.connects,
+                'reconnect_attempts': self.stats.reconnect_attempts,
+                'errors': self.stats.errors,
+                'resubscriptions': self.stats.resubscriptions,
+                'book_reads': self.stats.book_reads,
+                'stale_reads': self.stats.stale_reads,
+                'subscribed_tokens': len(self._spot_books) + len(self._option_books),
+                'books': {
+                    index_name: {
+                        'atm_strike': book.atm_strike,
+                        'spot_price': book.spot_price,
+                        'legs': len(book.contracts),
+                        'legs_ticked': len(book.legs),
+                        'expiry': book.expiry,
+                        'age': now - book.last_tick_time if book.last_tick_time else None,
+                        'option_age': now - book.last_option_tick_time if book.last_option_tick_time else None
+                    }
+                    for index_name, book in self._books.items()
+                }
+            }
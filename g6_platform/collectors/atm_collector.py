@@ -23,6 +23,21 @@ from dataclasses import dataclass, field
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import defaultdict
 
+from .market_context import IndexContext
+from ..api.instruments import STRIKE_INTERVALS
+
+try:
+    from ..analytics.analytics_engine import ChainGreeksEngine
+    GREEKS_ENGINE_AVAILABLE = True
+except ImportError:
+    GREEKS_ENGINE_AVAILABLE = False
+
+try:
+    from ..core.chain_snapshot import ChainSnapshot
+    CHAIN_SNAPSHOT_AVAILABLE = True
+except ImportError:
+    CHAIN_SNAPSHOT_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -31,6 +46,7 @@ class CollectionResult:
     success: bool
     data: List[Dict[str, Any]] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    snapshot: Optional[Any] = None  # ChainSnapshot of data (columnar form)
     
     # Performance metrics
     collection_time: float = 0.0
@@ -123,14 +139,7 @@ class ATMOptionsCollector:
     """
     
     # Index-specific strike intervals
-    STRIKE_INTERVALS = {
-        'NIFTY': 50,
-        'BANKNIFTY': 100,
-        'FINNIFTY': 50,
-        'MIDCPNIFTY': 25,
-        'SENSEX': 100,
-        'BANKEX': 100
-    }
+    STRIKE_INTERVALS = STRIKE_INTERVALS
     
     def __init__(self,
                  api_provider,
@@ -138,7 +147,10 @@ class ATMOptionsCollector:
                  timeout_seconds: float = 30.0,
                  quality_threshold: float = 0.8,
                  batch_size: int = 10,
-                 cache_ttl: int = 30):
+                 cache_ttl: int = 30,
+                 bulk_fetch: bool = True,
+                 greeks_engine: Optional[Any] = None,
+                 chain_source: Optional[Any] = None):
         """
         Initialize ATM Options Collector.
         
@@ -149,6 +161,9 @@ class ATMOptionsCollector:
             quality_threshold: Minimum data quality threshold
             batch_size: Batch size for processing
             cache_ttl: Cache TTL in seconds
+            bulk_fetch: Fetch the whole strike window in one chain request
+            greeks_engine: Chain-level IV/Greeks engine (ChainGreeksEngine by default)
+            chain_source: Streamed chain book (e.g. KiteStreamEngine) read before REST
         """
         self.api_provider = api_provider
         self.max_workers = max_workers
@@ -156,6 +171,13 @@ class ATMOptionsCollector:
         self.quality_threshold = quality_threshold
         self.batch_size = batch_size
         self.cache_ttl = cache_ttl
+        self.bulk_fetch = bulk_fetch
+        self.chain_source = chain_source
+        
+        # Chain-level Greeks (computed once per chain from column arrays)
+        if greeks_engine is None and GREEKS_ENGINE_AVAILABLE:
+            greeks_engine = ChainGreeksEngine()
+        self.greeks_engine = greeks_engine
         
         # Statistics tracking
         self.stats = CollectionStats()
@@ -175,6 +197,12 @@ class ATMOptionsCollector:
         
         logger.info("🎯 ATM Options Collector initialized")
         logger.info(f"⚙️ Config: {max_workers} workers, {timeout_seconds}s timeout, {quality_threshold} quality threshold")
+        logger.info(f"⚙️ Chain fetch: {'bulk' if bulk_fetch else 'per-leg'}")
+    
+    @property
+    def strike_reach(self) -> int:
+        """Strikes collected on each side of ATM with the default offsets."""
+        return max(abs(offset) for offset in self._default_offsets)
     
     def get_atm_strike(self, index_name: str, use_cache: bool = True) -> float:
         """
@@ -219,7 +247,8 @@ class ATMOptionsCollector:
                            index_params: Dict[str, Any] = None,
                            include_greeks: bool = True,
                            include_market_depth: bool = False,
-                           custom_offsets: List[int] = None) -> CollectionResult:
+                           custom_offsets: List[int] = None,
+                           context: Optional[IndexContext] = None) -> CollectionResult:
         """
         Collect ATM options data for an index.
         
@@ -229,18 +258,26 @@ class ATMOptionsCollector:
             include_greeks: Whether to include Greeks data
             include_market_depth: Whether to include market depth
             custom_offsets: Custom strike offsets
+            context: Cycle spot/ATM context (ATM and spot are fetched if None)
             
         Returns:
             CollectionResult with options data
         """
         start_time = time.time()
-        result = CollectionResult()
+        result = CollectionResult(success=False)
         
         try:
             logger.info(f"🎯 Starting ATM options collection for {index_name}")
             
-            # Get ATM strike
-            atm_strike = self.get_atm_strike(index_name)
+            # Get ATM strike (the cycle context already carries it)
+            spot_price = None
+            if context is not None:
+                atm_strike = context.atm_strike
+                spot_price = context.spot_price
+                with self._cache_lock:
+                    self._atm_cache[index_name] = (atm_strike, time.time())
+            else:
+                atm_strike = self.get_atm_strike(index_name)
             
             # Get strike configuration
             strike_config = self._build_strike_config(
@@ -262,7 +299,9 @@ class ATMOptionsCollector:
             processed_data = self._process_options_data(
                 index_name=index_name,
                 raw_data=options_data,
-                strike_config=strike_config
+                strike_config=strike_config,
+                include_greeks=include_greeks,
+                spot_price=spot_price
             )
             
             # Build result
@@ -273,10 +312,19 @@ class ATMOptionsCollector:
             result.failed_instruments = result.total_instruments - result.successful_instruments
             result.collection_time = time.time() - start_time
             
+            if CHAIN_SNAPSHOT_AVAILABLE and processed_data:
+                result.snapshot = ChainSnapshot.from_records(
+                    processed_data,
+                    index_name=index_name,
+                    spot_price=spot_price,
+                    atm_strike=atm_strike
+                )
+            
             # Add metadata
             result.metadata = {
                 'index_name': index_name,
                 'atm_strike': atm_strike,
+                'spot_price': spot_price,
                 'strike_interval': strike_config.strike_interval,
                 'offsets': strike_config.offsets,
                 'option_types': strike_config.option_types,
@@ -336,6 +384,33 @@ class ATMOptionsCollector:
         all_strikes = strike_config.get_strikes()
         option_types = strike_config.option_types
         
+        # Snapshot the streamed chain book when it covers the window
+        if self.chain_source is not None:
+            options_data = self.chain_source.get_options_data(
+                index_name=index_name,
+                strikes=all_strikes,
+                option_types=option_types
+            )
+            if options_data:
+                return [
+                    self._enrich_option_data(option_data, index_name, include_greeks, include_market_depth)
+                    for option_data in options_data
+                ]
+            logger.debug(f"📡 Chain book cannot serve {index_name}, fetching over REST")
+        
+        # Fetch the whole chain at once when possible
+        if self.bulk_fetch:
+            try:
+                return self._collect_chain_bulk(
+                    index_name=index_name,
+                    strikes=all_strikes,
+                    option_types=option_types,
+                    include_greeks=include_greeks,
+                    include_market_depth=include_market_depth
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Bulk chain fetch failed for {index_name}, falling back to per-leg: {e}")
+        
         # Build list of all instruments to collect
         instruments = []
         for strike in all_strikes:
@@ -359,6 +434,27 @@ class ATMOptionsCollector:
         
         return options_data
     
+    def _collect_chain_bulk(self,
+                            index_name: str,
+                            strikes: List[float],
+                            option_types: List[str],
+                            include_greeks: bool = True,
+                            include_market_depth: bool = False) -> List[Dict[str, Any]]:
+        """Collect every leg of the strike window through a single chain request."""
+        options_data = self.api_provider.get_options_data(
+            index_name=index_name,
+            strikes=strikes,
+            option_types=option_types
+        )
+        if not options_data:
+            # The provider reports failures as an empty chain; let the per-leg path retry
+            raise ValueError("empty chain response")
+        
+        return [
+            self._enrich_option_data(option_data, index_name, include_greeks, include_market_depth)
+            for option_data in options_data
+        ]
+    
     def _process_instrument_batch(self,
                                 batch: List[Dict[str, Any]],
                                 include_greeks: bool = True,
@@ -410,59 +506,96 @@ class ATMOptionsCollector:
                 return None
             
             # Take the first (and should be only) result
-            option_data = options_data[0]
-            
-            # Enhance with additional data if requested
-            if include_greeks and hasattr(self.api_provider, 'get_option_greeks'):
-                try:
-                    greeks = self.api_provider.get_option_greeks(
-                        index_name, strike, option_type
-                    )
-                    option_data.update(greeks)
-                except Exception as e:
-                    logger.debug(f"Greeks calculation failed for {index_name} {strike} {option_type}: {e}")
-            
-            if include_market_depth and hasattr(self.api_provider, 'get_market_depth'):
-                try:
-                    market_depth = self.api_provider.get_market_depth(
-                        index_name, strike, option_type
-                    )
-                    option_data['market_depth'] = market_depth
-                except Exception as e:
-                    logger.debug(f"Market depth failed for {index_name} {strike} {option_type}: {e}")
-            
-            return option_data
+            return self._enrich_option_data(options_data[0], index_name, include_greeks, include_market_depth)
             
         except Exception as e:
             logger.warning(f"⚠️ Single option collection failed: {e}")
             return None
     
+    def _enrich_option_data(self,
+                            option_data: Dict[str, Any],
+                            index_name: str,
+                            include_greeks: bool = True,
+                            include_market_depth: bool = False) -> Dict[str, Any]:
+        """Attach provider-side Greeks and market depth to a collected leg."""
+        strike = option_data.get('strike')
+        option_type = option_data.get('option_type')
+        
+        # Per-leg provider Greeks only when no chain-level engine is available
+        if include_greeks and self.greeks_engine is None and hasattr(self.api_provider, 'get_option_greeks'):
+            try:
+                greeks = self.api_provider.get_option_greeks(
+                    index_name, strike, option_type
+                )
+                option_data.update(greeks)
+            except Exception as e:
+                logger.debug(f"Greeks calculation failed for {index_name} {strike} {option_type}: {e}")
+        
+        if include_market_depth and hasattr(self.api_provider, 'get_market_depth'):
+            try:
+                market_depth = self.api_provider.get_market_depth(
+                    index_name, strike, option_type
+                )
+                option_data['market_depth'] = market_depth
+            except Exception as e:
+                logger.debug(f"Market depth failed for {index_name} {strike} {option_type}: {e}")
+        
+        return option_data
+    
     def _process_options_data(self,
                             index_name: str,
                             raw_data: List[Dict[str, Any]],
-                            strike_config: StrikeConfig) -> List[Dict[str, Any]]:
+                            strike_config: StrikeConfig,
+                            include_greeks: bool = False,
+                            spot_price: Optional[float] = None) -> List[Dict[str, Any]]:
         """Process and validate collected options data."""
         processed_data = []
         
+        # Validate data quality
+        valid_data = []
         for option_data in raw_data:
+            if self._validate_option_data(option_data):
+                valid_data.append(option_data)
+            else:
+                logger.debug(f"⚠️ Option data failed validation: {option_data.get('symbol', 'unknown')}")
+        
+        # Greeks for the whole chain in one vectorized pass
+        chain_greeks: List[Optional[Dict[str, Any]]] = [None] * len(valid_data)
+        if include_greeks and self.greeks_engine is not None and valid_data:
+            chain_greeks = self._calculate_chain_greeks(index_name, valid_data, spot_price) or chain_greeks
+        
+        for option_data, greeks in zip(valid_data, chain_greeks):
             try:
-                # Validate data quality
-                if self._validate_option_data(option_data):
-                    # Enhance with calculated fields
-                    enhanced_data = self._enhance_option_data(
-                        option_data=option_data,
-                        index_name=index_name,
-                        strike_config=strike_config
-                    )
-                    processed_data.append(enhanced_data)
-                else:
-                    logger.debug(f"⚠️ Option data failed validation: {option_data.get('symbol', 'unknown')}")
+                # Enhance with calculated fields
+                enhanced_data = self._enhance_option_data(
+                    option_data=option_data,
+                    index_name=index_name,
+                    strike_config=strike_config,
+                    greeks=greeks
+                )
+                processed_data.append(enhanced_data)
             
             except Exception as e:
                 logger.warning(f"⚠️ Failed to process option data: {e}")
         
         return processed_data
     
+    def _calculate_chain_greeks(self,
+                                index_name: str,
+                                options: List[Dict[str, Any]],
+                                spot_price: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """Calculate IV and Greeks for every leg of a chain at once."""
+        if spot_price is None and not hasattr(self.api_provider, 'get_spot_price'):
+            return None
+        
+        try:
+            if spot_price is None:
+                spot_price = self.api_provider.get_spot_price(index_name)
+            return self.greeks_engine.compute_chain(options, spot_price)
+        except Exception as e:
+            logger.debug(f"Chain Greeks calculation failed for {index_name}: {e}")
+            return None
+    
     def _validate_option_data(self, option_data: Dict[str, Any]) -> bool:
         """Validate option data quality."""
         required_fields = ['symbol', 'last_price', 'strike', 'option_type']
@@ -487,10 +620,14 @@ class ATMOptionsCollector:
     def _enhance_option_data(self,
                            option_data: Dict[str, Any],
                            index_name: str,
-                           strike_config: StrikeConfig) -> Dict[str, Any]:
-        """Enhance option data with calculated fields."""
+                           strike_config: StrikeConfig,
+                           greeks: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Enhance option data with calculated fields and chain Greeks."""
         enhanced_data = option_data.copy()
         
+        if greeks:
+            enhanced_data.update(greeks)
+        
         # Add metadata
         enhanced_data['index_name'] = index_name
         enhanced_data['collection_timestamp'] = datetime.now().isoformat()
@@ -573,7 +710,8 @@ class ATMOptionsCollector:
                 'timeout_seconds': self.timeout_seconds,
                 'quality_threshold': self.quality_threshold,
                 'batch_size': self.batch_size,
-                'cache_ttl': self.cache_ttl
+                'cache_ttl': self.cache_ttl,
+                'bulk_fetch': self.bulk_fetch
             }
         }
     
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📍 Market Context - G6 Platform v3.0
+Shared per-cycle spot and ATM context for all collectors.
+
+At the start of each collection cycle the spot price of every index is
+fetched in a single quote call and the ATM strike is derived with
+hysteresis. The ATM collector, chain Greeks and overview generation then
+read the same context instead of each quoting the index again.
+
+Features:
+- One batched quote for all index spots per cycle
+- ATM re-centering with hysteresis (small moves keep the strike window)
+- Immutable per-index context shared by every consumer in the cycle
+- Re-centering statistics for monitoring
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+from dataclasses import dataclass, field
+
+from ..api.kite_provider import RequestPriority
+from ..api.instruments import STRIKE_INTERVALS
+
+logger = logging.getLogger(__name__)
+
+def recenter_atm(spot_price: float, previous: Optional[float], interval: float, hysteresis: float) -> float:
+    """
+    Pick the ATM strike for a spot price, holding the previous ATM within the hysteresis band.
+    
+    Args:
+        spot_price: Current index price
+        previous: ATM strike in use (None on the first observation)
+        interval: Strike interval
+        hysteresis: Extra fraction of an interval spot must move past the rounding midpoint
+    
+    Returns:
+        ATM strike
+    """
+    nearest = round(spot_price / interval) * interval
+    if previous is None or nearest == previous:
+        return nearest
+    if abs(spot_price - previous) > (0.5 + hysteresis) * interval:
+        return nearest
+    return previous
+
+@dataclass(frozen=True)
+class IndexContext:
+    """Spot and ATM data for one index in one cycle."""
+    index_name: str
+    spot_price: float
+    atm_strike: float
+    strike_interval: int
+    change: float = 0.0
+    change_percent: float = 0.0
+    recentered: bool = False
+
+@dataclass
+class MarketContext:
+    """Spot and ATM data for all indices in one cycle."""
+    timestamp: datetime
+    indices: Dict[str, IndexContext] = field(default_factory=dict)
+    
+    def get(self, index_name: str) -> Optional[IndexContext]:
+        """Get an index's context (None if its spot was unavailable)."""
+        return self.indices.get(index_name)
+
+@dataclass
+class MarketContextStats:
+    """Market context statistics."""
+    cycles: int = 0
+    quote_calls: int = 0
+    failed_cycles: int = 0
+    recenters: int = 0
+    held_moves: int = 0  # Cycles where spot crossed a rounding boundary but ATM was held
+    last_build_time: float = 0.0
+
+class MarketContextBuilder:
+    """
+    📍 Builds the per-cycle market context.
+    
+    The ATM strike only moves once spot is more than (0.5 + hysteresis)
+    strike intervals away from the current ATM, so spot oscillating around
+    a rounding boundary does not flip the collected strike window.
+    """
+    
+    def __init__(self,
+                 api_provider,
+                 hysteresis: float = 0.3,
+                 strike_intervals: Optional[Dict[str, int]] = None):
+        """
+        Initialize Market Context Builder.
+        
+        Args:
+            api_provider: Data provider instance (KiteDataProvider)
+            hysteresis: Extra fraction of a strike interval spot must move past
+                the rounding midpoint before the ATM strike is re-centered
+            strike_intervals: Strike interval per index (STRIKE_INTERVALS if None)
+        """
+        self.api_provider = api_provider
+        self.hysteresis = hysteresis
+        self.strike_intervals = strike_intervals or STRIKE_INTERVALS
+        
+        self.stats = MarketContextStats()
+        self._atm_strikes: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        
+        logger.info(f"📍 Market context builder initialized (hysteresis: {hysteresis})")
+    
+    def build(self, indices: List[str]) -> MarketContext:
+        """
+        Fetch all index spots in one quote call and build the cycle context.
+        
+        Args:
+            indices: Index names (NIFTY, BANKNIFTY, etc.)
+        
+        Returns:
+            MarketContext; indices without a quote are left out
+        """
+        start_time = time.time()
+        context = MarketContext(timestamp=datetime.now())
+        
+        instruments = {}
+        for index_name in indices:
+            instrument = self.api_provider.INSTRUMENT_MAPPING.get(index_name)
+            if instrument:
+                instruments[index_name] = instrument
+            else:
+                logger.warning(f"⚠️ Unknown index for market context: {index_name}")
+        
+        with self._lock:
+            self.stats.cycles += 1
+            
+            if instruments:
+                try:
+                    self.stats.quote_calls += 1
+                    quotes = self.api_provider.get_quote(list(instruments.values()), RequestPriority.HIGH) or {}
+                except Exception as e:
+                    logger.error(f"🔴 Market context quote failed: {e}")
+                    self.stats.failed_cycles += 1
+                    quotes = {}
+                
+                for index_name, instrument in instruments.items():
+                    quote = quotes.get(instrument)
+                    if quote and quote.get('last_price'):
+                        context.indices[index_name] = self._index_context(index_name, quote)
+            
+            self.stats.last_build_time = time.time() - start_time
+        
+        logger.debug(f"📍 Market context built for {len(context.indices)}/{len(indices)} indices")
+        return context
+    
+    def _index_context(self, index_name: str, quote: Dict[str, Any]) -> IndexContext:
+        """Derive an index's context from its quote, applying ATM hysteresis."""
+        spot_price = float(quote['last_price'])
+        interval = self.strike_intervals.get(index_name, 50)
+        
+        previous = self._atm_strikes.get(index_name)
+        atm_strike = recenter_atm(spot_price, previous, interval, self.hysteresis)
+        recentered = atm_strike != previous
+        
+        if previous is not None:
+            if recentered:
+                self.stats.recenters += 1
+                logger.info(f"📍 {index_name} ATM re-centered: {previous} -> {atm_strike} (spot: {spot_price})")
+            elif round(spot_price / interval) * interval != previous:
+                self.stats.held_moves += 1
+        
+        self._atm_strikes[index_name] = atm_strike
+        
+        return IndexContext(
+            index_name=index_name,
+            spot_price=spot_price,
+            atm_strike=atm_strike,
+            strike_interval=interval,
+            change=quote.get('net_change', 0) or 0,
+            change_percent=quote.get('net_change_percentage', 0) or 0,
+            recentered=recentered
+        )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get market context statistics."""
+        with self._lock:
+            return {
+                'cycles': self.stats.cycles,
+                'quote_calls': self.stats.quote_calls,
+                'failed_cycles': self.stats.failed_cycles,
+                'recenters': self.stats.recenters,
+                'held_moves': self.stats.held_moves,
+                'last_build_time': self.stats.last_build_time,
+                'atm_strikes': dict(self._atm_strikes)
+            }
@@ -10,6 +10,7 @@ Features:
 - Real-time market sentiment analysis
 - Put-Call Ratio (PCR) calculations
 - Volatility analysis and trending
+- Per-index ring-buffer history for realized volatility and PCR trends
 - Index correlation analysis
 - Performance optimization with caching
 """
@@ -20,12 +21,22 @@ import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Union, Tuple
 from dataclasses import dataclass, field
-from collections import defaultdict, deque
+from collections import defaultdict
 import statistics
 import json
 
+import numpy as np
+
+from ..core.chain_snapshot import ChainSnapshot
+from ..analytics.chain_aggregates import ChainAggregates
+from ..analytics.history_buffer import RingHistory
+from .market_context import IndexContext
+
 logger = logging.getLogger(__name__)
 
+# Trading seconds in a year (252 sessions of 09:15-15:30) for annualizing intraday returns
+TRADING_SECONDS_PER_YEAR = 252 * 375 * 60
+
 @dataclass
 class MarketOverview:
     """Market overview data structure."""
@@ -139,7 +150,9 @@ class OverviewCollector:
                  enable_advanced_analytics: bool = True,
                  cache_duration: int = 60,
                  volatility_window: int = 20,
-                 sentiment_threshold: float = 0.1):
+                 sentiment_threshold: float = 0.1,
+                 history_source=None,
+                 history_capacity: int = 375):
         """
         Initialize Overview Collector.
         
@@ -147,22 +160,28 @@ class OverviewCollector:
             api_provider: Data provider instance
             enable_advanced_analytics: Enable advanced calculations
             cache_duration: Cache duration in seconds
-            volatility_window: Window for volatility calculations
+            volatility_window: Window (in cycles) for volatility calculations
             sentiment_threshold: Threshold for sentiment classification
+            history_source: Optional RollupSink answering historical queries
+            history_capacity: Cycles of per-index history kept in memory
         """
         self.api_provider = api_provider
         self.enable_advanced_analytics = enable_advanced_analytics
         self.cache_duration = cache_duration
         self.volatility_window = volatility_window
         self.sentiment_threshold = sentiment_threshold
+        self.history_source = history_source
         
         # Statistics tracking
         self.stats = OverviewStats()
         
         # Data storage for calculations
-        self._price_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=volatility_window))
+        self._history: Dict[str, RingHistory] = defaultdict(
+            lambda: RingHistory(history_capacity, stats_window=volatility_window)
+        )
         self._overview_cache: Dict[str, Tuple[MarketOverview, float]] = {}
         self._analytics_cache: Dict[str, Dict[str, AnalyticsResult]] = defaultdict(dict)
+        self._aggregates: Dict[str, ChainAggregates] = defaultdict(ChainAggregates)
         
         # Thread safety
         self._lock = threading.RLock()
@@ -173,15 +192,17 @@ class OverviewCollector:
     
     def generate_market_overview(self,
                                 index_name: str,
-                                options_data: List[Dict[str, Any]],
-                                use_cache: bool = True) -> MarketOverview:
+                                options_data: Union[List[Dict[str, Any]], ChainSnapshot],
+                                use_cache: bool = True,
+                                context: Optional[IndexContext] = None) -> MarketOverview:
         """
         Generate comprehensive market overview.
         
         Args:
             index_name: Index name (NIFTY, BANKNIFTY, etc.)
-            options_data: Options data from collection
+            options_data: Options records or ChainSnapshot from collection
             use_cache: Whether to use cached data
+            context: Cycle spot/ATM context (quotes the index itself if None)
             
         Returns:
             MarketOverview with comprehensive analysis
@@ -199,7 +220,7 @@ class OverviewCollector:
             logger.info(f"📊 Generating market overview for {index_name}")
             
             # Get current market data
-            current_data = self._get_current_market_data(index_name)
+            current_data = self._get_current_market_data(index_name, context)
             
             # Create base overview
             overview = MarketOverview(
@@ -211,12 +232,25 @@ class OverviewCollector:
                 atm_strike=current_data['atm_strike']
             )
             
-            # Process options data
-            self._process_options_data(overview, options_data)
+            # Work on columns; legacy records are converted once
+            if not isinstance(options_data, ChainSnapshot):
+                options_data = ChainSnapshot.from_records(options_data, index_name=index_name)
             
-            # Calculate analytics
-            if self.enable_advanced_analytics:
-                self._calculate_advanced_analytics(overview, options_data)
+            # Fold the snapshot into the index's running aggregates (only changed legs are re-summed)
+            with self._lock:
+                aggregates = self._aggregates[index_name]
+            with aggregates.lock:
+                aggregates.update(options_data)
+            
+                # Process options data
+                self._process_options_data(overview, aggregates)
+                
+                # Calculate analytics
+                if self.enable_advanced_analytics:
+                    self._calculate_advanced_analytics(overview, aggregates)
+            
+                # Record this cycle for volatility and trend calculations
+                self._record_history(overview, aggregates)
             
             # Cache the result
             self._cache_overview(index_name, overview)
@@ -233,8 +267,16 @@ class OverviewCollector:
             self._update_stats(index_name, start_time, False)
             raise
     
-    def _get_current_market_data(self, index_name: str) -> Dict[str, Any]:
-        """Get current market data for index."""
+    def _get_current_market_data(self, index_name: str, context: Optional[IndexContext] = None) -> Dict[str, Any]:
+        """Get current market data for index (from the cycle context when given)."""
+        if context is not None:
+            return {
+                'price': context.spot_price,
+                'change': context.change,
+                'change_percent': context.change_percent,
+                'atm_strike': context.atm_strike
+            }
+        
         try:
             # Get current price from API
             quote = self.api_provider.get_quote([index_name])
@@ -252,10 +294,6 @@ class OverviewCollector:
             change = quote_data.get('net_change', 0)
             change_percent = quote_data.get('net_change_percentage', 0)
             
-            # Store price history for volatility calculations
-            with self._lock:
-                self._price_history[index_name].append(current_price)
-            
             return {
                 'price': current_price,
                 'change': change,
@@ -267,65 +305,57 @@ class OverviewCollector:
             logger.error(f"🔴 Failed to get market data for {index_name}: {e}")
             raise
     
-    def _process_options_data(self, overview: MarketOverview, options_data: List[Dict[str, Any]]):
+    def _process_options_data(self, overview: MarketOverview, aggregates: ChainAggregates):
         """Process options data to calculate basic metrics."""
-        ce_oi_total = 0
-        pe_oi_total = 0
-        ce_volume_total = 0
-        pe_volume_total = 0
-        
-        strike_oi_map = defaultdict(lambda: {'CE': 0, 'PE': 0})
-        strike_volume_map = defaultdict(lambda: {'CE': 0, 'PE': 0})
-        
-        for option in options_data:
-            option_type = option.get('option_type', '')
-            strike = option.get('strike', 0)
-            oi = option.get('oi', 0)
-            volume = option.get('volume', 0)
-            
-            if option_type == 'CE':
-                ce_oi_total += oi
-                ce_volume_total += volume
-                strike_oi_map[strike]['CE'] = oi
-                strike_volume_map[strike]['CE'] = volume
-            elif option_type == 'PE':
-                pe_oi_total += oi
-                pe_volume_total += volume
-                strike_oi_map[strike]['PE'] = oi
-                strike_volume_map[strike]['PE'] = volume
-        
         # Update overview with totals
-        overview.total_ce_oi = ce_oi_total
-        overview.total_pe_oi = pe_oi_total
-        overview.total_ce_volume = ce_volume_total
-        overview.total_pe_volume = pe_volume_total
+        overview.total_ce_oi = int(aggregates.total_ce_oi)
+        overview.total_pe_oi = int(aggregates.total_pe_oi)
+        overview.total_ce_volume = int(aggregates.total_ce_volume)
+        overview.total_pe_volume = int(aggregates.total_pe_volume)
         
         # Calculate Put-Call Ratios
-        overview.pcr_oi = pe_oi_total / max(1, ce_oi_total)
-        overview.pcr_volume = pe_volume_total / max(1, ce_volume_total)
+        overview.pcr_oi = aggregates.pcr_oi
+        overview.pcr_volume = aggregates.pcr_volume
         
         # Store strike maps for advanced calculations
-        overview.key_strikes = {
-            'strike_oi_map': dict(strike_oi_map),
-            'strike_volume_map': dict(strike_volume_map)
-        }
+        overview.key_strikes = aggregates.strike_maps()
     
-    def _calculate_advanced_analytics(self, overview: MarketOverview, options_data: List[Dict[str, Any]]):
+    def _record_history(self, overview: MarketOverview, aggregates: ChainAggregates):
+        """Append the cycle's spot, PCR, ATM IV and max pain to the index history."""
+        with self._lock:
+            history = self._history[overview.index_name]
+            
+            previous = history.last('spot')
+            spot_return = None
+            if previous > 0 and overview.current_price > 0:
+                spot_return = float(np.log(overview.current_price / previous))
+            
+            history.append(
+                overview.timestamp.timestamp(),
+                spot=overview.current_price,
+                spot_return=spot_return,
+                pcr_oi=overview.pcr_oi,
+                pcr_volume=overview.pcr_volume,
+                atm_iv=aggregates.strike_iv(overview.atm_strike),
+                max_pain=overview.max_pain if self.enable_advanced_analytics else None
+            )
+    
+    def _calculate_advanced_analytics(self, overview: MarketOverview, aggregates: ChainAggregates):
         """Calculate advanced analytics metrics."""
         try:
             # Calculate Max Pain
-            overview.max_pain = self._calculate_max_pain(overview, options_data)
+            overview.max_pain = self._calculate_max_pain(overview, aggregates)
             
             # Calculate Implied Volatility (average)
-            overview.implied_volatility = self._calculate_average_iv(options_data)
+            overview.implied_volatility = self._calculate_average_iv(aggregates)
             
             # Calculate market sentiment
-            sentiment_result = self._calculate_market_sentiment(overview, options_data)
+            sentiment_result = self._calculate_market_sentiment(overview)
             overview.sentiment = sentiment_result['sentiment']
             overview.sentiment_score = sentiment_result['score']
             
             # Identify support and resistance levels
-            levels = self._identify_support_resistance(overview, options_data)
+            levels = self._identify_support_resistance(overview, aggregates)
             overview.support_levels = levels['support']
             overview.resistance_levels = levels['resistance']
             
@@ -335,59 +365,21 @@ class OverviewCollector:
             logger.warning(f"⚠️ Advanced analytics calculation failed: {e}")
             self.stats.analytics_failed += 1
     
-    def _calculate_max_pain(self, overview: MarketOverview, options_data: List[Dict[str, Any]]) -> float:
+    def _calculate_max_pain(self, overview: MarketOverview, aggregates: ChainAggregates) -> float:
         """Calculate max pain strike price."""
         try:
-            strike_pain = defaultdict(float)
-            
-            for option in options_data:
-                strike = option.get('strike', 0)
-                oi = option.get('oi', 0)
-                option_type = option.get('option_type', '')
-                
-                if oi == 0 or strike == 0:
-                    continue
-                
-                # Calculate pain at each strike
-                for test_strike in range(int(strike * 0.8), int(strike * 1.2), 50):
-                    if option_type == 'CE' and test_strike < strike:
-                        pain = (strike - test_strike) * oi
-                        strike_pain[test_strike] += pain
-                    elif option_type == 'PE' and test_strike > strike:
-                        pain = (test_strike - strike) * oi
-                        strike_pain[test_strike] += pain
-            
-            # Find strike with minimum pain
-            if strike_pain:
-                max_pain_strike = min(strike_pain.keys(), key=lambda x: strike_pain[x])
-                return float(max_pain_strike)
-            
-            return overview.atm_strike
+            result = aggregates.max_pain()
+            return result.strike if result is not None else overview.atm_strike
             
         except Exception as e:
             logger.warning(f"⚠️ Max pain calculation failed: {e}")
             return overview.atm_strike
     
-    def _calculate_average_iv(self, options_data: List[Dict[str, Any]]) -> float:
+    def _calculate_average_iv(self, aggregates: ChainAggregates) -> float:
         """Calculate average implied volatility."""
-        try:
-            iv_values = []
-            
-            for option in options_data:
-                iv = option.get('iv')
-                if iv is not None and iv > 0:
-                    iv_values.append(iv)
-            
-            if iv_values:
-                return statistics.mean(iv_values)
-            
-            return 0.0
-            
-        except Exception as e:
-            logger.warning(f"⚠️ IV calculation failed: {e}")
-            return 0.0
+        return aggregates.average_iv
     
-    def _calculate_market_sentiment(self, overview: MarketOverview, options_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _calculate_market_sentiment(self, overview: MarketOverview) -> Dict[str, Any]:
         """Calculate market sentiment based on multiple factors."""
         try:
             sentiment_factors = []
@@ -435,24 +427,11 @@ class OverviewCollector:
             logger.warning(f"⚠️ Sentiment calculation failed: {e}")
             return {'sentiment': 'neutral', 'score': 0.0}
     
-    def _identify_support_resistance(self, overview: MarketOverview, options_data: List[Dict[str, Any]]) -> Dict[str, List[float]]:
+    def _identify_support_resistance(self, overview: MarketOverview, aggregates: ChainAggregates) -> Dict[str, List[float]]:
         """Identify support and resistance levels based on OI concentration."""
         try:
-            strike_oi = defaultdict(int)
-            
-            # Aggregate OI by strike
-            for option in options_data:
-                strike = option.get('strike', 0)
-                oi = option.get('oi', 0)
-                if strike > 0 and oi > 0:
-                    strike_oi[strike] += oi
-            
-            if not strike_oi:
-                return {'support': [], 'resistance': []}
-            
-            # Find high OI strikes
-            sorted_strikes = sorted(strike_oi.items(), key=lambda x: x[1], reverse=True)
-            top_strikes = [strike for strike, oi in sorted_strikes[:5]]
+            # Highest OI strikes, maintained incrementally by the aggregates
+            top_strikes = aggregates.top_oi_strikes()
             
             current_price = overview.current_price
             
@@ -516,32 +495,65 @@ class OverviewCollector:
                 index_stats['successful'] += 1
     
     def get_historical_volatility(self, index_name: str, window: int = None) -> Optional[float]:
-        """Calculate historical volatility from price data."""
+        """
+        Calculate annualized realized volatility from per-cycle spot returns.
+        
+        Args:
+            index_name: Index name
+            window: Number of returns (volatility_window if None)
+        
+        Returns:
+            Volatility in percent, or None with fewer than 2 returns
+        """
         window = window or self.volatility_window
         
         with self._lock:
-            prices = list(self._price_history.get(index_name, []))
-            
-            if len(prices) < 2:
+            history = self._history.get(index_name)
+            if history is None:
                 return None
             
-            # Calculate returns
-            returns = []
-            for i in range(1, len(prices)):
-                ret = (prices[i] - prices[i-1]) / prices[i-1]
-                returns.append(ret)
-            
-            if len(returns) < 2:
+            if window == history.stats_window:
+                # Running sums cover exactly this window
+                std = history.std('spot_return')
+            else:
+                returns = history.window('spot_return', window)
+                returns = returns[~np.isnan(returns)]
+                std = float(returns.std(ddof=1)) if len(returns) >= 2 else np.nan
+            
+            # Annualize by the typical cycle interval (median skips overnight gaps)
+            intervals = np.diff(history.timestamps(window + 1))
+            intervals = intervals[intervals > 0]
+            if np.isnan(std) or not len(intervals):
                 return None
             
-            # Calculate volatility (annualized)
-            volatility = statistics.stdev(returns) * (252 ** 0.5) * 100  # 252 trading days
-            return volatility
+            periods_per_year = TRADING_SECONDS_PER_YEAR / float(np.median(intervals))
+            return float(std * np.sqrt(periods_per_year) * 100)
     
     def get_pcr_trend(self, index_name: str, lookback_minutes: int = 60) -> Dict[str, Any]:
-        """Get PCR trend analysis."""
-        # This would require storing historical PCR data
-        # For now, return current PCR with trend indication
+        """
+        Get PCR trend analysis.
+        
+        Uses the in-memory history when it covers the lookback, then rollup
+        history (when a history source is set), then whatever in-memory
+        history exists.
+        """
+        try:
+            return self._get_pcr_ring_trend(index_name, lookback_minutes, require_full=True)
+        except ValueError:
+            pass
+        
+        if self.history_source is not None:
+            try:
+                return self._get_pcr_history_trend(index_name, lookback_minutes)
+            except Exception as e:
+                logger.warning(f"⚠️ PCR history unavailable for {index_name}: {e}")
+        
+        try:
+            return self._get_pcr_ring_trend(index_name, lookback_minutes, require_full=False)
+        except ValueError:
+            pass
+        
+        # Without history, return current PCR with trend indication
         try:
             cached_overview = self._get_cached_overview(index_name)
             if cached_overview:
@@ -556,6 +568,69 @@ class OverviewCollector:
         
         return {'error': 'No data available'}
     
+    def _get_pcr_ring_trend(self, index_name: str, lookback_minutes: int, require_full: bool) -> Dict[str, Any]:
+        """Classify the PCR trend from a least-squares fit over the in-memory history."""
+        with self._lock:
+            history = self._history.get(index_name)
+            if history is None or len(history) < 2:
+                raise ValueError("not enough history")
+            
+            start = history.timestamps(1)[0] - lookback_minutes * 60
+            if require_full and history.timestamps()[0] > start:
+                raise ValueError("history does not cover the lookback")
+            
+            n = history.count_since(start)
+            first_pcr, last_pcr, samples = history.slope('pcr_oi', n)
+            if samples < 2:
+                raise ValueError("not enough PCR samples")
+            
+            change = last_pcr - first_pcr
+            trend = 'stable'
+            if abs(change) > self.sentiment_threshold * max(first_pcr, 1e-9):
+                trend = 'rising' if change > 0 else 'falling'
+            
+            return {
+                'current_pcr_oi': history.last('pcr_oi'),
+                'current_pcr_volume': history.last('pcr_volume'),
+                'start_pcr_oi': first_pcr,
+                'pcr_change': change,
+                'trend': trend,
+                'samples': samples,
+                'tier': 'memory',
+                'timestamp': datetime.fromtimestamp(history.timestamps(1)[0]).isoformat()
+            }
+    
+    def _get_pcr_history_trend(self, index_name: str, lookback_minutes: int) -> Dict[str, Any]:
+        """Classify the PCR trend from rollup bars (about 30 bars per lookback)."""
+        start = datetime.now() - timedelta(minutes=lookback_minutes)
+        bars = self.history_source.query(index_name, start, resolution=timedelta(minutes=lookback_minutes / 30))
+        tier = bars.attrs.get('tier')
+        
+        # Near expiry first: one PCR series per timestamp
+        bars = bars.dropna(subset=['pcr_oi_close']).sort_values(['bucket_start', 'expiry'])
+        bars = bars.drop_duplicates('bucket_start', keep='first')
+        if len(bars) < 2:
+            raise ValueError("not enough rollup bars")
+        
+        first_pcr = float(bars['pcr_oi_close'].iloc[0])
+        last_pcr = float(bars['pcr_oi_close'].iloc[-1])
+        change = last_pcr - first_pcr
+        
+        trend = 'stable'
+        if abs(change) > self.sentiment_threshold * max(first_pcr, 1e-9):
+            trend = 'rising' if change > 0 else 'falling'
+        
+        return {
+            'current_pcr_oi': last_pcr,
+            'current_pcr_volume': float(bars['pcr_volume_close'].iloc[-1]),
+            'start_pcr_oi': first_pcr,
+            'pcr_change': change,
+            'trend': trend,
+            'bars': len(bars),
+            'tier': tier,
+            'timestamp': bars['bucket_start'].iloc[-1].isoformat()
+        }
+    
     def clear_cache(self):
         """Clear all cached data."""
         with self._lock:
@@ -595,4 +670,4 @@ class OverviewCollector:
             'advanced_analytics_enabled': self.enable_advanced_analytics,
             'cache_size': len(self._overview_cache),
             'stats': self.get_stats()['overall']
-        }
\ No newline at end of file
+        }
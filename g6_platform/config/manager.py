@@ -300,15 +300,19 @@ class ConfigurationManager:
             storage = config['storage']
             csv_config = storage.get('csv', {})
             influx_config = storage.get('influxdb', {})
+            parquet_config = storage.get('parquet', {})
+            tick_log_config = storage.get('tick_log', {})
             
             # At least one storage backend must be enabled
             csv_enabled = csv_config.get('enabled', False)
             influx_enabled = influx_config.get('enabled', False)
+            parquet_enabled = parquet_config.get('enabled', False)
+            tick_log_enabled = tick_log_config.get('enabled', False)
             
-            if not csv_enabled and not influx_enabled:
+            if not (csv_enabled or influx_enabled or parquet_enabled or tick_log_enabled):
                 errors.append(ValidationError(
                     field='storage',
-                    message="At least one storage backend (CSV or InfluxDB) must be enabled"
+                    message="At least one storage backend (CSV, InfluxDB, Parquet or tick log) must be enabled"
                 ))
         
         # Rate limiting validation
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📦 Chain Snapshot - G6 Platform v3.0
+Columnar in-memory representation of one option chain collection.
+
+Replaces per-leg dictionaries with parallel NumPy columns, so collectors,
+sinks and analytics can share one compact structure instead of walking and
+copying lists of records.
+
+Features:
+- Parallel NumPy columns for strike, type, prices, volume, OI, IV and Greeks
+- Index, expiry and timestamp metadata held once per snapshot
+- Zero-copy call/put views (calls are stored first, sorted by strike)
+- Lossless adapters to and from legacy option record dictionaries
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Float columns and the legacy record key each maps to
+FLOAT_COLUMNS = {
+    'strike': 'strike',
+    'last_price': 'last_price',
+    'volume': 'volume',
+    'oi': 'oi',
+    'change': 'change',
+    'iv': 'implied_volatility',
+    'delta': 'delta',
+    'gamma': 'gamma',
+    'theta': 'theta',
+    'vega': 'vega',
+    'rho': 'rho'
+}
+
+# Record keys absorbed into columns or snapshot metadata
+CORE_KEYS = set(FLOAT_COLUMNS.values()) | {'symbol', 'option_type', 'instrument_token', 'expiry', 'timestamp', 'index_name'}
+
+class ChainSnapshot:
+    """
+    📦 Option chain held as parallel NumPy columns.
+    
+    Rows are ordered calls first, then puts, each by ascending strike, so
+    calls() and puts() return views that share memory with the snapshot.
+    Missing numeric values are NaN; missing instrument tokens are -1.
+    """
+    
+    def __init__(self,
+                 index_name: str,
+                 symbol: np.ndarray,
+                 is_call: np.ndarray,
+                 instrument_token: np.ndarray,
+                 columns: Dict[str, np.ndarray],
+                 expiry: Optional[str] = None,
+                 timestamp: Optional[datetime] = None,
+                 spot_price: Optional[float] = None,
+                 atm_strike: Optional[float] = None,
+                 extra: Optional[Dict[str, np.ndarray]] = None,
+                 record_timestamp: Optional[str] = None):
+        """
+        Initialize chain snapshot from prepared columns.
+        
+        Args:
+            index_name: Index name (NIFTY, BANKNIFTY, etc.)
+            symbol: Trading symbols (object array)
+            is_call: True for CE legs, False for PE legs
+            instrument_token: Instrument tokens (int64, -1 when unknown)
+            columns: Float columns keyed by FLOAT_COLUMNS names
+            expiry: Expiry date (YYYY-MM-DD)
+            timestamp: Collection time
+            spot_price: Underlying price at collection
+            atm_strike: ATM strike at collection
+            extra: Additional per-leg fields (object arrays)
+            record_timestamp: Quote timestamp carried by legacy records
+        """
+        self.index_name = index_name
+        self.expiry = expiry
+        self.timestamp = timestamp or datetime.now()
+        self.spot_price = spot_price
+        self.atm_strike = atm_strike
+        self.record_timestamp = record_timestamp
+        
+        self.symbol = symbol
+        self.is_call = is_call
+        self.instrument_token = instrument_token
+        self.columns = columns
+        self.extra = extra or {}
+        
+        # Calls occupy [0, _call_count)
+        self._call_count = int(np.count_nonzero(is_call))
+    
+    def __len__(self) -> int:
+        return len(self.is_call)
+    
+    def __getattr__(self, name: str) -> np.ndarray:
+        # Expose float columns as attributes (snapshot.strike, snapshot.oi, ...)
+        columns = self.__dict__.get('columns')
+        if columns is not None and name in columns:
+            return columns[name]
+        raise AttributeError(f"{type(self).__name__} has no attribute {name!r}")
+    
+    @classmethod
+    def from_records(cls,
+                     records: Iterable[Dict[str, Any]],
+                     index_name: Optional[str] = None,
+                     expiry: Optional[str] = None,
+                     timestamp: Optional[datetime] = None,
+                     spot_price: Optional[float] = None,
+                     atm_strike: Optional[float] = None) -> 'ChainSnapshot':
+        """
+        Build a snapshot from legacy option record dictionaries.
+        
+        Args:
+            records: Option records (symbol, strike, option_type, last_price, ...)
+            index_name: Index name (taken from the records if None)
+            expiry: Expiry date (taken from the records if None)
+            timestamp: Collection time
+            spot_price: Underlying price at collection
+            atm_strike: ATM strike (taken from the records if None)
+        
+        Returns:
+            ChainSnapshot with calls first, each side sorted by strike
+        """
+        records = [r for r in records if r.get('option_type') in ('CE', 'PE')]
+        first = records[0] if records else {}
+        
+        is_call = np.fromiter((r['option_type'] == 'CE' for r in records), dtype=bool, count=len(records))
+        columns = {
+            name: np.array([_to_float(r.get(key)) for r in records], dtype=np.float64)
+            for name, key in FLOAT_COLUMNS.items()
+        }
+        if np.isnan(columns['iv']).all():
+            # Older records carry IV under 'iv'
+            columns['iv'] = np.array([_to_float(r.get('iv')) for r in records], dtype=np.float64)
+        
+        # Calls first, then puts, each by ascending strike
+        order = np.lexsort((columns['strike'], ~is_call))
+        
+        symbol = np.array([r.get('symbol') for r in records], dtype=object)[order]
+        instrument_token = np.array(
+            [r.get('instrument_token') if r.get('instrument_token') is not None else -1 for r in records],
+            dtype=np.int64
+        )[order]
+        columns = {name: values[order] for name, values in columns.items()}
+        
+        # Keep any other per-leg fields so the conversion is lossless
+        extra_keys: List[str] = []
+        for record in records:
+            for key in record:
+                if key not in CORE_KEYS and key not in extra_keys:
+                    extra_keys.append(key)
+        extra = {key: _object_column([r.get(key) for r in records])[order] for key in extra_keys}
+        
+        if atm_strike is None and extra.get('atm_strike') is not None and len(records):
+            atm_strike = _to_float(extra['atm_strike'][0])
+        
+        return cls(
+            index_name=index_name or first.get('index_name') or '',
+            symbol=symbol,
+            is_call=is_call[order],
+            instrument_token=instrument_token,
+            columns=columns,
+            expiry=expiry or first.get('expiry'),
+            timestamp=timestamp,
+            spot_price=spot_price,
+            atm_strike=atm_strike,
+            extra=extra,
+            record_timestamp=first.get('timestamp')
+        )
+    
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Convert back to legacy option record dictionaries.
+        
+        Returns:
+            Fresh record dictionaries (callers may modify them)
+        """
+        columns = {key: self.columns[name].tolist() for name, key in FLOAT_COLUMNS.items()}
+        symbols = self.symbol.tolist()
+        tokens = self.instrument_token.tolist()
+        extra = {key: values.tolist() for key, values in self.extra.items()}
+        has_greeks = bool(len(self)) and not np.isnan(self.columns['delta']).all()
+        
+        records = []
+        for i in range(len(self)):
+            record = {
+                'symbol': symbols[i],
+                'strike': _from_float(columns['strike'][i], integer=columns['strike'][i].is_integer()),
+                'expiry': self.expiry,
+                'option_type': 'CE' if i < self._call_count else 'PE',
+                'instrument_token': tokens[i] if tokens[i] >= 0 else None,
+                'last_price': _from_float(columns['last_price'][i]),
+                'volume': _from_float(columns['volume'][i], integer=True),
+                'oi': _from_float(columns['oi'][i], integer=True),
+                'change': _from_float(columns['change'][i]),
+                'timestamp': self.record_timestamp
+            }
+            if self.index_name:
+                record['index_name'] = self.index_name
+            if has_greeks:
+                for name in ('delta', 'gamma', 'theta', 'vega', 'rho', 'iv'):
+                    key = FLOAT_COLUMNS[name]
+                    record[key] = _from_float(columns[key][i])
+            for key, values in extra.items():
+                record[key] = values[i]
+            records.append(record)
+        
+        return records
+    
+    def _view(self, rows: slice) -> 'ChainSnapshot':
+        """Build a snapshot sharing memory with a contiguous row range."""
+        return ChainSnapshot(
+            index_name=self.index_name,
+            symbol=self.symbol[rows],
+            is_call=self.is_call[rows],
+            instrument_token=self.instrument_token[rows],
+            columns={name: values[rows] for name, values in self.columns.items()},
+            expiry=self.expiry,
+            timestamp=self.timestamp,
+            spot_price=self.spot_price,
+            atm_strike=self.atm_strike,
+            extra={key: values[rows] for key, values in self.extra.items()},
+            record_timestamp=self.record_timestamp
+        )
+    
+    def calls(self) -> 'ChainSnapshot':
+        """Get the CE legs as a zero-copy view."""
+        return self._view(slice(0, self._call_count))
+    
+    def puts(self) -> 'ChainSnapshot':
+        """Get the PE legs as a zero-copy view."""
+        return self._view(slice(self._call_count, len(self)))
+    
+    def strikes(self) -> np.ndarray:
+        """Get the sorted unique strikes across both sides."""
+        return np.unique(self.columns['strike'])
+    
+    def option_types(self) -> np.ndarray:
+        """Get the option type ('CE'/'PE') of every row."""
+        return np.where(self.is_call, 'CE', 'PE')
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the snapshot columns."""
+        total = self.is_call.nbytes + self.instrument_token.nbytes + self.symbol.nbytes
+        total += sum(values.nbytes for values in self.columns.values())
+        total += sum(values.nbytes for values in self.extra.values())
+        return total
+
+def _to_float(value: Any) -> float:
+    """Convert a record value to float (NaN when missing or invalid)."""
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _object_column(values: List[Any]) -> np.ndarray:
+    """Build a 1-D object array (nested lists/dicts stay single cells)."""
+    column = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        column[i] = value
+    return column
+
+def _from_float(value: float, integer: bool = False) -> Any:
+    """Convert a column value back to a record value (None for NaN)."""
+    if value != value:  # NaN
+        return None
+    return int(value) if integer else value
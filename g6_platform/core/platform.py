@@ -26,7 +26,7 @@ import signal
 import threading
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Callable, Union
+from typing import Dict, List, Any, Optional, Callable, Union, Tuple
 from pathlib import Path
 from dataclasses import dataclass, field
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -37,6 +37,7 @@ from ..config.manager import get_config_manager, ConfigurationManager
 from ..monitoring.health import HealthMonitor
 from ..monitoring.performance import PerformanceMonitor
 from ..monitoring.metrics import MetricsSystem
+from .scheduler import CycleScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -108,12 +109,17 @@ class G6Platform:
         # Core subsystems (will be initialized in start())
         self._api_provider = None
         self._collectors = {}
+        self._market_context = None
+        self._stream_engine = None
         self._storage_backends = {}
+        self._storage_pipeline = None
         self._analytics_engine = None
+        self._volatility_analyzer = None
         
         # Threading and synchronization
         self._main_thread: Optional[threading.Thread] = None
         self._collection_lock = threading.RLock()
+        self._scheduler: Optional[CycleScheduler] = None
         
         # Signal handling
         self._setup_signal_handlers()
@@ -335,6 +341,7 @@ class G6Platform:
         try:
             from ..collectors.atm_collector import ATMOptionsCollector
             from ..collectors.overview_collector import OverviewCollector
+            from ..collectors.market_context import MarketContextBuilder
             
             # ATM Options Collector
             atm_config = self.config.get('data_collection.atm_options', {})
@@ -351,6 +358,18 @@ class G6Platform:
                     **overview_config
                 )
             
+            # Shared per-cycle spot/ATM context (one spot quote for all indices)
+            context_config = self.config.get('data_collection.market_context', {})
+            self._market_context = MarketContextBuilder(
+                api_provider=self._api_provider,
+                **context_config
+            )
+            
+            # Optional WebSocket ingestion: the cycle snapshots a tick-by-tick chain book
+            stream_config = dict(self.config.get('data_collection.streaming', {}))
+            if stream_config.pop('enabled', False):
+                self._initialize_stream_engine(stream_config)
+            
             logger.info(f"✅ Initialized {len(self._collectors)} collectors")
             return True
             
@@ -361,6 +380,30 @@ class G6Platform:
             logger.error(f"🔴 Collectors initialization failed: {e}")
             return False
     
+    def _initialize_stream_engine(self, stream_config: Dict[str, Any]):
+        """Start KiteTicker streaming and point the ATM collector at its chain book."""
+        try:
+            from ..api.kite_stream import KiteStreamEngine
+            
+            # The streamed window must cover every strike the ATM collector asks for
+            reach = self._collectors['atm_options'].strike_reach
+            if stream_config.get('offsets', reach) < reach:
+                logger.warning(f"⚠️ Streaming offsets {stream_config['offsets']} narrower than the "
+                               f"collected ±{reach} strikes; widening to ±{reach}")
+            stream_config['offsets'] = max(stream_config.get('offsets', reach), reach)
+            
+            stream_engine = KiteStreamEngine(provider=self._api_provider, **stream_config)
+            if not stream_engine.start(self.config.get('market.indices', ['NIFTY', 'BANKNIFTY'])):
+                logger.warning("⚠️ Streaming ingestion not started, collecting over REST")
+                return
+            
+            self._stream_engine = stream_engine
+            self._collectors['atm_options'].chain_source = stream_engine
+            logger.info("✅ Streaming ingestion enabled")
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Streaming ingestion unavailable, collecting over REST: {e}")
+    
     def _initialize_storage(self) -> bool:
         """Initialize storage backends."""
         try:
@@ -378,10 +421,51 @@ class G6Platform:
                 influx_config = storage_config.get('influxdb', {})
                 self._storage_backends['influxdb'] = InfluxDBSink(**influx_config)
             
+            # Parquet Storage (optional pyarrow dependency)
+            if storage_config.get('parquet', {}).get('enabled', False):
+                try:
+                    from ..storage.parquet_sink import ParquetSink
+                    parquet_config = {k: v for k, v in storage_config.get('parquet', {}).items() if k != 'enabled'}
+                    self._storage_backends['parquet'] = ParquetSink(**parquet_config)
+                except ImportError as e:
+                    logger.warning(f"⚠️ Parquet storage not available: {e}")
+            
+            # Binary tick log (replay source for backtests)
+            if storage_config.get('tick_log', {}).get('enabled', False):
+                from ..storage.tick_log import TickLogSink
+                tick_log_config = {k: v for k, v in storage_config.get('tick_log', {}).items() if k != 'enabled'}
+                self._storage_backends['tick_log'] = TickLogSink(**tick_log_config)
+            
+            # Downsampled 1m/5m/1h rollups (derived tier for long-range history)
+            if storage_config.get('rollup', {}).get('enabled', False):
+                from ..storage.rollup import RollupSink
+                rollup_config = {k: v for k, v in storage_config.get('rollup', {}).items()
+                                 if k not in ('enabled', 'mirror_influxdb')}
+                if storage_config.get('rollup', {}).get('mirror_influxdb', False):
+                    rollup_config['influx_sink'] = self._storage_backends.get('influxdb')
+                rollup = self._storage_backends['rollup'] = RollupSink(**rollup_config)
+                
+                # Historical overview queries read the rollup tiers
+                if 'overview' in self._collectors:
+                    self._collectors['overview'].history_source = rollup
+            
             if not self._storage_backends:
                 logger.error("🔴 No storage backends initialized")
                 return False
             
+            # Asynchronous fan-out stage (one queue + worker per backend)
+            pipeline_config = storage_config.get('pipeline', {})
+            if pipeline_config.get('enabled', True):
+                from ..storage.pipeline import StoragePipeline
+                self._storage_pipeline = StoragePipeline(
+                    backends=self._storage_backends,
+                    max_queue_size=pipeline_config.get('max_queue_size', 100),
+                    backpressure_policy=pipeline_config.get('backpressure_policy', 'block'),
+                    block_timeout=pipeline_config.get('block_timeout', 5.0),
+                    spill_dir=pipeline_config.get('spill_dir', 'data/spill'),
+                    metrics_system=self.metrics_system
+                )
+            
             logger.info(f"✅ Initialized {len(self._storage_backends)} storage backends")
             return True
             
@@ -394,6 +478,17 @@ class G6Platform:
     
     def _initialize_analytics(self) -> bool:
         """Initialize analytics engine."""
+        try:
+            from ..analytics.volatility_analyzer import VolatilityAnalyzer
+            
+            # Daily spot and ATM IV history come from the rollup tier when it is enabled
+            self._volatility_analyzer = VolatilityAnalyzer(
+                self.config.get('analytics.volatility', {}),
+                history_source=self._storage_backends.get('rollup')
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Volatility analyzer not available: {e}")
+        
         try:
             from ..analytics.engine import AnalyticsEngine
             
@@ -440,28 +535,41 @@ class G6Platform:
         
         return success
     
+    def _build_scheduler(self) -> CycleScheduler:
+        """Build the fixed-cadence cycle scheduler from configuration."""
+        return CycleScheduler(
+            interval=self.config_manager.get('market.collection_interval', 30),
+            align_to_wall_clock=self.config_manager.get('market.scheduler.align_to_wall_clock', True),
+            overrun_policy=self.config_manager.get('market.scheduler.overrun_policy', 'skip'),
+            offset=self.config_manager.get('market.scheduler.offset_seconds', 0.0)
+        )
+    
     def _main_collection_loop(self):
         """Main data collection loop."""
         logger.info("🔄 Starting main collection loop")
         
+        self._scheduler = self._build_scheduler()
+        
         while not self._shutdown_event.is_set():
             try:
+                # Wait for the next wall-clock aligned cycle boundary
+                scheduled_at = self._scheduler.wait_for_next_cycle(self._shutdown_event)
+                if scheduled_at is None:
+                    break  # Shutdown requested
+                
                 cycle_start = time.time()
+                timing = self._scheduler.mark_cycle_start(scheduled_at, cycle_start)
+                self._record_schedule_metrics(timing)
                 
                 # Run collection cycle
                 cycle_result = self._run_collection_cycle()
+                cycle_result['scheduled_at'] = scheduled_at
+                cycle_result['lateness'] = timing['lateness']
                 
                 # Update statistics
                 cycle_time = time.time() - cycle_start
                 self._update_cycle_stats(cycle_result, cycle_time)
                 
-                # Wait for next cycle
-                collection_interval = self.config.get('market.collection_interval', 30)
-                if not self._shutdown_event.wait(collection_interval):
-                    continue  # Normal timeout, continue with next cycle
-                else:
-                    break  # Shutdown requested
-                
             except Exception as e:
                 logger.error(f"🔴 Collection cycle error: {e}")
                 self.state.errors_count += 1
@@ -472,9 +580,24 @@ class G6Platform:
                 
                 if self._shutdown_event.wait(error_backoff):
                     break  # Shutdown requested during backoff
+                
+                # Realign to the next boundary after backing off
+                self._scheduler.reset()
         
         logger.info("🔄 Main collection loop stopped")
     
+    def _record_schedule_metrics(self, timing: Dict[str, float]):
+        """Report cycle lateness and jitter to the metrics system."""
+        if not self.metrics_system:
+            return
+        
+        try:
+            self.metrics_system.record_value('collection.cycle_lateness_ms', timing['lateness'] * 1000)
+            self.metrics_system.record_value('collection.cycle_jitter_ms', timing['jitter'] * 1000)
+            self.metrics_system.set_gauge('collection.cycle_overruns', self._scheduler.stats.overruns)
+        except Exception as e:
+            logger.debug(f"Schedule metrics recording failed: {e}")
+    
     def _run_collection_cycle(self) -> Dict[str, Any]:
         """Run a single collection cycle."""
         cycle_result = {
@@ -492,37 +615,16 @@ class G6Platform:
                 
                 logger.info(f"🔄 Starting cycle {self.state.cycles_completed + 1} for {len(indices)} indices")
                 
-                # Process each index
-                for index in indices:
-                    try:
-                        index_start = time.time()
-                        
-                        # Collect options data for this index
-                        index_result = self._process_index(index)
-                        
-                        # Update cycle result
-                        if index_result['success']:
-                            cycle_result['indices_processed'] += 1
-                            cycle_result['total_options'] += index_result.get('options_count', 0)
-                        else:
-                            cycle_result['errors'].append({
-                                'index': index,
-                                'error': index_result.get('error', 'Unknown error')
-                            })
-                        
-                        # Track processing time
-                        processing_time = time.time() - index_start
-                        cycle_result['processing_times'][index] = processing_time
-                        
-                        logger.info(f"✅ {index} processed in {processing_time:.2f}s")
-                        
-                    except Exception as e:
-                        logger.error(f"🔴 Error processing {index}: {e}")
-                        cycle_result['errors'].append({
-                            'index': index,
-                            'error': str(e)
-                        })
-                        cycle_result['success'] = False
+                # Quote every index spot once; collectors read spot/ATM from the context
+                market_context = self._build_market_context(indices)
+                
+                # Process indices concurrently or one after another
+                parallel = self.config_manager.get('data_collection.performance.parallel_indices', True)
+                if parallel and len(indices) > 1 and self._thread_pool:
+                    self._process_indices_parallel(indices, cycle_result, market_context)
+                else:
+                    for index in indices:
+                        self._merge_index_result(cycle_result, *self._process_index_timed(index, market_context))
                 
                 # Check if cycle was successful
                 if cycle_result['errors']:
@@ -536,9 +638,95 @@ class G6Platform:
             cycle_result['errors'].append({'cycle': str(e)})
             return cycle_result
     
-    def _process_index(self, index: str) -> Dict[str, Any]:
+    def _build_market_context(self, indices: List[str]) -> Optional[Any]:
+        """Build the cycle's spot/ATM context (None lets collectors quote for themselves)."""
+        # Streamed spots need no quote at all when every index is ticking
+        if self._stream_engine and self._stream_engine.is_running:
+            market_context = self._stream_engine.market_context(indices)
+            if len(market_context.indices) == len(indices):
+                return market_context
+        
+        if not self._market_context:
+            return None
+        
+        try:
+            return self._market_context.build(indices)
+        except Exception as e:
+            logger.warning(f"⚠️ Market context unavailable for this cycle: {e}")
+            return None
+    
+    def _process_indices_parallel(self,
+                                  indices: List[str],
+                                  cycle_result: Dict[str, Any],
+                                  market_context: Optional[Any] = None):
+        """
+        Process all indices at once on the platform thread pool.
+        
+        Concurrency is capped by data_collection.performance.max_concurrent_indices.
+        All indices share the API provider, so its rate limiter still governs
+        the combined request rate.
+        """
+        max_concurrent = self.config_manager.get(
+            'data_collection.performance.max_concurrent_indices', len(indices)
+        )
+        slots = threading.BoundedSemaphore(max(1, min(max_concurrent, len(indices))))
+        
+        def run_index(index: str):
+            with slots:
+                return self._process_index_timed(index, market_context)
+        
+        future_to_index = {
+            self._thread_pool.submit(run_index, index): index
+            for index in indices
+        }
+        
+        for future in as_completed(future_to_index):
+            index = future_to_index[future]
+            try:
+                self._merge_index_result(cycle_result, *future.result())
+            except Exception as e:
+                logger.error(f"🔴 Error processing {index}: {e}")
+                cycle_result['errors'].append({
+                    'index': index,
+                    'error': str(e)
+                })
+                cycle_result['success'] = False
+    
+    def _process_index_timed(self, index: str, market_context: Optional[Any] = None) -> Tuple[str, Dict[str, Any], float]:
+        """Process a single index and measure its processing time."""
+        index_start = time.time()
+        
+        try:
+            index_result = self._process_index(index, market_context)
+        except Exception as e:
+            index_result = {'success': False, 'options_count': 0, 'error': str(e)}
+        
+        return index, index_result, time.time() - index_start
+    
+    def _merge_index_result(self,
+                            cycle_result: Dict[str, Any],
+                            index: str,
+                            index_result: Dict[str, Any],
+                            processing_time: float):
+        """Merge a single index result into the cycle result."""
+        if index_result['success']:
+            cycle_result['indices_processed'] += 1
+            cycle_result['total_options'] += index_result.get('options_count', 0)
+            logger.info(f"✅ {index} processed in {processing_time:.2f}s")
+        else:
+            logger.error(f"🔴 Error processing {index}: {index_result.get('error', 'Unknown error')}")
+            cycle_result['errors'].append({
+                'index': index,
+                'error': index_result.get('error', 'Unknown error')
+            })
+        
+        # Track processing time
+        cycle_result['processing_times'][index] = processing_time
+    
+    def _process_index(self, index: str, market_context: Optional[Any] = None) -> Dict[str, Any]:
         """Process options data for a single index."""
         result = {'success': False, 'options_count': 0, 'error': None}
+        index_context = market_context.get(index) if market_context else None
         
         try:
             # Get ATM options collector
@@ -550,14 +738,36 @@ class G6Platform:
             options_data = atm_collector.collect_atm_options(
                 index_name=index,
                 include_greeks=self.config.get('data_collection.options.include_greeks', True),
-                include_market_depth=self.config.get('data_collection.options.include_market_depth', False)
+                include_market_depth=self.config.get('data_collection.options.include_market_depth', False),
+                context=index_context
             )
             
+            # Unwrap collector results into option records and their columnar snapshot
+            snapshot = None
+            if hasattr(options_data, 'data') and hasattr(options_data, 'success'):
+                if not options_data.success:
+                    raise ValueError(options_data.error_message or f"Collection failed for {index}")
+                snapshot = getattr(options_data, 'snapshot', None)
+                options_data = options_data.data
+            
             if not options_data:
                 raise ValueError(f"No options data received for {index}")
             
-            # Store the data
-            self._store_options_data(index, options_data)
+            # Store the data (queues hold the compact snapshot when available)
+            self._store_options_data(index, snapshot if snapshot is not None else options_data)
+            
+            # Market overview from the same cycle context (no extra spot quotes)
+            overview_collector = self._collectors.get('overview')
+            if overview_collector:
+                try:
+                    overview_collector.generate_market_overview(
+                        index,
+                        snapshot if snapshot is not None else options_data,
+                        use_cache=False,
+                        context=index_context
+                    )
+                except Exception as e:
+                    logger.warning(f"⚠️ Overview generation failed for {index}: {e}")
             
             # Update analytics if available
             if self._analytics_engine:
@@ -567,7 +777,7 @@ class G6Platform:
                     logger.warning(f"⚠️ Analytics processing failed for {index}: {e}")
             
             result['success'] = True
-            result['options_count'] = len(options_data) if isinstance(options_data, list) else 1
+            result['options_count'] = len(options_data) if isinstance(options_data, (list, tuple)) else 1
             
         except Exception as e:
             logger.error(f"🔴 Failed to process {index}: {e}")
@@ -577,6 +787,10 @@ class G6Platform:
     
     def _store_options_data(self, index: str, options_data: Any):
         """Store options data using configured storage backends."""
+        if self._storage_pipeline:
+            self._storage_pipeline.submit(index, options_data)
+            return
+        
         for backend_name, backend in self._storage_backends.items():
             try:
                 if hasattr(backend, 'store_options_data'):
@@ -637,6 +851,13 @@ class G6Platform:
             if self._main_thread.is_alive():
                 logger.warning("⚠️ Main collection loop did not stop gracefully")
         
+        # Close the ticker connection
+        if self._stream_engine:
+            self._stream_engine.stop()
+        
+        # Drain queued storage writes before closing backends
+        self._drain_storage_pipeline(timeout / 2)
+        
         # Stop monitoring systems
         self._stop_monitoring_systems()
         
@@ -666,6 +887,18 @@ class G6Platform:
                 except Exception as e:
                     logger.error(f"🔴 Failed to stop {name} monitor: {e}")
     
+    def _drain_storage_pipeline(self, timeout: float):
+        """Flush the asynchronous storage pipeline."""
+        if not self._storage_pipeline:
+            return
+        
+        try:
+            logger.info("⏱️ Draining storage pipeline...")
+            if not self._storage_pipeline.drain(timeout=timeout):
+                logger.warning("⚠️ Storage pipeline did not drain completely")
+        except Exception as e:
+            logger.error(f"🔴 Failed to drain storage pipeline: {e}")
+    
     def _close_storage_backends(self):
         """Close storage backends."""
         for name, backend in self._storage_backends.items():
@@ -693,11 +926,14 @@ class G6Platform:
             'average_cycle_time': self.stats.average_cycle_time,
             'errors_count': self.state.errors_count,
             'last_cycle_at': self.state.last_cycle_at.isoformat() if self.state.last_cycle_at else None,
+            'scheduler': self._scheduler.get_stats() if self._scheduler else None,
             'components': {
                 'api_provider': bool(self._api_provider),
                 'collectors': len(self._collectors),
                 'storage_backends': len(self._storage_backends),
+                'storage_pipeline': self._storage_pipeline.get_stats() if self._storage_pipeline else None,
                 'analytics_engine': bool(self._analytics_engine),
+                'volatility_analyzer': bool(self._volatility_analyzer),
                 'monitoring': {
                     'health': bool(self.health_monitor),
                     'performance': bool(self.performance_monitor),
@@ -706,6 +942,22 @@ class G6Platform:
             }
         }
     
+    def analyze_volatility(self, index: str, options_data: List[Dict[str, Any]], spot_price: float) -> Optional[Any]:
+        """
+        Run volatility analysis for one index chain.
+        
+        Args:
+            index: Index name (selects the rollup history)
+            options_data: Option records of the chain
+            spot_price: Current underlying price
+        
+        Returns:
+            VolatilityMetrics, or None if the analyzer is not available
+        """
+        if not self._volatility_analyzer:
+            return None
+        return self._volatility_analyzer.analyze_volatility({'symbol': index, 'price': spot_price}, options_data)
+    
     def get_health(self) -> Dict[str, Any]:
         """Get platform health information."""
         if self.health_monitor:
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ Cycle Scheduler - G6 Platform v3.0
+Drift-free, fixed-cadence scheduling for the main collection loop.
+
+Features:
+- Cycles aligned to wall-clock boundaries (e.g. every :00 and :30 second)
+- Overrun detection with skip or coalesce policies
+- Lateness and jitter tracking for monitoring
+- Shutdown-aware waiting
+"""
+
+import math
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class SchedulerStats:
+    """Scheduler timing statistics."""
+    cycles_scheduled: int = 0
+    overruns: int = 0
+    skipped_cycles: int = 0
+    coalesced_cycles: int = 0
+    last_lateness: float = 0.0
+    max_lateness: float = 0.0
+    total_lateness: float = 0.0
+    last_jitter: float = 0.0
+    max_jitter: float = 0.0
+    total_jitter: float = 0.0
+    
+    @property
+    def average_lateness(self) -> float:
+        """Calculate average start lateness in seconds."""
+        return self.total_lateness / max(1, self.cycles_scheduled)
+    
+    @property
+    def average_jitter(self) -> float:
+        """Calculate average period jitter in seconds."""
+        return self.total_jitter / max(1, self.cycles_scheduled - 1)
+
+class CycleScheduler:
+    """
+    ⏱️ Fixed-cadence scheduler aligned to wall-clock boundaries.
+    
+    Unlike sleeping a fixed interval after each cycle, the scheduler targets
+    absolute deadlines (multiples of the interval since the epoch), so cycle
+    duration never shifts later snapshots.
+    
+    Overrun policies (a cycle ran past one or more boundaries):
+    - skip: missed boundaries are dropped, the next cycle waits for the next
+      future boundary
+    - coalesce: missed boundaries collapse into a single cycle started
+      immediately, then the schedule realigns
+    """
+    
+    OVERRUN_POLICIES = ('skip', 'coalesce')
+    
+    def __init__(self,
+                 interval: float = 30.0,
+                 align_to_wall_clock: bool = True,
+                 overrun_policy: str = 'skip',
+                 offset: float = 0.0):
+        """
+        Initialize cycle scheduler.
+        
+        Args:
+            interval: Cycle period in seconds
+            align_to_wall_clock: Align deadlines to multiples of the interval
+            overrun_policy: 'skip' or 'coalesce'
+            offset: Offset in seconds added to each aligned boundary
+        """
+        if interval <= 0:
+            raise ValueError(f"Scheduler interval must be positive, got {interval}")
+        if overrun_policy not in self.OVERRUN_POLICIES:
+            raise ValueError(f"Unknown overrun policy: {overrun_policy}")
+        
+        self.interval = float(interval)
+        self.align_to_wall_clock = align_to_wall_clock
+        self.overrun_policy = overrun_policy
+        self.offset = offset
+        
+        self.stats = SchedulerStats()
+        
+        self._next_deadline: Optional[float] = None
+        self._last_start: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def _first_deadline(self, now: float) -> float:
+        """Get the first deadline at or after now."""
+        if not self.align_to_wall_clock:
+            return now
+        return math.ceil((now - self.offset) / self.interval) * self.interval + self.offset
+    
+    def next_deadline(self, now: Optional[float] = None) -> float:
+        """
+        Get the wall-clock time the next cycle should start at.
+        
+        Applies the overrun policy when the previous cycle ran past the
+        current deadline.
+        """
+        now = time.time() if now is None else now
+        
+        with self._lock:
+            if self._next_deadline is None:
+                self._next_deadline = self._first_deadline(now)
+                return self._next_deadline
+            
+            if now > self._next_deadline:
+                # Number of boundaries that passed while the last cycle ran
+                missed = int((now - self._next_deadline) // self.interval) + 1
+                self.stats.overruns += 1
+                
+                if self.overrun_policy == 'skip':
+                    self.stats.skipped_cycles += missed
+                    self._next_deadline += missed * self.interval
+                else:
+                    # Run once, immediately, for the latest missed boundary
+                    self.stats.coalesced_cycles += missed
+                    self._next_deadline += (missed - 1) * self.interval
+                
+                logger.warning(f"⏱️ Collection overran {missed} boundary(ies), policy={self.overrun_policy}")
+            
+            return self._next_deadline
+    
+    def wait_for_next_cycle(self, shutdown_event: threading.Event) -> Optional[float]:
+        """
+        Block until the next cycle deadline.
+        
+        Args:
+            shutdown_event: Event that aborts the wait when set
+        
+        Returns:
+            Scheduled deadline, or None if shutdown was requested
+        """
+        deadline = self.next_deadline()
+        delay = deadline - time.time()
+        
+        if delay > 0 and shutdown_event.wait(delay):
+            return None
+        if shutdown_event.is_set():
+            return None
+        
+        return deadline
+    
+    def mark_cycle_start(self, scheduled: float, started: Optional[float] = None) -> Dict[str, float]:
+        """
+        Record the actual start of a scheduled cycle.
+        
+        Args:
+            scheduled: Deadline returned by wait_for_next_cycle
+            started: Actual start time (uses now if None)
+        
+        Returns:
+            Dictionary with lateness and jitter in seconds
+        """
+        started = time.time() if started is None else started
+        lateness = max(0.0, started - scheduled)
+        
+        with self._lock:
+            jitter = 0.0
+            if self._last_start is not None:
+                # Distance from the nearest whole period (skipped boundaries are not jitter)
+                remainder = (started - self._last_start) % self.interval
+                jitter = min(remainder, self.interval - remainder)
+                self.stats.last_jitter = jitter
+                self.stats.max_jitter = max(self.stats.max_jitter, jitter)
+                self.stats.total_jitter += jitter
+            
+            self._last_start = started
+            self._next_deadline = scheduled + self.interval
+            
+            self.stats.cycles_scheduled += 1
+            self.stats.last_lateness = lateness
+            self.stats.max_lateness = max(self.stats.max_lateness, lateness)
+            self.stats.total_lateness += lateness
+        
+        return {'lateness': lateness, 'jitter': jitter}
+    
+    def reset(self):
+        """Forget the current schedule (e.g. after an error backoff)."""
+        with self._lock:
+            self._next_deadline = None
+            self._last_start = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics."""
+        with self._lock:
+            return {
+                'interval': self.interval,
+                'aligned': self.align_to_wall_clock,
+                'overrun_policy': self.overrun_policy,
+                'cycles_scheduled': self.stats.cycles_scheduled,
+                'overruns': self.stats.overruns,
+                'skipped_cycles': self.stats.skipped_cycles,
+                'coalesced_cycles': self.stats.coalesced_cycles,
+                'last_lateness_ms': self.stats.last_lateness * 1000,
+                'max_lateness_ms': self.stats.max_lateness * 1000,
+                'average_lateness_ms': self.stats.average_lateness * 1000,
+                'last_jitter_ms': self.stats.last_jitter * 1000,
+                'max_jitter_ms': self.stats.max_jitter * 1000,
+                'average_jitter_ms': self.stats.average_jitter * 1000,
+                'next_deadline': self._next_deadline
+            }
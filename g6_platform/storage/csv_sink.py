@@ -11,9 +11,12 @@ Features:
 - Thread-safe operations with proper locking
 - Configurable retention policies
 - Memory-efficient streaming writes
+- Batched, pre-rendered appends with configurable flush/fsync policy
+- Rotation by rename, with archive compression on a background worker pool
 - Comprehensive error handling and recovery
 """
 
+import io
 import os
 import csv
 import gzip
@@ -21,6 +24,7 @@ import shutil
 import hashlib
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Union, IO
@@ -28,8 +32,22 @@ from dataclasses import dataclass, field
 import json
 import time
 
+# Zstandard imports (optional archive codec)
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
+# Archive codecs and the file suffix each one adds
+CODEC_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+# Chunk size for streaming (re)compression
+COMPRESSION_CHUNK_BYTES = 1024 * 1024
+
 @dataclass
 class CSVWriteStats:
     """CSV writing statistics."""
@@ -39,6 +57,36 @@ class CSVWriteStats:
     write_errors: int = 0
     last_write_time: Optional[datetime] = None
     compression_ratio: float = 1.0
+    flushes: int = 0
+    fsyncs: int = 0
+    write_time: float = 0.0
+    
+    @property
+    def rows_per_second(self) -> float:
+        """Calculate write-path throughput in rows per second."""
+        return self.records_written / self.write_time if self.write_time > 0 else 0.0
+    
+    @property
+    def bytes_per_second(self) -> float:
+        """Calculate write-path throughput in bytes per second."""
+        return self.bytes_written / self.write_time if self.write_time > 0 else 0.0
+
+@dataclass
+class CompressionStats:
+    """Background archive compression statistics."""
+    queued: int = 0
+    in_progress: int = 0
+    completed: int = 0
+    failed: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    bytes_processed: int = 0
+    compression_time: float = 0.0
+    
+    @property
+    def ratio(self) -> float:
+        """Calculate compressed/uncompressed size ratio of completed jobs."""
+        return self.bytes_out / self.bytes_in if self.bytes_in else 1.0
 
 @dataclass
 class FileRotationInfo:
@@ -49,6 +97,13 @@ class FileRotationInfo:
     file_created_at: Optional[datetime] = None
     next_rotation_time: Optional[datetime] = None
 
+@dataclass
+class FileFlushState:
+    """Pending write state for an open file."""
+    rows_since_flush: int = 0
+    last_flush: float = field(default_factory=time.time)
+    last_fsync: float = field(default_factory=time.time)
+
 class CSVSink:
     """
     💾 Enhanced CSV storage backend with enterprise features.
@@ -65,7 +120,13 @@ class CSVSink:
                  retention_days: int = 30,
                  rotation_interval_hours: int = 24,
                  enable_backup: bool = True,
-                 enable_integrity_checks: bool = True):
+                 enable_integrity_checks: bool = True,
+                 flush_every_rows: int = 1000,
+                 flush_interval_seconds: float = 5.0,
+                 fsync_interval_seconds: float = 0.0,
+                 write_buffer_kb: int = 256,
+                 compression_workers: int = 1,
+                 compression_tiers: Optional[Dict[str, Dict[str, Any]]] = None):
         """
         Initialize CSV storage backend.
         
@@ -78,6 +139,14 @@ class CSVSink:
             rotation_interval_hours: Hours between automatic rotations
             enable_backup: Enable backup copies
             enable_integrity_checks: Enable data integrity checks
+            flush_every_rows: Flush a file once this many rows are buffered (0 = disabled)
+            flush_interval_seconds: Flush files at least this often (0 = flush every batch)
+            fsync_interval_seconds: fsync checkpoint interval (0 = never fsync)
+            write_buffer_kb: Per-file write buffer size
+            compression_workers: Background threads compressing rotated files
+            compression_tiers: Codec and level per archive tier ('archive', 'backup'),
+                e.g. {'archive': {'codec': 'gzip', 'level': 1}, 'backup': {'codec': 'zstd', 'level': 19}}
+                (defaults to gzip level 6 for 'archive' when compression is enabled)
         """
         self.base_path = Path(base_path).resolve()
         self.enable_compression = enable_compression
@@ -87,6 +156,10 @@ class CSVSink:
         self.rotation_interval = timedelta(hours=rotation_interval_hours)
         self.enable_backup = enable_backup
         self.enable_integrity_checks = enable_integrity_checks
+        self.flush_every_rows = flush_every_rows
+        self.flush_interval_seconds = flush_interval_seconds
+        self.fsync_interval_seconds = fsync_interval_seconds
+        self.write_buffer_size = max(1, write_buffer_kb) * 1024
         
         # Create directory structure
         self.base_path.mkdir(parents=True, exist_ok=True)
@@ -100,9 +173,22 @@ class CSVSink:
         for directory in [self.data_dir, self.archive_dir, self.backup_dir, self.temp_dir]:
             directory.mkdir(exist_ok=True)
         
+        # Archive compression per tier (runs off the write path)
+        if compression_tiers is None:
+            compression_tiers = {'archive': {'codec': 'gzip', 'level': 6}} if enable_compression else {}
+        self.compression_tiers = self._validate_compression_tiers(compression_tiers)
+        self._tier_dirs = {'archive': self.archive_dir, 'backup': self.backup_dir}
+        self.compression_stats = CompressionStats()
+        self._compression_pending: set = set()
+        self._compression_pool = ThreadPoolExecutor(
+            max_workers=max(1, compression_workers),
+            thread_name_prefix="CSVCompress"
+        )
+        
         # File management
         self._file_handles: Dict[str, IO] = {}
-        self._csv_writers: Dict[str, csv.DictWriter] = {}
+        self._fieldnames: Dict[str, List[str]] = {}
+        self._flush_state: Dict[str, FileFlushState] = {}
         self._rotation_info: Dict[str, FileRotationInfo] = {}
         
         # Statistics
@@ -112,12 +198,14 @@ class CSVSink:
         self._lock = threading.RLock()
         self._file_locks: Dict[str, threading.Lock] = {}
         
-        # Background cleanup thread
+        # Background cleanup and flush threads
         self._cleanup_thread: Optional[threading.Thread] = None
+        self._flush_thread: Optional[threading.Thread] = None
         self._stop_cleanup = threading.Event()
         
         # Start background tasks
         self._start_background_tasks()
+        self._resume_compression()
         
         logger.info("💾 CSV storage backend initialized")
         logger.info(f"📂 Base path: {self.base_path}")
@@ -144,7 +232,9 @@ class CSVSink:
             timestamp = timestamp or datetime.now()
             
             # Ensure options_data is a list
-            if isinstance(options_data, dict):
+            if hasattr(options_data, 'to_records'):
+                options_data = options_data.to_records()
+            elif isinstance(options_data, dict):
                 options_data = [options_data]
             
             if not options_data:
@@ -222,36 +312,32 @@ class CSVSink:
             file_lock = self._file_locks[file_key]
             
             with file_lock:
+                start_time = time.perf_counter()
+                
                 # Check if rotation is needed
                 if self.enable_rotation and self._needs_rotation(file_key):
                     self._rotate_file(file_key)
                 
                 # Get or create file handle
-                file_handle, csv_writer = self._get_or_create_writer(file_key)
+                file_handle, fieldnames = self._get_or_create_writer(file_key)
                 
-                if not file_handle or not csv_writer:
+                if not file_handle or not fieldnames:
                     return False
                 
-                # Write data
-                bytes_before = file_handle.tell() if hasattr(file_handle, 'tell') else 0
-                
-                for record in data:
-                    # Add metadata
-                    record_copy = record.copy()
-                    record_copy.setdefault('write_timestamp', timestamp.isoformat())
-                    record_copy.setdefault('index_name', file_key.split('_')[0])
-                    
-                    csv_writer.writerow(record_copy)
-                
-                # Flush to ensure data is written
-                file_handle.flush()
+                # Pre-render the whole batch (metadata defaults, no record copies)
+                payload = self._render_rows(data, fieldnames, {
+                    'write_timestamp': timestamp.isoformat(),
+                    'index_name': file_key.split('_')[0]
+                })
                 
-                # Update statistics
-                bytes_after = file_handle.tell() if hasattr(file_handle, 'tell') else bytes_before
-                bytes_written = max(0, bytes_after - bytes_before)
+                # One buffered write per batch; flushing follows the flush policy
+                file_handle.write(payload)
+                bytes_written = len(payload)
+                self._apply_flush_policy(file_key, file_handle, len(data))
                 
                 with self._lock:
                     self.stats.bytes_written += bytes_written
+                    self.stats.write_time += time.perf_counter() - start_time
                     
                     # Update rotation info
                     if file_key in self._rotation_info:
@@ -266,26 +352,89 @@ class CSVSink:
                 self.stats.write_errors += 1
             return False
     
-    def _get_or_create_writer(self, file_key: str) -> tuple[Optional[IO], Optional[csv.DictWriter]]:
-        """Get or create CSV writer for file key."""
+    def _render_rows(self,
+                     data: List[Dict[str, Any]],
+                     fieldnames: List[str],
+                     defaults: Dict[str, Any]) -> bytes:
+        """Render records to encoded CSV lines (missing fields use defaults, then blank)."""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(
+            [record[name] if name in record else defaults.get(name, '') for name in fieldnames]
+            for record in data
+        )
+        return buffer.getvalue().encode('utf-8')
+    
+    def _apply_flush_policy(self, file_key: str, file_handle: IO, rows: int):
+        """Flush and fsync a file according to the configured policy."""
+        state = self._flush_state.setdefault(file_key, FileFlushState())
+        state.rows_since_flush += rows
+        now = time.time()
+        
+        if (self.flush_interval_seconds <= 0 or
+                (self.flush_every_rows and state.rows_since_flush >= self.flush_every_rows) or
+                now - state.last_flush >= self.flush_interval_seconds):
+            self._flush_file(file_key, file_handle, state, now)
+        
+        if self.fsync_interval_seconds > 0 and now - state.last_fsync >= self.fsync_interval_seconds:
+            self._flush_file(file_key, file_handle, state, now, fsync=True)
+    
+    def _flush_file(self, file_key: str, file_handle: IO, state: FileFlushState, now: float, fsync: bool = False):
+        """Flush buffered rows of a file to the OS (and optionally to disk)."""
+        if state.rows_since_flush or fsync:
+            file_handle.flush()
+            state.rows_since_flush = 0
+            state.last_flush = now
+            with self._lock:
+                self.stats.flushes += 1
+        
+        if fsync:
+            raw = getattr(file_handle, 'fileobj', None) or file_handle  # gzip wraps the real file
+            raw.flush()
+            os.fsync(raw.fileno())
+            state.last_fsync = now
+            with self._lock:
+                self.stats.fsyncs += 1
+    
+    def flush_all(self, fsync: bool = False):
+        """
+        Flush every open file.
+        
+        Args:
+            fsync: Also force data to disk (checkpoint)
+        """
+        now = time.time()
+        for file_key in list(self._file_handles.keys()):
+            file_lock = self._file_locks.get(file_key)
+            if not file_lock:
+                continue
+            with file_lock:
+                file_handle = self._file_handles.get(file_key)
+                if not file_handle:
+                    continue
+                try:
+                    state = self._flush_state.setdefault(file_key, FileFlushState())
+                    self._flush_file(file_key, file_handle, state, now, fsync=fsync)
+                except Exception as e:
+                    logger.error(f"🔴 Failed to flush {file_key}: {e}")
+    
+    def _get_or_create_writer(self, file_key: str) -> tuple[Optional[IO], Optional[List[str]]]:
+        """Get or create the append handle and fieldnames for file key."""
         try:
             # Check if writer already exists
-            if file_key in self._csv_writers:
-                file_handle = self._file_handles[file_key]
-                csv_writer = self._csv_writers[file_key]
-                return file_handle, csv_writer
+            if file_key in self._file_handles:
+                return self._file_handles[file_key], self._fieldnames[file_key]
             
             # Create new file
-            file_path = self._get_file_path(file_key)
+            file_path = self._get_live_path(file_key)
             
             # Determine if file exists to know whether to write headers
             file_exists = file_path.exists()
             
-            # Open file for append
+            # Open file for buffered binary append (rows are pre-rendered)
             if self.enable_compression:
-                file_handle = gzip.open(file_path.with_suffix(file_path.suffix + '.gz'), 'at', newline='', encoding='utf-8')
+                file_handle = gzip.open(file_path, 'ab')
             else:
-                file_handle = open(file_path, 'a', newline='', encoding='utf-8')
+                file_handle = open(file_path, 'ab', buffering=self.write_buffer_size)
             
             # Store file handle
             self._file_handles[file_key] = file_handle
@@ -293,19 +442,14 @@ class CSVSink:
             # Determine fieldnames from first data record or use defaults
             fieldnames = self._get_csv_fieldnames(file_key)
             
-            # Create CSV writer
-            csv_writer = csv.DictWriter(
-                file_handle,
-                fieldnames=fieldnames,
-                extrasaction='ignore'  # Ignore extra fields
-            )
-            
             # Write header if new file
             if not file_exists:
-                csv_writer.writeheader()
+                file_handle.write(self._render_rows([dict(zip(fieldnames, fieldnames))], fieldnames, {}))
+                file_handle.flush()
             
-            # Store writer
-            self._csv_writers[file_key] = csv_writer
+            # Store fieldnames and flush state
+            self._fieldnames[file_key] = fieldnames
+            self._flush_state[file_key] = FileFlushState()
             
             # Initialize rotation info
             if file_key not in self._rotation_info:
@@ -320,7 +464,7 @@ class CSVSink:
                 if not file_exists:
                     self.stats.files_created += 1
             
-            return file_handle, csv_writer
+            return file_handle, fieldnames
             
         except Exception as e:
             logger.error(f"🔴 Failed to create writer for {file_key}: {e}")
@@ -331,6 +475,11 @@ class CSVSink:
         filename = f"{file_key}.csv"
         return self.data_dir / filename
     
+    def _get_live_path(self, file_key: str) -> Path:
+        """Get the path of the file currently being appended to (gzip when compression is enabled)."""
+        file_path = self._get_file_path(file_key)
+        return file_path.with_suffix(file_path.suffix + '.gz') if self.enable_compression else file_path
+    
     def _get_csv_fieldnames(self, file_key: str) -> List[str]:
         """Get CSV fieldnames for file type."""
         if 'options' in file_key:
@@ -373,29 +522,27 @@ class CSVSink:
         return False
     
     def _rotate_file(self, file_key: str):
-        """Rotate current file to archive."""
+        """
+        Rotate current file to archive.
+        
+        Rotation is a rename and hand-off: the closed file is moved into the
+        archive directory and queued for background compression, so the
+        writer can open a fresh file immediately.
+        """
         try:
             logger.info(f"🔄 Rotating file for {file_key}")
             
             # Close current file
             self._close_file(file_key)
             
-            # Move current file to archive
-            current_path = self._get_file_path(file_key)
+            # Move current file to archive (same filesystem, so this is a rename)
+            current_path = self._get_live_path(file_key)
             if current_path.exists():
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                archive_name = f"{file_key}_{timestamp}.csv"
-                archive_path = self.archive_dir / archive_name
-                
-                # Compress if enabled
-                if self.enable_compression:
-                    with open(current_path, 'rb') as f_in:
-                        with gzip.open(archive_path.with_suffix('.csv.gz'), 'wb') as f_out:
-                            shutil.copyfileobj(f_in, f_out)
-                    current_path.unlink()  # Remove original
-                else:
-                    shutil.move(str(current_path), str(archive_path))
+                archive_path = self.archive_dir / f"{file_key}_{timestamp}.csv{current_path.suffix if self.enable_compression else ''}"
+                os.replace(current_path, archive_path)
                 
+                self._submit_compression(archive_path, 'archive')
                 logger.info(f"✅ File rotated to {archive_path}")
             
             # Reset rotation info
@@ -408,6 +555,139 @@ class CSVSink:
         except Exception as e:
             logger.error(f"🔴 Failed to rotate file {file_key}: {e}")
     
+    def _validate_compression_tiers(self, tiers: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Normalize tier settings, falling back to gzip when zstd is unavailable."""
+        validated = {}
+        for tier, settings in tiers.items():
+            if tier not in ('archive', 'backup'):
+                logger.warning(f"⚠️ Ignoring unknown compression tier: {tier}")
+                continue
+            
+            codec = settings.get('codec', 'gzip')
+            level = settings.get('level')
+            if codec == 'zstd' and not ZSTD_AVAILABLE:
+                logger.warning(f"⚠️ zstandard not installed, using gzip for the {tier} tier")
+                codec, level = 'gzip', None
+            if codec not in CODEC_SUFFIXES:
+                logger.warning(f"⚠️ Unknown codec {codec!r} for the {tier} tier, using gzip")
+                codec, level = 'gzip', None
+            
+            validated[tier] = {'codec': codec, 'level': level if level is not None else (6 if codec == 'gzip' else 3)}
+        return validated
+    
+    def _submit_compression(self, path: Path, tier: str):
+        """Queue a file in a tier directory for (re)compression with the tier's codec."""
+        settings = self.compression_tiers.get(tier)
+        if not settings or path.name.endswith(CODEC_SUFFIXES[settings['codec']]):
+            return
+        
+        with self._lock:
+            if path in self._compression_pending:
+                return
+            self._compression_pending.add(path)
+            self.compression_stats.queued += 1
+        
+        try:
+            self._compression_pool.submit(self._compress_worker, path, settings)
+        except RuntimeError:
+            # Pool already shut down; the file is picked up again on restart
+            with self._lock:
+                self._compression_pending.discard(path)
+                self.compression_stats.queued -= 1
+    
+    def _resume_compression(self):
+        """Queue archived files left uncompressed by a previous run."""
+        for tier, directory in self._tier_dirs.items():
+            if tier not in self.compression_tiers:
+                continue
+            for path in sorted(directory.glob("*.part")):
+                path.unlink()  # Interrupted output; its source is still present
+            for path in sorted(directory.glob("*.csv*")):
+                self._submit_compression(path, tier)
+    
+    def _compress_worker(self, source: Path, settings: Dict[str, Any]):
+        """Compress one archived file to its tier codec (runs on the compression pool)."""
+        with self._lock:
+            self.compression_stats.queued -= 1
+            self.compression_stats.in_progress += 1
+        
+        start_time = time.perf_counter()
+        codec = settings['codec']
+        base_name = source.name
+        for suffix in CODEC_SUFFIXES.values():
+            if base_name.endswith(suffix):
+                base_name = base_name[:-len(suffix)]
+        target = source.with_name(base_name + CODEC_SUFFIXES[codec])
+        part = target.with_name(target.name + '.part')
+        
+        try:
+            source_size = source.stat().st_size
+            with self._open_archive_reader(source) as f_in, self._open_archive_writer(part, settings) as f_out:
+                while True:
+                    chunk = f_in.read(COMPRESSION_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    f_out.write(chunk)
+                    with self._lock:
+                        self.compression_stats.bytes_processed += len(chunk)
+            
+            os.replace(part, target)
+            source.unlink()
+            
+            with self._lock:
+                self.compression_stats.completed += 1
+                self.compression_stats.bytes_in += source_size
+                self.compression_stats.bytes_out += target.stat().st_size
+                self.compression_stats.compression_time += time.perf_counter() - start_time
+                self.stats.compression_ratio = self.compression_stats.ratio
+            logger.info(f"🗜️ Compressed {source.name} -> {target.name} ({codec})")
+            
+        except Exception as e:
+            logger.error(f"🔴 Failed to compress {source}: {e}")
+            if part.exists():
+                part.unlink()
+            with self._lock:
+                self.compression_stats.failed += 1
+        
+        finally:
+            with self._lock:
+                self.compression_stats.in_progress -= 1
+                self._compression_pending.discard(source)
+    
+    def _open_archive_reader(self, path: Path) -> IO:
+        """Open an archived file for reading its uncompressed bytes."""
+        if path.name.endswith('.gz'):
+            return gzip.open(path, 'rb')
+        if path.name.endswith('.zst'):
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstandard not installed")
+            return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return open(path, 'rb')
+    
+    def _open_archive_writer(self, path: Path, settings: Dict[str, Any]) -> IO:
+        """Open a compressed output file for a tier codec."""
+        if settings['codec'] == 'zstd':
+            return zstandard.ZstdCompressor(level=settings['level']).stream_writer(open(path, 'wb'), closefd=True)
+        return gzip.open(path, 'wb', compresslevel=settings['level'])
+    
+    def wait_for_compression(self, timeout: float = 30.0) -> bool:
+        """
+        Wait until the compression backlog is empty.
+        
+        Args:
+            timeout: Maximum seconds to wait
+            
+        Returns:
+            True if no compression jobs remain
+        """
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._lock:
+                if not self._compression_pending:
+                    return True
+            time.sleep(0.05)
+        return False
+    
     def _close_file(self, file_key: str):
         """Close file handle and remove from tracking."""
         try:
@@ -415,8 +695,8 @@ class CSVSink:
                 self._file_handles[file_key].close()
                 del self._file_handles[file_key]
             
-            if file_key in self._csv_writers:
-                del self._csv_writers[file_key]
+            self._fieldnames.pop(file_key, None)
+            self._flush_state.pop(file_key, None)
             
         except Exception as e:
             logger.error(f"🔴 Failed to close file {file_key}: {e}")
@@ -455,6 +735,26 @@ class CSVSink:
         )
         self._cleanup_thread.start()
         logger.info("🧹 Background cleanup thread started")
+        
+        # Time-based flushing for files that stop receiving writes
+        if self.flush_interval_seconds > 0 or self.fsync_interval_seconds > 0:
+            def flush_worker():
+                intervals = [i for i in (self.flush_interval_seconds, self.fsync_interval_seconds) if i > 0]
+                period = min(intervals)
+                last_fsync = time.time()
+                while not self._stop_cleanup.wait(period):
+                    fsync = (self.fsync_interval_seconds > 0 and
+                             time.time() - last_fsync >= self.fsync_interval_seconds)
+                    self.flush_all(fsync=fsync)
+                    if fsync:
+                        last_fsync = time.time()
+            
+            self._flush_thread = threading.Thread(
+                target=flush_worker,
+                daemon=True,
+                name="CSVFlush"
+            )
+            self._flush_thread.start()
     
     def _cleanup_old_files(self):
         """Clean up old files based on retention policy."""
@@ -467,6 +767,11 @@ class CSVSink:
             
             for file_path in self.archive_dir.glob("*.csv*"):
                 try:
+                    # Leave files the compression pool is still working on
+                    with self._lock:
+                        if file_path in self._compression_pending or file_path.name.endswith('.part'):
+                            continue
+                    
                     # Get file modification time
                     file_mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
                     
@@ -475,6 +780,7 @@ class CSVSink:
                             # Move to backup before deleting
                             backup_path = self.backup_dir / file_path.name
                             shutil.move(str(file_path), str(backup_path))
+                            self._submit_compression(backup_path, 'backup')
                         else:
                             # Delete directly
                             file_path.unlink()
@@ -525,6 +831,10 @@ class CSVSink:
                 'records_written': self.stats.records_written,
                 'bytes_written': self.stats.bytes_written,
                 'write_errors': self.stats.write_errors,
+                'flushes': self.stats.flushes,
+                'fsyncs': self.stats.fsyncs,
+                'rows_per_sec': self.stats.rows_per_second,
+                'bytes_per_sec': self.stats.bytes_per_second,
                 'last_write_time': self.stats.last_write_time.isoformat() if self.stats.last_write_time else None,
                 'compression_enabled': self.enable_compression,
                 'rotation_enabled': self.enable_rotation,
@@ -534,7 +844,14 @@ class CSVSink:
                 'current_size_mb': current_size / (1024 * 1024),
                 'archive_size_mb': archive_size / (1024 * 1024),
                 'backup_size_mb': backup_size / (1024 * 1024),
-                'total_size_mb': (current_size + archive_size + backup_size) / (1024 * 1024)
+                'total_size_mb': (current_size + archive_size + backup_size) / (1024 * 1024),
+                'compression_backlog': self.compression_stats.queued,
+                'compression_in_progress': self.compression_stats.in_progress,
+                'compression_completed': self.compression_stats.completed,
+                'compression_failed': self.compression_stats.failed,
+                'compression_bytes_processed': self.compression_stats.bytes_processed,
+                'compression_ratio': self.compression_stats.ratio,
+                'compression_time_seconds': self.compression_stats.compression_time
             }
     
     def health_check(self) -> Dict[str, Any]:
@@ -543,7 +860,7 @@ class CSVSink:
             'status': 'healthy',
             'base_path_exists': self.base_path.exists(),
             'directories_accessible': True,
-            'active_writers': len(self._csv_writers),
+            'active_writers': len(self._file_handles),
             'stats': self.get_storage_stats()
         }
         
@@ -570,13 +887,21 @@ class CSVSink:
     def shutdown(self):
         """Shutdown CSV storage backend."""
         # Stop background tasks
+        self._stop_cleanup.set()
         if self._cleanup_thread and self._cleanup_thread.is_alive():
-            self._stop_cleanup.set()
             self._cleanup_thread.join(timeout=5)
+        if self._flush_thread and self._flush_thread.is_alive():
+            self._flush_thread.join(timeout=5)
+        
+        # Checkpoint buffered rows before closing
+        self.flush_all(fsync=self.fsync_interval_seconds > 0)
         
         # Close all files
         self.close_all_files()
         
+        # Finish running compression jobs; queued ones resume on next start
+        self._compression_pool.shutdown(wait=True, cancel_futures=True)
+        
         logger.info("💾 CSV storage backend shutdown complete")
     
     def __del__(self):
@@ -12,17 +12,37 @@ Features:
 - Data compression and retention policies
 - Thread-safe operations with proper error handling
 - Comprehensive monitoring and health checks
+- Line-protocol fast path rendering whole option chains to bytes
+- Non-blocking writer queue with retries and ordered disk spill/replay
+- Dead-letter file for batches rejected with 4xx client errors
+- Parameterized queries with pivoted, windowed and chunked DataFrame/NumPy results
 """
 
+import os
 import time
+import queue
+import struct
 import logging
 import threading
 import asyncio
+from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Union, Callable
 from dataclasses import dataclass, field
 from collections import deque
+import re
 import json
+import math
+
+import numpy as np
+
+# Pandas is optional (only the DataFrame query API needs it)
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+    pd = None
 
 # InfluxDB imports
 try:
@@ -40,6 +60,183 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Numeric option fields written per point (ChainSnapshot column name == field name)
+OPTION_NUMERIC_FIELDS = (
+    'last_price', 'volume', 'oi', 'change', 'pchange',
+    'iv', 'delta', 'gamma', 'theta', 'vega', 'bid', 'ask'
+)
+OPTION_STRING_FIELDS = ('tradingsymbol', 'exchange', 'segment')
+
+# Fields that may be written as integers (see LineProtocolSerializer.integer_counts)
+OPTION_COUNT_FIELDS = ('volume', 'oi')
+
+# Flux aggregate functions accepted for query windows
+AGGREGATE_FUNCTIONS = ('mean', 'median', 'last', 'first', 'min', 'max', 'sum', 'count', 'spread')
+
+# Flux bookkeeping columns dropped from query results
+FLUX_META_COLUMNS = ('result', 'table', '_start', '_stop', '_measurement')
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# Client errors that retrying the same data can still fix (auth, missing bucket, throttling)
+RETRYABLE_CLIENT_STATUSES = (401, 403, 404, 408, 429)
+
+def _rejection_status(error: Exception) -> Optional[int]:
+    """
+    Get the HTTP status of a write InfluxDB rejected for its content.
+    
+    Returns:
+        The 4xx status (e.g. 400 field type conflict, 422 out of retention),
+        or None for outages and errors that a retry may resolve
+    """
+    status = getattr(error, 'status', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status', None)
+    if isinstance(status, int) and 400 <= status < 500 and status not in RETRYABLE_CLIENT_STATUSES:
+        return status
+    return None
+
+def _escape_tag(value: Any) -> str:
+    """Escape a tag key or value for line protocol."""
+    return str(value).replace('\\', '\\\\').replace(',', '\\,').replace('=', '\\=').replace(' ', '\\ ')
+
+def _escape_string_field(value: Any) -> str:
+    """Quote and escape a string field value for line protocol."""
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def _strike_tag(strike: Any) -> str:
+    """Render a strike tag the way legacy records did (25000, not 25000.0)."""
+    if isinstance(strike, float) and strike.is_integer():
+        return str(int(strike))
+    return str(strike)
+
+class LineProtocolSerializer:
+    """
+    ⚡ Renders option chain batches directly to line-protocol bytes.
+    
+    Escaped tag prefixes are cached per (index, symbol, type, strike, expiry),
+    numeric fields are formatted without per-value type probing, and the
+    per-point metadata fields of the Point path (data_source,
+    collection_timestamp) are dropped; the point timestamp carries the same
+    information.
+    """
+    
+    def __init__(self,
+                 measurement: str = "options_data",
+                 integer_counts: bool = False,
+                 max_cached_prefixes: int = 20000):
+        """
+        Initialize serializer.
+        
+        Args:
+            measurement: Measurement name
+            integer_counts: Write volume/OI as integer fields (use only for buckets
+                without existing float volume/OI, or Influx rejects the type change)
+            max_cached_prefixes: Tag prefix cache size before it is reset
+        """
+        self.measurement = measurement.replace(',', '\\,').replace(' ', '\\ ')
+        self.integer_counts = integer_counts
+        self.max_cached_prefixes = max_cached_prefixes
+        self._prefixes: Dict[tuple, str] = {}
+    
+    def _tag_prefix(self, index_name: str, symbol: Any, option_type: Any, strike: Any, expiry: Any) -> str:
+        """Get the escaped 'measurement,tags' prefix for one contract."""
+        key = (index_name, symbol, option_type, strike, expiry)
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            if len(self._prefixes) >= self.max_cached_prefixes:
+                self._prefixes.clear()
+            # Tags sorted by key, as InfluxDB recommends
+            tags = (
+                ('expiry', expiry or ''),
+                ('index_name', index_name),
+                ('option_type', option_type or ''),
+                ('strike', _strike_tag(strike if strike is not None else 0)),
+                ('symbol', symbol or '')
+            )
+            prefix = self.measurement + ''.join(
+                f",{name}={_escape_tag(value)}" for name, value in tags if value != ''
+            )
+            self._prefixes[key] = prefix
+        return prefix
+    
+    def _format_number(self, name: str, value: Any) -> Optional[str]:
+        """Format one numeric field (None when missing or not finite)."""
+        if value is None or isinstance(value, bool):
+            return None
+        if not isinstance(value, (int, float)):
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                return None
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        if self.integer_counts and name in OPTION_COUNT_FIELDS:
+            return f"{name}={int(value)}i"
+        return f"{name}={float(value)!r}"
+    
+    def _render(self, prefix: str, fields: List[str], timestamp_s: int) -> Optional[str]:
+        """Assemble one line (None if the point has no fields)."""
+        if not fields:
+            return None
+        return f"{prefix} {','.join(fields)} {timestamp_s}"
+    
+    def serialize_records(self,
+                          index_name: str,
+                          options_data: List[Dict[str, Any]],
+                          timestamp: datetime) -> tuple:
+        """
+        Render legacy option records.
+        
+        Returns:
+            (payload bytes, number of lines)
+        """
+        timestamp_s = int(timestamp.timestamp())
+        lines = []
+        for option in options_data:
+            prefix = self._tag_prefix(index_name, option.get('symbol'), option.get('option_type'),
+                                      option.get('strike'), option.get('expiry'))
+            fields = [text for text in (self._format_number(name, option.get(name)) for name in OPTION_NUMERIC_FIELDS)
+                      if text is not None]
+            fields.extend(f"{name}={_escape_string_field(option[name])}"
+                          for name in OPTION_STRING_FIELDS if option.get(name) is not None)
+            line = self._render(prefix, fields, timestamp_s)
+            if line is not None:
+                lines.append(line)
+        return '\n'.join(lines).encode('utf-8'), len(lines)
+    
+    def serialize_snapshot(self, snapshot: Any, timestamp: datetime) -> tuple:
+        """
+        Render a ChainSnapshot column by column without building records.
+        
+        Returns:
+            (payload bytes, number of lines)
+        """
+        timestamp_s = int(timestamp.timestamp())
+        columns = []
+        for name in OPTION_NUMERIC_FIELDS:
+            if name in snapshot.columns:
+                columns.append((name, snapshot.columns[name].tolist()))
+            elif name in snapshot.extra:
+                columns.append((name, snapshot.extra[name].tolist()))
+        string_columns = [(name, snapshot.extra[name].tolist()) for name in OPTION_STRING_FIELDS if name in snapshot.extra]
+        
+        symbols = snapshot.symbol.tolist()
+        strikes = snapshot.columns['strike'].tolist()
+        option_types = snapshot.option_types().tolist()
+        
+        lines = []
+        for i in range(len(symbols)):
+            prefix = self._tag_prefix(snapshot.index_name, symbols[i], option_types[i], strikes[i], snapshot.expiry)
+            fields = [text for text in (self._format_number(name, values[i]) for name, values in columns)
+                      if text is not None]
+            fields.extend(f"{name}={_escape_string_field(values[i])}" for name, values in string_columns
+                          if values[i] is not None)
+            line = self._render(prefix, fields, timestamp_s)
+            if line is not None:
+                lines.append(line)
+        return '\n'.join(lines).encode('utf-8'), len(lines)
+
 @dataclass
 class InfluxDBStats:
     """InfluxDB operation statistics."""
@@ -66,35 +263,448 @@ class InfluxDBStats:
             return 0.0
         return self.points_written / self.write_operations
 
-@dataclass
-class WriteBuffer:
-    """Write buffer for batching operations."""
-    points: List[Point] = field(default_factory=list)
-    max_size: int = 1000
-    max_age_seconds: int = 60
-    created_at: datetime = field(default_factory=datetime.now)
-    
-    def is_full(self) -> bool:
-        """Check if buffer is full."""
-        return len(self.points) >= self.max_size
-    
-    def is_expired(self) -> bool:
-        """Check if buffer has expired."""
-        age = (datetime.now() - self.created_at).total_seconds()
-        return age >= self.max_age_seconds
-    
-    def should_flush(self) -> bool:
-        """Check if buffer should be flushed."""
-        return self.is_full() or self.is_expired()
-    
-    def add_point(self, point: Point):
-        """Add point to buffer."""
-        self.points.append(point)
-    
-    def clear(self):
-        """Clear buffer."""
-        self.points.clear()
-        self.created_at = datetime.now()
+def build_flux_query(bucket: str,
+                     measurement: str,
+                     start_time: datetime,
+                     end_time: Optional[datetime] = None,
+                     filters: Optional[Dict[str, Any]] = None,
+                     fields: Optional[List[str]] = None,
+                     window: Optional[timedelta] = None,
+                     aggregate: str = 'last',
+                     pivot: bool = True,
+                     limit: Optional[int] = None,
+                     offset: int = 0) -> tuple:
+    """
+    Build a parameterized Flux query.
+    
+    Every value is passed as a Flux parameter (params.*) instead of being
+    pasted into the query text; tag keys and the aggregate function cannot
+    be parameters in Flux, so they are validated against a whitelist.
+    
+    Args:
+        bucket: Bucket name
+        measurement: Measurement name
+        start_time: Range start
+        end_time: Range stop (now if None)
+        filters: Tag filters; a list/tuple/set value matches any of its items
+        fields: Fields to return (all if None)
+        window: Server-side aggregation window (raw points if None)
+        aggregate: Aggregate function applied per window (see AGGREGATE_FUNCTIONS)
+        pivot: Return one row per timestamp/series with fields as columns
+        limit: Maximum rows per page (results are then time-sorted globally)
+        offset: Rows to skip before the page
+    
+    Returns:
+        (query text, params dict) for QueryApi.query*(query, params=...)
+    """
+    if aggregate not in AGGREGATE_FUNCTIONS:
+        raise ValueError(f"Unsupported aggregate {aggregate!r} (expected one of {AGGREGATE_FUNCTIONS})")
+    
+    params: Dict[str, Any] = {
+        'bucket': bucket,
+        'measurement': measurement,
+        'start': start_time,
+        'stop': end_time or datetime.now()
+    }
+    lines = [
+        'from(bucket: params.bucket)',
+        '  |> range(start: params.start, stop: params.stop)',
+        '  |> filter(fn: (r) => r._measurement == params.measurement)'
+    ]
+    
+    for n, (tag, value) in enumerate((filters or {}).items()):
+        if not _IDENTIFIER.match(tag):
+            raise ValueError(f"Invalid tag key {tag!r}")
+        name = f"filter{n}"
+        if isinstance(value, (list, tuple, set)):
+            params[name] = [str(item) for item in value]
+            lines.append(f'  |> filter(fn: (r) => contains(value: r["{tag}"], set: params.{name}))')
+        else:
+            params[name] = str(value)
+            lines.append(f'  |> filter(fn: (r) => r["{tag}"] == params.{name})')
+    
+    if fields:
+        params['fields'] = list(fields)
+        lines.append('  |> filter(fn: (r) => contains(value: r._field, set: params.fields))')
+    
+    if window is not None:
+        params['every'] = window
+        lines.append(f'  |> aggregateWindow(every: params.every, fn: {aggregate}, createEmpty: false)')
+    
+    if pivot:
+        lines.append('  |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")')
+    
+    if limit is not None:
+        params['limit'] = int(limit)
+        params['offset'] = int(offset)
+        lines.append('  |> group()')
+        lines.append('  |> sort(columns: ["_time"])')
+        lines.append('  |> limit(n: params.limit, offset: params.offset)')
+    
+    return '\n'.join(lines), params
+
+class SpillLog:
+    """
+    💽 Append-only file of line-protocol chunks awaiting delivery.
+    
+    Each chunk is stored as (payload length, point count, payload). A torn
+    trailing chunk from a crash is ignored on read and cut on the next append.
+    """
+    
+    CHUNK_HEADER = struct.Struct('<II')
+    
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open (or create) a spill file.
+        
+        Args:
+            path: Spill file path
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        
+        # Offset of the first chunk not yet replayed
+        self.offset = 0
+        self.points = 0
+        
+        with self._lock:
+            self.size = self._valid_size()
+            if self.path.exists() and self.path.stat().st_size > self.size:
+                with open(self.path, 'r+b') as f:
+                    f.truncate(self.size)
+            self.points = sum(count for _, count, _ in self._iter_chunks(0, self.size))
+    
+    def __bool__(self) -> bool:
+        return self.size > self.offset
+    
+    def append(self, payload: bytes, count: int):
+        """Append one chunk and force it to disk."""
+        with self._lock:
+            with open(self.path, 'ab') as f:
+                f.write(self.CHUNK_HEADER.pack(len(payload), count) + payload)
+                f.flush()
+                os.fsync(f.fileno())
+            self.size += self.CHUNK_HEADER.size + len(payload)
+            self.points += count
+    
+    def read_batch(self, max_points: int) -> tuple:
+        """
+        Read the oldest undelivered chunks.
+        
+        Args:
+            max_points: Stop after this many points (at least one chunk is read)
+        
+        Returns:
+            (payload bytes, point count, end offset)
+        """
+        with self._lock:
+            size = self.size
+        
+        payloads, points, end = [], 0, self.offset
+        for chunk_end, count, payload in self._iter_chunks(self.offset, size):
+            payloads.append(payload)
+            points += count
+            end = chunk_end
+            if points >= max_points:
+                break
+        return b'\n'.join(payloads), points, end
+    
+    def commit(self, end: int, count: int):
+        """Mark chunks up to an offset as delivered, truncating the file once drained."""
+        with self._lock:
+            self.offset = end
+            self.points -= count
+            if self.offset >= self.size:
+                with open(self.path, 'wb'):
+                    pass
+                self.offset = self.size = self.points = 0
+    
+    def _valid_size(self) -> int:
+        """Get the length of the file covered by complete chunks."""
+        if not self.path.exists():
+            return 0
+        end = 0
+        for end, _, _ in self._iter_chunks(0, self.path.stat().st_size):
+            pass
+        return end
+    
+    def _iter_chunks(self, start: int, stop: int):
+        """Yield (end offset, count, payload) for complete chunks in [start, stop)."""
+        if stop <= start or not self.path.exists():
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            position = start
+            while position + self.CHUNK_HEADER.size <= stop:
+                length, count = self.CHUNK_HEADER.unpack(f.read(self.CHUNK_HEADER.size))
+                if position + self.CHUNK_HEADER.size + length > stop:
+                    return
+                payload = f.read(length)
+                position += self.CHUNK_HEADER.size + length
+                yield position, count, payload
+
+class AsyncLineWriter:
+    """
+    📮 Background delivery of line-protocol chunks.
+    
+    Producers only enqueue. A dedicated worker batches chunks, writes them
+    with exponential-backoff retries and, when delivery keeps failing,
+    appends them to a SpillLog. While the spill log holds data every new
+    batch goes behind it, and the log is replayed oldest-first once writes
+    succeed again, so an outage loses nothing and keeps write order.
+    
+    Batches InfluxDB rejects for their content (4xx) are never retried;
+    they are appended to a dead-letter file next to the spill log so one
+    bad point cannot wedge delivery.
+    """
+    
+    _STOP = object()
+    
+    def __init__(self,
+                 send: Callable[[bytes, int], None],
+                 spill_path: Union[str, Path],
+                 batch_size: int = 1000,
+                 flush_interval: float = 1.0,
+                 max_queue_chunks: int = 10000,
+                 max_retries: int = 3,
+                 retry_base_delay: float = 0.5,
+                 max_retry_delay: float = 30.0):
+        """
+        Initialize and start the writer.
+        
+        Args:
+            send: Callable writing (payload, point count); raises on failure
+            spill_path: Spill file for undeliverable chunks
+            batch_size: Points per write
+            flush_interval: Maximum seconds a chunk waits for a full batch
+            max_queue_chunks: In-memory queue bound (overflow goes to the spill file)
+            max_retries: Retries per batch before it is spilled
+            retry_base_delay: First retry delay in seconds (doubles per attempt)
+            max_retry_delay: Cap for retry and replay delays
+        """
+        self.send = send
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.max_retry_delay = max_retry_delay
+        
+        self.spill = SpillLog(spill_path)
+        self.rejected_path = self.spill.path.with_suffix('.rejected')
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_queue_chunks))
+        self._queued_points = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        
+        # Replay backoff while the spill log is non-empty
+        self._replay_delay = retry_base_delay
+        self._next_replay_at = 0.0
+        
+        # Statistics
+        self.points_sent = 0
+        self.writes = 0
+        self.retries = 0
+        self.failed_writes = 0
+        self.points_spilled = 0
+        self.points_replayed = 0
+        self.points_rejected = 0
+        self.rejected_batches = 0
+        self.overflow_chunks = 0
+        self.last_error: Optional[str] = None
+        
+        if self.spill:
+            logger.warning(f"💽 {self.spill.points} spilled points pending replay from {self.spill.path}")
+        
+        self._thread = threading.Thread(target=self._run, daemon=True, name="InfluxDBWriter")
+        self._thread.start()
+    
+    def submit(self, payload: bytes, count: int):
+        """Queue a chunk for delivery (never waits for the network)."""
+        if not self._thread.is_alive():
+            # Writer already closed: keep the chunk for the next start
+            self._spill(payload, count)
+            return
+        try:
+            self._queue.put_nowait((payload, count))
+            with self._lock:
+                self._queued_points += count
+        except queue.Full:
+            # Memory bound reached: keep the chunk on disk instead
+            self.spill.append(payload, count)
+            with self._lock:
+                self.overflow_chunks += 1
+                self.points_spilled += count
+    
+    def flush(self, timeout: float = 30.0) -> bool:
+        """
+        Wait until everything queued so far has been written or spilled.
+        
+        Returns:
+            True if the queue was drained within the timeout
+        """
+        if not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+    
+    def close(self, timeout: float = 30.0):
+        """Drain the queue (spilling what cannot be written) and stop the worker."""
+        if self._thread.is_alive():
+            # Abort in-flight retry waits; remaining batches get one attempt each
+            self._stop_event.set()
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+    
+    def _run(self):
+        """Worker loop: batch, write, spill and replay."""
+        pending: List[bytes] = []
+        pending_points = 0
+        batch_started = 0.0
+        
+        while True:
+            # Block until the next item when no batch deadline or replay is due
+            wait = None
+            if pending:
+                wait = max(0.0, batch_started + self.flush_interval - time.time())
+            if self.spill:
+                replay_wait = max(0.0, self._next_replay_at - time.time())
+                wait = replay_wait if wait is None else min(wait, replay_wait)
+            
+            try:
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:
+                item = None
+            
+            if item is self._STOP or isinstance(item, threading.Event):
+                if pending:
+                    self._deliver(b'\n'.join(pending), pending_points, final=item is self._STOP)
+                    pending, pending_points = [], 0
+                if item is self._STOP:
+                    return
+                item.set()
+                continue
+            
+            if item is not None:
+                payload, count = item
+                with self._lock:
+                    self._queued_points -= count
+                if not pending:
+                    batch_started = time.time()
+                pending.append(payload)
+                pending_points += count
+            
+            if pending and (pending_points >= self.batch_size or time.time() - batch_started >= self.flush_interval):
+                self._deliver(b'\n'.join(pending), pending_points)
+                pending, pending_points = [], 0
+            
+            if self.spill and time.time() >= self._next_replay_at:
+                self._replay()
+    
+    def _deliver(self, payload: bytes, count: int, final: bool = False):
+        """Write one batch with retries, spilling it if delivery fails."""
+        if self.spill:
+            # Keep order: nothing overtakes data already waiting on disk
+            self._spill(payload, count)
+            return
+        
+        attempts = 1 if final else self.max_retries + 1
+        delay = self.retry_base_delay
+        for attempt in range(attempts):
+            if attempt:
+                self.retries += 1
+                if self._stop_event.wait(delay):
+                    break
+                delay = min(delay * 2, self.max_retry_delay)
+            if self._try_send(payload, count):
+                return
+        
+        self._spill(payload, count)
+        self._next_replay_at = time.time() + self._replay_delay
+    
+    def _try_send(self, payload: bytes, count: int) -> bool:
+        """
+        Attempt one write.
+        
+        Returns:
+            True once the batch is settled (written or dead-lettered),
+            False if it should be retried
+        """
+        try:
+            self.send(payload, count)
+            self.points_sent += count
+            self.writes += 1
+            return True
+        except Exception as e:
+            self.failed_writes += 1
+            self.last_error = str(e)
+            status = _rejection_status(e)
+            if status is not None and self._reject(payload, count, status):
+                return True
+            logger.warning(f"⚠️ InfluxDB write failed ({count} points): {e}")
+            return False
+    
+    def _reject(self, payload: bytes, count: int, status: int) -> bool:
+        """Move a batch InfluxDB will never accept to the dead-letter file."""
+        try:
+            with open(self.rejected_path, 'ab') as f:
+                f.write(payload + b'\n')
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            logger.error(f"🔴 Failed to dead-letter rejected InfluxDB batch: {e}")
+            return False
+        
+        self.points_rejected += count
+        self.rejected_batches += 1
+        logger.error(f"🔴 InfluxDB rejected {count} points (HTTP {status}), "
+                     f"moved to {self.rejected_path}: {self.last_error}")
+        return True
+    
+    def _spill(self, payload: bytes, count: int):
+        """Append a batch to the spill file."""
+        self.spill.append(payload, count)
+        self.points_spilled += count
+        logger.debug(f"💽 Spilled {count} points to {self.spill.path}")
+    
+    def _replay(self):
+        """Replay spilled batches oldest-first until one fails."""
+        while self.spill:
+            payload, count, end = self.spill.read_batch(self.batch_size)
+            if not self._try_send(payload, count):
+                self._replay_delay = min(self._replay_delay * 2, self.max_retry_delay)
+                self._next_replay_at = time.time() + self._replay_delay
+                return
+            self.spill.commit(end, count)
+            self.points_replayed += count
+        
+        self._replay_delay = self.retry_base_delay
+        logger.info("✅ InfluxDB spill replay complete")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get writer statistics."""
+        with self._lock:
+            queued_points = self._queued_points
+        return {
+            'queue_depth': self._queue.qsize(),
+            'queued_points': queued_points,
+            'points_sent': self.points_sent,
+            'writes': self.writes,
+            'retries': self.retries,
+            'failed_writes': self.failed_writes,
+            'points_spilled': self.points_spilled,
+            'points_replayed': self.points_replayed,
+            'points_rejected': self.points_rejected,
+            'rejected_batches': self.rejected_batches,
+            'spill_pending_points': self.spill.points,
+            'spill_bytes': self.spill.size - self.spill.offset,
+            'overflow_chunks': self.overflow_chunks,
+            'last_error': self.last_error
+        }
 
 class InfluxDBSink:
     """
@@ -114,7 +724,12 @@ class InfluxDBSink:
                  flush_interval: int = 60,
                  max_retries: int = 3,
                  enable_compression: bool = True,
-                 enable_batching: bool = True):
+                 enable_batching: bool = True,
+                 integer_counts: bool = False,
+                 max_queue_chunks: int = 10000,
+                 spill_path: str = "data/spill/influxdb.spill",
+                 retry_base_delay: float = 0.5,
+                 max_retry_delay: float = 30.0):
         """
         Initialize InfluxDB storage backend.
         
@@ -126,9 +741,14 @@ class InfluxDBSink:
             timeout: Request timeout in milliseconds
             batch_size: Maximum points per batch
             flush_interval: Flush interval in seconds
-            max_retries: Maximum retry attempts
+            max_retries: Maximum retry attempts per batch before it is spilled
             enable_compression: Enable gzip compression
-            enable_batching: Enable write batching
+            enable_batching: Enable write batching (otherwise every chunk is written on its own)
+            integer_counts: Write volume/OI as integer fields (new buckets only)
+            max_queue_chunks: In-memory writer queue bound (overflow is spilled to disk)
+            spill_path: Append-only file holding undelivered points
+            retry_base_delay: First retry delay in seconds (doubles per attempt)
+            max_retry_delay: Cap for retry and replay delays in seconds
         """
         if not INFLUXDB_AVAILABLE:
             raise ImportError("InfluxDB client not available. Install with: pip install influxdb-client")
@@ -147,19 +767,14 @@ class InfluxDBSink:
         # Statistics
         self.stats = InfluxDBStats()
         
-        # Buffering
-        self._write_buffer = WriteBuffer(max_size=batch_size, max_age_seconds=flush_interval)
-        self._buffer_lock = threading.RLock()
+        # Line-protocol rendering for option chains
+        self._serializer = LineProtocolSerializer(integer_counts=integer_counts)
         
         # Client and write API
         self._client: Optional[InfluxDBClient] = None
         self._write_api = None
         self._query_api = None
         
-        # Background flushing
-        self._flush_thread: Optional[threading.Thread] = None
-        self._stop_flushing = threading.Event()
-        
         # Connection state
         self._connected = False
         self._last_health_check = 0
@@ -168,9 +783,17 @@ class InfluxDBSink:
         # Initialize connection
         self._initialize_connection()
         
-        # Start background flushing if batching is enabled
-        if enable_batching:
-            self._start_background_flushing()
+        # Background writer: producers enqueue, one worker talks to InfluxDB
+        self._writer = AsyncLineWriter(
+            send=self._send_lines,
+            spill_path=spill_path,
+            batch_size=batch_size if enable_batching else 1,
+            flush_interval=flush_interval if enable_batching else 0.0,
+            max_queue_chunks=max_queue_chunks,
+            max_retries=max_retries,
+            retry_base_delay=retry_base_delay,
+            max_retry_delay=max_retry_delay
+        )
         
         logger.info("🕸️ InfluxDB storage backend initialized")
         logger.info(f"🔗 URL: {url}, Org: {org}, Bucket: {bucket}")
@@ -189,22 +812,8 @@ class InfluxDBSink:
                 enable_gzip=self.enable_compression
             )
             
-            # Configure write options
-            write_options = WriteOptions(
-                batch_size=self.batch_size,
-                flush_interval=self.flush_interval * 1000,  # Convert to milliseconds
-                jitter_interval=2000,
-                retry_interval=5000,
-                max_retries=self.max_retries,
-                max_retry_delay=30000,
-                exponential_base=2
-            )
-            
-            # Create write API
-            if self.enable_batching:
-                self._write_api = self._client.write_api(write_options=write_options)
-            else:
-                self._write_api = self._client.write_api(write_options=SYNCHRONOUS)
+            # Create write API (synchronous: batching and retries live in AsyncLineWriter)
+            self._write_api = self._client.write_api(write_options=SYNCHRONOUS)
             
             # Create query API
             self._query_api = self._client.query_api()
@@ -260,23 +869,26 @@ class InfluxDBSink:
             
             timestamp = timestamp or datetime.now()
             
-            # Ensure options_data is a list
-            if isinstance(options_data, dict):
-                options_data = [options_data]
-            
-            if not options_data:
-                logger.warning("⚠️ No options data to store")
-                return True
-            
-            # Convert data to InfluxDB points
-            points = self._create_options_points(index_name, options_data, timestamp)
+            # Render the whole chain to line protocol (snapshots stay columnar)
+            if hasattr(options_data, 'to_records'):
+                if len(options_data) == 0:
+                    logger.warning("⚠️ No options data to store")
+                    return True
+                payload, count = self._serializer.serialize_snapshot(options_data, timestamp)
+            else:
+                if isinstance(options_data, dict):
+                    options_data = [options_data]
+                if not options_data:
+                    logger.warning("⚠️ No options data to store")
+                    return True
+                payload, count = self._serializer.serialize_records(index_name, options_data, timestamp)
             
-            if not points:
+            if not count:
                 logger.warning("⚠️ No valid points created from options data")
                 return False
             
             # Write points
-            return self._write_points(points)
+            return self._write_lines(payload, count)
             
         except Exception as e:
             logger.error(f"🔴 Failed to store options data for {index_name}: {e}")
@@ -312,64 +924,13 @@ class InfluxDBSink:
                 logger.warning("⚠️ No valid overview point created")
                 return False
             
-            return self._write_points([point])
+            return self._write_lines(point.to_line_protocol().encode('utf-8'), 1)
             
         except Exception as e:
             logger.error(f"🔴 Failed to store overview data for {index_name}: {e}")
             self.stats.write_errors += 1
             return False
     
-    def _create_options_points(self,
-                              index_name: str,
-                              options_data: List[Dict[str, Any]],
-                              timestamp: datetime) -> List[Point]:
-        """Create InfluxDB points from options data."""
-        points = []
-        
-        for option in options_data:
-            try:
-                # Create point with measurement name
-                point = Point("options_data")
-                
-                # Add timestamp
-                point.time(timestamp, WritePrecision.S)
-                
-                # Add tags (indexed fields)
-                point.tag("index_name", index_name)
-                point.tag("symbol", option.get("symbol", ""))
-                point.tag("option_type", option.get("option_type", ""))
-                point.tag("strike", str(option.get("strike", 0)))
-                point.tag("expiry", option.get("expiry", ""))
-                
-                # Add fields (non-indexed data)
-                numeric_fields = [
-                    'last_price', 'volume', 'oi', 'change', 'pchange',
-                    'iv', 'delta', 'gamma', 'theta', 'vega', 'bid', 'ask'
-                ]
-                
-                for field in numeric_fields:
-                    value = option.get(field)
-                    if value is not None and self._is_numeric(value):
-                        point.field(field, float(value))
-                
-                # Add string fields
-                string_fields = ['tradingsymbol', 'exchange', 'segment']
-                for field in string_fields:
-                    value = option.get(field)
-                    if value is not None:
-                        point.field(field, str(value))
-                
-                # Add metadata
-                point.field("data_source", "g6_platform")
-                point.field("collection_timestamp", timestamp.isoformat())
-                
-                points.append(point)
-                
-            except Exception as e:
-                logger.warning(f"⚠️ Failed to create point for option {option}: {e}")
-        
-        return points
-    
     def _create_overview_point(self,
                               index_name: str,
                               overview_data: Dict[str, Any],
@@ -419,103 +980,80 @@ class InfluxDBSink:
             logger.warning(f"⚠️ Failed to create overview point: {e}")
             return None
     
-    def _write_points(self, points: List[Point]) -> bool:
-        """Write points to InfluxDB with proper error handling."""
+    def _write_lines(self, payload: bytes, count: int) -> bool:
+        """Hand line-protocol data to the background writer (never blocks on the network)."""
         try:
-            if not points:
-                return True
-            
-            if self.enable_batching:
-                # Add to buffer
-                with self._buffer_lock:
-                    for point in points:
-                        self._write_buffer.add_point(point)
-                    
-                    # Flush if buffer is full
-                    if self._write_buffer.should_flush():
-                        return self._flush_buffer()
-                
-                return True  # Buffered successfully
-            else:
-                # Write immediately
-                return self._write_points_immediate(points)
-                
+            if count:
+                self._writer.submit(payload, count)
+            return True
         except Exception as e:
-            logger.error(f"🔴 Failed to write points: {e}")
+            logger.error(f"🔴 Failed to queue points: {e}")
             self.stats.write_errors += 1
             return False
     
-    def _write_points_immediate(self, points: List[Point]) -> bool:
-        """Write points immediately to InfluxDB."""
+    def write_line_protocol(self, payload: bytes, count: int) -> bool:
+        """
+        Queue pre-rendered line-protocol points (second precision).
+        
+        Args:
+            payload: Newline-separated line-protocol bytes
+            count: Number of points in the payload
+        
+        Returns:
+            True if queued
+        """
+        return self._write_lines(payload, count)
+    
+    def delete_data(self, measurement: str, start_time: datetime, end_time: datetime) -> bool:
+        """
+        Delete a measurement's points in a time range.
+        
+        Args:
+            measurement: Measurement name
+            start_time: Range start
+            end_time: Range stop
+        
+        Returns:
+            True if successful
+        """
         try:
-            start_time = time.time()
+            if not self._connected:
+                return False
             
-            # Write points
-            self._write_api.write(
-                bucket=self.bucket,
-                org=self.org,
-                record=points
+            self._client.delete_api().delete(
+                start_time, end_time, f'_measurement="{measurement}"',
+                bucket=self.bucket, org=self.org
             )
-            
-            # Update statistics
-            write_time = time.time() - start_time
-            self.stats.points_written += len(points)
-            self.stats.write_operations += 1
-            self.stats.last_write_time = datetime.now()
-            
-            logger.debug(f"✅ Wrote {len(points)} points in {write_time:.3f}s")
             return True
-            
-        except InfluxDBError as e:
-            logger.error(f"🔴 InfluxDB write error: {e}")
-            self.stats.write_errors += 1
-            self.stats.connection_errors += 1
-            return False
+        
         except Exception as e:
-            logger.error(f"🔴 Unexpected write error: {e}")
-            self.stats.write_errors += 1
+            logger.error(f"🔴 Failed to delete {measurement} data: {e}")
             return False
     
-    def _flush_buffer(self) -> bool:
-        """Flush write buffer to InfluxDB."""
+    def _send_lines(self, payload: bytes, count: int):
+        """Write line-protocol data through the raw write API (called by the writer thread)."""
+        start_time = time.time()
         try:
-            with self._buffer_lock:
-                if not self._write_buffer.points:
-                    return True
-                
-                points_to_write = self._write_buffer.points.copy()
-                self._write_buffer.clear()
-            
-            # Write buffered points
-            success = self._write_points_immediate(points_to_write)
-            
-            if success:
-                logger.debug(f"🚽 Flushed {len(points_to_write)} points from buffer")
-            
-            return success
-            
+            self._write_api.write(
+                bucket=self.bucket,
+                org=self.org,
+                record=payload,
+                write_precision=WritePrecision.S
+            )
         except Exception as e:
-            logger.error(f"🔴 Buffer flush failed: {e}")
-            return False
-    
-    def _start_background_flushing(self):
-        """Start background flushing thread."""
-        def flush_worker():
-            while not self._stop_flushing.wait(self.flush_interval):
-                try:
-                    with self._buffer_lock:
-                        if self._write_buffer.should_flush():
-                            self._flush_buffer()
-                except Exception as e:
-                    logger.error(f"🔴 Background flush error: {e}")
-        
-        self._flush_thread = threading.Thread(
-            target=flush_worker,
-            daemon=True,
-            name="InfluxDBFlush"
-        )
-        self._flush_thread.start()
-        logger.info("🔄 Background flushing thread started")
+            self.stats.write_errors += 1
+            if _rejection_status(e) is None:
+                self.stats.connection_errors += 1
+            raise
+        
+        # Update statistics
+        write_time = time.time() - start_time
+        self.stats.points_written += count
+        self.stats.bytes_written += len(payload)
+        self.stats.write_operations += 1
+        self.stats.last_write_time = datetime.now()
+        
+        logger.debug(f"✅ Wrote {count} points ({len(payload):,} bytes) in {write_time:.3f}s")
     
     def _is_numeric(self, value: Any) -> bool:
         """Check if value is numeric."""
@@ -525,11 +1063,9 @@ class InfluxDBSink:
         except (ValueError, TypeError):
             return False
     
-    def flush(self) -> bool:
-        """Manually flush any buffered data."""
-        if self.enable_batching:
-            return self._flush_buffer()
-        return True
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Wait until queued data has been written (or spilled to disk)."""
+        return self._writer.flush(timeout)
     
     def query_data(self,
                   measurement: str,
@@ -537,7 +1073,10 @@ class InfluxDBSink:
                   end_time: Optional[datetime] = None,
                   filters: Dict[str, str] = None) -> List[Dict[str, Any]]:
         """
-        Query data from InfluxDB.
+        Query data from InfluxDB (one record per field value).
+        
+        Prefer query_frame()/iter_query() for larger ranges; they return one
+        pivoted row per timestamp and series instead of a dict per field.
         
         Args:
             measurement: Measurement name (options_data, market_overview)
@@ -553,22 +1092,10 @@ class InfluxDBSink:
                 logger.error("🔴 InfluxDB not connected")
                 return []
             
-            end_time = end_time or datetime.now()
-            
-            # Build query
-            query = f'''
-                from(bucket: "{self.bucket}")
-                |> range(start: {start_time.isoformat()}, stop: {end_time.isoformat()})
-                |> filter(fn: (r) => r._measurement == "{measurement}")
-            '''
-            
-            # Add filters
-            if filters:
-                for tag, value in filters.items():
-                    query += f'\n|> filter(fn: (r) => r.{tag} == "{value}")'
-            
-            # Execute query
-            result = self._query_api.query(query, org=self.org)
+            query, params = build_flux_query(
+                self.bucket, measurement, start_time, end_time, filters=filters, pivot=False
+            )
+            result = self._query_api.query(query, org=self.org, params=params)
             
             # Process results
             records = []
@@ -588,10 +1115,120 @@ class InfluxDBSink:
             logger.error(f"🔴 Query failed: {e}")
             return []
     
+    def iter_query(self,
+                   measurement: str,
+                   start_time: datetime,
+                   end_time: Optional[datetime] = None,
+                   filters: Optional[Dict[str, Any]] = None,
+                   fields: Optional[List[str]] = None,
+                   window: Optional[timedelta] = None,
+                   aggregate: str = 'last',
+                   pivot: bool = True,
+                   chunk_rows: int = 50000,
+                   as_numpy: bool = False):
+        """
+        Stream query results in bounded chunks.
+        
+        Results are parsed from the server's CSV stream straight into
+        DataFrames, so memory stays proportional to chunk_rows rather than
+        to the queried range.
+        
+        Args:
+            measurement: Measurement name
+            start_time: Start time for query
+            end_time: End time for query (uses now if None)
+            filters: Tag filters (list values match any item)
+            fields: Fields to return (all if None)
+            window: Server-side aggregation window (raw points if None)
+            aggregate: Aggregate function per window
+            pivot: One row per timestamp/series with fields as columns
+            chunk_rows: Maximum rows per yielded chunk
+            as_numpy: Yield {column: ndarray} dicts instead of DataFrames
+        
+        Yields:
+            pandas DataFrame (or dict of NumPy arrays) with at most chunk_rows rows
+        """
+        _require_pandas()
+        if not self._connected:
+            raise ConnectionError("InfluxDB not connected")
+        
+        query, params = build_flux_query(
+            self.bucket, measurement, start_time, end_time, filters=filters, fields=fields,
+            window=window, aggregate=aggregate, pivot=pivot
+        )
+        stream = self._query_api.query_data_frame_stream(query, org=self.org, params=params)
+        for chunk in _rechunk((_clean_frame(frame) for frame in stream), chunk_rows):
+            yield _frame_to_arrays(chunk) if as_numpy else chunk
+    
+    def query_frame(self,
+                    measurement: str,
+                    start_time: datetime,
+                    end_time: Optional[datetime] = None,
+                    filters: Optional[Dict[str, Any]] = None,
+                    fields: Optional[List[str]] = None,
+                    window: Optional[timedelta] = None,
+                    aggregate: str = 'last',
+                    pivot: bool = True,
+                    limit: Optional[int] = None,
+                    offset: int = 0) -> 'pd.DataFrame':
+        """
+        Query into a single DataFrame.
+        
+        Args:
+            measurement: Measurement name
+            start_time: Start time for query
+            end_time: End time for query (uses now if None)
+            filters: Tag filters (list values match any item)
+            fields: Fields to return (all if None)
+            window: Server-side aggregation window (raw points if None)
+            aggregate: Aggregate function per window
+            pivot: One row per timestamp/series with fields as columns
+            limit: Page size (rows sorted by time; all rows if None)
+            offset: Rows to skip before the page
+        
+        Returns:
+            pandas DataFrame (empty on error)
+        """
+        _require_pandas()
+        try:
+            if not self._connected:
+                logger.error("🔴 InfluxDB not connected")
+                return pd.DataFrame()
+            
+            query, params = build_flux_query(
+                self.bucket, measurement, start_time, end_time, filters=filters, fields=fields,
+                window=window, aggregate=aggregate, pivot=pivot, limit=limit, offset=offset
+            )
+            result = self._query_api.query_data_frame(query, org=self.org, params=params)
+            
+            # The client returns a list when result tables have different schemas
+            frames = result if isinstance(result, list) else [result]
+            frames = [_clean_frame(frame) for frame in frames if not frame.empty]
+            if not frames:
+                return pd.DataFrame()
+            return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
+        
+        except Exception as e:
+            logger.error(f"🔴 Query failed: {e}")
+            return pd.DataFrame()
+    
+    def query_arrays(self, measurement: str, start_time: datetime, **kwargs) -> Dict[str, np.ndarray]:
+        """
+        Query into NumPy columns.
+        
+        Args:
+            measurement: Measurement name
+            start_time: Start time for query
+            **kwargs: Same options as query_frame()
+        
+        Returns:
+            Dictionary of column name to NumPy array
+        """
+        return _frame_to_arrays(self.query_frame(measurement, start_time, **kwargs))
+    
     def get_storage_stats(self) -> Dict[str, Any]:
         """Get storage statistics."""
-        with self._buffer_lock:
-            buffered_points = len(self._write_buffer.points)
+        writer_stats = self._writer.get_stats()
         
         return {
             'points_written': self.stats.points_written,
@@ -599,12 +1236,19 @@ class InfluxDBSink:
             'write_errors': self.stats.write_errors,
             'success_rate': self.stats.success_rate,
             'average_points_per_write': self.stats.average_points_per_write,
+            'bytes_written': self.stats.bytes_written,
             'connection_errors': self.stats.connection_errors,
-            'retry_operations': self.stats.retry_operations,
+            'retry_operations': writer_stats['retries'],
             'last_write_time': self.stats.last_write_time.isoformat() if self.stats.last_write_time else None,
             'connected': self._connected,
             'batching_enabled': self.enable_batching,
-            'buffered_points': buffered_points,
+            'buffered_points': writer_stats['queued_points'],
+            'queue_depth': writer_stats['queue_depth'],
+            'points_spilled': writer_stats['points_spilled'],
+            'points_replayed': writer_stats['points_replayed'],
+            'points_rejected': writer_stats['points_rejected'],
+            'spill_pending_points': writer_stats['spill_pending_points'],
+            'spill_bytes': writer_stats['spill_bytes'],
             'bucket': self.bucket,
             'org': self.org
         }
@@ -640,13 +1284,8 @@ class InfluxDBSink:
     def cleanup(self):
         """Cleanup resources."""
         try:
-            # Stop background flushing
-            if self._flush_thread and self._flush_thread.is_alive():
-                self._stop_flushing.set()
-                self._flush_thread.join(timeout=5)
-            
-            # Flush any remaining data
-            self.flush()
+            # Drain the writer; anything InfluxDB does not accept stays in the spill file
+            self._writer.close()
             
             # Close client
             if self._client:
@@ -657,9 +1296,44 @@ class InfluxDBSink:
         except Exception as e:
             logger.error(f"🔴 Cleanup error: {e}")
     
+    def shutdown(self):
+        """Shutdown InfluxDB storage backend."""
+        self.cleanup()
+    
     def __del__(self):
         """Destructor to ensure cleanup."""
         try:
             self.cleanup()
         except Exception:
-            pass
\ No newline at end of file
+            pass
+
+def _require_pandas():
+    """Raise ImportError when the DataFrame query API is used without pandas."""
+    if not PANDAS_AVAILABLE:
+        raise ImportError("pandas not available. Install with: pip install pandas")
+
+def _clean_frame(frame: 'pd.DataFrame') -> 'pd.DataFrame':
+    """Drop Flux bookkeeping columns and expose _time/_field/_value under plain names."""
+    frame = frame.drop(columns=[c for c in FLUX_META_COLUMNS if c in frame.columns])
+    return frame.rename(columns={'_time': 'time', '_field': 'field', '_value': 'value'})
+
+def _rechunk(frames, chunk_rows: int):
+    """Regroup a stream of DataFrames into chunks of at most chunk_rows rows."""
+    chunk_rows = max(1, chunk_rows)
+    pending: List['pd.DataFrame'] = []
+    pending_rows = 0
+    for frame in frames:
+        while len(frame):
+            take = frame.iloc[:chunk_rows - pending_rows]
+            frame = frame.iloc[len(take):]
+            pending.append(take)
+            pending_rows += len(take)
+            if pending_rows >= chunk_rows:
+                yield pd.concat(pending, ignore_index=True)
+                pending, pending_rows = [], 0
+    if pending:
+        yield pd.concat(pending, ignore_index=True)
+
+def _frame_to_arrays(frame: 'pd.DataFrame') -> Dict[str, np.ndarray]:
+    """Convert a DataFrame to a dictionary of NumPy columns."""
+    return {column: frame[column].to_numpy() for column in frame.columns}
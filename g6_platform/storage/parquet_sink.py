@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧱 Parquet Storage Backend - G6 Platform v3.0
+Columnar option chain storage with partitioned Parquet files.
+
+Collection cycles are converted to Arrow batches straight from ChainSnapshot
+columns and written as large row groups into files partitioned by index,
+date and expiry, so analysis can load typed columns directly instead of
+parsing text CSVs.
+
+Features:
+- Hive-style partitions: index=<INDEX>/date=<YYYY-MM-DD>/expiry=<YYYY-MM-DD>
+- Typed numeric columns and dictionary-encoded symbol/type columns
+- Cycles buffered into large row groups (tiny per-cycle groups read slowly)
+- File roll-over by size or age (in-progress files are hidden until closed)
+- Reader API with partition pruning and predicate pushdown
+"""
+
+import os
+import logging
+import threading
+import time
+from datetime import datetime, date
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union, Tuple
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# PyArrow imports
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.dataset as ds
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+    pq = None
+    ds = None
+
+from ..core.chain_snapshot import ChainSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Numeric snapshot columns written as float64 (volume/OI are stored as int64)
+FLOAT_FIELDS = ('strike', 'last_price', 'change', 'iv', 'delta', 'gamma', 'theta', 'vega', 'rho')
+INTEGER_FIELDS = ('volume', 'oi')
+
+# Filter operators accepted by ParquetSink.query()
+FILTER_OPERATORS = ('==', '!=', '<', '<=', '>', '>=', 'in')
+
+def options_schema() -> 'pa.Schema':
+    """Get the Arrow schema of the options files (partition keys excluded)."""
+    fields = [
+        pa.field('timestamp', pa.timestamp('ms')),
+        pa.field('symbol', pa.dictionary(pa.int32(), pa.string())),
+        pa.field('option_type', pa.dictionary(pa.int8(), pa.string())),
+        pa.field('instrument_token', pa.int64())
+    ]
+    fields.extend(pa.field(name, pa.float64()) for name in FLOAT_FIELDS)
+    fields.extend(pa.field(name, pa.int64()) for name in INTEGER_FIELDS)
+    return pa.schema(fields)
+
+@dataclass
+class ParquetWriteStats:
+    """Parquet write statistics."""
+    rows_written: int = 0
+    row_groups_written: int = 0
+    files_created: int = 0
+    files_closed: int = 0
+    bytes_written: int = 0
+    write_errors: int = 0
+    write_time: float = 0.0
+    last_write_time: Optional[datetime] = None
+    
+    @property
+    def rows_per_second(self) -> float:
+        """Calculate write throughput in rows per second."""
+        return self.rows_written / self.write_time if self.write_time > 0 else 0.0
+
+@dataclass
+class PartitionWriter:
+    """Open writer for one partition file."""
+    writer: Any
+    temp_path: Path
+    final_path: Path
+    opened_at: float
+    last_write_at: float = 0.0
+    rows: int = 0
+    row_groups: int = 0
+    pending: List[Any] = field(default_factory=list)
+    pending_rows: int = 0
+    pending_bytes: int = 0
+
+class ParquetSink:
+    """
+    🧱 Parquet storage backend for option chains.
+    
+    Only the typed chain columns are stored (see options_schema()); other
+    per-leg fields remain available in the CSV backend.
+    """
+    
+    def __init__(self,
+                 base_path: Union[str, Path] = "data/parquet",
+                 compression: str = "zstd",
+                 max_file_size_mb: int = 128,
+                 roll_interval_minutes: int = 60,
+                 row_group_rows: int = 65536):
+        """
+        Initialize Parquet storage backend.
+        
+        Args:
+            base_path: Root directory of the partitioned dataset
+            compression: Parquet compression codec (zstd, snappy, gzip, none)
+            max_file_size_mb: Close a partition file once it grows past this size
+            roll_interval_minutes: Close a partition file after this many minutes (0 = never)
+            row_group_rows: Buffered rows per row group (cycles are batched until reached)
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("PyArrow not available. Install with: pip install pyarrow")
+        
+        self.base_path = Path(base_path).resolve()
+        self.compression = compression
+        self.max_file_size_bytes = max_file_size_mb * 1024 * 1024
+        self.roll_interval_seconds = roll_interval_minutes * 60
+        self.row_group_rows = max(1, row_group_rows)
+        
+        self.schema = options_schema()
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        
+        self._writers: Dict[Tuple[str, str, str], PartitionWriter] = {}
+        self._sequence = 0
+        self._lock = threading.RLock()
+        
+        self.stats = ParquetWriteStats()
+        
+        logger.info(f"🧱 Parquet storage backend initialized: {self.base_path} "
+                    f"(compression={compression}, roll={max_file_size_mb}MB/{roll_interval_minutes}min)")
+    
+    def store_options_data(self,
+                          index_name: str,
+                          options_data: Union[ChainSnapshot, List[Dict[str, Any]], Dict[str, Any]],
+                          timestamp: Optional[datetime] = None) -> bool:
+        """
+        Store one collection cycle (buffered into the partition's next row group).
+        
+        Args:
+            index_name: Index name (NIFTY, BANKNIFTY, etc.)
+            options_data: ChainSnapshot or legacy option records
+            timestamp: Optional timestamp (snapshot time, else current)
+        
+        Returns:
+            True if successful
+        """
+        try:
+            snapshot = options_data
+            if not isinstance(snapshot, ChainSnapshot):
+                records = [options_data] if isinstance(options_data, dict) else list(options_data or [])
+                snapshot = ChainSnapshot.from_records(records, index_name=index_name, timestamp=timestamp)
+            
+            if len(snapshot) == 0:
+                logger.warning("⚠️ No options data to store")
+                return True
+            
+            timestamp = timestamp or snapshot.timestamp or datetime.now()
+            start_time = time.perf_counter()
+            
+            table = self._build_table(snapshot, timestamp)
+            key = (index_name.upper(), timestamp.strftime('%Y-%m-%d'), str(snapshot.expiry or 'unknown'))
+            with self._lock:
+                self._close_stale_writers(key)
+                self._append_cycle(key, table)
+                
+                self.stats.rows_written += table.num_rows
+                self.stats.write_time += time.perf_counter() - start_time
+                self.stats.last_write_time = timestamp
+            
+            return True
+        
+        except Exception as e:
+            logger.error(f"🔴 Failed to store Parquet data for {index_name}: {e}")
+            with self._lock:
+                self.stats.write_errors += 1
+            return False
+    
+    def _build_table(self, snapshot: ChainSnapshot, timestamp: datetime) -> 'pa.Table':
+        """
+        Build an Arrow table from snapshot columns.
+        
+        Args:
+            snapshot: Chain snapshot
+            timestamp: Cycle timestamp
+        
+        Returns:
+            Arrow table matching self.schema
+        """
+        rows = len(snapshot)
+        arrays = [
+            pa.array(np.full(rows, np.datetime64(timestamp, 'ms'))),
+            pa.array(snapshot.symbol, type=pa.string()).dictionary_encode(),
+            pa.DictionaryArray.from_arrays(
+                pa.array((~snapshot.is_call).astype(np.int8)), pa.array(['CE', 'PE'])
+            ),
+            pa.array(snapshot.instrument_token, mask=snapshot.instrument_token < 0)
+        ]
+        for name in FLOAT_FIELDS:
+            arrays.append(pa.array(snapshot.columns[name], from_pandas=True))
+        for name in INTEGER_FIELDS:
+            values = snapshot.columns[name]
+            missing = np.isnan(values)
+            arrays.append(pa.array(np.where(missing, 0, values).astype(np.int64), mask=missing))
+        
+        return pa.Table.from_arrays(arrays, schema=self.schema)
+    
+    def _partition_dir(self, key: Tuple[str, str, str]) -> Path:
+        """Get the directory of a partition."""
+        index_name, date_str, expiry = key
+        return self.base_path / f"index={index_name}" / f"date={date_str}" / f"expiry={expiry}"
+    
+    def _append_cycle(self, key: Tuple[str, str, str], table: 'pa.Table'):
+        """Buffer a cycle for a partition, writing a row group once enough rows are pending."""
+        partition = self._writers.get(key)
+        if partition is not None and self._should_roll(partition):
+            self._close_writer(key)
+            partition = None
+        
+        if partition is None:
+            partition = self._open_writer(key)
+        
+        partition.last_write_at = time.time()
+        partition.pending.append(table)
+        partition.pending_rows += table.num_rows
+        partition.pending_bytes += table.get_total_buffer_size()
+        if partition.pending_rows >= self.row_group_rows:
+            self._write_pending(partition)
+    
+    def _close_stale_writers(self, key: Tuple[str, str, str]):
+        """
+        Close partitions that will not be written again.
+        
+        A new date or expiry for an index supersedes that index's other open
+        partitions, and partitions idle past the roll interval (e.g. an index
+        that stopped reporting) are closed so their rows become queryable.
+        """
+        now = time.time()
+        for open_key, partition in list(self._writers.items()):
+            if open_key == key:
+                continue
+            superseded = open_key[0] == key[0]
+            idle = self.roll_interval_seconds and now - partition.last_write_at >= self.roll_interval_seconds
+            if superseded or idle:
+                self._close_writer(open_key)
+    
+    def _write_pending(self, partition: PartitionWriter):
+        """Write a partition's buffered cycles as one row group."""
+        if not partition.pending_rows:
+            return
+        
+        table = pa.concat_tables(partition.pending)
+        partition.writer.write_table(table, row_group_size=table.num_rows)
+        partition.rows += table.num_rows
+        partition.row_groups += 1
+        partition.pending = []
+        partition.pending_rows = 0
+        partition.pending_bytes = 0
+        self.stats.row_groups_written += 1
+    
+    def _should_roll(self, partition: PartitionWriter) -> bool:
+        """Check whether a partition file is due for roll-over."""
+        if self.roll_interval_seconds and time.time() - partition.opened_at >= self.roll_interval_seconds:
+            return True
+        try:
+            return partition.temp_path.stat().st_size + partition.pending_bytes >= self.max_file_size_bytes
+        except OSError:
+            return False
+    
+    def _open_writer(self, key: Tuple[str, str, str]) -> PartitionWriter:
+        """Open a new in-progress file for a partition."""
+        directory = self._partition_dir(key)
+        directory.mkdir(parents=True, exist_ok=True)
+        
+        self._sequence += 1
+        name = f"part-{datetime.now().strftime('%H%M%S')}-{os.getpid()}-{self._sequence:04d}.parquet"
+        # Leading dot hides the file from dataset discovery until its footer is written
+        temp_path = directory / f".{name}"
+        
+        writer = pq.ParquetWriter(
+            str(temp_path), self.schema,
+            compression=self.compression,
+            use_dictionary=['symbol', 'option_type']
+        )
+        now = time.time()
+        partition = PartitionWriter(writer=writer, temp_path=temp_path, final_path=directory / name,
+                                    opened_at=now, last_write_at=now)
+        self._writers[key] = partition
+        self.stats.files_created += 1
+        
+        logger.debug(f"🧱 Opened Parquet file {directory.name}/{name}")
+        return partition
+    
+    def _close_writer(self, key: Tuple[str, str, str]):
+        """Close a partition file and publish it under its final name."""
+        partition = self._writers.pop(key, None)
+        if partition is None:
+            return
+        
+        try:
+            self._write_pending(partition)
+            partition.writer.close()
+            os.replace(partition.temp_path, partition.final_path)
+            
+            self.stats.files_closed += 1
+            self.stats.bytes_written += partition.final_path.stat().st_size
+            logger.debug(f"📦 Closed Parquet file {partition.final_path.name} "
+                         f"({partition.rows} rows, {partition.row_groups} row groups)")
+        except Exception as e:
+            logger.error(f"🔴 Failed to close Parquet file {partition.temp_path}: {e}")
+    
+    def flush(self) -> bool:
+        """
+        Close all open partition files so their rows become queryable.
+        
+        Returns:
+            True if successful
+        """
+        with self._lock:
+            for key in list(self._writers.keys()):
+                self._close_writer(key)
+        return True
+    
+    def query(self,
+              index_name: Optional[str] = None,
+              start_date: Optional[Union[str, date]] = None,
+              end_date: Optional[Union[str, date]] = None,
+              expiry: Optional[str] = None,
+              columns: Optional[List[str]] = None,
+              filters: Optional[List[Tuple[str, str, Any]]] = None,
+              as_pandas: bool = True):
+        """
+        Query closed partition files.
+        
+        Partition keys prune directories before any file is opened; the
+        remaining filters are pushed down to row-group statistics.
+        
+        Args:
+            index_name: Index name (all if None)
+            start_date: First date (inclusive, YYYY-MM-DD)
+            end_date: Last date (inclusive, YYYY-MM-DD)
+            expiry: Expiry date (YYYY-MM-DD)
+            columns: Columns to load (all if None)
+            filters: Column predicates as (column, operator, value) tuples
+            as_pandas: Return a pandas DataFrame instead of an Arrow table
+        
+        Returns:
+            pandas DataFrame or Arrow table with partition keys as columns
+        """
+        dataset = ds.dataset(
+            str(self.base_path), format='parquet',
+            partitioning=ds.partitioning(
+                pa.schema([('index', pa.string()), ('date', pa.string()), ('expiry', pa.string())]),
+                flavor='hive'
+            )
+        )
+        
+        conditions = []
+        if index_name:
+            conditions.append(ds.field('index') == index_name.upper())
+        if start_date:
+            conditions.append(ds.field('date') >= str(start_date))
+        if end_date:
+            conditions.append(ds.field('date') <= str(end_date))
+        if expiry:
+            conditions.append(ds.field('expiry') == expiry)
+        for column, operator, value in filters or []:
+            conditions.append(_filter_expression(column, operator, value))
+        
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        
+        table = dataset.to_table(columns=columns, filter=expression)
+        return table.to_pandas() if as_pandas else table
+    
+    def get_storage_stats(self) -> Dict[str, Any]:
+        """Get storage statistics."""
+        with self._lock:
+            return {
+                'rows_written': self.stats.rows_written,
+                'row_groups_written': self.stats.row_groups_written,
+                'files_created': self.stats.files_created,
+                'files_closed': self.stats.files_closed,
+                'open_files': len(self._writers),
+                'buffered_rows': sum(partition.pending_rows for partition in self._writers.values()),
+                'bytes_written': self.stats.bytes_written,
+                'write_errors': self.stats.write_errors,
+                'rows_per_sec': self.stats.rows_per_second,
+                'last_write_time': self.stats.last_write_time.isoformat() if self.stats.last_write_time else None,
+                'compression': self.compression
+            }
+    
+    def health_check(self) -> Dict[str, Any]:
+        """Perform health check."""
+        return {
+            'status': 'healthy' if self.base_path.exists() else 'unhealthy',
+            'base_path_exists': self.base_path.exists(),
+            'stats': self.get_storage_stats()
+        }
+    
+    def shutdown(self):
+        """Shutdown Parquet storage backend."""
+        self.flush()
+        logger.info("🧱 Parquet storage backend shutdown complete")
+
+def _filter_expression(column: str, operator: str, value: Any) -> 'ds.Expression':
+    """Build a dataset filter expression from a (column, operator, value) tuple."""
+    field = ds.field(column)
+    if operator == '==':
+        return field == value
+    if operator == '!=':
+        return field != value
+    if operator == '<':
+        return field < value
+    if operator == '<=':
+        return field <= value
+    if operator == '>':
+        return field > value
+    if operator == '>=':
+        return field >= value
+    if operator == 'in':
+        return field.isin(list(value))
+    raise ValueError(f"Unsupported filter operator {operator!r} (expected one of {FILTER_OPERATORS})")
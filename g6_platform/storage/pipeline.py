@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🚚 Storage Pipeline - G6 Platform v3.0
+Asynchronous fan-out of collected data to storage backends.
+
+Decouples collection from storage: each backend gets its own bounded queue
+and worker thread, so a slow InfluxDB write or CSV rotation never delays
+the next index's fetch.
+
+Features:
+- One worker thread per backend with a bounded queue
+- Back-pressure policies: block, drop_oldest, spill (to disk)
+- Ordered replay of spilled batches once the backend catches up
+- Per-backend queue depth and latency metrics
+- Drain-on-shutdown with timeout
+"""
+
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union, Tuple
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class BackendQueueStats:
+    """Per-backend pipeline statistics."""
+    enqueued: int = 0
+    stored: int = 0
+    failed: int = 0
+    dropped: int = 0
+    spilled: int = 0
+    replayed: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    last_latency: float = 0.0
+    
+    @property
+    def average_latency(self) -> float:
+        """Calculate average enqueue-to-stored latency."""
+        return self.total_latency / max(1, self.stored)
+
+class BackendWorker:
+    """
+    🚚 Queue and worker thread feeding a single storage backend.
+    """
+    
+    BACKPRESSURE_POLICIES = ('block', 'drop_oldest', 'spill')
+    
+    def __init__(self,
+                 name: str,
+                 backend: Any,
+                 max_queue_size: int = 100,
+                 backpressure_policy: str = 'block',
+                 block_timeout: float = 5.0,
+                 spill_dir: Union[str, Path] = "data/spill",
+                 metrics_system=None):
+        """
+        Initialize backend worker.
+        
+        Args:
+            name: Backend name (csv, influxdb, ...)
+            backend: Storage backend instance
+            max_queue_size: Maximum batches held in memory
+            backpressure_policy: block, drop_oldest or spill
+            block_timeout: Maximum time a producer blocks under the block policy
+            spill_dir: Directory for spilled batches
+            metrics_system: Optional MetricsSystem for queue metrics
+        """
+        if backpressure_policy not in self.BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown back-pressure policy: {backpressure_policy}")
+        
+        self.name = name
+        self.backend = backend
+        self.max_queue_size = max_queue_size
+        self.backpressure_policy = backpressure_policy
+        self.block_timeout = block_timeout
+        self.metrics_system = metrics_system
+        
+        self.stats = BackendQueueStats()
+        
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        
+        # Spill state
+        self.spill_path = Path(spill_dir).resolve() / f"{name}.spill.jsonl"
+        self.replay_path = self.spill_path.with_suffix('.replay')
+        self.offset_path = self.spill_path.with_suffix('.offset')
+        
+        # A replay interrupted by a restart is still pending
+        self._spilling = self.spill_path.exists() or self.replay_path.exists()
+        
+        self._thread = threading.Thread(
+            target=self._worker_loop,
+            daemon=True,
+            name=f"StoragePipeline-{name}"
+        )
+        self._thread.start()
+    
+    def submit(self, index_name: str, options_data: Any, timestamp: Optional[datetime] = None) -> bool:
+        """
+        Queue a batch for this backend.
+        
+        Returns:
+            True if the batch was queued or spilled, False if it was dropped
+        """
+        item = (time.time(), index_name, options_data, timestamp or datetime.now())
+        
+        with self._lock:
+            self.stats.enqueued += 1
+            
+            # Keep ordering: once spilling, everything goes to disk until replayed
+            if self._spilling:
+                return self._spill(item)
+        
+        try:
+            self._queue.put_nowait(item)
+            self._idle.clear()
+            return True
+        except queue.Full:
+            pass
+        
+        if self.backpressure_policy == 'block':
+            try:
+                self._queue.put(item, timeout=self.block_timeout)
+                self._idle.clear()
+                return True
+            except queue.Full:
+                logger.warning(f"⚠️ Storage queue for {self.name} full after {self.block_timeout}s, dropping batch")
+                with self._lock:
+                    self.stats.dropped += 1
+                return False
+        
+        if self.backpressure_policy == 'drop_oldest':
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                with self._lock:
+                    self.stats.dropped += 1
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(item)
+                self._idle.clear()
+                return True
+            except queue.Full:
+                with self._lock:
+                    self.stats.dropped += 1
+                return False
+        
+        # Spill policy
+        with self._lock:
+            self._spilling = True
+            return self._spill(item)
+    
+    def _spill(self, item: Tuple[float, str, Any, datetime]) -> bool:
+        """Append a batch to the spill file (caller holds the lock)."""
+        enqueued_at, index_name, options_data, timestamp = item
+        
+        # Columnar snapshots are spilled in their record form
+        if hasattr(options_data, 'to_records'):
+            options_data = options_data.to_records()
+        
+        try:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({
+                    'enqueued_at': enqueued_at,
+                    'index_name': index_name,
+                    'timestamp': timestamp.isoformat(),
+                    'data': options_data
+                }, default=str) + '\n')
+            self.stats.spilled += 1
+            self._idle.clear()
+            return True
+        except Exception as e:
+            logger.error(f"🔴 Failed to spill batch for {self.name}: {e}")
+            self.stats.dropped += 1
+            return False
+    
+    def _worker_loop(self):
+        """Drain the queue into the backend, replaying spilled batches when idle."""
+        while True:
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._spilling:
+                    self._replay_spill()
+                    continue
+                self._idle.set()
+                if self._stop_event.is_set():
+                    break
+                continue
+            
+            if item is None:
+                # Stop sentinel from drain()
+                self._queue.task_done()
+                break
+            
+            try:
+                self._store(*item)
+            finally:
+                self._queue.task_done()
+            
+            if self._queue.empty() and not self._spilling:
+                self._idle.set()
+    
+    def _replay_spill(self):
+        """
+        Replay spilled batches in order once the in-memory queue is empty.
+        
+        The byte offset of the last stored record is committed to a side file,
+        so a backend failure or restart resumes after it instead of storing
+        earlier batches twice.
+        """
+        with self._lock:
+            if not self.replay_path.exists():
+                if not self.spill_path.exists():
+                    self._spilling = False
+                    return
+                os.replace(self.spill_path, self.replay_path)
+                self._commit_replay_offset(0)
+        
+        offset = self._read_replay_offset()
+        try:
+            with open(self.replay_path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        # Torn tail from a crash mid-spill
+                        logger.warning(f"⚠️ Skipping torn spill record for {self.name}")
+                        break
+                    
+                    if line.strip():
+                        try:
+                            record = json.loads(line)
+                            item = (record['enqueued_at'], record['index_name'], record['data'],
+                                    datetime.fromisoformat(record['timestamp']))
+                        except (ValueError, KeyError, TypeError) as e:
+                            logger.error(f"🔴 Skipping corrupt spill record for {self.name}: {e}")
+                            with self._lock:
+                                self.stats.dropped += 1
+                            item = None
+                        
+                        if item is not None:
+                            if not self._store(*item):
+                                # Backend still failing - keep the rest for the next pass
+                                self._stop_event.wait(1.0)
+                                return
+                            with self._lock:
+                                self.stats.replayed += 1
+                    
+                    offset += len(line)
+                    self._commit_replay_offset(offset)
+            
+            self.replay_path.unlink()
+            self.offset_path.unlink(missing_ok=True)
+            logger.info(f"✅ Replayed spilled batches for {self.name}")
+        
+        except Exception as e:
+            logger.error(f"🔴 Spill replay failed for {self.name}: {e}")
+            self._stop_event.wait(1.0)
+    
+    def _read_replay_offset(self) -> int:
+        """Get the committed replay offset (0 when none was recorded)."""
+        try:
+            return int(self.offset_path.read_text(encoding='utf-8').strip() or 0)
+        except (OSError, ValueError):
+            return 0
+    
+    def _commit_replay_offset(self, offset: int):
+        """Atomically record the end of the last replayed record."""
+        temp_path = self.offset_path.with_suffix('.tmp')
+        temp_path.write_text(str(offset), encoding='utf-8')
+        os.replace(temp_path, self.offset_path)
+    
+    def _store(self, enqueued_at: float, index_name: str, options_data: Any, timestamp: datetime) -> bool:
+        """
+        Write a single batch to the backend.
+        
+        Returns:
+            True if the backend accepted the batch
+        """
+        try:
+            if hasattr(self.backend, 'store_options_data'):
+                result = self.backend.store_options_data(index_name, options_data, timestamp)
+            elif hasattr(self.backend, 'write'):
+                result = self.backend.write(index_name, options_data)
+            else:
+                logger.warning(f"⚠️ Storage backend {self.name} has no store method")
+                return False
+            
+            if result is False:
+                raise RuntimeError("backend reported failure")
+            
+            latency = time.time() - enqueued_at
+            with self._lock:
+                self.stats.stored += 1
+                self.stats.last_latency = latency
+                self.stats.total_latency += latency
+                self.stats.max_latency = max(self.stats.max_latency, latency)
+            
+            if self.metrics_system:
+                self.metrics_system.record_value(f"storage.{self.name}.latency_ms", latency * 1000)
+                self.metrics_system.set_gauge(f"storage.{self.name}.queue_depth", self._queue.qsize())
+            return True
+        
+        except Exception as e:
+            logger.error(f"🔴 Failed to store data in {self.name}: {e}")
+            with self._lock:
+                self.stats.failed += 1
+            return False
+    
+    def drain(self, timeout: float) -> bool:
+        """
+        Wait until every queued and spilled batch has been stored, then stop.
+        
+        Returns:
+            True if fully drained within the timeout
+        """
+        deadline = time.time() + timeout
+        
+        while time.time() < deadline:
+            if self._idle.wait(timeout=min(0.5, max(0.0, deadline - time.time()))):
+                if self._queue.empty() and not self._spilling:
+                    break
+        
+        drained = self._queue.empty() and not self._spilling
+        self._stop_event.set()
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=max(0.1, deadline - time.time()))
+        
+        if not drained:
+            logger.warning(f"⚠️ Storage queue for {self.name} not drained: "
+                           f"{self._queue.qsize()} batches pending")
+        return drained
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get worker statistics."""
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'max_queue_size': self.max_queue_size,
+                'backpressure_policy': self.backpressure_policy,
+                'spilling': self._spilling,
+                'enqueued': self.stats.enqueued,
+                'stored': self.stats.stored,
+                'failed': self.stats.failed,
+                'dropped': self.stats.dropped,
+                'spilled': self.stats.spilled,
+                'replayed': self.stats.replayed,
+                'average_latency_ms': self.stats.average_latency * 1000,
+                'max_latency_ms': self.stats.max_latency * 1000,
+                'last_latency_ms': self.stats.last_latency * 1000
+            }
+
+class StoragePipeline:
+    """
+    🚚 Asynchronous storage fan-out stage.
+    
+    Each submitted batch is handed to every backend's worker; producers
+    return as soon as the batch is queued.
+    """
+    
+    def __init__(self,
+                 backends: Dict[str, Any],
+                 max_queue_size: int = 100,
+                 backpressure_policy: str = 'block',
+                 block_timeout: float = 5.0,
+                 spill_dir: Union[str, Path] = "data/spill",
+                 metrics_system=None):
+        """
+        Initialize storage pipeline.
+        
+        Args:
+            backends: Mapping of backend name -> backend instance
+            max_queue_size: Maximum batches queued per backend
+            backpressure_policy: block, drop_oldest or spill
+            block_timeout: Maximum producer block time under the block policy
+            spill_dir: Directory for spilled batches
+            metrics_system: Optional MetricsSystem for queue metrics
+        """
+        self._workers: Dict[str, BackendWorker] = {
+            name: BackendWorker(
+                name=name,
+                backend=backend,
+                max_queue_size=max_queue_size,
+                backpressure_policy=backpressure_policy,
+                block_timeout=block_timeout,
+                spill_dir=spill_dir,
+                metrics_system=metrics_system
+            )
+            for name, backend in backends.items()
+        }
+        self._closed = False
+        
+        logger.info(f"🚚 Storage pipeline started for {len(self._workers)} backends "
+                    f"(queue={max_queue_size}, policy={backpressure_policy})")
+    
+    def submit(self, index_name: str, options_data: Any, timestamp: Optional[datetime] = None) -> bool:
+        """
+        Fan a batch out to every backend queue.
+        
+        Returns:
+            True if every backend accepted the batch
+        """
+        if self._closed:
+            logger.warning(f"⚠️ Storage pipeline closed, rejecting batch for {index_name}")
+            return False
+        
+        timestamp = timestamp or datetime.now()
+        accepted = True
+        for worker in self._workers.values():
+            accepted &= worker.submit(index_name, options_data, timestamp)
+        return accepted
+    
+    def drain(self, timeout: float = 30.0) -> bool:
+        """
+        Stop accepting batches and flush every backend queue.
+        
+        Args:
+            timeout: Maximum total time to wait
+        
+        Returns:
+            True if every queue drained within the timeout
+        """
+        self._closed = True
+        deadline = time.time() + timeout
+        
+        drained = True
+        for name, worker in self._workers.items():
+            drained &= worker.drain(max(0.1, deadline - time.time()))
+        
+        logger.info(f"🚚 Storage pipeline drained {'completely' if drained else 'partially'}")
+        return drained
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-backend pipeline statistics."""
+        return {name: worker.get_stats() for name, worker in self._workers.items()}
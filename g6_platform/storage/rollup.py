@@ -0,0 +1,759 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📉 Rollup Storage Tier - G6 Platform v3.0
+Incremental downsampling of option chain snapshots into 1m/5m/1h bars.
+
+Every collection cycle updates the open bar of each tier in place (NumPy
+columns per contract); a bar is written out once a later cycle moves past
+its bucket. Long-range history reads the coarsest tier that still has the
+requested resolution instead of scanning full-resolution snapshots.
+
+Features:
+- Chain bars: spot OHLC, call/put OI open/close/change, PCR and ATM IV
+- Contract bars: premium OHLC, OI change, volume traded and closing IV
+- Per-tier CSV files with their own retention (optional InfluxDB mirror)
+- Backfill from CSVSink files or InfluxDBSink history
+- Tier selection by requested resolution and lookback
+"""
+
+import csv
+import logging
+import threading
+from datetime import datetime, date, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union, Tuple, Iterable
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from ..core.chain_snapshot import ChainSnapshot
+from .influxdb_sink import _escape_tag, _strike_tag
+
+logger = logging.getLogger(__name__)
+
+# Bucket length in seconds per tier
+ROLLUP_TIERS = {'1m': 60, '5m': 300, '1h': 3600}
+
+# Default retention per tier in days
+DEFAULT_RETENTION_DAYS = {'1m': 7, '5m': 60, '1h': 730}
+
+CHAIN_COLUMNS = [
+    'bucket_start', 'index_name', 'expiry', 'samples',
+    'spot_open', 'spot_high', 'spot_low', 'spot_close',
+    'call_oi_open', 'call_oi_close', 'call_oi_change',
+    'put_oi_open', 'put_oi_close', 'put_oi_change',
+    'pcr_oi_open', 'pcr_oi_high', 'pcr_oi_low', 'pcr_oi_close', 'pcr_volume_close',
+    'atm_strike', 'atm_iv_open', 'atm_iv_close', 'atm_iv_mean'
+]
+
+CONTRACT_COLUMNS = [
+    'bucket_start', 'index_name', 'expiry', 'symbol', 'strike', 'option_type', 'samples',
+    'open', 'high', 'low', 'close', 'oi_open', 'oi_close', 'oi_change', 'volume', 'iv_close'
+]
+
+# Columns that identify a bar (later rows for the same key supersede earlier ones)
+BAR_KEYS = {
+    'chain': ['bucket_start', 'expiry'],
+    'contracts': ['bucket_start', 'expiry', 'symbol']
+}
+
+# Per-contract state arrays held by an open bar
+_CONTRACT_ARRAYS = ('open', 'high', 'low', 'close', 'oi_open', 'oi_close', 'oi_base',
+                    'vol_open', 'vol_close', 'vol_base', 'iv_close')
+
+def bucket_start(timestamp: datetime, seconds: int) -> datetime:
+    """Floor a timestamp to its bucket (aligned to local midnight, not the epoch)."""
+    midnight = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    elapsed = int((timestamp - midnight).total_seconds())
+    return midnight + timedelta(seconds=elapsed - elapsed % seconds)
+
+@dataclass
+class RollupStats:
+    """Rollup statistics."""
+    snapshots_processed: int = 0
+    late_snapshots: int = 0
+    backfilled_snapshots: int = 0
+    chain_bars_written: int = 0
+    contract_bars_written: int = 0
+    files_pruned: int = 0
+    write_errors: int = 0
+    last_write_time: Optional[datetime] = None
+
+class RollupBar:
+    """
+    📊 Open bar of one tier for one index/expiry chain.
+    
+    Contract state lives in NumPy arrays indexed by a stable row per symbol,
+    so each cycle updates every contract with a handful of vector operations.
+    """
+    
+    def __init__(self, index_name: str, expiry: Optional[str], start: datetime,
+                 previous: Optional['RollupBar'] = None):
+        """
+        Initialize an empty bar.
+        
+        Args:
+            index_name: Index name
+            expiry: Expiry date (YYYY-MM-DD)
+            start: Bucket start
+            previous: Preceding bar of the same chain; its closing cumulative
+                volume/OI is the baseline for this bar's volume and OI change
+        """
+        self.index_name = index_name
+        self.expiry = expiry
+        self.start = start
+        self.samples = 0
+        self.chain: Dict[str, float] = {}
+        
+        # Closing cumulative (oi, volume) per symbol and chain OI of earlier bars
+        self._carry: Dict[Any, Tuple[float, float]] = {}
+        self._chain_carry: Dict[str, float] = {}
+        if previous is not None:
+            self._carry, self._chain_carry = previous.closing_state()
+            if previous.start.date() != start.date():
+                # Traded volume is cumulative per session and restarts each day
+                self._carry = {symbol: (oi, np.nan) for symbol, (oi, _) in self._carry.items()}
+        
+        # Contract rows
+        self._rows: Dict[Any, int] = {}
+        self._symbols: List[Any] = []
+        self._strikes: List[float] = []
+        self._is_call: List[bool] = []
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._arrays = {name: np.empty(0) for name in _CONTRACT_ARRAYS}
+        
+        # Row mapping of the previous snapshot (chains usually keep their layout)
+        self._last_symbols: Optional[np.ndarray] = None
+        self._last_rows: Optional[np.ndarray] = None
+    
+    def update(self, snapshot: ChainSnapshot):
+        """
+        Fold one snapshot into the bar.
+        
+        Args:
+            snapshot: Chain snapshot inside this bar's bucket
+        """
+        rows = self._rows_for(snapshot)
+        columns = snapshot.columns
+        arrays = self._arrays
+        
+        price = columns['last_price']
+        arrays['high'][rows] = np.fmax(arrays['high'][rows], price)
+        arrays['low'][rows] = np.fmin(arrays['low'][rows], price)
+        self._first_last(rows, price, 'open', 'close')
+        self._first_last(rows, columns['oi'], 'oi_open', 'oi_close')
+        self._first_last(rows, columns['volume'], 'vol_open', 'vol_close')
+        self._first_last(rows, columns['iv'], None, 'iv_close')
+        self._counts[rows] += 1
+        
+        self._update_chain(snapshot)
+        self.samples += 1
+    
+    def _rows_for(self, snapshot: ChainSnapshot) -> np.ndarray:
+        """Map snapshot rows to bar rows, adding contracts seen for the first time."""
+        symbols = snapshot.symbol
+        last = self._last_symbols
+        if last is not None and len(last) == len(symbols) and bool((last == symbols).all()):
+            return self._last_rows
+        
+        rows = np.empty(len(symbols), dtype=np.int64)
+        strikes = snapshot.columns['strike'].tolist()
+        is_call = snapshot.is_call.tolist()
+        for i, symbol in enumerate(symbols.tolist()):
+            row = self._rows.get(symbol)
+            if row is None:
+                row = self._rows[symbol] = len(self._symbols)
+                self._symbols.append(symbol)
+                self._strikes.append(strikes[i])
+                self._is_call.append(is_call[i])
+            rows[i] = row
+        
+        grow = len(self._symbols) - len(self._counts)
+        if grow:
+            self._counts = np.concatenate([self._counts, np.zeros(grow, dtype=np.int64)])
+            for name, values in self._arrays.items():
+                self._arrays[name] = np.concatenate([values, np.full(grow, np.nan)])
+            added = self._symbols[-grow:]
+            baselines = np.array([self._carry.get(symbol, (np.nan, np.nan)) for symbol in added], dtype=float)
+            self._arrays['oi_base'][-grow:] = baselines[:, 0]
+            self._arrays['vol_base'][-grow:] = baselines[:, 1]
+        
+        self._last_symbols = symbols
+        self._last_rows = rows
+        return rows
+    
+    def _first_last(self, rows: np.ndarray, values: np.ndarray, first: Optional[str], last: str):
+        """Keep the first and latest non-missing value per contract."""
+        present = ~np.isnan(values)
+        if first is not None:
+            current = self._arrays[first][rows]
+            self._arrays[first][rows] = np.where(np.isnan(current), values, current)
+        self._arrays[last][rows] = np.where(present, values, self._arrays[last][rows])
+    
+    def _update_chain(self, snapshot: ChainSnapshot):
+        """Update the chain-level aggregates."""
+        columns = snapshot.columns
+        calls = snapshot.is_call
+        oi = columns['oi']
+        volume = columns['volume']
+        
+        call_oi = float(np.nansum(oi[calls]))
+        put_oi = float(np.nansum(oi[~calls]))
+        call_volume = float(np.nansum(volume[calls]))
+        put_volume = float(np.nansum(volume[~calls]))
+        
+        spot = snapshot.spot_price if snapshot.spot_price is not None else np.nan
+        pcr_oi = put_oi / call_oi if call_oi > 0 else np.nan
+        atm_strike = _atm_strike(snapshot)
+        atm_iv = np.nan
+        if atm_strike == atm_strike:
+            ivs = columns['iv'][columns['strike'] == atm_strike]
+            ivs = ivs[~np.isnan(ivs)]
+            if len(ivs):
+                atm_iv = float(ivs.mean())
+        
+        chain = self.chain
+        self._ohlc('spot', spot)
+        self._ohlc('pcr_oi', pcr_oi)
+        for name, value in (('call_oi', call_oi), ('put_oi', put_oi), ('atm_iv', atm_iv)):
+            if value == value:
+                chain.setdefault(f'{name}_open', value)
+                chain[f'{name}_close'] = value
+        
+        chain['pcr_volume_close'] = put_volume / call_volume if call_volume > 0 else np.nan
+        if atm_strike == atm_strike:
+            chain['atm_strike'] = atm_strike
+        if atm_iv == atm_iv:
+            chain['atm_iv_sum'] = chain.get('atm_iv_sum', 0.0) + atm_iv
+            chain['atm_iv_count'] = chain.get('atm_iv_count', 0) + 1
+    
+    def _ohlc(self, name: str, value: float):
+        """Update open/high/low/close of a chain-level value."""
+        if value != value:
+            return
+        chain = self.chain
+        chain.setdefault(f'{name}_open', value)
+        chain[f'{name}_high'] = max(chain.get(f'{name}_high', value), value)
+        chain[f'{name}_low'] = min(chain.get(f'{name}_low', value), value)
+        chain[f'{name}_close'] = value
+    
+    def closing_state(self) -> Tuple[Dict[Any, Tuple[float, float]], Dict[str, float]]:
+        """
+        Get the latest cumulative values as of this bar's close.
+        
+        Returns:
+            (symbol -> (oi, volume), chain OI closes) including contracts and
+            values only seen in earlier bars
+        """
+        carry = dict(self._carry)
+        arrays = self._arrays
+        oi = np.where(np.isnan(arrays['oi_close']), arrays['oi_base'], arrays['oi_close']).tolist()
+        volume = np.where(np.isnan(arrays['vol_close']), arrays['vol_base'], arrays['vol_close']).tolist()
+        carry.update(zip(self._symbols, zip(oi, volume)))
+        
+        chain_carry = dict(self._chain_carry)
+        for name in ('call_oi_close', 'put_oi_close'):
+            if name in self.chain:
+                chain_carry[name] = self.chain[name]
+        return carry, chain_carry
+    
+    def chain_row(self) -> Dict[str, Any]:
+        """Get the chain bar as a CHAIN_COLUMNS row."""
+        chain = self.chain
+        row = {name: chain.get(name, np.nan) for name in CHAIN_COLUMNS}
+        row.update({
+            'bucket_start': self.start,
+            'index_name': self.index_name,
+            'expiry': self.expiry,
+            'samples': self.samples,
+            'call_oi_change': row['call_oi_close'] - self._chain_carry.get('call_oi_close', row['call_oi_open']),
+            'put_oi_change': row['put_oi_close'] - self._chain_carry.get('put_oi_close', row['put_oi_open']),
+            'atm_iv_mean': chain['atm_iv_sum'] / chain['atm_iv_count'] if chain.get('atm_iv_count') else np.nan
+        })
+        return row
+    
+    def contract_rows(self) -> List[List[Any]]:
+        """Get the contract bars as CONTRACT_COLUMNS rows."""
+        arrays = self._arrays
+        # Changes run from the previous bar's close (first sample when there is none)
+        oi_base = np.where(np.isnan(arrays['oi_base']), arrays['oi_open'], arrays['oi_base'])
+        vol_base = np.where(np.isnan(arrays['vol_base']), arrays['vol_open'], arrays['vol_base'])
+        columns = [arrays['open'], arrays['high'], arrays['low'], arrays['close'],
+                   arrays['oi_open'], arrays['oi_close'], arrays['oi_close'] - oi_base,
+                   arrays['vol_close'] - vol_base, arrays['iv_close']]
+        values = np.column_stack(columns).tolist() if len(self._symbols) else []
+        
+        return [
+            [self.start, self.index_name, self.expiry, symbol, strike, 'CE' if is_call else 'PE', count] + bar
+            for symbol, strike, is_call, count, bar
+            in zip(self._symbols, self._strikes, self._is_call, self._counts.tolist(), values)
+        ]
+
+class RollupSink:
+    """
+    📉 Downsampling storage tier fed with the same cycles as the other backends.
+    
+    Bars are appended to <base_path>/<tier>/<INDEX>/<YYYY-MM-DD>_chain.csv and
+    _contracts.csv. flush() writes open bars without closing them, so a file
+    may hold several rows for one bar; readers keep the last (see query()).
+    """
+    
+    def __init__(self,
+                 base_path: Union[str, Path] = "data/rollups",
+                 tiers: Optional[Dict[str, Dict[str, Any]]] = None,
+                 contract_bars: bool = True,
+                 influx_sink=None):
+        """
+        Initialize rollup tier.
+        
+        Args:
+            base_path: Root directory of the rollup files
+            tiers: Tier name -> {'retention_days': N} (all of ROLLUP_TIERS if None)
+            contract_bars: Also write per-contract bars (chain bars are always written)
+            influx_sink: Optional InfluxDBSink mirroring bars to chain_rollup_<tier>
+                and options_rollup_<tier> measurements
+        """
+        tiers = tiers if tiers is not None else {name: {} for name in ROLLUP_TIERS}
+        unknown = set(tiers) - set(ROLLUP_TIERS)
+        if unknown:
+            raise ValueError(f"Unknown rollup tiers {sorted(unknown)} (expected {list(ROLLUP_TIERS)})")
+        
+        self.base_path = Path(base_path)
+        self.tiers = sorted(tiers, key=ROLLUP_TIERS.get)
+        self.retention_days = {
+            name: int((tiers[name] or {}).get('retention_days', DEFAULT_RETENTION_DAYS[name]))
+            for name in self.tiers
+        }
+        self.contract_bars = contract_bars
+        self.influx_sink = influx_sink
+        
+        self._bars: Dict[Tuple[str, str, Optional[str]], RollupBar] = {}
+        self._lock = threading.RLock()
+        
+        self.stats = RollupStats()
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        
+        # Retention runs off the collection path (Influx deletes are blocking HTTP calls)
+        self._stop_retention = threading.Event()
+        self._retention_thread = threading.Thread(
+            target=self._retention_worker,
+            daemon=True,
+            name="RollupRetention"
+        )
+        self._retention_thread.start()
+        
+        logger.info(f"📉 Rollup tier initialized: {self.base_path} "
+                    f"({', '.join(f'{t}={self.retention_days[t]}d' for t in self.tiers)})")
+    
+    def store_options_data(self,
+                          index_name: str,
+                          options_data: Union[ChainSnapshot, List[Dict[str, Any]], Dict[str, Any]],
+                          timestamp: Optional[datetime] = None) -> bool:
+        """
+        Fold one collection cycle into the open bars of every tier.
+        
+        Args:
+            index_name: Index name (NIFTY, BANKNIFTY, etc.)
+            options_data: ChainSnapshot or legacy option records
+            timestamp: Optional timestamp (snapshot time, else current)
+        
+        Returns:
+            True if successful
+        """
+        try:
+            snapshot = options_data
+            if not isinstance(snapshot, ChainSnapshot):
+                records = [options_data] if isinstance(options_data, dict) else list(options_data or [])
+                snapshot = ChainSnapshot.from_records(records, index_name=index_name, timestamp=timestamp)
+            
+            if len(snapshot) == 0:
+                return True
+            
+            timestamp = timestamp or snapshot.timestamp or datetime.now()
+            with self._lock:
+                self._update(self._bars, index_name.upper(), snapshot, timestamp)
+                self.stats.snapshots_processed += 1
+            
+            return True
+        
+        except Exception as e:
+            logger.error(f"🔴 Failed to roll up data for {index_name}: {e}")
+            with self._lock:
+                self.stats.write_errors += 1
+            return False
+    
+    def _update(self,
+                bars: Dict[Tuple[str, str, Optional[str]], RollupBar],
+                index_name: str,
+                snapshot: ChainSnapshot,
+                timestamp: datetime):
+        """Fold a snapshot into a set of open bars, writing out bars it moves past."""
+        for tier in self.tiers:
+            start = bucket_start(timestamp, ROLLUP_TIERS[tier])
+            key = (tier, index_name, snapshot.expiry)
+            bar = bars.get(key)
+            
+            previous = None
+            if bar is not None and bar.start != start:
+                if start < bar.start:
+                    # Out-of-order cycle for an already closed bucket
+                    self.stats.late_snapshots += 1
+                    continue
+                self._write_bar(tier, bar)
+                previous, bar = bar, None
+            
+            if bar is None:
+                bar = bars[key] = RollupBar(index_name, snapshot.expiry, start, previous)
+            bar.update(snapshot)
+    
+    def _tier_dir(self, tier: str, index_name: str) -> Path:
+        """Get the directory holding one tier of an index."""
+        return self.base_path / tier / index_name.upper()
+    
+    def _write_bar(self, tier: str, bar: RollupBar):
+        """Append a bar to its tier files (and mirror it to InfluxDB)."""
+        try:
+            directory = self._tier_dir(tier, bar.index_name)
+            directory.mkdir(parents=True, exist_ok=True)
+            day = bar.start.strftime('%Y-%m-%d')
+            
+            chain_row = bar.chain_row()
+            _append_csv(directory / f"{day}_chain.csv", CHAIN_COLUMNS,
+                        [[chain_row[name] for name in CHAIN_COLUMNS]])
+            self.stats.chain_bars_written += 1
+            
+            contract_rows = bar.contract_rows() if self.contract_bars else []
+            if contract_rows:
+                _append_csv(directory / f"{day}_contracts.csv", CONTRACT_COLUMNS, contract_rows)
+                self.stats.contract_bars_written += len(contract_rows)
+            
+            if self.influx_sink is not None:
+                self._mirror_to_influx(tier, chain_row, contract_rows)
+            
+            self.stats.last_write_time = datetime.now()
+        
+        except Exception as e:
+            logger.error(f"🔴 Failed to write {tier} rollup bar for {bar.index_name}: {e}")
+            self.stats.write_errors += 1
+    
+    def _mirror_to_influx(self, tier: str, chain_row: Dict[str, Any], contract_rows: List[List[Any]]):
+        """Render bars as line protocol and queue them on the InfluxDB sink."""
+        lines = [_bar_line(f"chain_rollup_{tier}", CHAIN_COLUMNS, [chain_row[name] for name in CHAIN_COLUMNS],
+                           ('expiry', 'index_name'))]
+        lines.extend(
+            _bar_line(f"options_rollup_{tier}", CONTRACT_COLUMNS, row,
+                      ('expiry', 'index_name', 'option_type', 'strike', 'symbol'))
+            for row in contract_rows
+        )
+        self.influx_sink.write_line_protocol('\n'.join(lines).encode('utf-8'), len(lines))
+    
+    def flush(self) -> bool:
+        """
+        Write every open bar in its current state (bars stay open).
+        
+        Returns:
+            True if successful
+        """
+        with self._lock:
+            for (tier, _, _), bar in list(self._bars.items()):
+                self._write_bar(tier, bar)
+        return True
+    
+    def backfill_from_csv(self, csv_sink, index_name: str, day: date) -> int:
+        """
+        Build the bars of one day from a CSVSink options file.
+        
+        Args:
+            csv_sink: CSVSink that wrote the file
+            index_name: Index name
+            day: Trading day
+        
+        Returns:
+            Number of snapshots replayed
+        """
+        file_key = csv_sink._get_file_key(index_name, datetime(day.year, day.month, day.day))
+        path = csv_sink._get_live_path(file_key)
+        if not path.exists():
+            path = csv_sink._get_file_path(file_key)
+        if not path.exists():
+            logger.warning(f"⚠️ No CSV options file for {index_name} on {day}")
+            return 0
+        
+        frame = pd.read_csv(path, dtype={'symbol': str, 'expiry': str, 'option_type': str})
+        return self._backfill(index_name, [frame], 'write_timestamp')
+    
+    def backfill_from_influx(self,
+                             influx_sink,
+                             index_name: str,
+                             start_time: datetime,
+                             end_time: Optional[datetime] = None) -> int:
+        """
+        Build bars from InfluxDB options_data history, one day per query.
+        
+        Args:
+            influx_sink: Connected InfluxDBSink
+            index_name: Index name
+            start_time: First point to replay
+            end_time: Last point to replay (now if None)
+        
+        Returns:
+            Number of snapshots replayed
+        """
+        end_time = end_time or datetime.now()
+        
+        def frames() -> Iterable[pd.DataFrame]:
+            day_start = start_time
+            while day_start < end_time:
+                day_end = min(end_time, datetime(day_start.year, day_start.month, day_start.day) + timedelta(days=1))
+                frame = influx_sink.query_frame('options_data', day_start, day_end, filters={'index_name': index_name})
+                if not frame.empty:
+                    times = pd.to_datetime(frame['time'])
+                    if times.dt.tz is not None:
+                        times = times.dt.tz_convert(datetime.now().astimezone().tzinfo).dt.tz_localize(None)
+                    yield frame.assign(time=times)
+                day_start = day_end
+        
+        return self._backfill(index_name, frames(), 'time')
+    
+    def _backfill(self, index_name: str, frames: Iterable[pd.DataFrame], time_column: str) -> int:
+        """Replay historical rows (one snapshot per timestamp/expiry) into a separate set of bars."""
+        bars: Dict[Tuple[str, str, Optional[str]], RollupBar] = {}
+        count = 0
+        
+        with self._lock:
+            for frame in frames:
+                frame = frame.assign(**{time_column: pd.to_datetime(frame[time_column])})
+                for (timestamp, _), rows in frame.groupby([time_column, 'expiry'], sort=True, dropna=False):
+                    timestamp = timestamp.to_pydatetime()
+                    snapshot = ChainSnapshot.from_records(rows.to_dict('records'), index_name=index_name,
+                                                          timestamp=timestamp)
+                    if len(snapshot):
+                        self._update(bars, index_name.upper(), snapshot, timestamp)
+                        count += 1
+            
+            for (tier, _, _), bar in bars.items():
+                self._write_bar(tier, bar)
+            self.stats.backfilled_snapshots += count
+        
+        logger.info(f"📉 Backfilled {count} {index_name} snapshots into rollup tiers")
+        return count
+    
+    def select_tier(self, start_time: datetime, resolution: Optional[timedelta] = None) -> str:
+        """
+        Pick the coarsest tier that still has the requested resolution and lookback.
+        
+        Args:
+            start_time: Oldest bar needed
+            resolution: Coarsest acceptable bar length (finest tier if None)
+        
+        Returns:
+            Tier name
+        """
+        lookback_days = (datetime.now() - start_time).total_seconds() / 86400
+        covering = [tier for tier in self.tiers if self.retention_days[tier] >= lookback_days]
+        if not covering:
+            # Nothing keeps that much history; use whatever goes back furthest
+            return max(self.tiers, key=self.retention_days.get)
+        
+        limit = resolution.total_seconds() if resolution else 0
+        fitting = [tier for tier in covering if ROLLUP_TIERS[tier] <= limit]
+        return fitting[-1] if fitting else covering[0]
+    
+    def query(self,
+              index_name: str,
+              start_time: datetime,
+              end_time: Optional[datetime] = None,
+              resolution: Optional[timedelta] = None,
+              kind: str = 'chain',
+              expiry: Optional[str] = None,
+              tier: Optional[str] = None) -> pd.DataFrame:
+        """
+        Read bars from the coarsest tier that satisfies the request.
+        
+        Args:
+            index_name: Index name
+            start_time: First bucket (inclusive)
+            end_time: Last bucket (inclusive, now if None)
+            resolution: Coarsest acceptable bar length (see select_tier())
+            kind: 'chain' or 'contracts'
+            expiry: Expiry date filter (YYYY-MM-DD)
+            tier: Force a tier instead of selecting one
+        
+        Returns:
+            DataFrame of bars sorted by bucket_start (attrs['tier'] names the tier read)
+        """
+        if kind not in BAR_KEYS:
+            raise ValueError(f"Unknown rollup kind {kind!r} (expected one of {list(BAR_KEYS)})")
+        
+        end_time = end_time or datetime.now()
+        tier = tier or self.select_tier(start_time, resolution)
+        columns = CHAIN_COLUMNS if kind == 'chain' else CONTRACT_COLUMNS
+        directory = self._tier_dir(tier, index_name)
+        
+        frames = []
+        day = start_time.date()
+        while day <= end_time.date():
+            path = directory / f"{day.isoformat()}_{kind}.csv"
+            if path.exists():
+                frames.append(pd.read_csv(path, dtype={'expiry': str, 'symbol': str, 'index_name': str}))
+            day += timedelta(days=1)
+        
+        # Bars still open in memory
+        with self._lock:
+            open_bars = [bar for (bar_tier, bar_index, _), bar in self._bars.items()
+                         if bar_tier == tier and bar_index == index_name.upper()]
+            rows = [bar.chain_row() for bar in open_bars] if kind == 'chain' else \
+                [dict(zip(CONTRACT_COLUMNS, row)) for bar in open_bars for row in bar.contract_rows()]
+        if rows:
+            frames.append(pd.DataFrame(rows, columns=columns))
+        
+        if not frames:
+            result = pd.DataFrame(columns=columns)
+            result.attrs['tier'] = tier
+            return result
+        
+        result = pd.concat(frames, ignore_index=True)
+        result['bucket_start'] = pd.to_datetime(result['bucket_start'])
+        mask = (result['bucket_start'] >= bucket_start(start_time, ROLLUP_TIERS[tier])) & \
+            (result['bucket_start'] <= end_time)
+        if expiry:
+            mask &= result['expiry'] == expiry
+        
+        result = result[mask].drop_duplicates(BAR_KEYS[kind], keep='last')
+        result = result.sort_values('bucket_start', kind='stable').reset_index(drop=True)
+        result.attrs['tier'] = tier
+        return result
+    
+    def _retention_worker(self):
+        """Prune expired bars at startup and then hourly."""
+        while True:
+            try:
+                self.enforce_retention()
+            except Exception as e:
+                logger.error(f"🔴 Rollup retention error: {e}")
+            if self._stop_retention.wait(3600):
+                return
+    
+    def enforce_retention(self, now: Optional[datetime] = None) -> int:
+        """
+        Delete tier files (and mirrored InfluxDB bars) older than each tier's retention.
+        
+        Args:
+            now: Reference time (current if None)
+        
+        Returns:
+            Number of files deleted
+        """
+        now = now or datetime.now()
+        removed = 0
+        
+        for tier in self.tiers:
+            cutoff = now - timedelta(days=self.retention_days[tier])
+            cutoff_day = cutoff.strftime('%Y-%m-%d')
+            
+            for path in (self.base_path / tier).glob('*/*.csv'):
+                if path.name[:10] < cutoff_day:
+                    try:
+                        path.unlink()
+                        removed += 1
+                    except OSError as e:
+                        logger.warning(f"⚠️ Could not delete rollup file {path}: {e}")
+            
+            if self.influx_sink is not None:
+                for measurement in (f"chain_rollup_{tier}", f"options_rollup_{tier}"):
+                    self.influx_sink.delete_data(measurement, datetime(1970, 1, 2), cutoff)
+        
+        with self._lock:
+            self.stats.files_pruned += removed
+        if removed:
+            logger.info(f"🗑️ Pruned {removed} expired rollup files")
+        return removed
+    
+    def get_storage_stats(self) -> Dict[str, Any]:
+        """Get storage statistics."""
+        with self._lock:
+            return {
+                'tiers': {tier: {'bucket_seconds': ROLLUP_TIERS[tier], 'retention_days': self.retention_days[tier]}
+                          for tier in self.tiers},
+                'open_bars': len(self._bars),
+                'snapshots_processed': self.stats.snapshots_processed,
+                'late_snapshots': self.stats.late_snapshots,
+                'backfilled_snapshots': self.stats.backfilled_snapshots,
+                'chain_bars_written': self.stats.chain_bars_written,
+                'contract_bars_written': self.stats.contract_bars_written,
+                'files_pruned': self.stats.files_pruned,
+                'write_errors': self.stats.write_errors,
+                'last_write_time': self.stats.last_write_time.isoformat() if self.stats.last_write_time else None
+            }
+    
+    def health_check(self) -> Dict[str, Any]:
+        """Perform health check."""
+        return {
+            'status': 'healthy' if self.base_path.exists() else 'unhealthy',
+            'base_path_exists': self.base_path.exists(),
+            'stats': self.get_storage_stats()
+        }
+    
+    def shutdown(self):
+        """Shutdown rollup tier (open bars are written in their current state)."""
+        self._stop_retention.set()
+        if self._retention_thread.is_alive():
+            self._retention_thread.join(timeout=5)
+        self.flush()
+        logger.info("📉 Rollup tier shutdown complete")
+
+def _atm_strike(snapshot: ChainSnapshot) -> float:
+    """Get the snapshot's ATM strike (nearest to spot, else where call and put premiums meet)."""
+    if snapshot.atm_strike is not None:
+        return float(snapshot.atm_strike)
+    
+    strikes = snapshot.columns['strike']
+    if not len(strikes):
+        return np.nan
+    if snapshot.spot_price is not None:
+        return float(strikes[np.nanargmin(np.abs(strikes - snapshot.spot_price))])
+    
+    calls, puts = snapshot.calls(), snapshot.puts()
+    common, call_rows, put_rows = np.intersect1d(calls.columns['strike'], puts.columns['strike'],
+                                                 return_indices=True)
+    spread = np.abs(calls.columns['last_price'][call_rows] - puts.columns['last_price'][put_rows])
+    if not len(common) or np.isnan(spread).all():
+        return np.nan
+    return float(common[np.nanargmin(spread)])
+
+def _format_cell(value: Any) -> Any:
+    """Format a bar value for CSV (missing values as empty cells)."""
+    if value is None or (isinstance(value, float) and value != value):
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _append_csv(path: Path, columns: List[str], rows: List[List[Any]]):
+    """Append rows to a CSV file, writing the header when the file is new."""
+    new_file = not path.exists()
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(columns)
+        writer.writerows([_format_cell(value) for value in row] for row in rows)
+
+def _bar_line(measurement: str, columns: List[str], values: List[Any], tags: Tuple[str, ...]) -> str:
+    """Render one bar as a line-protocol line (missing fields are skipped)."""
+    row = dict(zip(columns, values))
+    tag_text = ''.join(
+        f",{name}={_strike_tag(row[name]) if name == 'strike' else _escape_tag(row[name])}"
+        for name in tags if row.get(name) not in (None, '')
+    )
+    fields = []
+    for name in columns:
+        if name in tags or name in ('bucket_start', 'index_name'):
+            continue
+        value = row[name]
+        if name == 'samples':
+            fields.append(f"samples={int(value)}i")
+        elif isinstance(value, (int, float)) and value == value:
+            fields.append(f"{name}={float(value)!r}")
+    return f"{measurement}{tag_text} {','.join(fields)} {int(row['bucket_start'].timestamp())}"
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🎞️ Binary Tick Log - G6 Platform v3.0
+Fixed-width binary log of option chain snapshots with memory-mapped replay.
+
+One file per index per day. A JSON header describes the record layout and
+every option leg is appended as one fixed-width record, so replay maps the
+file and views it with numpy.frombuffer instead of parsing text.
+
+Features:
+- Fixed-width little-endian records (NumPy structured dtype)
+- Self-describing header (magic, version, dtype description)
+- Torn trailing records ignored by readers and trimmed by writers
+- mmap + numpy.frombuffer reads with no per-row parsing
+- Replay API yielding ChainSnapshot batches by timestamp range
+"""
+
+import os
+import json
+import mmap
+import struct
+import logging
+import threading
+import time
+from datetime import datetime, date, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union, Iterator
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..core.chain_snapshot import ChainSnapshot, FLOAT_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'G6TICKLG'
+FORMAT_VERSION = 1
+
+# Header = MAGIC + uint32 JSON length + JSON, padded so records start aligned
+HEADER_PREFIX = struct.Struct('<8sI')
+HEADER_ALIGNMENT = 64
+
+# One option leg per record
+RECORD_DTYPE = np.dtype(
+    [('timestamp_ms', '<i8'), ('instrument_token', '<i8'), ('expiry', '<i4'), ('is_call', 'u1'),
+     ('symbol', 'S31'), ('spot_price', '<f8'), ('atm_strike', '<f8')]
+    + [(name, '<f8') for name in FLOAT_COLUMNS]
+)
+
+def _expiry_to_int(expiry: Optional[str]) -> int:
+    """Encode YYYY-MM-DD as an integer YYYYMMDD (0 when unknown)."""
+    if not expiry:
+        return 0
+    try:
+        return int(str(expiry)[:10].replace('-', ''))
+    except ValueError:
+        return 0
+
+def _expiry_from_int(value: int) -> Optional[str]:
+    """Decode an integer YYYYMMDD back to YYYY-MM-DD."""
+    if not value:
+        return None
+    text = str(int(value))
+    return f"{text[:4]}-{text[4:6]}-{text[6:8]}"
+
+def _to_epoch_ms(timestamp: datetime) -> int:
+    """Convert a datetime to epoch milliseconds."""
+    return int(round(timestamp.timestamp() * 1000))
+
+@dataclass
+class TickLogStats:
+    """Tick log write statistics."""
+    snapshots_written: int = 0
+    records_written: int = 0
+    bytes_written: int = 0
+    write_errors: int = 0
+    write_time: float = 0.0
+    last_write_time: Optional[datetime] = None
+
+class TickLogReader:
+    """
+    🎞️ Memory-mapped reader over one tick log file.
+    
+    Records are exposed as a read-only structured array that shares memory
+    with the mapping; complete records only (a torn tail is ignored).
+    """
+    
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open a tick log file.
+        
+        Args:
+            path: Tick log file path
+        """
+        self.path = Path(path)
+        self.header = read_header(self.path)
+        self.index_name = self.header['index_name']
+        self.dtype = np.dtype([tuple(field) for field in self.header['dtype']])
+        self.data_offset = self.header['data_offset']
+        
+        self._file = open(self.path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        count = max(0, size - self.data_offset) // self.dtype.itemsize
+        
+        self._mmap = None
+        if count:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.records = np.frombuffer(self._mmap, dtype=self.dtype, count=count, offset=self.data_offset)
+        else:
+            self.records = np.empty(0, dtype=self.dtype)
+    
+    def __len__(self) -> int:
+        return len(self.records)
+    
+    def __enter__(self) -> 'TickLogReader':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def replay(self,
+               start: Optional[datetime] = None,
+               end: Optional[datetime] = None,
+               expiry: Optional[str] = None) -> Iterator[ChainSnapshot]:
+        """
+        Yield one ChainSnapshot per logged cycle.
+        
+        Args:
+            start: First timestamp (inclusive)
+            end: Last timestamp (inclusive)
+            expiry: Only yield this expiry (YYYY-MM-DD)
+        
+        Yields:
+            ChainSnapshot whose float columns are views into the mapping
+        """
+        records = self.records
+        timestamps = records['timestamp_ms']
+        
+        # Records are appended in time order, so the range is a slice
+        lo = int(np.searchsorted(timestamps, _to_epoch_ms(start), side='left')) if start else 0
+        hi = int(np.searchsorted(timestamps, _to_epoch_ms(end), side='right')) if end else len(records)
+        records = records[lo:hi]
+        if expiry:
+            records = records[records['expiry'] == _expiry_to_int(expiry)]
+        if not len(records):
+            return
+        
+        # A cycle ends where the timestamp or expiry changes
+        boundaries = np.flatnonzero(
+            (np.diff(records['timestamp_ms']) != 0) | (np.diff(records['expiry']) != 0)
+        ) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(records)]))
+        
+        # Decode the non-numeric columns once for the whole range
+        symbols = np.char.decode(records['symbol'], 'ascii').astype(object)
+        is_call = records['is_call'].astype(bool)
+        
+        for first, last in zip(starts.tolist(), ends.tolist()):
+            rows = slice(first, last)
+            yield self._to_snapshot(records[rows], symbols[rows], is_call[rows])
+    
+    def _to_snapshot(self, batch: np.ndarray, symbols: np.ndarray, is_call: np.ndarray) -> ChainSnapshot:
+        """Wrap one cycle's records as a ChainSnapshot."""
+        head = batch[0]
+        spot_price = float(head['spot_price'])
+        atm_strike = float(head['atm_strike'])
+        
+        return ChainSnapshot(
+            index_name=self.index_name,
+            symbol=symbols,
+            is_call=is_call,
+            instrument_token=batch['instrument_token'],
+            columns={name: batch[name] for name in FLOAT_COLUMNS},
+            expiry=_expiry_from_int(head['expiry']),
+            timestamp=datetime.fromtimestamp(int(head['timestamp_ms']) / 1000),
+            spot_price=None if np.isnan(spot_price) else spot_price,
+            atm_strike=None if np.isnan(atm_strike) else atm_strike
+        )
+    
+    def close(self):
+        """Release the mapping and file handle."""
+        self.records = np.empty(0, dtype=self.dtype)
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Snapshots still reference the mapping; it is freed with them
+                pass
+            self._mmap = None
+        self._file.close()
+
+def read_header(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Read and validate a tick log header.
+    
+    Args:
+        path: Tick log file path
+    
+    Returns:
+        Header dictionary (index_name, date, dtype, record_size, data_offset)
+    """
+    with open(path, 'rb') as f:
+        magic, length = HEADER_PREFIX.unpack(f.read(HEADER_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a G6 tick log")
+        header = json.loads(f.read(length).decode('utf-8'))
+    
+    if header.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported tick log version {header.get('version')} in {path}")
+    return header
+
+class TickLogSink:
+    """
+    🎞️ Storage backend writing option chains to daily binary tick logs.
+    """
+    
+    def __init__(self,
+                 base_path: Union[str, Path] = "data/ticks",
+                 fsync: bool = False):
+        """
+        Initialize tick log storage backend.
+        
+        Args:
+            base_path: Directory holding {INDEX}_{YYYY-MM-DD}.ticks files
+            fsync: fsync after every appended snapshot
+        """
+        self.base_path = Path(base_path).resolve()
+        self.fsync = fsync
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        
+        self._handles: Dict[Path, Any] = {}
+        self._lock = threading.RLock()
+        
+        self.stats = TickLogStats()
+        
+        logger.info(f"🎞️ Tick log storage backend initialized: {self.base_path} "
+                    f"({RECORD_DTYPE.itemsize} bytes/record)")
+    
+    def get_path(self, index_name: str, day: Union[date, datetime]) -> Path:
+        """Get the tick log path for an index and day."""
+        return self.base_path / f"{index_name.upper()}_{day.strftime('%Y-%m-%d')}.ticks"
+    
+    def store_options_data(self,
+                          index_name: str,
+                          options_data: Union[ChainSnapshot, List[Dict[str, Any]], Dict[str, Any]],
+                          timestamp: Optional[datetime] = None) -> bool:
+        """
+        Append one collection cycle to the day's tick log.
+        
+        Args:
+            index_name: Index name (NIFTY, BANKNIFTY, etc.)
+            options_data: ChainSnapshot or legacy option records
+            timestamp: Optional timestamp (snapshot time, else current)
+        
+        Returns:
+            True if successful
+        """
+        try:
+            snapshot = options_data
+            if not isinstance(snapshot, ChainSnapshot):
+                records = [options_data] if isinstance(options_data, dict) else list(options_data or [])
+                snapshot = ChainSnapshot.from_records(records, index_name=index_name, timestamp=timestamp)
+            
+            if len(snapshot) == 0:
+                logger.warning("⚠️ No options data to store")
+                return True
+            
+            timestamp = timestamp or snapshot.timestamp or datetime.now()
+            start_time = time.perf_counter()
+            
+            payload = self._encode(snapshot, timestamp).tobytes()
+            with self._lock:
+                handle = self._get_handle(index_name, timestamp)
+                handle.write(payload)
+                handle.flush()
+                if self.fsync:
+                    os.fsync(handle.fileno())
+                
+                self.stats.snapshots_written += 1
+                self.stats.records_written += len(snapshot)
+                self.stats.bytes_written += len(payload)
+                self.stats.write_time += time.perf_counter() - start_time
+                self.stats.last_write_time = timestamp
+            
+            return True
+        
+        except Exception as e:
+            logger.error(f"🔴 Failed to append tick log for {index_name}: {e}")
+            with self._lock:
+                self.stats.write_errors += 1
+            return False
+    
+    def _encode(self, snapshot: ChainSnapshot, timestamp: datetime) -> np.ndarray:
+        """Pack a snapshot into fixed-width records."""
+        records = np.zeros(len(snapshot), dtype=RECORD_DTYPE)
+        records['timestamp_ms'] = _to_epoch_ms(timestamp)
+        records['instrument_token'] = snapshot.instrument_token
+        records['expiry'] = _expiry_to_int(snapshot.expiry)
+        records['is_call'] = snapshot.is_call
+        records['symbol'] = [str(symbol or '').encode('ascii', 'replace') for symbol in snapshot.symbol]
+        records['spot_price'] = np.nan if snapshot.spot_price is None else snapshot.spot_price
+        records['atm_strike'] = np.nan if snapshot.atm_strike is None else snapshot.atm_strike
+        for name in FLOAT_COLUMNS:
+            records[name] = snapshot.columns[name]
+        return records
+    
+    def _get_handle(self, index_name: str, timestamp: datetime):
+        """Get the append handle for a day's file, creating the file if needed."""
+        path = self.get_path(index_name, timestamp)
+        handle = self._handles.get(path)
+        if handle is not None:
+            return handle
+        
+        # Day rolled over: close the previous day's handle for this index
+        for old_path in [p for p in self._handles if p.name.startswith(f"{index_name.upper()}_")]:
+            self._handles.pop(old_path).close()
+        
+        if path.exists():
+            self._trim_torn_tail(path)
+        else:
+            self._write_header(path, index_name, timestamp)
+        
+        handle = open(path, 'ab')
+        self._handles[path] = handle
+        return handle
+    
+    def _write_header(self, path: Path, index_name: str, timestamp: datetime):
+        """Create a new tick log file containing only its header."""
+        header = {
+            'version': FORMAT_VERSION,
+            'index_name': index_name.upper(),
+            'date': timestamp.strftime('%Y-%m-%d'),
+            'dtype': [list(field) for field in RECORD_DTYPE.descr],
+            'record_size': RECORD_DTYPE.itemsize
+        }
+        # data_offset depends on the encoded header length, so size it with a placeholder first
+        header['data_offset'] = 0
+        length = len(json.dumps(header).encode('utf-8')) + 16
+        data_offset = -(-(HEADER_PREFIX.size + length) // HEADER_ALIGNMENT) * HEADER_ALIGNMENT
+        header['data_offset'] = data_offset
+        
+        body = json.dumps(header).encode('utf-8')
+        blob = HEADER_PREFIX.pack(MAGIC, len(body)) + body
+        temp_path = path.with_suffix('.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(blob.ljust(data_offset, b' '))
+        os.replace(temp_path, path)
+    
+    def _trim_torn_tail(self, path: Path):
+        """Cut a partially written trailing record left by a crash."""
+        header = read_header(path)
+        size = path.stat().st_size
+        excess = (size - header['data_offset']) % header['record_size']
+        if excess:
+            with open(path, 'r+b') as f:
+                f.truncate(size - excess)
+            logger.warning(f"⚠️ Trimmed {excess} bytes of a torn record from {path.name}")
+    
+    def open_reader(self, index_name: str, day: Union[date, datetime]) -> TickLogReader:
+        """Open a memory-mapped reader for one index and day."""
+        with self._lock:
+            handle = self._handles.get(self.get_path(index_name, day))
+            if handle is not None:
+                handle.flush()
+        return TickLogReader(self.get_path(index_name, day))
+    
+    def replay(self,
+               index_name: str,
+               start: datetime,
+               end: datetime,
+               expiry: Optional[str] = None) -> Iterator[ChainSnapshot]:
+        """
+        Replay logged cycles across days.
+        
+        Args:
+            index_name: Index name
+            start: First timestamp (inclusive)
+            end: Last timestamp (inclusive)
+            expiry: Only yield this expiry (YYYY-MM-DD)
+        
+        Yields:
+            ChainSnapshot per cycle in time order
+        """
+        day = start.date()
+        while day <= end.date():
+            if self.get_path(index_name, day).exists():
+                reader = self.open_reader(index_name, day)
+                try:
+                    yield from reader.replay(start, end, expiry)
+                finally:
+                    reader.close()
+            day += timedelta(days=1)
+    
+    def get_storage_stats(self) -> Dict[str, Any]:
+        """Get storage statistics."""
+        with self._lock:
+            return {
+                'snapshots_written': self.stats.snapshots_written,
+                'records_written': self.stats.records_written,
+                'bytes_written': self.stats.bytes_written,
+                'record_size': RECORD_DTYPE.itemsize,
+                'write_errors': self.stats.write_errors,
+                'average_write_ms': (self.stats.write_time / self.stats.snapshots_written * 1000
+                                     if self.stats.snapshots_written else 0.0),
+                'open_files': len(self._handles),
+                'last_write_time': self.stats.last_write_time.isoformat() if self.stats.last_write_time else None
+            }
+    
+    def health_check(self) -> Dict[str, Any]:
+        """Perform health check."""
+        return {
+            'status': 'healthy' if self.base_path.exists() else 'unhealthy',
+            'base_path_exists': self.base_path.exists(),
+            'stats': self.get_storage_stats()
+        }
+    
+    def shutdown(self):
+        """Shutdown tick log storage backend."""
+        with self._lock:
+            for handle in self._handles.values():
+                try:
+                    handle.flush()
+                    handle.close()
+                except Exception as e:
+                    logger.warning(f"⚠️ Error closing tick log: {e}")
+            self._handles.clear()
+        logger.info("🎞️ Tick log storage backend shutdown complete")
@@ -23,6 +23,10 @@ from dataclasses import dataclass, asdict
 from collections import defaultdict
 import statistics
 
+import numpy as np
+
+from g6_platform.analytics.max_pain import calculate_max_pain
+
 @dataclass
 class MarketOverview:
     """Market overview data structure."""
@@ -253,40 +257,13 @@ class OverviewGenerator:
         if not options_data:
             return 0
         
-        # Group by strike
-        strike_data = defaultdict(lambda: {'ce_oi': 0, 'pe_oi': 0})
-        
-        for option in options_data:
-            strike = option.get('strike', 0)
-            oi = option.get('oi', 0)
-            option_type = option.get('option_type', '')
-            
-            if option_type == 'CE':
-                strike_data[strike]['ce_oi'] = oi
-            elif option_type == 'PE':
-                strike_data[strike]['pe_oi'] = oi
-        
-        # Calculate pain for each strike
-        strikes = sorted(strike_data.keys())
-        max_pain_strike = 0
-        min_pain = float('inf')
-        
-        for test_strike in strikes:
-            total_pain = 0
-            
-            for strike, data in strike_data.items():
-                if strike > test_strike:
-                    # ITM calls
-                    total_pain += (strike - test_strike) * data['ce_oi']
-                elif strike < test_strike:
-                    # ITM puts
-                    total_pain += (test_strike - strike) * data['pe_oi']
-            
-            if total_pain < min_pain:
-                min_pain = total_pain
-                max_pain_strike = test_strike
-        
-        return max_pain_strike
+        legs = [option for option in options_data if option.get('option_type') in ('CE', 'PE')]
+        result = calculate_max_pain(
+            np.array([option.get('strike') or 0 for option in legs], dtype=float),
+            np.array([option.get('oi') or 0 for option in legs], dtype=float),
+            np.array([option['option_type'] == 'CE' for option in legs], dtype=bool)
+        )
+        return result.strike if result is not None else 0
     
     def _calculate_iv_percentile(self, options_data: List[Dict]) -> float:
         """Calculate IV percentile.
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Suite for G6 Platform Analytics
+Unit tests for g6_platform.analytics chain-level calculations
+
+Test Categories:
+- Vectorized implied volatility solver
+- Chain-level IV and Greeks engine
+- Max pain engine
+- Incremental chain aggregates
+- Ring-buffer metric history
+"""
+
+import math
+import datetime
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from g6_platform.analytics.analytics_engine import IVCalculator, GreeksCalculator, ChainGreeksEngine
+from g6_platform.analytics.max_pain import MaxPainEngine, calculate_max_pain
+from g6_platform.analytics.chain_aggregates import ChainAggregates
+from g6_platform.analytics.history_buffer import RingHistory
+from g6_platform.core.chain_snapshot import ChainSnapshot
+
+
+class TestImpliedVolatilityBatch(unittest.TestCase):
+    """Test cases for the vectorized IV solver."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.iv_calc = IVCalculator()
+        self.greeks_calc = GreeksCalculator()
+        self.spot = 25000.0
+        self.time_to_expiry = 14 / 365
+        self.strikes = np.array([24000.0, 24500.0, 25000.0, 25500.0, 26000.0] * 2)
+        self.types = np.array(['CE'] * 5 + ['PE'] * 5)
+        self.vols = np.array([0.22, 0.19, 0.16, 0.15, 0.17] * 2)
+        self.prices = np.array([
+            self.greeks_calc.calculate_all_greeks(self.spot, k, self.time_to_expiry, v, t).theoretical_price
+            for k, v, t in zip(self.strikes, self.vols, self.types)
+        ])
+    
+    def test_recovers_volatility_across_chain(self):
+        """Test the batch solver recovers the pricing volatility for every leg."""
+        iv, failed = self.iv_calc.calculate_implied_volatility_batch(
+            self.prices, self.spot, self.strikes, self.time_to_expiry, self.types
+        )
+        
+        self.assertFalse(failed.any())
+        np.testing.assert_allclose(iv, self.vols * 100, atol=0.05)
+    
+    def test_matches_scalar_solver(self):
+        """Test batch results agree with the scalar solver wherever it converges."""
+        iv, failed = self.iv_calc.calculate_implied_volatility_batch(
+            self.prices, self.spot, self.strikes, self.time_to_expiry, self.types
+        )
+        
+        scalar_failures = 0
+        for i in range(len(self.prices)):
+            scalar = self.iv_calc.calculate_implied_volatility(
+                self.prices[i], self.spot, self.strikes[i], self.time_to_expiry, self.types[i]
+            )
+            if scalar is None:
+                # Plain Newton overshoots on OTM wings; the bracketed solver must not
+                scalar_failures += 1
+                self.assertFalse(failed[i])
+            else:
+                self.assertAlmostEqual(iv[i], scalar, delta=0.01)
+        
+        self.assertLess(scalar_failures, len(self.prices))
+    
+    def test_invalid_lanes_are_masked(self):
+        """Test that unsolvable legs are flagged without affecting the rest."""
+        prices = np.array([0.0, 500.0, math.nan, self.prices[2]])
+        strikes = np.array([25000.0, 24000.0, 25000.0, 25000.0])
+        types = ['CE', 'CE', 'PE', 'CE']
+        
+        iv, failed = self.iv_calc.calculate_implied_volatility_batch(
+            prices, self.spot, strikes, self.time_to_expiry, types
+        )
+        
+        np.testing.assert_array_equal(failed, [True, True, True, False])
+        self.assertTrue(np.isnan(iv[:3]).all())
+        self.assertAlmostEqual(iv[3], 16.0, delta=0.05)
+    
+    def test_chain_engine_solves_expiry_once(self):
+        """Test the chain engine computes time to expiry once per distinct expiry."""
+        engine = ChainGreeksEngine()
+        now = datetime.datetime(2025, 1, 6, 10, 0)
+        expiry = datetime.date(2025, 1, 20)
+        options = [
+            {'last_price': p, 'strike': k, 'option_type': t, 'expiry': expiry}
+            for p, k, t in zip(self.prices, self.strikes, self.types)
+        ]
+        
+        with patch.object(engine, 'time_to_expiry', wraps=engine.time_to_expiry) as time_to_expiry:
+            rows = engine.compute_chain(options, self.spot, now)
+        
+        self.assertEqual(time_to_expiry.call_count, 1)
+        self.assertEqual(len(rows), len(options))
+        self.assertTrue(all(row['implied_volatility'] is not None for row in rows))
+
+
+class TestMaxPainEngine(unittest.TestCase):
+    """Test cases for the cumulative-sum max pain engine."""
+    
+    def test_matches_brute_force_on_uneven_grid(self):
+        """Test the payout curve matches a direct sum, including strikes off a 50-point grid."""
+        strikes = np.array([47900.0, 48000.0, 48100.0, 48300.0, 48400.0] * 2)
+        is_call = np.array([True] * 5 + [False] * 5)
+        oi = np.array([500.0, 900.0, 4000.0, 7000.0, 1200.0, 6000.0, 5000.0, 3500.0, 800.0, np.nan])
+        
+        result = calculate_max_pain(strikes, oi, is_call)
+        
+        legs = list(zip(strikes, np.nan_to_num(oi), is_call))
+        expected = [sum(o * max(s - k, 0) if call else o * max(k - s, 0) for k, o, call in legs)
+                    for s in result.strikes]
+        np.testing.assert_allclose(result.pain, expected)
+        self.assertEqual(result.strike, result.strikes[int(np.argmin(expected))])
+        self.assertEqual(result.strike, 48100.0)
+    
+    def test_cached_layout_tracks_new_oi(self):
+        """Test a reused strike layout still uses the latest OI."""
+        engine = MaxPainEngine()
+        strikes = np.array([100.0, 200.0, 300.0] * 2)
+        is_call = np.array([True] * 3 + [False] * 3)
+        
+        first = engine.compute(strikes, np.array([0, 10, 0, 0, 10, 0.0]), is_call, key='NIFTY')
+        second = engine.compute(strikes, np.array([10, 0, 0, 10, 0, 0.0]), is_call, key='NIFTY')
+        
+        self.assertEqual(first.strike, 200.0)
+        self.assertEqual(second.strike, 100.0)
+        self.assertIsNone(engine.compute(strikes, np.zeros(6), is_call, key='NIFTY'))
+
+
+class TestChainAggregates(unittest.TestCase):
+    """Test cases for incrementally maintained chain aggregates."""
+    
+    def _snapshot(self, oi, volume, iv):
+        """Build a 3-strike NIFTY chain snapshot."""
+        records = [
+            {'symbol': f'NIFTY{strike}{side}', 'strike': strike, 'option_type': side,
+             'oi': oi[i], 'volume': volume[i], 'iv': iv[i]}
+            for i, (strike, side) in enumerate([(24900, 'CE'), (25000, 'CE'), (25100, 'CE'),
+                                                (24900, 'PE'), (25000, 'PE'), (25100, 'PE')])
+        ]
+        return ChainSnapshot.from_records(records, index_name='NIFTY')
+    
+    def test_incremental_update_matches_rebuild(self):
+        """Test folding a delta gives the same aggregates as a fresh rebuild."""
+        aggregates = ChainAggregates(top_k=2)
+        aggregates.update(self._snapshot([100, 500, 700, 800, 300, 50], [10] * 6, [15.0, 14.0, 0.0, 16.0, 15.0, 17.0]))
+        before = aggregates.strike_maps()
+        self.assertEqual(aggregates.top_oi_strikes(), [24900, 25000])
+        
+        latest = self._snapshot([100, 2500, 700, 800, 300, 50], [10, 30, 10, 10, 10, 10], [15.0, 14.0, 18.0, 16.0, 15.0, 17.0])
+        self.assertEqual(aggregates.update(latest), 2)
+        
+        fresh = ChainAggregates(top_k=2)
+        fresh.update(latest)
+        self.assertEqual(aggregates.rebuilds, 1)
+        self.assertEqual(aggregates.strike_maps(), fresh.strike_maps())
+        self.assertEqual(aggregates.top_oi_strikes(), [25000, 24900])
+        self.assertEqual(aggregates.top_oi_strikes(), fresh.top_oi_strikes())
+        self.assertAlmostEqual(aggregates.average_iv, fresh.average_iv)
+        self.assertEqual(aggregates.max_pain().strike, fresh.max_pain().strike)
+        self.assertEqual((aggregates.total_ce_oi, aggregates.total_pe_volume), (3300, 30))
+        
+        # Maps handed out earlier keep their values
+        self.assertEqual(before['strike_oi_map'][25000], {'CE': 500, 'PE': 300})
+
+
+class TestRingHistory(unittest.TestCase):
+    """Test cases for the ring-buffer metric history."""
+    
+    def test_running_statistics_match_window(self):
+        """Test O(1) rolling mean/std equal a direct computation after wraparound."""
+        history = RingHistory(capacity=30, stats_window=12, fields=('spot', 'pcr_oi'))
+        spots = 25000 + np.cumsum(np.random.default_rng(7).normal(0, 5, 77))
+        for i, spot in enumerate(spots):
+            history.append(60.0 * i, spot=spot, pcr_oi=None if i % 5 == 0 else 0.8 + 0.01 * i)
+        
+        self.assertEqual(len(history), 30)
+        np.testing.assert_array_equal(history.window('spot', 4), spots[-4:])
+        self.assertAlmostEqual(history.mean('spot'), spots[-12:].mean(), places=6)
+        self.assertAlmostEqual(history.std('spot'), spots[-12:].std(ddof=1), places=6)
+        
+        pcr = history.window('pcr_oi', 12)
+        self.assertAlmostEqual(history.mean('pcr_oi'), np.nanmean(pcr))
+        self.assertAlmostEqual(history.std('pcr_oi'), np.nanstd(pcr, ddof=1))
+        self.assertEqual(history.count_since(60.0 * 70), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
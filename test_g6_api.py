@@ -0,0 +1,569 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Suite for G6 Platform API
+Unit tests for g6_platform.api without a live Kite session
+
+Test Categories:
+- IntelligentCache LRU, TTL and statistics behaviour
+- TokenBucketRateLimiter blocking, priority-ordered acquire
+- InstrumentIndex lookups, expiry resolution and snapshots
+- KiteTicker streaming chain book against a fake ticker
+- Async provider batching, deadlines and token bucket ordering
+"""
+
+import json
+import time
+import asyncio
+import tempfile
+import threading
+import unittest
+from datetime import date
+from unittest.mock import AsyncMock, Mock, patch
+
+from g6_platform.api.async_kite_provider import AsyncKiteDataProvider, AsyncTokenBucket
+from g6_platform.api.instruments import InstrumentIndex
+from g6_platform.api.kite_stream import KiteStreamEngine
+from g6_platform.api.kite_provider import IntelligentCache, KiteDataProvider, TokenBucketRateLimiter, RequestPriority
+from g6_platform.api.kite_provider import TokenException
+
+
+class TestIntelligentCache(unittest.TestCase):
+    """Test cases for the O(1) LRU/TTL cache."""
+    
+    def test_lru_eviction_keeps_recently_used(self):
+        """Test that get refreshes recency and eviction drops the LRU key."""
+        cache = IntelligentCache(max_size=2, default_ttl=60.0)
+        cache.put('quote:a', 1)
+        cache.put('quote:b', 2)
+        self.assertEqual(cache.get('quote:a'), 1)
+        
+        cache.put('quote:c', 3)
+        
+        self.assertIsNone(cache.get('quote:b'))
+        self.assertEqual(cache.get('quote:a'), 1)
+        self.assertEqual(cache.get('quote:c'), 3)
+        self.assertEqual(cache.get_stats()['evictions'], 1)
+    
+    def test_expired_entries_removed_lazily(self):
+        """Test that expired entries are dropped on lookup."""
+        cache = IntelligentCache(max_size=10, default_ttl=60.0)
+        cache.put('historical:x', 'old', ttl=0.01)
+        time.sleep(0.02)
+        
+        self.assertIsNone(cache.get('historical:x'))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.get_stats()['expirations'], 1)
+    
+    def test_per_prefix_statistics(self):
+        """Test hit/miss counters are tracked per key prefix."""
+        cache = IntelligentCache(max_size=10, lock_stripes=4)
+        cache.put('quote:NSE:NIFTY 50', {'last_price': 25000})
+        cache.get('quote:NSE:NIFTY 50')
+        cache.get('instruments:NFO')
+        cache.get('misc')
+        
+        stats = cache.get_stats()
+        self.assertEqual(stats['by_prefix']['quote:']['hits'], 1)
+        self.assertEqual(stats['by_prefix']['instruments:']['misses'], 1)
+        self.assertEqual(stats['by_prefix']['other']['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['lock_stripes'], 4)
+
+
+class TestTokenBucketRateLimiter(unittest.TestCase):
+    """Test cases for blocking, priority-ordered token acquisition."""
+    
+    def setUp(self):
+        """Set up an exhausted limiter refilling 20 tokens per second."""
+        self.limiter = TokenBucketRateLimiter(requests_per_minute=1200, burst_capacity=0)
+        self.limiter.state.tokens = 0.0
+    
+    def test_non_blocking_acquire_fails_when_empty(self):
+        """Test that the default zero timeout keeps the old non-blocking behaviour."""
+        self.assertFalse(self.limiter.acquire(RequestPriority.NORMAL))
+        self.assertEqual(self.limiter.get_status()['rate_limit_hits'], 1)
+    
+    def test_blocking_acquire_waits_for_refill(self):
+        """Test that a blocking acquire succeeds once tokens refill."""
+        self.assertTrue(self.limiter.acquire(RequestPriority.NORMAL, timeout=1.0))
+        
+        status = self.limiter.get_status()
+        self.assertEqual(status['requests'], 1)
+        self.assertEqual(sum(status['wait_histogram']['NORMAL'].values()), 1)
+    
+    def test_acquire_times_out(self):
+        """Test that a blocking acquire gives up at its deadline."""
+        self.limiter.refill_rate = 0.001
+        self.assertFalse(self.limiter.acquire(RequestPriority.LOW, timeout=0.05))
+        
+        status = self.limiter.get_status()
+        self.assertEqual(status['timeouts']['LOW'], 1)
+        self.assertEqual(status['queue_depth']['LOW'], 0)
+    
+    def test_higher_priority_waiter_served_first(self):
+        """Test that a later NORMAL waiter overtakes an earlier LOW waiter."""
+        order = []
+        
+        def worker(priority):
+            if self.limiter.acquire(priority, timeout=2.0):
+                order.append(priority)
+        
+        low = threading.Thread(target=worker, args=(RequestPriority.LOW,))
+        normal = threading.Thread(target=worker, args=(RequestPriority.NORMAL,))
+        
+        # Hold the refill back until both waiters are queued
+        self.limiter.state.tokens = -1.0
+        low.start()
+        while not self.limiter.get_status()['queue_depth']['LOW']:
+            time.sleep(0.001)
+        normal.start()
+        while not self.limiter.get_status()['queue_depth']['NORMAL']:
+            time.sleep(0.001)
+        
+        low.join()
+        normal.join()
+        
+        self.assertEqual(order, [RequestPriority.NORMAL, RequestPriority.LOW])
+
+
+def _instrument_rows():
+    rows = []
+    token = 1000
+    for expiry in (date(2025, 1, 2), date(2025, 1, 9), date(2024, 12, 26)):
+        for strike in (24950.0, 25000.0):
+            for option_type in ('CE', 'PE'):
+                token += 1
+                rows.append({
+                    'instrument_token': token,
+                    'tradingsymbol': f"NIFTY{expiry:%y%m%d}{int(strike)}{option_type}",
+                    'name': 'NIFTY',
+                    'expiry': expiry,
+                    'strike': strike,
+                    'instrument_type': option_type,
+                    'exchange': 'NFO',
+                    'lot_size': 75
+                })
+    rows.append({'instrument_token': 1, 'tradingsymbol': 'NIFTY25JANFUT', 'name': 'NIFTY',
+                 'expiry': date(2025, 1, 30), 'strike': 0.0, 'instrument_type': 'FUT', 'exchange': 'NFO'})
+    rows.append({'instrument_token': 2, 'tradingsymbol': 'RELIANCE25JAN1300CE', 'name': 'RELIANCE',
+                 'expiry': date(2025, 1, 30), 'strike': 1300.0, 'instrument_type': 'CE', 'exchange': 'NFO'})
+    return rows
+
+
+class TestInstrumentIndex(unittest.TestCase):
+    """Test cases for the instrument master index."""
+    
+    def setUp(self):
+        """Set up an index over a small instrument dump."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index = InstrumentIndex(snapshot_dir=self.temp_dir.name, underlyings=['NIFTY'])
+        self.index.build(_instrument_rows(), trade_date=date(2025, 1, 1))
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.temp_dir.cleanup()
+    
+    def test_lookup_and_reverse_map(self):
+        """Test forward and token lookups over indexed options only."""
+        self.assertEqual(len(self.index), 12)
+        
+        contract = self.index.lookup('NIFTY', '2025-01-09', 25000, 'PE')
+        self.assertEqual(contract.quote_symbol, 'NFO:NIFTY25010925000PE')
+        self.assertIs(self.index.by_token(contract.instrument_token), contract)
+        self.assertIsNone(self.index.lookup('NIFTY', '2025-01-09', 25050, 'PE'))
+    
+    def test_nearest_expiry(self):
+        """Test expiry lists are sorted and nearest expiry skips past dates."""
+        self.assertEqual(self.index.expiries('NIFTY'), ['2024-12-26', '2025-01-02', '2025-01-09'])
+        self.assertEqual(self.index.nearest_expiry('NIFTY', on_date=date(2025, 1, 1)), '2025-01-02')
+        self.assertEqual(self.index.nearest_expiry('NIFTY', on_date=date(2025, 1, 2)), '2025-01-02')
+        self.assertIsNone(self.index.nearest_expiry('NIFTY', on_date=date(2025, 2, 1)))
+    
+    def test_snapshot_round_trip(self):
+        """Test the on-disk snapshot restores the same contracts."""
+        self.assertIsNotNone(self.index.save_snapshot())
+        
+        restored = InstrumentIndex(snapshot_dir=self.temp_dir.name)
+        self.assertTrue(restored.load_snapshot(date(2025, 1, 1)))
+        self.assertEqual(restored.lookup('NIFTY', '2025-01-02', 24950, 'CE'),
+                         self.index.lookup('NIFTY', '2025-01-02', 24950, 'CE'))
+        self.assertFalse(restored.load_snapshot(date(2025, 1, 2)))
+    
+    def test_provider_builds_symbols_from_index(self):
+        """Test the provider resolves symbols through a fresh index without API calls."""
+        self.index.trade_date = date.today()
+        provider = KiteDataProvider.__new__(KiteDataProvider)
+        provider.instrument_index = self.index
+        provider.get_instruments = Mock()
+        
+        symbols = provider.build_option_symbols('NIFTY', [24950, 25000, 25050], expiry='2025-01-09',
+                                                option_types=['CE'])
+        
+        self.assertEqual(symbols, {
+            'NFO:NIFTY25010924950CE': (24950, 'CE'),
+            'NFO:NIFTY25010925000CE': (25000, 'CE')
+        })
+        provider.get_instruments.assert_not_called()
+
+
+class _FakeTicker:
+    """In-process stand-in for the Kite ticker WebSocket."""
+    
+    def __init__(self, api_key, access_token, root=None):
+        self.subscribed = set()
+        self.modes = {}
+    
+    def connect(self, threaded=False):
+        self.on_connect(self, {})
+    
+    def subscribe(self, tokens):
+        self.subscribed.update(tokens)
+    
+    def unsubscribe(self, tokens):
+        self.subscribed.difference_update(tokens)
+    
+    def set_mode(self, mode, tokens):
+        self.modes.update({token: mode for token in tokens})
+    
+    def push(self, *ticks):
+        self.on_ticks(self, list(ticks))
+    
+    def close(self):
+        pass
+
+
+class TestKiteStreamEngine(unittest.TestCase):
+    """Test cases for the streamed chain book."""
+    
+    def setUp(self):
+        """Set up an engine over a NIFTY strike ladder and a fake ticker."""
+        rows = [
+            {'instrument_token': 1000 + i * 2 + (option_type == 'PE'), 'tradingsymbol': f'NIFTY99{strike}{option_type}',
+             'exchange': 'NFO', 'name': 'NIFTY', 'expiry': '2099-01-01', 'strike': strike, 'instrument_type': option_type}
+            for i, strike in enumerate(range(24600, 25450, 50)) for option_type in ('CE', 'PE')
+        ]
+        index = InstrumentIndex(underlyings=['NIFTY'])
+        index.build(rows)
+        provider = Mock()
+        provider.ensure_instrument_index.return_value = index
+        self.index = index
+        
+        self.engine = KiteStreamEngine(provider, api_key='key', access_token='token', offsets=1, window_margin=1,
+                                       ticker_factory=_FakeTicker)
+        self.assertTrue(self.engine.start(['NIFTY']))
+        self.ticker = self.engine.ticker
+    
+    def _tick_window(self, oi=100):
+        """Send one tick for every subscribed option."""
+        self.ticker.push(*[{'instrument_token': token, 'last_price': 10.0, 'volume_traded': 5, 'oi': oi}
+                           for token in self.ticker.subscribed if token != 256265])
+    
+    def test_book_serves_window_and_follows_atm(self):
+        """Test the window is subscribed around spot, served from ticks and re-centered on large moves."""
+        self.assertEqual(self.ticker.subscribed, {256265})
+        self.ticker.push({'instrument_token': 256265, 'last_price': 25010.0})
+        self.assertEqual(len(self.ticker.subscribed), 1 + 10)  # spot + 5 strikes x CE/PE
+        self.assertIsNone(self.engine.get_options_data('NIFTY', [24950, 25000, 25050]))
+        
+        self._tick_window(oi=250)
+        records = self.engine.get_options_data('NIFTY', [24950, 25000, 25050])
+        self.assertEqual(len(records), 6)
+        self.assertEqual({r['oi'] for r in records}, {250})
+        self.assertEqual(records[0]['symbol'], 'NIFTY9924950CE')
+        
+        # Inside the hysteresis band: no re-subscription
+        self.ticker.push({'instrument_token': 256265, 'last_price': 25035.0})
+        self.assertEqual(self.engine.stats.resubscriptions, 1)
+        
+        self.ticker.push({'instrument_token': 256265, 'last_price': 25110.0})
+        self.assertEqual(self.engine.stats.resubscriptions, 2)
+        self.assertNotIn(self.index.lookup('NIFTY', '2099-01-01', 24900, 'CE').instrument_token, self.ticker.subscribed)
+        self.assertIn(self.index.lookup('NIFTY', '2099-01-01', 25200, 'PE').instrument_token, self.ticker.subscribed)
+        
+        # Legs kept across the shift still serve; new legs wait for their first tick
+        self.assertIsNotNone(self.engine.get_options_data('NIFTY', [25050, 25100]))
+        self.assertIsNone(self.engine.get_options_data('NIFTY', [25100, 25150]))
+    
+    def test_market_context_from_streamed_spot(self):
+        """Test the cycle context comes from ticks and stale books are left out."""
+        self.ticker.push({'instrument_token': 256265, 'last_price': 25010.0, 'change': 0.5,
+                          'ohlc': {'close': 24885.0}})
+        
+        context = self.engine.market_context(['NIFTY', 'BANKNIFTY']).get('NIFTY')
+        self.assertEqual(context.atm_strike, 25000)
+        self.assertEqual(context.change, 125.0)
+        self.assertIsNone(self.engine.market_context(['BANKNIFTY']).get('BANKNIFTY'))
+        
+        self.engine.max_staleness = 0.0
+        time.sleep(0.01)
+        self.assertEqual(self.engine.market_context(['NIFTY']).indices, {})
+    
+    def test_silent_option_legs_fall_back_while_spot_ticks(self):
+        """Test spot ticks alone do not keep the option window fresh."""
+        self.ticker.push({'instrument_token': 256265, 'last_price': 25010.0})
+        self._tick_window()
+        self.assertIsNotNone(self.engine.get_options_data('NIFTY', [25000]))
+        
+        self.engine._books['NIFTY'].last_option_tick_time -= 10
+        self.ticker.push({'instrument_token': 256265, 'last_price': 25015.0})
+        self.assertIsNone(self.engine.get_options_data('NIFTY', [25000]))
+        self.assertIsNotNone(self.engine.market_context(['NIFTY']).get('NIFTY'))
+    
+    def test_window_rolls_to_next_expiry(self):
+        """Test a new day re-resolves the nearest expiry instead of keeping the first one."""
+        self.ticker.push({'instrument_token': 256265, 'last_price': 25010.0})
+        self.assertEqual(self.engine._books['NIFTY'].expiry, '2099-01-01')
+        
+        # The old series is delisted overnight; the next weekly keeps the same strikes
+        self.index.build([
+            {'instrument_token': 5000 + i * 2 + (option_type == 'PE'), 'tradingsymbol': f'NIFTY98{strike}{option_type}',
+             'exchange': 'NFO', 'name': 'NIFTY', 'expiry': '2099-01-08', 'strike': strike, 'instrument_type': option_type}
+            for i, strike in enumerate(range(24600, 25450, 50)) for option_type in ('CE', 'PE')
+        ])
+        self.engine._books['NIFTY'].window_date = date(2000, 1, 1)
+        self.ticker.push({'instrument_token': 256265, 'last_price': 25012.0})
+        
+        self.assertEqual(self.engine._books['NIFTY'].expiry, '2099-01-08')
+        self.assertEqual(self.engine.stats.resubscriptions, 2)
+        self.assertIn(self.index.lookup('NIFTY', '2099-01-08', 25000, 'CE').instrument_token, self.ticker.subscribed)
+        self.assertEqual(len(self.ticker.subscribed), 1 + 10)
+    
+    def test_instrument_index_refreshed_off_ticker_thread(self):
+        """Test a missing index is fetched on a worker thread and failed re-centres back off."""
+        callers = []
+        
+        def ensure_instrument_index():
+            callers.append(threading.current_thread().name)
+            return self.index if len(callers) > 1 else None
+        
+        provider = Mock()
+        provider.ensure_instrument_index.side_effect = ensure_instrument_index
+        engine = KiteStreamEngine(provider, api_key='key', access_token='token', offsets=1, window_margin=1,
+                                  ticker_factory=_FakeTicker)
+        self.assertTrue(engine.start(['NIFTY']))
+        
+        engine.ticker.push({'instrument_token': 256265, 'last_price': 25010.0})
+        engine.ticker.push({'instrument_token': 256265, 'last_price': 25011.0})
+        self.assertGreater(engine._books['NIFTY'].retry_at, time.time())
+        engine._refresh_thread.join(2)
+        self.assertEqual(callers[1:], ['KiteStreamInstruments'])
+        
+        engine.ticker.push({'instrument_token': 256265, 'last_price': 25012.0})
+        self.assertEqual(engine.stats.resubscriptions, 1)
+        self.assertEqual(len(engine.ticker.subscribed), 1 + 10)
+    
+    def test_refresh_finishing_first_is_not_backed_off(self):
+        """Test a refresh that completes before the failed re-centre returns still re-arms the window."""
+        class InlineThread:
+            """Thread stand-in running its target inside start()."""
+            
+            def __init__(self, target, daemon=None, name=None):
+                self.target = target
+            
+            def start(self):
+                self.target()
+            
+            def is_alive(self):
+                return False
+        
+        provider = Mock()
+        provider.ensure_instrument_index.side_effect = [None, self.index]
+        engine = KiteStreamEngine(provider, api_key='key', access_token='token', offsets=1, window_margin=1,
+                                  ticker_factory=_FakeTicker)
+        self.assertTrue(engine.start(['NIFTY']))
+        
+        with patch('g6_platform.api.kite_stream.threading.Thread', InlineThread):
+            engine.ticker.push({'instrument_token': 256265, 'last_price': 25010.0})
+        self.assertEqual(engine._books['NIFTY'].retry_at, 0.0)
+        
+        engine.ticker.push({'instrument_token': 256265, 'last_price': 25011.0})
+        self.assertEqual(engine.stats.resubscriptions, 1)
+
+
+class _FakeSession:
+    """Stand-in for a pooled aiohttp session answering /quote requests."""
+    
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    def get(self, url, params=None):
+        self.calls.append((url, params))
+        return _FakeResponse(self, params)
+
+
+class _FakeResponse:
+    """Response context manager echoing a quote per requested instrument."""
+    
+    status = 200
+    
+    def __init__(self, session, params):
+        self.session = session
+        self.params = params
+    
+    async def __aenter__(self):
+        self.session.in_flight += 1
+        self.session.max_in_flight = max(self.session.max_in_flight, self.session.in_flight)
+        try:
+            await asyncio.sleep(self.session.delay)
+        finally:
+            self.session.in_flight -= 1
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    async def text(self):
+        data = {symbol: {'last_price': 100.0} for _, symbol in self.params}
+        return json.dumps({'status': 'success', 'data': data})
+
+
+class _ScriptedSession:
+    """Session answering each request with the next scripted (status, body)."""
+    
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+    
+    def get(self, url, params=None):
+        self.calls.append(url)
+        return _ScriptedResponse(*self.responses.pop(0))
+
+
+class _ScriptedResponse:
+    """Response context manager with a fixed status and body."""
+    
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    async def text(self):
+        return self.body
+
+
+class TestAsyncKiteDataProvider(unittest.TestCase):
+    """Test the asyncio provider against a fake pooled session."""
+    
+    def setUp(self):
+        self.session = _FakeSession(delay=0.05)
+        self.provider = AsyncKiteDataProvider('key', 'token', instrument_snapshot_dir=tempfile.mkdtemp(),
+                                              session=self.session)
+    
+    def test_quote_chunks_fetched_concurrently(self):
+        """Test batched quotes run every chunk at once and merge the responses."""
+        symbols = [f"NFO:NIFTY{strike}CE" for strike in range(5)]
+        
+        quotes = asyncio.run(self.provider.get_quotes_batched(symbols, chunk_size=2))
+        
+        self.assertEqual(set(quotes), set(symbols))
+        self.assertEqual(len(self.session.calls), 3)
+        self.assertEqual(self.session.max_in_flight, 3)
+        self.assertEqual(self.session.calls[0][1], [('i', symbols[0]), ('i', symbols[1])])
+    
+    def test_deadline_cancels_request(self):
+        """Test an expired deadline cancels the request and counts a timeout."""
+        self.session.delay = 1.0
+        
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(self.provider.get_quote('NSE:NIFTY 50', deadline=0.05))
+        
+        self.assertEqual(self.session.in_flight, 0)
+        self.assertEqual(self.provider.metrics.timeout_errors, 1)
+    
+    def test_options_deadline_raises_timeout(self):
+        """Test get_options_data lets an expired deadline raise instead of returning []."""
+        self.session.delay = 1.0
+        self.provider.instrument_index = None
+        
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(self.provider.get_options_data('NIFTY', [25000], expiry='2025-01-09', deadline=0.05))
+    
+    def test_rate_limit_and_server_errors_retried_with_backoff(self):
+        """Test 429 and 5xx responses are retried with doubling backoff until one succeeds."""
+        session = _ScriptedSession((429, '{"message": "Too many requests"}'), (503, 'unavailable'),
+                                   (200, '{"status": "success", "data": {"user_id": "AB1234"}}'))
+        provider = AsyncKiteDataProvider('key', 'token', instrument_snapshot_dir=tempfile.mkdtemp(), session=session)
+        
+        with patch('g6_platform.api.async_kite_provider.asyncio.sleep', new=AsyncMock()) as sleep:
+            profile = asyncio.run(provider._request('/user/profile'))
+        
+        self.assertEqual(profile, {'user_id': 'AB1234'})
+        self.assertEqual([call.args[0] for call in sleep.await_args_list], [1, 2])
+        self.assertEqual((provider.metrics.total_requests, provider.metrics.successful_requests), (3, 1))
+    
+    def test_retries_exhausted_and_token_errors(self):
+        """Test persistent 5xx raises after max_retries and 403 maps to TokenException without retrying."""
+        session = _ScriptedSession(*[(502, 'bad gateway')] * 3,
+                                   (403, '{"error_type": "TokenException", "message": "Token expired"}'))
+        provider = AsyncKiteDataProvider('key', 'token', instrument_snapshot_dir=tempfile.mkdtemp(),
+                                         max_retries=2, session=session)
+        
+        with patch('g6_platform.api.async_kite_provider.asyncio.sleep', new=AsyncMock()):
+            with self.assertRaises(Exception) as raised:
+                asyncio.run(provider._request('/quote'))
+            self.assertIn('HTTP 502', str(raised.exception))
+            
+            with self.assertRaises(TokenException) as raised:
+                asyncio.run(provider._request('/quote'))
+        
+        self.assertIn('Token expired', str(raised.exception))
+        self.assertEqual(len(session.calls), 4)
+        self.assertEqual(provider.metrics.failed_requests, 2)
+    
+    def test_instruments_csv_parsed_and_cached(self):
+        """Test the instrument dump CSV is typed like kiteconnect rows and cached per exchange."""
+        body = ("instrument_token,exchange_token,tradingsymbol,name,last_price,expiry,strike,tick_size,"
+                "lot_size,instrument_type,segment,exchange\n"
+                "12345,48,NIFTY25JAN25000CE,NIFTY,0,2025-01-30,25000.0,0.05,75,CE,NFO-OPT,NFO\n"
+                "256265,1001,NIFTY 50,,0,,0,0,0,EQ,INDICES,NSE\n")
+        session = _ScriptedSession((200, body))
+        provider = AsyncKiteDataProvider('key', 'token', instrument_snapshot_dir=tempfile.mkdtemp(), session=session)
+        
+        instruments = asyncio.run(provider.get_instruments('NFO'))
+        self.assertEqual(asyncio.run(provider.get_instruments('NFO')), instruments)
+        
+        self.assertEqual(session.calls, ['https://api.kite.trade/instruments/NFO'])
+        self.assertEqual(len(instruments), 2)
+        option = instruments[0]
+        self.assertEqual((option['instrument_token'], option['lot_size'], option['strike']), (12345, 75, 25000.0))
+        self.assertEqual((option['tradingsymbol'], option['expiry'], option['instrument_type']),
+                         ('NIFTY25JAN25000CE', '2025-01-30', 'CE'))
+        self.assertEqual((instruments[1]['strike'], instruments[1]['expiry']), (0.0, ''))
+    
+    def test_token_bucket_serves_priority_and_drops_cancelled(self):
+        """Test waiters are served by priority and cancelled waiters leave the queue."""
+        async def scenario():
+            bucket = AsyncTokenBucket(requests_per_minute=600, burst_capacity=0)
+            bucket.tokens = 0.0
+            order = []
+            
+            async def waiter(priority):
+                await bucket.acquire(priority, timeout=2.0)
+                order.append(priority)
+            
+            cancelled = asyncio.create_task(bucket.acquire(RequestPriority.CRITICAL, timeout=None))
+            low = asyncio.create_task(waiter(RequestPriority.LOW))
+            high = asyncio.create_task(waiter(RequestPriority.HIGH))
+            await asyncio.sleep(0.01)
+            cancelled.cancel()
+            await asyncio.gather(low, high)
+            return order, bucket.get_status()['queue_depth']
+        
+        order, queue_depth = asyncio.run(scenario())
+        
+        self.assertEqual(order, [RequestPriority.HIGH, RequestPriority.LOW])
+        self.assertEqual(sum(queue_depth.values()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Suite for G6 Platform Collectors
+Unit tests for g6_platform.collectors using a stubbed API provider
+
+Test Categories:
+- Chain fetch behaviour of ATMOptionsCollector
+- Chain-level Greeks attached during processing
+- Overview metrics from records and chain snapshots
+- Shared per-cycle spot/ATM context
+"""
+
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+from g6_platform.api.kite_provider import KiteDataProvider, RequestPriority
+from g6_platform.collectors.atm_collector import ATMOptionsCollector, StrikeConfig
+from g6_platform.collectors.overview_collector import OverviewCollector
+from g6_platform.collectors.market_context import MarketContextBuilder
+from g6_platform.core.chain_snapshot import ChainSnapshot
+
+
+def _make_provider(quote_side_effect):
+    """Build a KiteDataProvider without a live Kite session."""
+    provider = KiteDataProvider.__new__(KiteDataProvider)
+    provider.instrument_index = None
+    provider.get_quote = Mock(side_effect=quote_side_effect)
+    return provider
+
+
+def _fake_quote(instruments, priority=RequestPriority.NORMAL):
+    return {
+        symbol: {'instrument_token': i, 'last_price': 100.0 + i, 'volume': 10, 'oi': 1000, 'net_change': 1.5}
+        for i, symbol in enumerate(instruments)
+    }
+
+
+class TestChainFetch(unittest.TestCase):
+    """Test cases for bulk chain fetching."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.provider = _make_provider(_fake_quote)
+        self.collector = ATMOptionsCollector(api_provider=self.provider, max_workers=2)
+        self.strike_config = StrikeConfig(
+            center_strike=25000,
+            offsets=[-5, -4, -3, -2, -1, 0, 1, 2, 3, 4, 5],
+            strike_interval=50
+        )
+    
+    def tearDown(self):
+        """Release collector threads."""
+        self.collector.thread_pool.shutdown(wait=False)
+    
+    def test_bulk_fetch_uses_single_quote_call(self):
+        """The whole 11-strike window is fetched in one quote request."""
+        data = self.collector._collect_options_batch('NIFTY', self.strike_config, include_greeks=False)
+        
+        self.assertEqual(self.provider.get_quote.call_count, 1)
+        self.assertEqual(len(data), 22)
+        
+        requested = self.provider.get_quote.call_args[0][0]
+        self.assertIn('NFO:NIFTY25000CE', requested)
+        self.assertIn('NFO:NIFTY24750PE', requested)
+    
+    def test_bulk_fetch_fans_out_per_leg_records(self):
+        """Each leg keeps its real strike and option type."""
+        data = self.collector._collect_options_batch('NIFTY', self.strike_config, include_greeks=False)
+        
+        legs = {(d['strike'], d['option_type']) for d in data}
+        self.assertIn((25000, 'CE'), legs)
+        self.assertIn((25250, 'PE'), legs)
+        self.assertTrue(all(d['symbol'].startswith('NIFTY') for d in data))
+    
+    def test_quotes_are_chunked_by_instrument_limit(self):
+        """Large windows are split at the per-request instrument limit."""
+        self.provider.MAX_QUOTE_INSTRUMENTS = 10
+        data = self.collector._collect_options_batch('NIFTY', self.strike_config, include_greeks=False)
+        
+        self.assertEqual(self.provider.get_quote.call_count, 3)
+        self.assertEqual(len(data), 22)
+    
+    def test_chain_source_served_before_rest(self):
+        """A streamed chain book that covers the window replaces the REST quote."""
+        self.collector.chain_source = Mock()
+        self.collector.chain_source.get_options_data.return_value = [
+            {'symbol': 'NIFTY25000CE', 'strike': 25000, 'option_type': 'CE', 'last_price': 101.0}
+        ]
+        data = self.collector._collect_options_batch('NIFTY', self.strike_config, include_greeks=False)
+        
+        self.assertEqual(len(data), 1)
+        self.provider.get_quote.assert_not_called()
+        
+        self.collector.chain_source.get_options_data.return_value = None
+        data = self.collector._collect_options_batch('NIFTY', self.strike_config, include_greeks=False)
+        self.assertEqual(len(data), 22)
+    
+    def test_failed_bulk_fetch_falls_back_per_leg(self):
+        """A failed chain request (reported as an empty chain) is retried leg by leg."""
+        def quote(instruments, priority=RequestPriority.NORMAL):
+            if len(instruments) > 1:
+                raise ConnectionError("bulk quote failed")
+            return _fake_quote(instruments, priority)
+        
+        self.provider.get_quote.side_effect = quote
+        data = self.collector._collect_options_batch('NIFTY', self.strike_config, include_greeks=False)
+        
+        self.assertEqual(self.provider.get_quote.call_count, 1 + 22)
+        self.assertEqual(len(data), 22)
+    
+    def test_per_leg_mode_still_available(self):
+        """Disabling bulk fetch keeps the per-leg path."""
+        self.collector.bulk_fetch = False
+        data = self.collector._collect_options_batch('NIFTY', self.strike_config, include_greeks=False)
+        
+        self.assertEqual(self.provider.get_quote.call_count, 22)
+        self.assertEqual(len(data), 22)
+
+
+class TestChainGreeks(unittest.TestCase):
+    """Test cases for chain-level Greeks in option processing."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.provider = Mock(spec=['get_spot_price'])
+        self.provider.get_spot_price.return_value = 25000.0
+        self.collector = ATMOptionsCollector(api_provider=self.provider, max_workers=1)
+        self.strike_config = StrikeConfig(center_strike=25000, offsets=[-1, 0, 1], strike_interval=50)
+        
+        expiry = (datetime.now() + timedelta(days=10)).strftime('%Y-%m-%d')
+        self.raw_data = [
+            {'symbol': 'NIFTY24950CE', 'strike': 24950, 'option_type': 'CE', 'last_price': 320.0, 'expiry': expiry},
+            {'symbol': 'NIFTY25000PE', 'strike': 25000, 'option_type': 'PE', 'last_price': 230.0, 'expiry': expiry},
+            {'symbol': 'NIFTY25050CE', 'strike': 25050, 'option_type': 'CE', 'last_price': 0.0, 'expiry': expiry}
+        ]
+    
+    def tearDown(self):
+        """Release collector threads."""
+        self.collector.thread_pool.shutdown(wait=False)
+    
+    def test_greeks_attached_per_leg(self):
+        """Every valid leg gets Greeks from one spot lookup; unsolvable legs get None."""
+        data = self.collector._process_options_data('NIFTY', self.raw_data, self.strike_config, include_greeks=True)
+        
+        self.assertEqual(len(data), 3)
+        self.provider.get_spot_price.assert_called_once_with('NIFTY')
+        
+        call_leg, put_leg, zero_leg = data
+        self.assertGreater(call_leg['delta'], 0.5)
+        self.assertLess(put_leg['delta'], 0)
+        self.assertGreater(put_leg['implied_volatility'], 0)
+        self.assertIsNone(zero_leg['delta'])
+    
+    def test_greeks_skipped_when_disabled(self):
+        """No Greeks and no spot lookup when include_greeks is off."""
+        data = self.collector._process_options_data('NIFTY', self.raw_data, self.strike_config)
+        
+        self.assertNotIn('delta', data[0])
+        self.provider.get_spot_price.assert_not_called()
+
+
+class TestOverviewFromSnapshot(unittest.TestCase):
+    """Test cases for overview generation over columnar chains."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        provider = Mock()
+        provider.get_quote.return_value = {'NIFTY': {'last_price': 25020.0, 'net_change': 10.0}}
+        provider.get_atm_strike.return_value = 25000
+        self.collector = OverviewCollector(api_provider=provider)
+        self.records = [
+            {'symbol': f"NIFTY{strike}{option_type}", 'strike': strike, 'option_type': option_type,
+             'last_price': 100.0, 'volume': volume, 'oi': oi}
+            for strike, option_type, volume, oi in (
+                (24900, 'PE', 500, 9000), (24900, 'CE', 100, 1000),
+                (25000, 'CE', 300, 4000), (25000, 'PE', 400, 5000),
+                (25100, 'CE', 200, 8000), (25100, 'PE', 50, 500)
+            )
+        ]
+    
+    def test_records_and_snapshot_agree(self):
+        """Legacy records and a ChainSnapshot produce the same overview metrics."""
+        from_records = self.collector.generate_market_overview('NIFTY', self.records, use_cache=False)
+        from_snapshot = self.collector.generate_market_overview(
+            'NIFTY', ChainSnapshot.from_records(self.records), use_cache=False
+        )
+        
+        for overview in (from_records, from_snapshot):
+            self.assertEqual(overview.total_ce_oi, 13000)
+            self.assertEqual(overview.total_pe_oi, 14500)
+            self.assertEqual(overview.total_pe_volume, 950)
+            self.assertEqual(overview.key_strikes['strike_oi_map'][24900], {'CE': 1000, 'PE': 9000})
+            self.assertEqual(overview.support_levels, [25000, 24900])
+            self.assertEqual(overview.resistance_levels, [25100])
+        self.assertEqual(from_records.max_pain, from_snapshot.max_pain)
+    
+    def test_pcr_trend_from_cycle_history(self):
+        """PCR trend is classified from the in-memory history of recent cycles."""
+        for put_oi in (9000, 12000, 15000):
+            self.records[0]['oi'] = put_oi
+            self.collector.generate_market_overview('NIFTY', self.records, use_cache=False)
+        
+        trend = self.collector.get_pcr_trend('NIFTY')
+        
+        self.assertEqual(trend['trend'], 'rising')
+        self.assertEqual(trend['samples'], 3)
+        self.assertAlmostEqual(trend['current_pcr_oi'], 20500 / 13000)
+
+
+class TestMarketContext(unittest.TestCase):
+    """Test cases for the shared per-cycle spot/ATM context."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.spots = {'NSE:NIFTY 50': 25010.0, 'NSE:NIFTY BANK': 55040.0}
+        self.provider = Mock()
+        self.provider.INSTRUMENT_MAPPING = KiteDataProvider.INSTRUMENT_MAPPING
+        self.provider.get_quote.side_effect = lambda instruments, priority: {
+            instrument: {'last_price': self.spots[instrument]} for instrument in instruments
+        }
+        self.builder = MarketContextBuilder(self.provider, hysteresis=0.3)
+    
+    def test_one_quote_for_all_indices_with_hysteresis(self):
+        """All spots come from one quote per cycle and small moves keep the ATM strike."""
+        first = self.builder.build(['NIFTY', 'BANKNIFTY'])
+        self.assertEqual(self.provider.get_quote.call_count, 1)
+        self.assertEqual(first.get('NIFTY').atm_strike, 25000)
+        self.assertEqual(first.get('BANKNIFTY').atm_strike, 55000)
+        
+        # 35 points past ATM rounds to 25050 but stays inside the hysteresis band
+        self.spots['NSE:NIFTY 50'] = 25035.0
+        held = self.builder.build(['NIFTY', 'BANKNIFTY']).get('NIFTY')
+        self.assertEqual(held.atm_strike, 25000)
+        self.assertFalse(held.recentered)
+        
+        self.spots['NSE:NIFTY 50'] = 25045.0
+        moved = self.builder.build(['NIFTY', 'BANKNIFTY']).get('NIFTY')
+        self.assertEqual(moved.atm_strike, 25050)
+        self.assertTrue(moved.recentered)
+        self.assertEqual(self.provider.get_quote.call_count, 3)
+    
+    def test_consumers_read_context_without_quoting(self):
+        """ATM collection and overview generation take spot and ATM from the context."""
+        context = self.builder.build(['NIFTY']).get('NIFTY')
+        self.provider.reset_mock()
+        
+        collector = ATMOptionsCollector(api_provider=self.provider, max_workers=1, greeks_engine=Mock())
+        collector.greeks_engine.compute_chain.return_value = None
+        records = [{'symbol': 'NIFTY25000CE', 'strike': 25000, 'option_type': 'CE', 'last_price': 100.0, 'oi': 10}]
+        collector._collect_options_batch = Mock(return_value=records)
+        try:
+            result = collector.collect_atm_options('NIFTY', context=context)
+        finally:
+            collector.thread_pool.shutdown(wait=False)
+        
+        overview = OverviewCollector(api_provider=self.provider).generate_market_overview(
+            'NIFTY', result.snapshot, use_cache=False, context=context
+        )
+        
+        self.assertTrue(result.success)
+        self.assertEqual(result.metadata['atm_strike'], 25000)
+        collector.greeks_engine.compute_chain.assert_called_once_with(records, 25010.0)
+        self.assertEqual(overview.current_price, 25010.0)
+        self.provider.get_quote.assert_not_called()
+        self.provider.get_atm_strike.assert_not_called()
+        self.provider.get_spot_price.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
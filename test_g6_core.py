@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Suite for G6 Platform Core
+Unit tests for g6_platform.core scheduling and chain snapshots
+
+Test Categories:
+- Wall-clock alignment of collection cycles
+- Overrun handling (skip / coalesce)
+- Lateness and jitter accounting
+- ChainSnapshot columnar layout and record adapters
+"""
+
+import unittest
+import threading
+
+import numpy as np
+
+from g6_platform.core.chain_snapshot import ChainSnapshot
+from g6_platform.core.scheduler import CycleScheduler
+
+
+class TestCycleScheduler(unittest.TestCase):
+    """Test cases for CycleScheduler."""
+    
+    def test_first_deadline_aligns_to_boundary(self):
+        """The first cycle starts on the next :00/:30 boundary."""
+        scheduler = CycleScheduler(interval=30)
+        self.assertEqual(scheduler.next_deadline(now=1000012.5), 1000020.0)
+    
+    def test_cycle_duration_does_not_drift(self):
+        """Deadlines advance by exactly one interval regardless of cycle time."""
+        scheduler = CycleScheduler(interval=30)
+        deadline = scheduler.next_deadline(now=1000005.0)
+        
+        for _ in range(5):
+            scheduler.mark_cycle_start(deadline, started=deadline + 0.2)
+            next_deadline = scheduler.next_deadline(now=deadline + 12.0)
+            self.assertEqual(next_deadline - deadline, 30.0)
+            deadline = next_deadline
+    
+    def test_skip_policy_drops_missed_boundaries(self):
+        """A 70s cycle on a 30s cadence skips to the next future boundary."""
+        scheduler = CycleScheduler(interval=30, overrun_policy='skip')
+        deadline = scheduler.next_deadline(now=999990.0)
+        scheduler.mark_cycle_start(deadline, started=deadline)
+        
+        next_deadline = scheduler.next_deadline(now=deadline + 70.0)
+        self.assertEqual(next_deadline, deadline + 90.0)
+        self.assertEqual(scheduler.stats.skipped_cycles, 2)
+        self.assertEqual(scheduler.stats.overruns, 1)
+    
+    def test_coalesce_policy_runs_once_immediately(self):
+        """Missed boundaries collapse into one late cycle, then realign."""
+        scheduler = CycleScheduler(interval=30, overrun_policy='coalesce')
+        deadline = scheduler.next_deadline(now=999990.0)
+        scheduler.mark_cycle_start(deadline, started=deadline)
+        
+        late_deadline = scheduler.next_deadline(now=deadline + 70.0)
+        self.assertEqual(late_deadline, deadline + 60.0)
+        
+        timing = scheduler.mark_cycle_start(late_deadline, started=deadline + 70.0)
+        self.assertAlmostEqual(timing['lateness'], 10.0)
+        self.assertEqual(scheduler.next_deadline(now=deadline + 75.0), deadline + 90.0)
+    
+    def test_jitter_ignores_whole_skipped_periods(self):
+        """Jitter measures deviation from the cadence, not skipped cycles."""
+        scheduler = CycleScheduler(interval=30)
+        scheduler.mark_cycle_start(1000020.0, started=1000020.0)
+        timing = scheduler.mark_cycle_start(1000080.0, started=1000080.25)
+        
+        self.assertAlmostEqual(timing['jitter'], 0.25)
+    
+    def test_wait_returns_none_on_shutdown(self):
+        """Waiting aborts as soon as shutdown is requested."""
+        scheduler = CycleScheduler(interval=3600)
+        shutdown = threading.Event()
+        shutdown.set()
+        
+        self.assertIsNone(scheduler.wait_for_next_cycle(shutdown))
+    
+    def test_invalid_policy_rejected(self):
+        """Unknown overrun policies raise ValueError."""
+        with self.assertRaises(ValueError):
+            CycleScheduler(interval=30, overrun_policy='backfill')
+
+def _chain_records():
+    records = []
+    for i, strike in enumerate((25100, 24900, 25000)):
+        for option_type in ('PE', 'CE'):
+            records.append({
+                'symbol': f"NIFTY{strike}{option_type}",
+                'strike': strike,
+                'expiry': '2025-01-09',
+                'option_type': option_type,
+                'instrument_token': 100 + i,
+                'last_price': 50.0 + i,
+                'volume': 10 * (i + 1),
+                'oi': 1000 * (i + 1),
+                'change': None,
+                'timestamp': '2025-01-06T09:15:00',
+                'index_name': 'NIFTY',
+                'position_type': 'OTM'
+            })
+    return records
+
+
+class TestChainSnapshot(unittest.TestCase):
+    """Test cases for the columnar chain snapshot."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.records = _chain_records()
+        self.snapshot = ChainSnapshot.from_records(self.records, atm_strike=25000)
+    
+    def test_calls_first_sorted_by_strike(self):
+        """Rows are ordered calls then puts, each by strike, with metadata held once."""
+        self.assertEqual(len(self.snapshot), 6)
+        self.assertEqual(self.snapshot.option_types().tolist(), ['CE'] * 3 + ['PE'] * 3)
+        self.assertEqual(self.snapshot.calls().strike.tolist(), [24900, 25000, 25100])
+        self.assertEqual(self.snapshot.index_name, 'NIFTY')
+        self.assertEqual(self.snapshot.expiry, '2025-01-09')
+    
+    def test_side_views_share_memory(self):
+        """calls() and puts() are zero-copy views of the snapshot columns."""
+        puts = self.snapshot.puts()
+        
+        self.assertTrue(np.shares_memory(puts.oi, self.snapshot.oi))
+        self.assertTrue(np.shares_memory(puts.extra['position_type'], self.snapshot.extra['position_type']))
+        self.assertEqual(puts.oi.tolist(), [2000, 3000, 1000])
+    
+    def test_record_round_trip(self):
+        """Converting back yields the original records."""
+        key = lambda r: (r['option_type'], r['strike'])
+        self.assertEqual(sorted(self.snapshot.to_records(), key=key), sorted(self.records, key=key))
+    
+    def test_missing_values_are_nan(self):
+        """Missing numeric fields become NaN columns."""
+        self.assertTrue(np.isnan(self.snapshot.change).all())
+        self.assertTrue(np.isnan(self.snapshot.iv).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,799 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Suite for G6 Platform Storage
+Unit tests for g6_platform.storage backends and the storage pipeline
+
+Test Categories:
+- Asynchronous fan-out and back-pressure policies
+- Drain-on-shutdown behaviour
+- CSVSink batched writes and flush policy
+- CSVSink rotation hand-off and background compression
+- EnhancedCSVSink streaming appends and segment manifest
+- ParquetSink partitioned row groups and queries
+- TickLogSink binary append and memory-mapped replay
+- InfluxDB line-protocol serialization
+- InfluxDB parameterized queries and result chunking
+"""
+
+import csv
+import gzip
+import json
+import time
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from g6_platform.storage.csv_sink import CSVSink
+from g6_platform.storage.pipeline import StoragePipeline
+from g6_platform.storage.parquet_sink import ParquetSink, PYARROW_AVAILABLE
+from g6_platform.storage.tick_log import TickLogSink
+from g6_platform.storage.rollup import RollupSink
+from g6_platform.storage.influxdb_sink import (
+    InfluxDBSink, LineProtocolSerializer, AsyncLineWriter, build_flux_query, _rechunk
+)
+from g6_platform.core.chain_snapshot import ChainSnapshot
+from enhanced_csv_sink_complete import EnhancedCSVSink
+
+
+class RecordingBackend:
+    """Backend stub that records stored batches, optionally slowly."""
+    
+    def __init__(self, delay: float = 0.0, gate: threading.Event = None):
+        self.delay = delay
+        self.gate = gate
+        self.batches = []
+    
+    def store_options_data(self, index_name, options_data, timestamp=None):
+        if self.gate:
+            self.gate.wait(5)
+        time.sleep(self.delay)
+        self.batches.append((index_name, options_data))
+        return True
+
+
+class TestStoragePipeline(unittest.TestCase):
+    """Test cases for StoragePipeline."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """Remove spill directory."""
+        self.temp_dir.cleanup()
+    
+    def test_submit_does_not_wait_for_slow_backend(self):
+        """Producers return immediately even when a backend is slow."""
+        slow = RecordingBackend(delay=0.2)
+        pipeline = StoragePipeline({'slow': slow}, spill_dir=self.temp_dir.name)
+        
+        start = time.time()
+        for i in range(3):
+            pipeline.submit('NIFTY', [{'strike': i}])
+        self.assertLess(time.time() - start, 0.1)
+        
+        self.assertTrue(pipeline.drain(timeout=5))
+        self.assertEqual(len(slow.batches), 3)
+    
+    def test_drop_oldest_policy(self):
+        """A full queue discards its oldest batch under drop_oldest."""
+        gate = threading.Event()
+        backend = RecordingBackend(gate=gate)
+        pipeline = StoragePipeline({'csv': backend}, max_queue_size=2,
+                                   backpressure_policy='drop_oldest', spill_dir=self.temp_dir.name)
+        
+        for i in range(6):
+            pipeline.submit('NIFTY', [{'seq': i}])
+        gate.set()
+        pipeline.drain(timeout=5)
+        
+        stats = pipeline.get_stats()['csv']
+        self.assertGreater(stats['dropped'], 0)
+        self.assertEqual(backend.batches[-1][1], [{'seq': 5}])
+    
+    def test_spill_policy_preserves_order(self):
+        """Spilled batches are replayed in submission order."""
+        gate = threading.Event()
+        backend = RecordingBackend(gate=gate)
+        pipeline = StoragePipeline({'influxdb': backend}, max_queue_size=1,
+                                   backpressure_policy='spill', spill_dir=self.temp_dir.name)
+        
+        for i in range(6):
+            self.assertTrue(pipeline.submit('NIFTY', [{'seq': i}]))
+        gate.set()
+        self.assertTrue(pipeline.drain(timeout=10))
+        
+        self.assertEqual([b[1][0]['seq'] for b in backend.batches], list(range(6)))
+        self.assertGreater(pipeline.get_stats()['influxdb']['replayed'], 0)
+    
+    def _write_spill(self, path, seqs, torn=False):
+        """Write spill records for the given sequence numbers."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in seqs:
+                f.write(json.dumps({'enqueued_at': time.time(), 'index_name': 'NIFTY',
+                                    'timestamp': datetime.now().isoformat(),
+                                    'data': [{'seq': i}]}) + '\n')
+            if torn:
+                f.write('{"enqueued_at": 1.0, "index_na')
+    
+    def test_interrupted_replay_resumes_after_restart(self):
+        """A leftover replay file is replayed from its committed offset, skipping a torn tail."""
+        spill_path = Path(self.temp_dir.name) / 'csv.spill.jsonl'
+        replay_path = spill_path.with_suffix('.replay')
+        self._write_spill(replay_path, range(4), torn=True)
+        
+        # First two records were stored before the restart
+        first_two = sum(len(line) for line in replay_path.read_bytes().splitlines(keepends=True)[:2])
+        spill_path.with_suffix('.offset').write_text(str(first_two))
+        
+        backend = RecordingBackend()
+        pipeline = StoragePipeline({'csv': backend}, spill_dir=self.temp_dir.name)
+        self.assertTrue(pipeline.drain(timeout=5))
+        
+        self.assertEqual([b[1][0]['seq'] for b in backend.batches], [2, 3])
+        self.assertFalse(replay_path.exists())
+        self.assertFalse(spill_path.with_suffix('.offset').exists())
+    
+    def test_failed_replay_keeps_remaining_batches(self):
+        """A backend failure stops replay at that batch without losing or repeating batches."""
+        
+        class FlakyBackend(RecordingBackend):
+            def __init__(self):
+                super().__init__()
+                self.calls = 0
+            
+            def store_options_data(self, index_name, options_data, timestamp=None):
+                self.calls += 1
+                if self.calls in (2, 3):
+                    raise ConnectionError("backend down")
+                return super().store_options_data(index_name, options_data, timestamp)
+        
+        self._write_spill(Path(self.temp_dir.name) / 'influxdb.spill.jsonl', range(3))
+        
+        backend = FlakyBackend()
+        pipeline = StoragePipeline({'influxdb': backend}, spill_dir=self.temp_dir.name)
+        self.assertTrue(pipeline.drain(timeout=10))
+        
+        self.assertEqual([b[1][0]['seq'] for b in backend.batches], [0, 1, 2])
+        stats = pipeline.get_stats()['influxdb']
+        self.assertEqual(stats['replayed'], 3)
+        self.assertEqual(stats['failed'], 2)
+    
+    def test_closed_pipeline_rejects_batches(self):
+        """No batches are accepted after drain."""
+        pipeline = StoragePipeline({'csv': RecordingBackend()}, spill_dir=self.temp_dir.name)
+        pipeline.drain(timeout=2)
+        self.assertFalse(pipeline.submit('NIFTY', [{'strike': 1}]))
+
+
+class TestCSVSinkBatchedWrites(unittest.TestCase):
+    """Test cases for the pre-rendered, policy-flushed CSV write path."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.timestamp = datetime(2025, 1, 6, 9, 15)
+        self.records = [
+            {'symbol': f"NIFTY{25000 + i * 50}CE", 'strike': 25000 + i * 50, 'option_type': 'CE',
+             'last_price': 100.5 + i, 'volume': 10, 'oi': None, 'unknown_field': 'x'}
+            for i in range(3)
+        ]
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.sink.shutdown()
+        self.temp_dir.cleanup()
+    
+    def _make_sink(self, **kwargs):
+        self.sink = CSVSink(base_path=self.temp_dir.name, enable_rotation=False, **kwargs)
+        return self.sink
+    
+    def _read_rows(self):
+        path = self.sink._get_file_path(self.sink._get_file_key('NIFTY', self.timestamp))
+        with open(path, newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+    
+    def test_rows_match_dictwriter_output(self):
+        """Rendered rows carry the same values and metadata defaults as before."""
+        sink = self._make_sink(flush_interval_seconds=0)
+        self.assertTrue(sink.store_options_data('NIFTY', self.records, self.timestamp))
+        
+        rows = self._read_rows()
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1]['strike'], '25050')
+        self.assertEqual(rows[1]['last_price'], '101.5')
+        self.assertEqual(rows[1]['oi'], '')
+        self.assertEqual(rows[1]['write_timestamp'], self.timestamp.isoformat())
+        self.assertEqual(rows[1]['index_name'], 'NIFTY')
+        self.assertNotIn('write_timestamp', self.records[0])
+    
+    def test_rows_buffered_until_flush_policy(self):
+        """Rows stay buffered until the row threshold or an explicit flush."""
+        sink = self._make_sink(flush_every_rows=5, flush_interval_seconds=3600)
+        sink.store_options_data('NIFTY', self.records, self.timestamp)
+        self.assertEqual(self._read_rows(), [])
+        
+        sink.store_options_data('NIFTY', self.records, self.timestamp)
+        self.assertEqual(len(self._read_rows()), 6)
+        
+        sink.store_options_data('NIFTY', self.records, self.timestamp)
+        sink.flush_all(fsync=True)
+        self.assertEqual(len(self._read_rows()), 9)
+        
+        stats = sink.get_storage_stats()
+        self.assertEqual(stats['records_written'], 9)
+        self.assertEqual(stats['fsyncs'], 1)
+        self.assertGreater(stats['rows_per_sec'], 0)
+        self.assertGreater(stats['bytes_per_sec'], 0)
+
+
+
+class TestCSVSinkRotation(unittest.TestCase):
+    """Test cases for rename-based rotation and background compression."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.timestamp = datetime(2025, 1, 6, 9, 15)
+        self.records = [{'symbol': 'NIFTY25000CE', 'strike': 25000, 'option_type': 'CE', 'last_price': 100.5}]
+        self.sink = CSVSink(base_path=self.temp_dir.name, flush_interval_seconds=0,
+                            compression_tiers={'archive': {'codec': 'gzip', 'level': 1}})
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.sink.shutdown()
+        self.temp_dir.cleanup()
+    
+    def test_rotated_file_compressed_in_background(self):
+        """Rotation renames the file, writes continue, and the archive is gzipped off-path."""
+        self.sink.store_options_data('NIFTY', self.records, self.timestamp)
+        file_key = self.sink._get_file_key('NIFTY', self.timestamp)
+        with self.sink._file_locks[file_key]:
+            self.sink._rotate_file(file_key)
+        self.assertTrue(self.sink.store_options_data('NIFTY', self.records, self.timestamp))
+        
+        self.assertTrue(self.sink.wait_for_compression(timeout=10))
+        archived = list(self.sink.archive_dir.iterdir())
+        self.assertEqual(len(archived), 1)
+        self.assertTrue(archived[0].name.endswith('.csv.gz'))
+        with gzip.open(archived[0], 'rt', newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(rows[0]['symbol'], 'NIFTY25000CE')
+        
+        stats = self.sink.get_storage_stats()
+        self.assertEqual(stats['compression_completed'], 1)
+        self.assertEqual(stats['compression_backlog'], 0)
+        self.assertEqual(len(self._read_current(file_key)), 1)
+    
+    def test_leftover_archives_resumed_on_start(self):
+        """Uncompressed archives from an earlier run are queued at startup."""
+        leftover = self.sink.archive_dir / 'NIFTY_2025-01-03_options_20250103_153000.csv'
+        leftover.write_text('symbol\nNIFTY25000CE\n')
+        (self.sink.archive_dir / 'stale.csv.gz.part').write_bytes(b'partial')
+        self.sink.shutdown()
+        
+        self.sink = CSVSink(base_path=self.temp_dir.name,
+                            compression_tiers={'archive': {'codec': 'gzip', 'level': 1}})
+        self.assertTrue(self.sink.wait_for_compression(timeout=10))
+        self.assertEqual(sorted(p.name for p in self.sink.archive_dir.iterdir()), [leftover.name + '.gz'])
+    
+    def _read_current(self, file_key):
+        with open(self.sink._get_file_path(file_key), newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+
+
+class TestEnhancedCSVSinkStreamingAppend(unittest.TestCase):
+    """Test cases for segment-based streaming appends."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.sink = EnhancedCSVSink(self.temp_dir.name, enable_backup=False)
+        self.csv_file = Path(self.temp_dir.name) / '2025-01-06.csv'
+        self.timestamp = datetime(2025, 1, 6, 9, 15)
+        self.rows = [{'tradingsymbol': f"NIFTY{25000 + i * 50}CE", 'strike': 25000 + i * 50, 'last_price': 10.5}
+                     for i in range(3)]
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.temp_dir.cleanup()
+    
+    def _append(self, rows):
+        return self.sink._write_csv_atomic(self.csv_file, rows, self.timestamp, append_mode=True)
+    
+    def test_appends_do_not_rewrite_file(self):
+        """Appends extend the day file in place and are tracked by the manifest."""
+        self.assertTrue(self._append(self.rows))
+        inode = self.csv_file.stat().st_ino
+        self.assertTrue(self._append(self.rows))
+        
+        self.assertEqual(self.csv_file.stat().st_ino, inode)
+        self.assertEqual(len(self.sink.read_segments(self.csv_file)), 6)
+        manifest = json.loads(self.csv_file.with_suffix('.manifest.json').read_text())
+        self.assertEqual(manifest['segments'][0]['rows'], 6)
+        self.assertEqual(manifest['segments'][0]['bytes'], self.csv_file.stat().st_size)
+    
+    def test_schema_change_opens_new_segment(self):
+        """New columns start a new segment instead of rewriting history."""
+        self._append(self.rows)
+        self._append([dict(row, iv=18.2) for row in self.rows])
+        
+        rows = self.sink.read_segments(self.csv_file)
+        self.assertEqual(len(rows), 6)
+        self.assertNotIn('iv', rows[0])
+        self.assertEqual(rows[-1]['iv'], '18.2')
+        self.assertTrue((self.csv_file.parent / '2025-01-06.seg001.csv').exists())
+    
+    def test_uncommitted_bytes_truncated_on_reload(self):
+        """A torn append past the committed length is cut off on reload."""
+        self._append(self.rows)
+        committed_size = self.csv_file.stat().st_size
+        with open(self.csv_file, 'ab') as f:
+            f.write(b'NIFTY25150CE,251')
+        
+        sink = EnhancedCSVSink(self.temp_dir.name, enable_backup=False)
+        self.assertEqual(len(sink.read_segments(self.csv_file)), 3)
+        self.assertEqual(self.csv_file.stat().st_size, committed_size)
+
+
+
+@unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow not installed")
+class TestParquetSink(unittest.TestCase):
+    """Test cases for the partitioned Parquet backend."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.sink = ParquetSink(base_path=self.temp_dir.name)
+        records = []
+        for i in range(5):
+            for option_type in ('CE', 'PE'):
+                records.append({'symbol': f"NIFTY{25000 + i * 50}{option_type}", 'strike': 25000 + i * 50,
+                                'option_type': option_type, 'expiry': '2025-01-09', 'last_price': 50.0 + i,
+                                'volume': 100 * i, 'oi': None, 'instrument_token': 1000 + i})
+        self.snapshot = ChainSnapshot.from_records(records, index_name='NIFTY')
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.sink.shutdown()
+        self.temp_dir.cleanup()
+    
+    def test_cycles_batched_into_row_groups(self):
+        """Cycles are batched into row groups; open files stay hidden until flushed."""
+        for minute in (15, 16):
+            self.assertTrue(self.sink.store_options_data('NIFTY', self.snapshot, datetime(2025, 1, 6, 9, minute)))
+        self.assertEqual(len(self.sink.query()), 0)
+        
+        self.sink.flush()
+        frame = self.sink.query(index_name='NIFTY', expiry='2025-01-09')
+        self.assertEqual(len(frame), 20)
+        self.assertEqual(self.sink.get_storage_stats()['row_groups_written'], 1)
+        self.assertEqual(str(frame['volume'].dtype), 'int64')
+        self.assertTrue(frame['oi'].isna().all())
+    
+    def test_query_pushes_down_filters(self):
+        """Partition keys and column predicates narrow the result."""
+        self.sink.store_options_data('NIFTY', self.snapshot, datetime(2025, 1, 6, 9, 15))
+        self.sink.store_options_data('NIFTY', self.snapshot.to_records(), datetime(2025, 1, 7, 9, 15))
+        self.sink.flush()
+        
+        frame = self.sink.query(index_name='NIFTY', start_date='2025-01-07',
+                                columns=['symbol', 'strike', 'option_type'],
+                                filters=[('strike', '>=', 25100), ('option_type', '==', 'CE')])
+        self.assertEqual(sorted(frame['strike']), [25100.0, 25150.0, 25200.0])
+        self.assertEqual(list(frame.columns), ['symbol', 'strike', 'option_type'])
+        self.assertEqual(len(self.sink.query(index_name='BANKNIFTY')), 0)
+    
+    def test_date_and_expiry_change_publish_old_partition(self):
+        """A new date or expiry closes the superseded partition without a flush."""
+        self.sink.store_options_data('NIFTY', self.snapshot, datetime(2025, 1, 6, 15, 29))
+        self.sink.store_options_data('BANKNIFTY', self.snapshot, datetime(2025, 1, 6, 15, 29))
+        self.sink.store_options_data('NIFTY', self.snapshot, datetime(2025, 1, 7, 9, 15))
+        
+        self.assertEqual(len(self.sink.query(index_name='NIFTY', start_date='2025-01-06', end_date='2025-01-06')), 10)
+        self.assertEqual(len(self.sink.query(index_name='BANKNIFTY')), 0)
+        
+        rolled = ChainSnapshot.from_records(
+            [dict(record, expiry='2025-01-16') for record in self.snapshot.to_records()], index_name='NIFTY'
+        )
+        self.sink.store_options_data('NIFTY', rolled, datetime(2025, 1, 7, 9, 16))
+        self.assertEqual(len(self.sink.query(index_name='NIFTY', expiry='2025-01-09')), 20)
+        self.assertEqual(self.sink.get_storage_stats()['open_files'], 2)
+    
+    def test_idle_partition_closed_after_roll_interval(self):
+        """A partition that stops receiving cycles is published once idle past the roll interval."""
+        self.sink.roll_interval_seconds = 60
+        self.sink.store_options_data('BANKNIFTY', self.snapshot, datetime(2025, 1, 6, 9, 15))
+        self.sink._writers[('BANKNIFTY', '2025-01-06', '2025-01-09')].last_write_at -= 120
+        
+        self.sink.store_options_data('NIFTY', self.snapshot, datetime(2025, 1, 6, 9, 17))
+        self.assertEqual(len(self.sink.query(index_name='BANKNIFTY')), 10)
+        self.assertEqual(self.sink.get_storage_stats()['open_files'], 1)
+
+
+
+class TestTickLogSink(unittest.TestCase):
+    """Test cases for the binary tick log and replay."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.sink = TickLogSink(base_path=self.temp_dir.name)
+        records = [{'symbol': f"NIFTY{25000 + i * 50}{option_type}", 'strike': 25000 + i * 50,
+                    'option_type': option_type, 'expiry': '2025-01-09', 'last_price': 50.0 + i,
+                    'volume': 100 * i, 'oi': 1000 + i, 'instrument_token': 1000 + i}
+                   for i in range(3) for option_type in ('CE', 'PE')]
+        self.snapshot = ChainSnapshot.from_records(records, index_name='NIFTY', spot_price=25050.0)
+        self.start = datetime(2025, 1, 6, 9, 15)
+        for minute in range(3):
+            self.sink.store_options_data('NIFTY', self.snapshot, self.start.replace(minute=15 + minute))
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.sink.shutdown()
+        self.temp_dir.cleanup()
+    
+    def test_replay_round_trip(self):
+        """Replayed cycles carry the logged columns and metadata."""
+        snapshots = list(self.sink.replay('NIFTY', self.start, self.start.replace(minute=30)))
+        self.assertEqual([s.timestamp for s in snapshots], [self.start.replace(minute=m) for m in (15, 16, 17)])
+        
+        replayed = snapshots[0]
+        self.assertEqual(replayed.expiry, '2025-01-09')
+        self.assertEqual(replayed.spot_price, 25050.0)
+        self.assertEqual(list(replayed.symbol), list(self.snapshot.symbol))
+        self.assertEqual(replayed.calls().oi.tolist(), [1000.0, 1001.0, 1002.0])
+        self.assertTrue(np.isnan(replayed.columns['delta']).all())
+    
+    def test_replay_time_range_and_torn_tail(self):
+        """Ranges select whole cycles and a torn trailing record is ignored."""
+        path = self.sink.get_path('NIFTY', self.start)
+        self.sink.shutdown()
+        with open(path, 'ab') as f:
+            f.write(b'\x01' * 10)
+        
+        snapshots = list(self.sink.replay('NIFTY', self.start.replace(minute=16), self.start.replace(minute=17)))
+        self.assertEqual(len(snapshots), 2)
+        self.assertTrue(all(len(s) == 6 for s in snapshots))
+        
+        # Appending again trims the torn bytes first
+        self.sink.store_options_data('NIFTY', self.snapshot, self.start.replace(minute=18))
+        self.assertEqual(len(list(self.sink.replay('NIFTY', self.start, self.start.replace(minute=30)))), 4)
+
+
+class TestRollupSink(unittest.TestCase):
+    """Test cases for the downsampling tier."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.start = datetime.now().replace(hour=9, minute=15, second=0, microsecond=0)
+        self.snapshots = []
+        for cycle in range(20):
+            records = [{'symbol': f"NIFTY{25000 + i * 50}{option_type}", 'strike': 25000 + i * 50,
+                        'option_type': option_type, 'expiry': '2025-01-09',
+                        'last_price': 50.0 + i + (cycle if option_type == 'CE' else -cycle),
+                        'volume': 10 * cycle, 'oi': 1000 + (cycle if option_type == 'CE' else 2 * cycle),
+                        'iv': 0.2 if option_type == 'CE' else 0.22}
+                       for i in range(3) for option_type in ('CE', 'PE')]
+            timestamp = self.start + timedelta(seconds=30 * cycle)
+            self.snapshots.append((timestamp, ChainSnapshot.from_records(
+                records, index_name='NIFTY', timestamp=timestamp, spot_price=25050.0 + cycle)))
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.temp_dir.cleanup()
+    
+    def test_bars_and_tier_selection(self):
+        """Cycles fold into OHLC/OI/PCR bars and queries read the coarsest fitting tier."""
+        sink = RollupSink(base_path=Path(self.temp_dir.name) / "rollups")
+        for timestamp, snapshot in self.snapshots:
+            sink.store_options_data('NIFTY', snapshot, timestamp)
+        
+        minute_bars = sink.query('NIFTY', self.start, resolution=timedelta(minutes=1))
+        self.assertEqual(minute_bars.attrs['tier'], '1m')
+        self.assertEqual(len(minute_bars), 10)
+        first = minute_bars.iloc[0]
+        self.assertEqual((first['spot_open'], first['spot_high'], first['spot_close']), (25050.0, 25051.0, 25051.0))
+        self.assertEqual((first['call_oi_change'], first['put_oi_change']), (3.0, 6.0))
+        self.assertAlmostEqual(first['pcr_oi_close'], 3006 / 3003)
+        self.assertEqual(first['atm_strike'], 25050.0)
+        self.assertAlmostEqual(first['atm_iv_mean'], 0.21)
+        
+        sink.shutdown()
+        contracts = sink.query('NIFTY', self.start, resolution=timedelta(minutes=7), kind='contracts')
+        self.assertEqual(contracts.attrs['tier'], '5m')
+        call = contracts[contracts['symbol'] == 'NIFTY25000CE'].iloc[0]
+        self.assertEqual((call['open'], call['high'], call['close'], call['oi_change'], call['volume']),
+                         (50.0, 59.0, 59.0, 9.0, 90.0))
+        self.assertEqual(sink.select_tier(datetime.now() - timedelta(days=90)), '1h')
+    
+    def test_retention_runs_off_the_store_path(self):
+        """Expired bars are pruned on the retention thread, never inside store_options_data."""
+        class InfluxStub:
+            def __init__(self):
+                self.delete_threads = []
+            
+            def delete_data(self, measurement, start, stop):
+                self.delete_threads.append(threading.current_thread().name)
+            
+            def write_line_protocol(self, payload, count):
+                pass
+        
+        influx = InfluxStub()
+        sink = RollupSink(base_path=Path(self.temp_dir.name) / "rollups", tiers={'1m': {}}, influx_sink=influx)
+        for timestamp, snapshot in self.snapshots[:4]:
+            sink.store_options_data('NIFTY', snapshot, timestamp)
+        sink.shutdown()
+        
+        self.assertTrue(influx.delete_threads)
+        self.assertEqual(set(influx.delete_threads), {'RollupRetention'})
+    
+    def test_bar_volume_and_oi_change_sum_to_cumulative_delta(self):
+        """Each bar counts from the previous bar's close, so no cycle-to-cycle change is dropped."""
+        sink = RollupSink(base_path=Path(self.temp_dir.name) / "rollups", tiers={'1m': {}})
+        for timestamp, snapshot in self.snapshots:
+            sink.store_options_data('NIFTY', snapshot, timestamp)
+        sink.shutdown()
+        
+        contracts = sink.query('NIFTY', self.start, kind='contracts')
+        call = contracts[contracts['symbol'] == 'NIFTY25000CE']
+        self.assertEqual(len(call), 10)
+        self.assertEqual(call['volume'].sum(), 190.0)
+        self.assertEqual(call['oi_change'].sum(), 19.0)
+        
+        chain = sink.query('NIFTY', self.start)
+        self.assertEqual((chain['call_oi_change'].sum(), chain['put_oi_change'].sum()), (57.0, 114.0))
+    
+    def test_backfill_from_csv_matches_live(self):
+        """Bars rebuilt from CSVSink files match the incrementally built ones."""
+        live = RollupSink(base_path=Path(self.temp_dir.name) / "live")
+        csv_sink = CSVSink(base_path=Path(self.temp_dir.name) / "csv")
+        for timestamp, snapshot in self.snapshots:
+            live.store_options_data('NIFTY', snapshot, timestamp)
+            csv_sink.store_options_data('NIFTY', snapshot, timestamp)
+        live.shutdown()
+        csv_sink.shutdown()
+        
+        backfilled = RollupSink(base_path=Path(self.temp_dir.name) / "backfill")
+        self.assertEqual(backfilled.backfill_from_csv(csv_sink, 'NIFTY', self.start.date()), 20)
+        
+        columns = ['bucket_start', 'samples', 'call_oi_change', 'put_oi_change', 'pcr_oi_close', 'atm_iv_close']
+        for tier in ('1m', '5m'):
+            expected = live.query('NIFTY', self.start, tier=tier)[columns]
+            actual = backfilled.query('NIFTY', self.start, tier=tier)[columns]
+            pd.testing.assert_frame_equal(expected, actual, obj=tier)
+
+
+
+class TestLineProtocolSerializer(unittest.TestCase):
+    """Test cases for the InfluxDB line-protocol fast path."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.timestamp = datetime(2025, 1, 6, 9, 15)
+        self.records = [
+            {'symbol': 'NIFTY25000CE', 'strike': 25000, 'option_type': 'CE', 'expiry': '2025-01-09',
+             'last_price': 101.5, 'volume': 10, 'oi': None, 'iv': float('nan'), 'tradingsymbol': 'a "b"'},
+            {'symbol': 'NIFTY 25000PE', 'strike': 25000, 'option_type': 'PE', 'expiry': '2025-01-09',
+             'last_price': 99.0, 'volume': 12, 'oi': 300}
+        ]
+    
+    def test_records_render_escaped_typed_lines(self):
+        """Tags are sorted and escaped, missing/non-finite fields skipped, no metadata fields."""
+        payload, count = LineProtocolSerializer().serialize_records('NIFTY', self.records, self.timestamp)
+        lines = payload.decode('utf-8').split('\n')
+        
+        self.assertEqual(count, 2)
+        self.assertEqual(lines[0],
+                         'options_data,expiry=2025-01-09,index_name=NIFTY,option_type=CE,strike=25000,'
+                         'symbol=NIFTY25000CE last_price=101.5,volume=10.0,tradingsymbol="a \\"b\\"" '
+                         f"{int(self.timestamp.timestamp())}")
+        self.assertIn('symbol=NIFTY\\ 25000PE ', lines[1])
+        self.assertNotIn('collection_timestamp', payload.decode('utf-8'))
+    
+    def test_snapshot_matches_records(self):
+        """The columnar path renders the same lines as the record path."""
+        serializer = LineProtocolSerializer(integer_counts=True)
+        snapshot = ChainSnapshot.from_records(self.records, index_name='NIFTY')
+        from_records, _ = serializer.serialize_records('NIFTY', self.records, self.timestamp)
+        from_snapshot, _ = serializer.serialize_snapshot(snapshot, self.timestamp)
+        
+        self.assertEqual(sorted(from_records.split(b'\n')), sorted(from_snapshot.split(b'\n')))
+        self.assertIn(b'volume=12i,oi=300i', from_snapshot)
+
+
+class TestAsyncLineWriter(unittest.TestCase):
+    """Test cases for the non-blocking InfluxDB writer."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.spill_path = Path(self.temp_dir) / "influxdb.spill"
+        self.online = True
+        self.written = []
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def send(self, payload, count):
+        """Fake InfluxDB write."""
+        if not self.online:
+            raise ConnectionError("influxdb down")
+        self.written.extend(payload.split(b'\n'))
+    
+    def make_writer(self):
+        return AsyncLineWriter(self.send, self.spill_path, batch_size=2, flush_interval=0.05,
+                               max_retries=1, retry_base_delay=0.01, max_retry_delay=0.02)
+    
+    def test_outage_spills_and_replays_in_order(self):
+        """Failed batches go to disk and are replayed oldest-first once writes succeed."""
+        writer = self.make_writer()
+        self.online = False
+        for i in range(4):
+            writer.submit(f"m v={i} {i}".encode(), 1)
+        self.assertTrue(writer.flush())
+        self.assertEqual(writer.get_stats()['spill_pending_points'], 4)
+        
+        self.online = True
+        writer.submit(b"m v=4 4", 1)
+        self.assertTrue(writer.flush())
+        deadline = time.time() + 2
+        while writer.spill and time.time() < deadline:
+            time.sleep(0.01)
+        writer.close()
+        
+        self.assertEqual(self.written, [f"m v={i} {i}".encode() for i in range(5)])
+        self.assertEqual(writer.get_stats()['points_replayed'], 5)
+        self.assertEqual(self.spill_path.stat().st_size, 0)
+    
+    def test_spill_survives_restart(self):
+        """Points spilled at shutdown are replayed by the next writer; a torn tail is dropped."""
+        self.online = False
+        writer = self.make_writer()
+        writer.submit(b"m v=1 1", 1)
+        writer.close()
+        with open(self.spill_path, 'ab') as f:
+            f.write(b'\x40\x00')
+        
+        self.online = True
+        writer = self.make_writer()
+        deadline = time.time() + 2
+        while writer.spill and time.time() < deadline:
+            time.sleep(0.01)
+        writer.close()
+        
+        self.assertEqual(self.written, [b"m v=1 1"])
+    
+    def test_rejected_batch_is_dead_lettered(self):
+        """A 4xx-rejected batch goes to the dead-letter file instead of wedging replay."""
+        
+        class Rejected(Exception):
+            def __init__(self, status):
+                super().__init__(f"HTTP {status}")
+                self.response = type('Response', (), {'status': status})()
+        
+        def send(payload, count):
+            if not self.online:
+                raise Rejected(429)
+            if b'bad' in payload:
+                raise Rejected(400)
+            self.written.extend(payload.split(b'\n'))
+        
+        self.online = False
+        writer = AsyncLineWriter(send, self.spill_path, batch_size=1, flush_interval=0.0,
+                                 max_retries=0, retry_base_delay=0.01, max_retry_delay=0.02)
+        writer.submit(b"m bad=1 1", 1)
+        writer.submit(b"m v=2 2", 1)
+        self.assertTrue(writer.flush())
+        self.assertEqual(writer.get_stats()['spill_pending_points'], 2)
+        
+        self.online = True
+        deadline = time.time() + 2
+        while writer.spill and time.time() < deadline:
+            time.sleep(0.01)
+        writer.close()
+        
+        stats = writer.get_stats()
+        self.assertEqual(self.written, [b"m v=2 2"])
+        self.assertEqual(stats['points_rejected'], 1)
+        self.assertEqual(stats['spill_pending_points'], 0)
+        self.assertEqual(writer.rejected_path.read_bytes(), b"m bad=1 1\n")
+    
+    def test_unbatched_writer_blocks_while_idle(self):
+        """With flush_interval=0 the worker sleeps on the queue instead of spinning."""
+        writer = AsyncLineWriter(self.send, self.spill_path, batch_size=1000, flush_interval=0.0)
+        cpu_start = time.process_time()
+        time.sleep(0.3)
+        idle_cpu = time.process_time() - cpu_start
+        
+        writer.submit(b"m v=1 1", 1)
+        self.assertTrue(writer.flush())
+        writer.close()
+        
+        self.assertLess(idle_cpu, 0.1)
+        self.assertEqual(self.written, [b"m v=1 1"])
+
+
+class TestFluxQueryBuilder(unittest.TestCase):
+    """Test cases for parameterized Flux queries."""
+    
+    def test_values_are_parameters(self):
+        """Filter values never appear in the query text; lists match any item."""
+        start = datetime(2025, 1, 6, 9, 15)
+        query, params = build_flux_query('g6', 'options_data', start, filters={
+            'index_name': 'NIFTY") |> drop(', 'option_type': ['CE', 'PE']
+        }, fields=['oi'], window=timedelta(minutes=5), aggregate='max', limit=100, offset=200)
+        
+        self.assertNotIn('NIFTY', query)
+        self.assertIn('r["index_name"] == params.filter0', query)
+        self.assertIn('contains(value: r["option_type"], set: params.filter1)', query)
+        self.assertIn('aggregateWindow(every: params.every, fn: max', query)
+        self.assertIn('pivot(', query)
+        self.assertEqual(params['filter1'], ['CE', 'PE'])
+        self.assertEqual((params['start'], params['limit'], params['offset']), (start, 100, 200))
+    
+    def test_rejects_unsafe_identifiers(self):
+        """Tag keys and aggregate functions are whitelisted."""
+        start = datetime(2025, 1, 6)
+        with self.assertRaises(ValueError):
+            build_flux_query('g6', 'options_data', start, filters={'a) or (true': 'x'})
+        with self.assertRaises(ValueError):
+            build_flux_query('g6', 'options_data', start, aggregate='drop')
+    
+    def test_rechunk_bounds_chunk_rows(self):
+        """Uneven stream frames are regrouped into full chunks plus one remainder."""
+        frames = [pd.DataFrame({'value': range(start, stop)}) for start, stop in ((0, 3), (3, 10), (10, 11))]
+        chunks = list(_rechunk(iter(frames), 4))
+        
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 3])
+        self.assertEqual(pd.concat(chunks)['value'].tolist(), list(range(11)))
+        self.assertEqual(list(chunks[1].index), [0, 1, 2, 3])
+        self.assertEqual(list(_rechunk(iter([]), 4)), [])
+    
+    def test_query_frame_cleans_and_concatenates_tables(self):
+        """Pivoted tables lose Flux bookkeeping columns and are joined into one frame."""
+        class QueryApiStub:
+            def __init__(self):
+                self.calls = []
+            
+            def query_data_frame(self, query, org=None, params=None):
+                self.calls.append((query, params))
+                meta = {'result': '_result', 'table': 0, '_start': 0, '_stop': 0, '_measurement': 'options_data'}
+                return [
+                    pd.DataFrame([dict(meta, _time='2025-01-06T09:15:00Z', symbol='NIFTY25000CE', oi=10.0)]),
+                    pd.DataFrame(),
+                    pd.DataFrame([dict(meta, table=1, _time='2025-01-06T09:15:00Z', symbol='NIFTY25000PE',
+                                       oi=12.0, iv=0.2)])
+                ]
+        
+        class WriterStub:
+            def close(self):
+                pass
+        
+        # Bypass __init__ (no InfluxDB client or server needed)
+        sink = InfluxDBSink.__new__(InfluxDBSink)
+        sink._connected, sink._query_api, sink._client, sink._writer = True, QueryApiStub(), None, WriterStub()
+        sink.bucket, sink.org = 'g6', 'org'
+        
+        frame = sink.query_frame('options_data', datetime(2025, 1, 6), filters={'index_name': 'NIFTY'})
+        self.assertEqual(list(frame.columns), ['time', 'symbol', 'oi', 'iv'])
+        self.assertEqual(frame['symbol'].tolist(), ['NIFTY25000CE', 'NIFTY25000PE'])
+        self.assertEqual(frame['oi'].tolist(), [10.0, 12.0])
+        self.assertIn('pivot(', sink._query_api.calls[0][0])
+        self.assertEqual(sink._query_api.calls[0][1]['filter0'], 'NIFTY')
+        
+        sink._connected = False
+        self.assertTrue(sink.query_frame('options_data', datetime(2025, 1, 6)).empty)
+
+
+if __name__ == '__main__':
+    unittest.main()